@@ -8,11 +8,13 @@ require_once BACKEND_PATH . 'config/database.php';
 require_once BACKEND_PATH . 'models/ServiceRequest.php';
 require_once BACKEND_PATH . 'models/Customer.php';
 require_once BACKEND_PATH . 'models/Driver.php';
+require_once BACKEND_PATH . 'models/Report.php';
 
 class ReportController extends Controller {
     private $requestModel;
     private $customerModel;
     private $driverModel;
+    private $reportModel;
 
     public function __construct() {
         parent::__construct();
@@ -20,6 +22,7 @@ class ReportController extends Controller {
         $this->requestModel = new ServiceRequest();
         $this->customerModel = new Customer();
         $this->driverModel = new Driver();
+        $this->reportModel = new Report();
     }
 
     // Report dashboard
@@ -405,6 +408,67 @@ class ReportController extends Controller {
         }
     }
 
+    // Queue a report for python/report_worker.py; poll status() for the outcome
+    public function queue() {
+        $this->requirePermission('generate_reports');
+
+        if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
+            $this->jsonError('Invalid request method', 405);
+        }
+        if (!isset($_POST['csrf_token']) || $_POST['csrf_token'] !== ($_SESSION['csrf_token'] ?? null)) {
+            $this->jsonError('Invalid request token.', 403);
+        }
+
+        try {
+            $type = sanitize($_POST['type'] ?? '');
+            $parameters = [];
+            if (!empty($_POST['date'])) {
+                $date = sanitize($_POST['date']);
+                if (!preg_match('/^\d{4}-\d{2}-\d{2}$/', $date)) {
+                    throw new Exception('Invalid date');
+                }
+                $parameters['date'] = $date;
+            }
+            foreach (['year', 'month', 'customer_id', 'days'] as $field) {
+                if (isset($_POST[$field]) && $_POST[$field] !== '') {
+                    $parameters[$field] = intval($_POST[$field]);
+                }
+            }
+
+            $id = $this->reportModel->enqueue($type, $parameters, $_SESSION['user_id']);
+            logActivity('report_queued', "Queued $type report #$id");
+
+            $this->jsonResponse([
+                'success' => true,
+                'message' => 'Report queued',
+                'data' => [
+                    'id' => (int)$id,
+                    'status' => 'pending',
+                    'status_url' => SITE_URL . 'reports/status/' . $id
+                ]
+            ], 202);
+
+        } catch (Exception $e) {
+            $this->jsonError($e->getMessage());
+        }
+    }
+
+    // Progress of a queued report: pending, processing, completed (with file_path) or failed
+    public function status() {
+        $this->requirePermission('view_reports');
+
+        $report = $this->reportModel->getStatus((int)($_GET['id'] ?? 0));
+        if (!$report) {
+            $this->jsonError('Report not found', 404);
+        }
+        if ($report['generated_by'] != $_SESSION['user_id'] && !hasPermission('export_reports')) {
+            $this->jsonError('You do not have permission to view this report.', 403);
+        }
+
+        $report['parameters'] = json_decode($report['parameters'] ?? 'null', true);
+        $this->jsonSuccess($report);
+    }
+
     // Export report as CSV
     public function export() {
         $this->requirePermission('export_reports');
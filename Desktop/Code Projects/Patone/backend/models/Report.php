@@ -0,0 +1,86 @@
+<?php
+/**
+ * Roadside Assistance Admin Platform - Report Model
+ * Queues reports for python/report_worker.py and tracks their progress
+ */
+
+class Report extends Model {
+    protected $table = 'reports';
+
+    // Report types the worker generates (REPORT_HANDLERS in python/report_worker.py)
+    // and the parameters each one needs
+    const TYPES = [
+        'daily' => ['date'],
+        'monthly' => ['year', 'month'],
+        'customer' => ['customer_id'],
+        'demand' => [],
+        'drivers' => [],
+        'customers' => [],
+        'revenue' => [],
+        'analysis' => []
+    ];
+
+    /**
+     * Queue a report as a pending row for the worker to generate
+     */
+    public function enqueue($reportType, $parameters, $userId) {
+        if (!array_key_exists($reportType, self::TYPES)) {
+            throw new Exception("Unknown report type: $reportType");
+        }
+
+        foreach (self::TYPES[$reportType] as $field) {
+            if (!isset($parameters[$field]) || $parameters[$field] === '') {
+                throw new Exception("Required parameter missing: $field");
+            }
+        }
+
+        return $this->db->insert(
+            "INSERT INTO {$this->table}
+             (report_type, report_name, generated_by, parameters, status, created_at)
+             VALUES (?, ?, ?, ?, 'pending', NOW())",
+            [$reportType, $this->reportName($reportType, $parameters), $userId, json_encode($parameters)]
+        );
+    }
+
+    /**
+     * Get a queued report's progress
+     */
+    public function getStatus($id) {
+        return $this->db->getRow(
+            "SELECT id, report_type, report_name, generated_by, parameters, status, file_path,
+                    error_message, attempts, created_at, started_at, completed_at, duration_seconds
+             FROM {$this->table}
+             WHERE id = ?",
+            [$id]
+        );
+    }
+
+    /**
+     * Get the reports a user queued, newest first
+     */
+    public function getRecentByUser($userId, $limit = 20) {
+        return $this->db->getRows(
+            "SELECT id, report_type, report_name, status, error_message, created_at, completed_at
+             FROM {$this->table}
+             WHERE generated_by = ?
+             ORDER BY created_at DESC, id DESC
+             LIMIT ?",
+            [$userId, $limit]
+        );
+    }
+
+    private function reportName($reportType, $parameters) {
+        switch ($reportType) {
+            case 'daily':
+                return "Daily Report {$parameters['date']}";
+            case 'monthly':
+                return sprintf('Monthly Report %04d-%02d', $parameters['year'], $parameters['month']);
+            case 'customer':
+                return "Customer Analysis #{$parameters['customer_id']}";
+            default:
+                $days = $parameters['days'] ?? null;
+                return ucfirst($reportType) . ' Analysis' . ($days ? " ({$days} days)" : '');
+        }
+    }
+}
+?>
@@ -0,0 +1,91 @@
+<?php
+/**
+ * Roadside Assistance Admin Platform - Service Request Change Index
+ * Migration for indexing service_requests.updated_at so the Python rollup
+ * refresh can find changed rows without scanning the table
+ */
+
+require_once '../../config.php';
+
+class ServiceRequestUpdatedIndexMigration {
+    private $db;
+
+    public function __construct() {
+        $this->db = Database::getInstance();
+    }
+
+    public function up() {
+        try {
+            echo "Starting service request updated_at index migration...\n";
+
+            $indexes = $this->db->getRows("SHOW INDEX FROM service_requests WHERE Key_name = 'idx_updated'");
+            if (empty($indexes)) {
+                echo "Adding idx_updated to service_requests...\n";
+                $this->db->query("ALTER TABLE service_requests ADD INDEX `idx_updated` (`updated_at`)");
+            }
+
+            // Record migration
+            $this->recordMigration('003_service_request_updated_index');
+
+            echo "Service request updated_at index migration completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Migration failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    public function down() {
+        try {
+            echo "Rolling back service request updated_at index...\n";
+
+            $indexes = $this->db->getRows("SHOW INDEX FROM service_requests WHERE Key_name = 'idx_updated'");
+            if (!empty($indexes)) {
+                $this->db->query("ALTER TABLE service_requests DROP INDEX `idx_updated`");
+            }
+
+            // Remove migration record
+            $this->removeMigration('003_service_request_updated_index');
+
+            echo "Rollback completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Rollback failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    private function recordMigration($version) {
+        $this->db->query(
+            "CREATE TABLE IF NOT EXISTS migrations (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                version VARCHAR(50) NOT NULL,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_version (version)
+            )"
+        );
+
+        $this->db->query(
+            "INSERT INTO migrations (version) VALUES (?)",
+            [$version]
+        );
+    }
+
+    private function removeMigration($version) {
+        $this->db->query("DELETE FROM migrations WHERE version = ?", [$version]);
+    }
+}
+
+// Handle command line execution
+if (php_sapi_name() === 'cli') {
+    $migration = new ServiceRequestUpdatedIndexMigration();
+
+    if ($argc > 1 && $argv[1] === 'down') {
+        $migration->down();
+    } else {
+        $migration->up();
+    }
+}
+?>
@@ -0,0 +1,114 @@
+<?php
+/**
+ * Roadside Assistance Admin Platform - Report Queue
+ * Migration for the columns the Python report worker uses to claim queued
+ * reports and record how each run went
+ */
+
+require_once '../../config.php';
+
+class ReportQueueMigration {
+    private $db;
+
+    public function __construct() {
+        $this->db = Database::getInstance();
+    }
+
+    public function up() {
+        try {
+            echo "Starting report queue migration...\n";
+
+            $columns = [
+                'started_at' => "DATETIME NULL COMMENT 'When a worker claimed the report' AFTER `created_at`",
+                'duration_seconds' => "DECIMAL(10,3) NULL COMMENT 'Generation time' AFTER `completed_at`",
+                'worker' => "VARCHAR(100) NULL COMMENT 'host:pid of the claiming worker' AFTER `status`",
+                'attempts' => "TINYINT UNSIGNED NOT NULL DEFAULT 0 AFTER `worker`",
+                'error_message' => "TEXT NULL AFTER `attempts`"
+            ];
+            foreach ($columns as $column => $definition) {
+                $existing = $this->db->getRows("SHOW COLUMNS FROM reports LIKE '$column'");
+                if (empty($existing)) {
+                    echo "Adding $column to reports...\n";
+                    $this->db->query("ALTER TABLE reports ADD COLUMN `$column` $definition");
+                }
+            }
+
+            // Workers claim the oldest pending rows: status first, then queue order
+            $indexes = $this->db->getRows("SHOW INDEX FROM reports WHERE Key_name = 'idx_status_created'");
+            if (empty($indexes)) {
+                echo "Adding idx_status_created to reports...\n";
+                $this->db->query("ALTER TABLE reports ADD INDEX `idx_status_created` (`status`, `created_at`)");
+            }
+
+            // Record migration
+            $this->recordMigration('004_report_queue');
+
+            echo "Report queue migration completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Migration failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    public function down() {
+        try {
+            echo "Rolling back report queue columns...\n";
+
+            $indexes = $this->db->getRows("SHOW INDEX FROM reports WHERE Key_name = 'idx_status_created'");
+            if (!empty($indexes)) {
+                $this->db->query("ALTER TABLE reports DROP INDEX `idx_status_created`");
+            }
+            // DROP COLUMN IF EXISTS is MariaDB-only, so check each column first
+            foreach (['error_message', 'attempts', 'worker', 'duration_seconds', 'started_at'] as $column) {
+                $existing = $this->db->getRows("SHOW COLUMNS FROM reports LIKE '$column'");
+                if (!empty($existing)) {
+                    $this->db->query("ALTER TABLE reports DROP COLUMN `$column`");
+                }
+            }
+
+            // Remove migration record
+            $this->removeMigration('004_report_queue');
+
+            echo "Rollback completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Rollback failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    private function recordMigration($version) {
+        $this->db->query(
+            "CREATE TABLE IF NOT EXISTS migrations (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                version VARCHAR(50) NOT NULL,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_version (version)
+            )"
+        );
+
+        $this->db->query(
+            "INSERT INTO migrations (version) VALUES (?)",
+            [$version]
+        );
+    }
+
+    private function removeMigration($version) {
+        $this->db->query("DELETE FROM migrations WHERE version = ?", [$version]);
+    }
+}
+
+// Handle command line execution
+if (php_sapi_name() === 'cli') {
+    $migration = new ReportQueueMigration();
+
+    if ($argc > 1 && $argv[1] === 'down') {
+        $migration->down();
+    } else {
+        $migration->up();
+    }
+}
+?>
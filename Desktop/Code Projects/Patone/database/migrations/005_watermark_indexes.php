@@ -0,0 +1,99 @@
+<?php
+/**
+ * Roadside Assistance Admin Platform - Watermark Indexes
+ * Migration for indexing customers.updated_at and service_types.updated_at so
+ * the Python result cache can read each table's last change without scanning
+ * it (service_requests got idx_updated in 003; drivers are watermarked by row
+ * count only)
+ */
+
+require_once '../../config.php';
+
+class WatermarkIndexMigration {
+    private const TABLES = ['customers', 'service_types'];
+
+    private $db;
+
+    public function __construct() {
+        $this->db = Database::getInstance();
+    }
+
+    public function up() {
+        try {
+            echo "Starting watermark index migration...\n";
+
+            foreach (self::TABLES as $table) {
+                $indexes = $this->db->getRows("SHOW INDEX FROM `$table` WHERE Key_name = 'idx_updated'");
+                if (empty($indexes)) {
+                    echo "Adding idx_updated to $table...\n";
+                    $this->db->query("ALTER TABLE `$table` ADD INDEX `idx_updated` (`updated_at`)");
+                }
+            }
+
+            // Record migration
+            $this->recordMigration('005_watermark_indexes');
+
+            echo "Watermark index migration completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Migration failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    public function down() {
+        try {
+            echo "Rolling back watermark indexes...\n";
+
+            foreach (self::TABLES as $table) {
+                $indexes = $this->db->getRows("SHOW INDEX FROM `$table` WHERE Key_name = 'idx_updated'");
+                if (!empty($indexes)) {
+                    $this->db->query("ALTER TABLE `$table` DROP INDEX `idx_updated`");
+                }
+            }
+
+            // Remove migration record
+            $this->removeMigration('005_watermark_indexes');
+
+            echo "Rollback completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Rollback failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    private function recordMigration($version) {
+        $this->db->query(
+            "CREATE TABLE IF NOT EXISTS migrations (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                version VARCHAR(50) NOT NULL,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_version (version)
+            )"
+        );
+
+        $this->db->query(
+            "INSERT INTO migrations (version) VALUES (?)",
+            [$version]
+        );
+    }
+
+    private function removeMigration($version) {
+        $this->db->query("DELETE FROM migrations WHERE version = ?", [$version]);
+    }
+}
+
+// Handle command line execution
+if (php_sapi_name() === 'cli') {
+    $migration = new WatermarkIndexMigration();
+
+    if ($argc > 1 && $argv[1] === 'down') {
+        $migration->down();
+    } else {
+        $migration->up();
+    }
+}
+?>
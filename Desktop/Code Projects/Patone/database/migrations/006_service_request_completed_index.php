@@ -0,0 +1,96 @@
+<?php
+/**
+ * Roadside Assistance Admin Platform - Service Request Completion Index
+ * Migration for indexing service_requests (completed_at, customer_rating) so
+ * the daily report can find the rated requests completed on a day without
+ * scanning the table
+ */
+
+require_once '../../config.php';
+
+class ServiceRequestCompletedIndexMigration {
+    private $db;
+
+    public function __construct() {
+        $this->db = Database::getInstance();
+    }
+
+    public function up() {
+        try {
+            echo "Starting service request completed_at index migration...\n";
+
+            $indexes = $this->db->getRows("SHOW INDEX FROM service_requests WHERE Key_name = 'idx_completed_rating'");
+            if (empty($indexes)) {
+                // Tables created from schema.sql name the rating column `rating`
+                $columns = $this->db->getRows("SHOW COLUMNS FROM service_requests LIKE 'customer_rating'");
+                $rating = empty($columns) ? 'rating' : 'customer_rating';
+
+                echo "Adding idx_completed_rating to service_requests...\n";
+                $this->db->query("ALTER TABLE service_requests ADD INDEX `idx_completed_rating` (`completed_at`, `$rating`)");
+            }
+
+            // Record migration
+            $this->recordMigration('006_service_request_completed_index');
+
+            echo "Service request completed_at index migration completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Migration failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    public function down() {
+        try {
+            echo "Rolling back service request completed_at index...\n";
+
+            $indexes = $this->db->getRows("SHOW INDEX FROM service_requests WHERE Key_name = 'idx_completed_rating'");
+            if (!empty($indexes)) {
+                $this->db->query("ALTER TABLE service_requests DROP INDEX `idx_completed_rating`");
+            }
+
+            // Remove migration record
+            $this->removeMigration('006_service_request_completed_index');
+
+            echo "Rollback completed successfully!\n";
+            return true;
+
+        } catch (Exception $e) {
+            echo "Rollback failed: " . $e->getMessage() . "\n";
+            return false;
+        }
+    }
+
+    private function recordMigration($version) {
+        $this->db->query(
+            "CREATE TABLE IF NOT EXISTS migrations (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                version VARCHAR(50) NOT NULL,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_version (version)
+            )"
+        );
+
+        $this->db->query(
+            "INSERT INTO migrations (version) VALUES (?)",
+            [$version]
+        );
+    }
+
+    private function removeMigration($version) {
+        $this->db->query("DELETE FROM migrations WHERE version = ?", [$version]);
+    }
+}
+
+// Handle command line execution
+if (php_sapi_name() === 'cli') {
+    $migration = new ServiceRequestCompletedIndexMigration();
+
+    if ($argc > 1 && $argv[1] === 'down') {
+        $migration->down();
+    } else {
+        $migration->up();
+    }
+}
+?>
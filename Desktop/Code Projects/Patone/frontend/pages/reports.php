@@ -133,6 +133,40 @@
                 </div>
             </div>
         </div>
+
+        <!-- Queued Report Card -->
+        <div class="col-md-6 col-lg-4 mb-4">
+            <div class="card h-100">
+                <div class="card-header bg-primary text-white">
+                    <h5 class="mb-0"><i class="bi bi-hourglass-split"></i> Queue a Report</h5>
+                </div>
+                <div class="card-body">
+                    <p>Generate a PDF report or analysis export in the background and download it when it is ready.</p>
+                    <form id="queueReportForm">
+                        <input type="hidden" name="csrf_token" value="<?php echo generateCSRFToken(); ?>">
+                        <select name="type" class="form-select form-select-sm mb-2" required>
+                            <option value="daily">Daily report (PDF)</option>
+                            <option value="monthly">Monthly report (PDF)</option>
+                            <option value="customer">Customer analysis (PDF)</option>
+                            <option value="analysis">All analyses (JSON)</option>
+                            <option value="demand">Demand analysis (JSON)</option>
+                            <option value="drivers">Driver analysis (JSON)</option>
+                            <option value="customers">Customer analysis (JSON)</option>
+                            <option value="revenue">Revenue analysis (JSON)</option>
+                        </select>
+                        <div class="row g-2 mb-2">
+                            <div class="col-6"><input type="date" name="date" class="form-control form-control-sm" value="<?php echo date('Y-m-d'); ?>" title="Date (daily)"></div>
+                            <div class="col-6"><input type="number" name="customer_id" class="form-control form-control-sm" placeholder="Customer ID" min="1"></div>
+                            <div class="col-4"><input type="number" name="year" class="form-control form-control-sm" value="<?php echo date('Y'); ?>" title="Year (monthly)"></div>
+                            <div class="col-4"><input type="number" name="month" class="form-control form-control-sm" value="<?php echo date('n'); ?>" min="1" max="12" title="Month (monthly)"></div>
+                            <div class="col-4"><input type="number" name="days" class="form-control form-control-sm" placeholder="Days" min="1" title="Days (analyses)"></div>
+                        </div>
+                        <button type="submit" class="btn btn-primary w-100">Queue</button>
+                    </form>
+                    <div id="queuedReportStatus" class="small mt-2"></div>
+                </div>
+            </div>
+        </div>
     </div>
 
     <!-- Quick Stats -->
@@ -233,3 +267,50 @@
     box-shadow: 0 6px 12px rgba(0,0,0,0.15);
 }
 </style>
+
+<script>
+document.getElementById('queueReportForm').addEventListener('submit', function(event) {
+    event.preventDefault();
+    const status = document.getElementById('queuedReportStatus');
+
+    fetch('<?php echo SITE_URL; ?>reports/queue', {
+        method: 'POST',
+        body: new FormData(this)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            status.textContent = 'Error: ' + data.error;
+            return;
+        }
+        status.textContent = 'Report #' + data.data.id + ' queued';
+        pollReportStatus(data.data.status_url, status);
+    })
+    .catch(error => {
+        status.textContent = 'Error queueing report: ' + error;
+    });
+});
+
+function pollReportStatus(url, status) {
+    fetch(url)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            status.textContent = 'Error: ' + data.error;
+            return;
+        }
+        const report = data.data;
+        if (report.status === 'completed') {
+            status.textContent = 'Report #' + report.id + ' completed in ' + report.duration_seconds + 's: ' + report.file_path;
+        } else if (report.status === 'failed') {
+            status.textContent = 'Report #' + report.id + ' failed: ' + report.error_message;
+        } else {
+            status.textContent = 'Report #' + report.id + ' ' + report.status + '...';
+            setTimeout(() => pollReportStatus(url, status), 3000);
+        }
+    })
+    .catch(error => {
+        status.textContent = 'Error checking report: ' + error;
+    });
+}
+</script>
@@ -43,6 +43,8 @@ $router->addRoute('POST', '/drivers/edit/{id}', 'DriverController', 'doEdit');
 $router->addRoute('GET', '/reports', 'ReportController', 'index');
 $router->addRoute('GET', '/reports/daily', 'ReportController', 'daily');
 $router->addRoute('GET', '/reports/monthly', 'ReportController', 'monthly');
+$router->addRoute('POST', '/reports/queue', 'ReportController', 'queue');
+$router->addRoute('GET', '/reports/status/{id}', 'ReportController', 'status');
 $router->addRoute('GET', '/settings', 'SettingController', 'index');
 $router->addRoute('POST', '/settings', 'SettingController', 'update');
 $router->addRoute('POST', '/settings/user/add', 'SettingController', 'addUser');
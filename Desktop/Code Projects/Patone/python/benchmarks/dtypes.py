@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Frame Dtype Benchmark
+Measures the memory and groupby time of the revenue and customer analyses on
+frames with default read_sql dtypes versus the compact schemas in schemas.py
+
+Frames are synthetic and seeded, shaped like the revenue_trends rollup output
+and the customer_behavior query result, and timed through the same
+DataAnalyzer helpers the analyses run.
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from python.schemas import apply_schema, memory_usage, string_dtype
+
+SERVICE_TYPES = ['Towing', 'Jump Start', 'Lockout', 'Flat Tire', 'Fuel Delivery',
+                 'Winching', 'Battery Replacement', 'Key Replacement']
+
+
+def revenue_frame(days: int, seed: int = 42) -> pd.DataFrame:
+    """Revenue rows per day, hour and service type with untyped date and name columns"""
+    rng = np.random.default_rng(seed)
+    start = date(2024, 1, 1)
+    rows = days * 24 * len(SERVICE_TYPES)
+    day_index = np.repeat(np.arange(days), 24 * len(SERVICE_TYPES))
+    service_count = rng.integers(1, 12, rows)
+    revenue = (service_count * rng.gamma(4, 20, rows)).round(2)
+    return pd.DataFrame({
+        'date': [start + timedelta(days=int(d)) for d in day_index],
+        'hour': np.tile(np.repeat(np.arange(24), len(SERVICE_TYPES)), days),
+        'service_type': np.tile(SERVICE_TYPES, days * 24).astype(object),
+        'daily_revenue': revenue,
+        'service_count': service_count.astype('float64'),
+        'avg_service_cost': revenue / service_count
+    })
+
+
+def customer_frame(customers: int, seed: int = 42) -> pd.DataFrame:
+    """customer_behavior rows as read_sql returns them: floats, object names and mixed bools"""
+    rng = np.random.default_rng(seed)
+    services = rng.integers(1, 40, customers).astype('float64')
+    spent = (services * rng.gamma(4, 20, customers)).round(2)
+    vip = rng.random(customers) < 0.15
+    now = datetime(2024, 12, 31)
+    return pd.DataFrame({
+        'id': np.arange(1, customers + 1),
+        'first_name': [f'First{i % 5000}' for i in range(customers)],
+        'last_name': [f'Last{i % 20000}' for i in range(customers)],
+        # The connector returns Python bools, numpy comparisons elsewhere return numpy bools
+        'is_vip': [bool(v) if i % 2 else np.bool_(v) for i, v in enumerate(vip)],
+        'total_services': services,
+        'total_spent': spent,
+        'avg_service_cost': spent / services,
+        'last_service_date': pd.to_datetime(now - pd.to_timedelta(rng.integers(0, 365, customers), unit='D')),
+        'avg_rating_given': rng.uniform(1, 5, customers),
+        'days_since_first_service': rng.integers(0, 1500, customers).astype('float64')
+    })
+
+
+def revenue_workload(analyzer, df: pd.DataFrame):
+    """The frame work of DataAnalyzer.analyze_revenue_trends"""
+    daily_totals = df.groupby('date')['daily_revenue'].sum().reset_index()
+    analyzer._calculate_weekly_averages(daily_totals)
+    analyzer._analyze_service_revenue(df)
+    analyzer._predict_revenue(daily_totals)
+    analyzer._identify_peak_periods(df.copy())
+    analyzer._generate_revenue_summary(daily_totals, df)
+
+
+def customer_workload(analyzer, df: pd.DataFrame):
+    """The frame work of DataAnalyzer.analyze_customer_behavior after segment assignment"""
+    analyzer._segment_customers(df)
+    analyzer._analyze_vip_performance(df)
+    analyzer._predict_customer_lifetime_value(df)
+    analyzer._identify_at_risk_customers(df.copy(), reference_date=datetime(2024, 12, 31))
+    analyzer._generate_customer_summary(df)
+
+
+def timed(func: Callable, repeat: int) -> float:
+    """Median wall time of func over `repeat` runs, in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def measure(name: str, raw: pd.DataFrame, workload: Callable, group_key: str,
+            group_value: str, repeat: int) -> Dict:
+    """Compare memory, schema conversion, analysis and groupby time of raw and typed frames"""
+    started = time.perf_counter()
+    typed = apply_schema(raw, name)
+    convert_ms = (time.perf_counter() - started) * 1000
+
+    groupby = lambda df: df.groupby(group_key, observed=True)[group_value].agg(['sum', 'mean'])
+    result = {
+        'rows': len(raw),
+        'raw_bytes': memory_usage(raw),
+        'typed_bytes': memory_usage(typed),
+        'convert_ms': convert_ms,
+        'raw_analysis_ms': timed(lambda: workload(raw), repeat),
+        'typed_analysis_ms': timed(lambda: workload(typed), repeat),
+        'raw_groupby_ms': timed(lambda: groupby(raw), repeat),
+        'typed_groupby_ms': timed(lambda: groupby(typed), repeat)
+    }
+    result['memory_reduction'] = 1 - result['typed_bytes'] / result['raw_bytes']
+    result['analysis_speedup'] = result['raw_analysis_ms'] / result['typed_analysis_ms']
+    result['groupby_speedup'] = result['raw_groupby_ms'] / result['typed_groupby_ms']
+    return result
+
+
+def run(days: int = 365, customers: int = 200000, repeat: int = 5) -> Dict:
+    """Benchmark the revenue and customer frames"""
+    from python.data_analyzer import DataAnalyzer
+
+    analyzer = DataAnalyzer(use_cache=False)
+
+    customers_raw = customer_frame(customers)
+    customers_raw['segment'] = np.arange(customers) % 4
+
+    return {
+        'strings': f"string[{string_dtype().storage}]",
+        'revenue_trends': measure(
+            'revenue_trends', revenue_frame(days),
+            lambda df: revenue_workload(analyzer, df), 'service_type', 'daily_revenue', repeat
+        ),
+        'customer_behavior': measure(
+            'customer_behavior', customers_raw,
+            lambda df: customer_workload(analyzer, df), 'is_vip', 'total_spent', repeat
+        )
+    }
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark compact frame dtypes for the analyses')
+    parser.add_argument('--days', type=int, default=365, help='Days of revenue rows to generate')
+    parser.add_argument('--customers', type=int, default=200000, help='Customer rows to generate')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement')
+    parser.add_argument('--output', help='Write results to this JSON file')
+
+    args = parser.parse_args()
+
+    results = run(args.days, args.customers, args.repeat)
+
+    print(f"strings: {results['strings']}")
+    print(f"{'frame':<18} {'rows':>9} {'raw MB':>8} {'typed MB':>9} {'saved':>6} "
+          f"{'analysis':>9} {'groupby':>8}")
+    for name in ('revenue_trends', 'customer_behavior'):
+        r = results[name]
+        print(f"{name:<18} {r['rows']:>9} {r['raw_bytes'] / 2**20:>8.1f} {r['typed_bytes'] / 2**20:>9.1f} "
+              f"{r['memory_reduction']:>6.0%} {r['analysis_speedup']:>8.1f}x {r['groupby_speedup']:>7.1f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
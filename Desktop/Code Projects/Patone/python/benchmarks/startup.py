@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Startup Benchmark
+Measures interpreter startup and import time of the data_analyzer and
+report_generator entry points for each CLI mode, since the PHP side shells
+out to these scripts on the request path
+
+Each mode's real command line is run as a script in fresh interpreters
+under `python -X importtime`, with --help appended so it exits once its
+arguments are parsed: what is timed is everything a request pays before
+the mode starts working, and the heavy packages the script loaded by then.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPTS = os.path.join(PROJECT_ROOT, 'python')
+
+# Mode -> the script and arguments the CLI is invoked with
+CLI_MODES = {
+    'analyzer:demand': ['data_analyzer.py', '--analysis', 'demand'],
+    'analyzer:drivers': ['data_analyzer.py', '--analysis', 'drivers'],
+    'analyzer:customers': ['data_analyzer.py', '--analysis', 'customers'],
+    'analyzer:revenue': ['data_analyzer.py', '--analysis', 'revenue'],
+    'analyzer:all': ['data_analyzer.py', '--analysis', 'all'],
+    'report:daily': ['report_generator.py', '--type', 'daily'],
+    'report:monthly': ['report_generator.py', '--type', 'monthly'],
+    'report:customer': ['report_generator.py', '--type', 'customer']
+}
+
+# Packages no script may import before its mode starts working
+STARTUP_FORBIDDEN = ['sklearn', 'matplotlib', 'seaborn', 'reportlab']
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse `-X importtime` output into (name, depth, cumulative_us) entries"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # One leading space, then two more per nesting level
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append({'name': name.strip(), 'depth': depth, 'cumulative_us': int(cumulative_us)})
+    return entries
+
+
+def probe(command: List[str]) -> Dict:
+    """Time one fresh interpreter running a CLI command line up to its argument parsing"""
+    script, *arguments = command
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.join(SCRIPTS, script), *arguments, '--help'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+
+    entries = parse_importtime(result.stderr)
+    loaded = {entry['name'].split('.')[0] for entry in entries}
+    return {
+        'wall_ms': wall * 1000,
+        'import_ms': sum(entry['cumulative_us'] for entry in entries if entry['depth'] == 0) / 1000,
+        'forbidden_loaded': [name for name in STARTUP_FORBIDDEN if name in loaded]
+    }
+
+
+def interpreter_baseline(repeat: int) -> float:
+    """Median wall time of a bare interpreter, in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(modes: Optional[List[str]] = None, repeat: int = 5) -> Dict:
+    """Benchmark each CLI mode, reporting medians over `repeat` fresh interpreters"""
+    results = {
+        'python': sys.version.split()[0],
+        'repeat': repeat,
+        'interpreter_ms': interpreter_baseline(repeat),
+        'modes': {}
+    }
+
+    for mode in modes or CLI_MODES:
+        samples = [probe(CLI_MODES[mode]) for _ in range(repeat)]
+        results['modes'][mode] = {
+            'command': ' '.join(CLI_MODES[mode]),
+            'wall_ms': statistics.median(s['wall_ms'] for s in samples),
+            'import_ms': statistics.median(s['import_ms'] for s in samples),
+            'forbidden_loaded': samples[0]['forbidden_loaded']
+        }
+
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List modes whose import time regressed beyond the tolerance"""
+    regressions = []
+    for mode, current in results['modes'].items():
+        if current['forbidden_loaded']:
+            regressions.append(f"{mode}: imports {', '.join(current['forbidden_loaded'])} at startup")
+
+        previous = baseline.get('modes', {}).get(mode)
+        # Baselines from before import_ms was measured have nothing to compare
+        if not previous or 'import_ms' not in previous:
+            continue
+        limit = previous['import_ms'] * (1 + tolerance)
+        if current['import_ms'] > limit:
+            regressions.append(
+                f"{mode}: startup import {current['import_ms']:.0f}ms "
+                f"> {limit:.0f}ms (baseline {previous['import_ms']:.0f}ms)"
+            )
+    return regressions
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark CLI startup and import time')
+    parser.add_argument('--mode', action='append', choices=list(CLI_MODES),
+                       help='CLI mode to benchmark (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per mode')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Fail if startup regressed against this results file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                       help='Allowed startup regression as a fraction of the baseline')
+
+    args = parser.parse_args()
+
+    results = run(args.mode, args.repeat)
+
+    print(f"{'mode':<20} {'wall':>9} {'imports':>9}")
+    for mode, result in results['modes'].items():
+        print(f"{mode:<20} {result['wall_ms']:>7.0f}ms {result['import_ms']:>7.0f}ms")
+    print(f"(bare interpreter: {results['interpreter_ms']:.0f}ms)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    exit(main())
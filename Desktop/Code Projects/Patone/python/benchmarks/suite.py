@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Performance Benchmark Suite
+Times every DataAnalyzer analysis and ReportGenerator report against seeded
+synthetic data at several scales, recording wall time, peak memory and query
+counts, and compares the results with a stored baseline
+
+Data comes from synthetic.py and is loaded into a local snapshot directory
+(and, for --source duckdb, an embedded DuckDB database built from it), which
+the analyzers and reports read in place of MySQL. Each run happens in a fresh
+process with empty rollup, model, result and chart caches, so every
+measurement is a cold run and peak memory is that process's own. Queries are
+counted where the data source answers them: one per statement DuckDB
+executes, over the snapshot's frames or the database file.
+"""
+
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from python.config import PATHS
+
+SOURCES = ['snapshot', 'duckdb']
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000
+}
+
+# Customer reports rendered by the report:customers workload
+CUSTOMER_BATCH = 50
+
+# Heavy modules the analyses and reports load on first use
+LAZY_IMPORTS = ['sklearn.cluster', 'sklearn.preprocessing', 'reportlab.platypus',
+                'matplotlib.figure', 'matplotlib.backends.backend_agg', 'pyarrow.ipc']
+
+# Absolute allowances on top of the tolerance, so scheduler and allocator noise
+# on small workloads does not read as a regression
+WALL_SLACK_MS = 50
+MEMORY_SLACK_MB = 16
+
+WORKLOADS: Dict[str, Callable] = {}
+
+# Data source of the workloads in this process, set by measure()
+_source = 'snapshot'
+
+
+def workload(name: str):
+    """Register a benchmark workload; it receives a fresh DataAnalyzer/ReportGenerator context"""
+    def register(func):
+        WORKLOADS[name] = func
+        return func
+    return register
+
+
+def _analyzer():
+    from python.data_analyzer import DataAnalyzer
+    return DataAnalyzer(_source, use_cache=False)
+
+
+def _reports():
+    from python.report_generator import ReportGenerator
+    return ReportGenerator(_source)
+
+
+@workload('analyze:demand')
+def analyze_demand():
+    return _analyzer().analyze_service_demand(30)
+
+
+@workload('analyze:drivers')
+def analyze_drivers():
+    return _analyzer().analyze_driver_performance(30)
+
+
+@workload('analyze:customers')
+def analyze_customers():
+    return _analyzer().analyze_customer_behavior(90)
+
+
+@workload('analyze:revenue')
+def analyze_revenue():
+    return _analyzer().analyze_revenue_trends(90)
+
+
+@workload('analyze:all')
+def analyze_all():
+    return _analyzer().analyze_all()
+
+
+@workload('report:daily')
+def report_daily():
+    yesterday = datetime.now().date() - timedelta(days=1)
+    return _reports().generate_daily_report(yesterday.isoformat())
+
+
+@workload('report:monthly')
+def report_monthly():
+    last_month = datetime.now().date().replace(day=1) - timedelta(days=1)
+    return _reports().generate_monthly_report(last_month.year, last_month.month)
+
+
+@workload('report:customer')
+def report_customer():
+    return _reports().generate_customer_analysis(1)
+
+
+@workload('report:customers')
+def report_customers():
+    results = _reports().generate_customer_analyses(list(range(1, CUSTOMER_BATCH + 1)), workers=1)
+    failed = [r for r in results if r['status'] == 'failed']
+    if failed:
+        raise RuntimeError(f"{len(failed)} customer reports failed: {failed[0]['error']}")
+    return results
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def _count_statements(counts: Dict):
+    """Count every statement issued in the DuckDB dialect, and the rows it returns
+
+    Both sources run their queries on DuckDB: the snapshot through frames.py,
+    the database file through the pooled connections.
+    """
+    import threading
+    from python.dialects import DUCKDB
+    from python.duckdb_backend import DuckDBConnection, DuckDBCursor
+    from python.query_builder import Query
+
+    lock = threading.Lock()
+    statement, read_frame = Query.statement, DuckDBConnection.read_frame
+    rows = DuckDBCursor._rows
+
+    def counting_statement(self, dialect='mysql', **values):
+        if dialect == DUCKDB:
+            with lock:
+                counts['queries'] += 1
+                counts['by_query'][self.name] = counts['by_query'].get(self.name, 0) + 1
+        return statement(self, dialect, **values)
+
+    def counting_read_frame(self, sql, params=()):
+        frame = read_frame(self, sql, params)
+        with lock:
+            counts['rows'] += len(frame)
+        return frame
+
+    def counting_rows(self, fetched):
+        with lock:
+            counts['rows'] += len(fetched)
+        return rows(self, fetched)
+
+    Query.statement = counting_statement
+    DuckDBConnection.read_frame = counting_read_frame
+    DuckDBCursor._rows = counting_rows
+
+
+def measure(name: str, data_dir: str, work_dir: str, source: str = 'snapshot') -> Dict:
+    """Run one workload in this process against a dataset directory, with caches under work_dir"""
+    global _source
+    from python.config import DUCKDB_CONFIG
+
+    _source = source
+    PATHS['snapshots'] = data_dir
+    DUCKDB_CONFIG['path'] = os.path.join(data_dir, 'analytics.duckdb')
+    for cache in ('rollups', 'results', 'models', 'charts', 'reports'):
+        PATHS[cache] = os.path.join(work_dir, cache)
+
+    # Import everything the workload needs before the baseline memory reading;
+    # import time itself is measured by startup.py
+    import importlib
+    import python.data_analyzer  # noqa: F401
+    import python.report_generator  # noqa: F401
+    for module in LAZY_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    counts = {'queries': 0, 'rows': 0, 'by_query': {}}
+    _count_statements(counts)
+
+    baseline_rss = _peak_rss_mb()
+    started = time.perf_counter()
+    error = None
+    try:
+        # The reports' progress lines would drown the benchmark table
+        with redirect_stdout(io.StringIO()):
+            WORKLOADS[name]()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+
+    return {
+        'wall_ms': wall * 1000,
+        'peak_rss_mb': _peak_rss_mb(),
+        'base_rss_mb': baseline_rss,
+        'queries': counts['queries'],
+        'rows_read': counts['rows'],
+        'by_query': counts['by_query'],
+        'error': error
+    }
+
+
+def measure_isolated(name: str, data_dir: str, source: str = 'snapshot') -> Dict:
+    """Run one workload in a fresh interpreter with empty caches"""
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as work_dir:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            return executor.submit(measure, name, data_dir, work_dir, source).result()
+
+
+def run(scales: Optional[List[str]] = None, workloads: Optional[List[str]] = None,
+        repeat: int = 3, seed: int = 42, data_root: Optional[str] = None,
+        source: str = 'snapshot') -> Dict:
+    """Benchmark each workload at each scale, reporting medians over `repeat` runs"""
+    from python.benchmarks.synthetic import ensure_dataset
+
+    data_root = data_root or PATHS['benchmarks']
+    results = {
+        'python': sys.version.split()[0],
+        'repeat': repeat,
+        'seed': seed,
+        'source': source,
+        'scales': {}
+    }
+
+    for scale in scales or ['10k', '100k']:
+        data_dir = os.path.join(data_root, f"{scale}-{seed}")
+        dataset = ensure_dataset(data_dir, SCALES[scale], seed, duckdb=source == 'duckdb')
+        scale_results = {'rows': dataset['rows'], 'workloads': {}}
+
+        for name in workloads or WORKLOADS:
+            samples = [measure_isolated(name, data_dir, source) for _ in range(repeat)]
+            errors = [s['error'] for s in samples if s['error']]
+            scale_results['workloads'][name] = {
+                'wall_ms': statistics.median(s['wall_ms'] for s in samples),
+                'peak_rss_mb': statistics.median(s['peak_rss_mb'] for s in samples),
+                'base_rss_mb': statistics.median(s['base_rss_mb'] for s in samples),
+                'queries': samples[0]['queries'],
+                'rows_read': samples[0]['rows_read'],
+                'by_query': samples[0]['by_query'],
+                'error': errors[0] if errors else None
+            }
+        results['scales'][scale] = scale_results
+
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List workloads that failed, issue more queries, or regressed beyond the tolerance"""
+    regressions = []
+    for scale, scale_results in results['scales'].items():
+        previous_scale = baseline.get('scales', {}).get(scale, {}).get('workloads', {})
+        for name, current in scale_results['workloads'].items():
+            label = f"{scale} {name}"
+            if current['error']:
+                regressions.append(f"{label}: {current['error']}")
+                continue
+
+            previous = previous_scale.get(name)
+            if not previous or previous.get('error'):
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(f"{label}: {current['queries']} queries > {previous['queries']}")
+            limit = previous['wall_ms'] * (1 + tolerance) + WALL_SLACK_MS
+            if current['wall_ms'] > limit:
+                regressions.append(f"{label}: wall {current['wall_ms']:.0f}ms > {limit:.0f}ms "
+                                   f"(baseline {previous['wall_ms']:.0f}ms)")
+            # Memory is compared net of the interpreter and imports
+            used, previous_used = (current['peak_rss_mb'] - current['base_rss_mb'],
+                                   previous['peak_rss_mb'] - previous['base_rss_mb'])
+            memory_limit = previous_used * (1 + tolerance) + MEMORY_SLACK_MB
+            if used > memory_limit:
+                regressions.append(f"{label}: peak memory +{used:.0f}MB > +{memory_limit:.0f}MB "
+                                   f"(baseline +{previous_used:.0f}MB)")
+    return regressions
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark analyses and reports on synthetic data')
+    parser.add_argument('--scale', action='append', choices=list(SCALES),
+                       help='Request count to benchmark at (default: 10k and 100k)')
+    parser.add_argument('--source', choices=SOURCES, default='snapshot',
+                       help='Data source the workloads read (default: the Arrow snapshot)')
+    parser.add_argument('--workload', action='append', choices=list(WORKLOADS),
+                       help='Analysis or report to benchmark (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh processes per measurement')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed')
+    parser.add_argument('--data-dir', help='Where generated datasets are kept (default: cache/benchmarks)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Fail if results regressed against this results file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                       help='Allowed wall time and memory regression as a fraction of the baseline')
+
+    args = parser.parse_args()
+
+    results = run(args.scale, args.workload, args.repeat, args.seed, args.data_dir, args.source)
+
+    print(f"{'scale':<6} {'workload':<20} {'wall':>10} {'peak':>9} {'queries':>8} {'rows read':>11}")
+    for scale, scale_results in results['scales'].items():
+        for name, result in scale_results['workloads'].items():
+            if result['error']:
+                print(f"{scale:<6} {name:<20} failed: {result['error']}")
+                continue
+            print(f"{scale:<6} {name:<20} {result['wall_ms']:>8.0f}ms {result['peak_rss_mb']:>7.0f}MB "
+                  f"{result['queries']:>8} {result['rows_read']:>11}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    exit(main())
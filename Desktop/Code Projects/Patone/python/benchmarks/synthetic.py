@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Synthetic Data Generator
+Seeded, realistic customers, drivers, service_types and service_requests at a
+configurable scale, loaded into a local snapshot directory that the analyzers
+and reports read with source='snapshot'
+
+The same seed and scale always produce the same rows. Timestamps are laid out
+over the `days` before the day the data is generated for, so the trailing
+windows of the analyses and the daily and monthly reports find data.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from python.snapshot import SNAPSHOT_TABLES, write_arrow
+
+# Bump when the generated rows change so stored datasets are regenerated
+GENERATOR_VERSION = 1
+
+# name, base price, estimated minutes
+SERVICE_TYPES = [
+    ('Towing', 125.0, 60), ('Jump Start', 65.0, 20), ('Lockout', 70.0, 25),
+    ('Flat Tire', 80.0, 30), ('Fuel Delivery', 55.0, 25), ('Winching', 150.0, 45),
+    ('Battery Replacement', 140.0, 35), ('Key Replacement', 180.0, 50)
+]
+SERVICE_MIX = [0.30, 0.18, 0.14, 0.16, 0.07, 0.04, 0.07, 0.04]
+
+CITIES = [
+    ('Springfield', 'IL'), ('Chicago', 'IL'), ('Peoria', 'IL'), ('Madison', 'WI'),
+    ('Milwaukee', 'WI'), ('St. Louis', 'MO'), ('Kansas City', 'MO'), ('Indianapolis', 'IN'),
+    ('Des Moines', 'IA'), ('Columbus', 'OH')
+]
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+               'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+               'Thomas', 'Sarah', 'Carlos', 'Maria', 'Wei', 'Aisha', 'Ivan', 'Priya']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas',
+              'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Chen', 'Patel', 'Khan', 'Novak']
+
+# Requests per hour of day (commutes and evenings are busiest) and per weekday (Mon..Sun)
+HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 2, 4, 7, 8, 6, 5, 5, 5, 5, 5, 6, 8, 9, 7, 5, 4, 3, 2, 1],
+                        dtype='float64')
+WEEKDAY_WEIGHTS = np.array([1.0, 0.95, 0.95, 1.0, 1.1, 1.25, 1.15])
+
+STATUS_MIX = {'completed': 0.84, 'cancelled': 0.12, 'in_progress': 0.02, 'assigned': 0.01, 'pending': 0.01}
+PRIORITY_MIX = {'normal': 0.70, 'high': 0.18, 'low': 0.08, 'emergency': 0.04}
+RATING_MIX = [0.03, 0.05, 0.12, 0.30, 0.50]
+
+# Requests per customer and per driver at every scale
+REQUESTS_PER_CUSTOMER = 20
+REQUESTS_PER_DRIVER = 500
+
+
+def _names(rng, count: int, names) -> np.ndarray:
+    return np.array(names, dtype=object)[rng.integers(0, len(names), count)]
+
+
+def _choice(rng, count: int, mix: Dict) -> np.ndarray:
+    return np.array(list(mix), dtype=object)[rng.choice(len(mix), count, p=list(mix.values()))]
+
+
+def generate(requests: int, seed: int = 42, days: int = 365,
+             end: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+    """Generate the four source tables with `requests` service requests
+
+    Customers and drivers scale with the request count; customer activity
+    is skewed so a few customers account for many requests. end defaults to
+    the start of today.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.now().date())
+    start = end - pd.Timedelta(days=days)
+
+    customer_count = max(requests // REQUESTS_PER_CUSTOMER, 100)
+    driver_count = max(requests // REQUESTS_PER_DRIVER, 10)
+
+    service_types = pd.DataFrame({
+        'id': np.arange(1, len(SERVICE_TYPES) + 1),
+        'name': [name for name, _, _ in SERVICE_TYPES],
+        'description': [f"{name} service" for name, _, _ in SERVICE_TYPES],
+        'base_price': [price for _, price, _ in SERVICE_TYPES],
+        'estimated_duration': [minutes for _, _, minutes in SERVICE_TYPES],
+        'is_active': 1,
+        'priority': 0,
+        'created_at': start - pd.Timedelta(days=730),
+        'updated_at': start - pd.Timedelta(days=730)
+    })
+
+    customer_cities = rng.integers(0, len(CITIES), customer_count)
+    customer_created = start - pd.to_timedelta(rng.integers(0, 730 * 86400, customer_count), unit='s')
+    customers = pd.DataFrame({
+        'id': np.arange(1, customer_count + 1),
+        'first_name': _names(rng, customer_count, FIRST_NAMES),
+        'last_name': _names(rng, customer_count, LAST_NAMES),
+        'email': [f"customer{i}@example.com" for i in range(1, customer_count + 1)],
+        'phone': [f"555-{i % 10000:04d}" for i in range(1, customer_count + 1)],
+        'city': np.array([city for city, _ in CITIES], dtype=object)[customer_cities],
+        'state': np.array([state for _, state in CITIES], dtype=object)[customer_cities],
+        'zip': [f"{60000 + i % 9000:05d}" for i in range(customer_count)],
+        'is_vip': (rng.random(customer_count) < 0.10).astype('float64'),
+        'status': _choice(rng, customer_count, {'active': 0.92, 'inactive': 0.06, 'suspended': 0.02}),
+        'created_at': customer_created,
+        'updated_at': customer_created
+    })
+
+    driver_created = start - pd.to_timedelta(rng.integers(0, 365 * 86400, driver_count), unit='s')
+    drivers = pd.DataFrame({
+        'id': np.arange(1, driver_count + 1),
+        'first_name': _names(rng, driver_count, FIRST_NAMES),
+        'last_name': _names(rng, driver_count, LAST_NAMES),
+        'email': [f"driver{i}@example.com" for i in range(1, driver_count + 1)],
+        'phone': [f"555-{(i + 5000) % 10000:04d}" for i in range(1, driver_count + 1)],
+        'license_number': [f"D{i:07d}" for i in range(1, driver_count + 1)],
+        'status': _choice(rng, driver_count, {'available': 0.5, 'busy': 0.3, 'offline': 0.15, 'on_break': 0.05}),
+        'rating': rng.uniform(3.0, 5.0, driver_count).round(2),
+        'created_at': driver_created,
+        'updated_at': driver_created
+    })
+
+    service_requests = _generate_requests(rng, requests, start, end, days, customer_count, driver_count)
+
+    return {
+        'service_requests': service_requests,
+        'customers': customers,
+        'drivers': drivers,
+        'service_types': service_types
+    }
+
+
+def _generate_requests(rng, count: int, start: pd.Timestamp, end: pd.Timestamp, days: int,
+                       customer_count: int, driver_count: int) -> pd.DataFrame:
+    """Service requests shaped by hour of day, weekday, service mix and customer activity"""
+    # Day of the window weighted by weekday, hour weighted by time of day
+    day_weights = WEEKDAY_WEIGHTS[(start + pd.to_timedelta(np.arange(days), unit='D')).dayofweek]
+    day = rng.choice(days, count, p=day_weights / day_weights.sum())
+    hour = rng.choice(24, count, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, count)
+    seconds.sort()
+    created = start + pd.to_timedelta(seconds, unit='s')
+
+    # Heavy-tailed customer activity
+    activity = rng.gamma(0.6, 1.0, customer_count)
+    customer_id = rng.choice(customer_count, count, p=activity / activity.sum()) + 1
+    service_index = rng.choice(len(SERVICE_TYPES), count, p=SERVICE_MIX)
+
+    status = _choice(rng, count, STATUS_MIX)
+    # Open requests are recent: anything older than a day has been closed
+    open_status = np.isin(status, ['pending', 'assigned', 'in_progress'])
+    stale = open_status & (created < end - pd.Timedelta(days=1))
+    status[stale] = 'completed'
+
+    completed = status == 'completed'
+    cancelled = status == 'cancelled'
+    # Most cancellations happen before a driver is assigned
+    assigned = ~(status == 'pending') & ~(cancelled & (rng.random(count) < 0.7))
+    started = completed | (status == 'in_progress')
+
+    assign_minutes = rng.gamma(2.5, 6.0, count)
+    travel_minutes = rng.gamma(3.0, 8.0, count)
+    durations = np.array([minutes for _, _, minutes in SERVICE_TYPES], dtype='float64')[service_index]
+    work_minutes = durations * rng.lognormal(0.0, 0.3, count)
+
+    assigned_at = created + pd.to_timedelta(assign_minutes * 60, unit='s').round('s')
+    started_at = assigned_at + pd.to_timedelta(travel_minutes * 60, unit='s').round('s')
+    completed_at = started_at + pd.to_timedelta(work_minutes * 60, unit='s').round('s')
+
+    prices = np.array([price for _, price, _ in SERVICE_TYPES])[service_index]
+    actual_cost = np.where(completed, (prices * rng.lognormal(0.0, 0.25, count)).round(2), np.nan)
+    rating = rng.choice(5, count, p=RATING_MIX) + 1.0
+    customer_rating = np.where(completed & (rng.random(count) < 0.6), rating, np.nan)
+
+    cities = rng.integers(0, len(CITIES), count)
+    requests = pd.DataFrame({
+        'id': np.arange(1, count + 1),
+        'customer_id': customer_id.astype('float64'),
+        'driver_id': np.where(assigned, rng.integers(1, driver_count + 1, count), np.nan),
+        'service_type_id': (service_index + 1).astype('float64'),
+        'status': status,
+        'priority': _choice(rng, count, PRIORITY_MIX),
+        'location_city': np.array([city for city, _ in CITIES], dtype=object)[cities],
+        'location_state': np.array([state for _, state in CITIES], dtype=object)[cities],
+        'actual_cost': actual_cost,
+        'customer_rating': customer_rating,
+        'created_at': created,
+        'assigned_at': assigned_at.where(assigned),
+        'started_at': started_at.where(started),
+        'completed_at': completed_at.where(completed)
+    })
+    requests['updated_at'] = requests[['created_at', 'assigned_at', 'started_at', 'completed_at']].max(axis=1)
+    return requests[SNAPSHOT_TABLES['service_requests']['columns']]
+
+
+def dataset_info(path: str) -> Optional[Dict]:
+    """Get the parameters a stored dataset was generated with"""
+    info_file = os.path.join(path, 'synthetic.json')
+    if not os.path.exists(info_file):
+        return None
+    with open(info_file) as f:
+        return json.load(f)
+
+
+def load_snapshot(path: str, tables: Dict[str, pd.DataFrame], info: Optional[Dict] = None):
+    """Write generated tables as a snapshot directory, with the state a sync would leave"""
+    os.makedirs(path, exist_ok=True)
+    state = {}
+    for name, df in tables.items():
+        write_arrow(os.path.join(path, f"{name}.arrow"), df)
+        watermark = df['updated_at'].max() if len(df) else None
+        state[name] = {
+            'watermark': watermark.isoformat(sep=' ') if watermark is not None else None,
+            'rows': len(df),
+            'synced_at': datetime.now().isoformat(timespec='seconds')
+        }
+    with open(os.path.join(path, 'state.json'), 'w') as f:
+        json.dump(state, f, indent=2)
+    with open(os.path.join(path, 'synthetic.json'), 'w') as f:
+        json.dump(info or {}, f, indent=2)
+
+
+def ensure_dataset(path: str, requests: int, seed: int = 42, days: int = 365,
+                   duckdb: bool = False) -> Dict:
+    """Generate and load a dataset unless one with the same parameters is already stored
+
+    With duckdb=True the dataset also gets an embedded DuckDB copy
+    (analytics.duckdb in the same directory), built once from the snapshot.
+    """
+    info = {
+        'version': GENERATOR_VERSION,
+        'requests': requests,
+        'seed': seed,
+        'days': days,
+        'end': datetime.now().date().isoformat()
+    }
+    database = os.path.join(path, 'analytics.duckdb')
+    stored = dataset_info(path)
+    if stored is None or {k: stored.get(k) for k in info} != info:
+        # A copy built from the previous dataset would be stale
+        if os.path.exists(database):
+            os.remove(database)
+        started = time.perf_counter()
+        tables = generate(requests, seed, days, end=datetime.fromisoformat(info['end']))
+        info['rows'] = {name: len(df) for name, df in tables.items()}
+        info['generate_seconds'] = round(time.perf_counter() - started, 3)
+        load_snapshot(path, tables, info)
+        stored = info
+
+    if duckdb and not os.path.exists(database):
+        from python.duckdb_backend import load_snapshot as load_duckdb
+        from python.snapshot import Snapshot
+        load_duckdb(database, Snapshot(path))
+    return stored
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic snapshot for benchmarks')
+    parser.add_argument('--requests', type=int, default=100000, help='Service requests to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--days', type=int, default=365, help='Days of history before today')
+    parser.add_argument('--output', required=True, help='Snapshot directory to write')
+
+    args = parser.parse_args()
+
+    info = ensure_dataset(args.output, args.requests, args.seed, args.days)
+    rows = ', '.join(f"{count} {name}" for name, count in info['rows'].items())
+    print(f"Synthetic snapshot in {args.output}: {rows}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
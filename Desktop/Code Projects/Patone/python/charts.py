@@ -0,0 +1,239 @@
+"""
+Roadside Assistance Admin Platform - Report Charts
+Trend, service-mix and driver charts for the PDF reports, rendered headless
+with matplotlib's Agg canvas and cached as PNG files keyed on a hash of the
+chart's data and spec
+
+Identical charts (a re-run report, the same service mix on two days) are
+rendered once; worker processes rendering a batch of reports share the
+on-disk cache, and writes are atomic so two workers racing on the same chart
+both end up with a complete file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from python.config import CHART_CONFIG, PATHS
+from python.profiling import span
+
+# Bump when a renderer changes its drawing so stale images stop matching
+CHART_FORMAT_VERSION = 1
+
+CHART_RENDERERS: Dict[str, Callable] = {}
+
+
+def chart_renderer(kind: str):
+    """Register a function that draws a kind of chart onto a matplotlib Figure"""
+    def register(func):
+        CHART_RENDERERS[kind] = func
+        return func
+    return register
+
+
+class ChartCache:
+    def __init__(self, path: Optional[str] = None, max_disk_bytes: Optional[int] = None):
+        self.path = path or PATHS['charts']
+        self.max_disk_bytes = (max_disk_bytes if max_disk_bytes is not None
+                               else CHART_CONFIG['max_disk_bytes'])
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'renders': 0, 'render_time': 0.0, 'evictions': 0}
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def make_key(kind: str, data: Dict, spec: Dict) -> str:
+        """Hash a chart's kind, data and spec into its cache key"""
+        payload = json.dumps({
+            'version': CHART_FORMAT_VERSION,
+            'kind': kind,
+            'data': data,
+            'spec': spec
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _count(self, stat: str, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def image_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.png")
+
+    def chart(self, kind: str, data: Dict, title: str = '', width: Optional[float] = None,
+              height: Optional[float] = None) -> str:
+        """Get the PNG path of a chart, rendering it only if this content is not cached
+
+        width and height are in inches (CHART_CONFIG defaults).
+        """
+        if kind not in CHART_RENDERERS:
+            raise ValueError(f"Unknown chart kind {kind}")
+
+        spec = {
+            'title': title,
+            'width': width or CHART_CONFIG['width'],
+            'height': height or CHART_CONFIG['height'],
+            'dpi': CHART_CONFIG['dpi']
+        }
+        path = self.image_path(self.make_key(kind, data, spec))
+
+        with span(kind, 'chart') as chart_span:
+            if os.path.exists(path):
+                # Touch the file so size-based eviction drops least recently used charts first
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._count('hits')
+                chart_span.set(cache='hit')
+                return path
+
+            started = time.perf_counter()
+            self._render(kind, data, spec, path)
+            self._count('renders')
+            self._count('render_time', time.perf_counter() - started)
+            self._evict_disk(keep=path)
+            chart_span.set(cache='miss')
+        return path
+
+    def _render(self, kind: str, data: Dict, spec: Dict, path: str):
+        """Draw a chart and atomically write it as a PNG"""
+        # The Figure API with an explicit Agg canvas never touches pyplot's
+        # global state or a display, whatever MPLBACKEND says
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=(spec['width'], spec['height']), dpi=spec['dpi'])
+        FigureCanvasAgg(figure)
+        CHART_RENDERERS[kind](figure, data)
+        if spec['title']:
+            figure.suptitle(spec['title'], fontsize=11)
+        figure.tight_layout()
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        figure.savefig(tmp_path, format='png', dpi=spec['dpi'])
+        os.replace(tmp_path, path)
+
+    def _evict_disk(self, keep: str):
+        """Drop least recently used charts until the cache is under max_disk_bytes"""
+        if not self.max_disk_bytes:
+            return
+
+        entries = []
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith('.png') or entry.path == keep:
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        if evicted:
+            self._count('evictions', evicted)
+
+    def stats(self) -> Dict:
+        """Get hit and render counters"""
+        with self._lock:
+            return dict(self._stats)
+
+
+# ============================================
+# Renderers
+# ============================================
+
+@chart_renderer('trend')
+def trend(figure, data: Dict):
+    """Requests per day as bars with revenue as a line on a second axis
+
+    data: {'dates': [...], 'requests': [...], 'revenue': [...]}
+    """
+    axes = figure.subplots()
+    positions = list(range(len(data['dates'])))
+    axes.bar(positions, data['requests'], color='#9db4d3', label='Requests')
+    axes.set_ylabel('Requests')
+
+    step = max(len(positions) // 10, 1)
+    axes.set_xticks(positions[::step])
+    axes.set_xticklabels([str(d)[5:10] for d in data['dates']][::step], fontsize=8)
+
+    revenue = axes.twinx()
+    revenue.plot(positions, [value or 0 for value in data['revenue']], color='darkblue',
+                 marker='o', markersize=3, label='Revenue')
+    revenue.set_ylabel('Revenue ($)')
+
+
+@chart_renderer('service_mix')
+def service_mix(figure, data: Dict):
+    """Requests per service type as horizontal bars, largest on top
+
+    data: {'labels': [...], 'requests': [...]}
+    """
+    axes = figure.subplots()
+    labels = list(reversed(data['labels']))
+    counts = list(reversed(data['requests']))
+    bars = axes.barh(labels, counts, color='#9db4d3')
+    axes.bar_label(bars, fontsize=8, padding=2)
+    axes.set_xlabel('Requests')
+    axes.tick_params(axis='y', labelsize=8)
+
+
+@chart_renderer('drivers')
+def drivers(figure, data: Dict):
+    """Revenue per driver as horizontal bars colored by average rating
+
+    data: {'names': [...], 'revenue': [...], 'ratings': [...]}
+    """
+    from matplotlib import colormaps
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import Normalize
+
+    axes = figure.subplots()
+    # Positional bars, since two drivers may share a name
+    positions = list(range(len(data['names'])))
+    revenue = [value or 0 for value in reversed(data['revenue'])]
+    ratings = [rating or 0 for rating in reversed(data['ratings'])]
+    colormap = colormaps['RdYlGn']
+    norm = Normalize(vmin=1, vmax=5)
+    axes.barh(positions, revenue, color=[colormap(norm(rating)) for rating in ratings])
+    axes.set_yticks(positions)
+    axes.set_yticklabels(list(reversed(data['names'])))
+    axes.set_xlabel('Revenue ($)')
+    axes.tick_params(axis='y', labelsize=8)
+
+    scale = figure.colorbar(ScalarMappable(norm=norm, cmap=colormap), ax=axes)
+    scale.set_label('Avg rating')
+
+
+_shared_cache = None
+_shared_cache_pid = None
+
+
+def get_chart_cache() -> ChartCache:
+    """Get the process-wide chart cache"""
+    global _shared_cache, _shared_cache_pid
+    if _shared_cache is None or _shared_cache_pid != os.getpid():
+        _shared_cache = ChartCache()
+        _shared_cache_pid = os.getpid()
+    return _shared_cache
+
+
+def chart(kind: str, data: Dict, title: str = '', width: Optional[float] = None,
+          height: Optional[float] = None) -> str:
+    """Get the PNG path of a chart from the shared cache, rendering it on a miss"""
+    return get_chart_cache().chart(kind, data, title, width, height)
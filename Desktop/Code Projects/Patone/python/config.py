@@ -18,6 +18,23 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# Database Connection Pool
+DB_POOL_CONFIG = {
+    'size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'checkout_timeout': float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '30')),
+    'health_check': os.getenv('DB_POOL_HEALTH_CHECK', 'true').lower() == 'true',
+    'max_lifetime': int(os.getenv('DB_POOL_MAX_LIFETIME', '3600'))  # seconds
+}
+
+# Time Zones
+# report_timezone defines where a report day starts and ends; database_timezone is
+# the zone the database session returns timestamps in. Leave either empty to treat
+# report dates and stored timestamps as the same wall clock.
+TIMEZONE_CONFIG = {
+    'report_timezone': os.getenv('REPORT_TIMEZONE', ''),
+    'database_timezone': os.getenv('DB_TIMEZONE', '')
+}
+
 # API Configuration
 API_CONFIG = {
     'base_url': os.getenv('API_BASE_URL', 'http://localhost/roadside-admin/'),
@@ -48,7 +65,24 @@ PATHS = {
     'reports': os.path.join(os.path.dirname(__file__), '..', 'uploads', 'reports'),
     'exports': os.path.join(os.path.dirname(__file__), '..', 'uploads', 'exports'),
     'logs': os.path.join(os.path.dirname(__file__), '..', 'logs'),
-    'backups': os.path.join(os.path.dirname(__file__), '..', 'backups')
+    'backups': os.path.join(os.path.dirname(__file__), '..', 'backups'),
+    'snapshots': os.path.join(os.path.dirname(__file__), '..', 'cache', 'snapshots'),
+    'rollups': os.path.join(os.path.dirname(__file__), '..', 'cache', 'rollups'),
+    'results': os.path.join(os.path.dirname(__file__), '..', 'cache', 'results'),
+    'models': os.path.join(os.path.dirname(__file__), '..', 'cache', 'models'),
+    'charts': os.path.join(os.path.dirname(__file__), '..', 'cache', 'charts'),
+    'benchmarks': os.path.join(os.path.dirname(__file__), '..', 'cache', 'benchmarks'),
+    'duckdb': os.path.join(os.path.dirname(__file__), '..', 'cache', 'duckdb'),
+    'scheduler': os.path.join(os.path.dirname(__file__), '..', 'cache', 'scheduler')
+}
+
+# Embedded DuckDB backend (--source duckdb), built from the local snapshot by
+# duckdb_backend.py --load. threads 0 and an empty memory_limit keep DuckDB's defaults.
+DUCKDB_CONFIG = {
+    'path': os.getenv('DUCKDB_PATH', os.path.join(PATHS['duckdb'], 'analytics.duckdb')),
+    'connections': int(os.getenv('DUCKDB_CONNECTIONS', '4')),
+    'threads': int(os.getenv('DUCKDB_THREADS', '0')),
+    'memory_limit': os.getenv('DUCKDB_MEMORY_LIMIT', '')
 }
 
 # Report Configuration
@@ -58,7 +92,89 @@ REPORT_CONFIG = {
     'company_name': os.getenv('COMPANY_NAME', 'Roadside Assistance Company'),
     'company_address': os.getenv('COMPANY_ADDRESS', '123 Service Road, City, State 12345'),
     'company_phone': os.getenv('COMPANY_PHONE', '1-800-ROADSIDE'),
-    'company_email': os.getenv('COMPANY_EMAIL', 'info@roadsideassistance.com')
+    'company_email': os.getenv('COMPANY_EMAIL', 'info@roadsideassistance.com'),
+    'render_workers': int(os.getenv('REPORT_RENDER_WORKERS', '0')),  # 0 = one per CPU
+    # Queries of one report sent at once, each on its own pooled connection
+    # (capped at DB_POOL_SIZE); 1 runs them one after another
+    'query_concurrency': int(os.getenv('REPORT_QUERY_CONCURRENCY', '4')),
+    # Rows per piece of a long PDF table; about one page of the listing style
+    'table_chunk_rows': int(os.getenv('REPORT_TABLE_CHUNK_ROWS', '50')),
+    # Append every request of the month to the monthly report
+    'monthly_request_log': os.getenv('REPORT_MONTHLY_REQUEST_LOG', 'true').lower() == 'true',
+    # Customers fetched per set of batch queries by --customer-ids/--vip
+    'customer_batch_size': int(os.getenv('CUSTOMER_REPORT_BATCH_SIZE', '1000'))
+}
+
+# Report Charts
+# PNGs are cached under PATHS['charts'] keyed on their data, so re-running a
+# report only renders charts whose numbers changed
+CHART_CONFIG = {
+    'enabled': os.getenv('REPORT_CHARTS', 'true').lower() == 'true',
+    'dpi': int(os.getenv('REPORT_CHART_DPI', '150')),
+    'width': 6.5,   # inches, the A4 text width of the reports
+    'height': 2.8,
+    'max_disk_bytes': int(os.getenv('CHART_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+}
+
+# Analysis Result Cache
+# Entries are keyed on the data watermark, so they are reused until the source
+# tables change. The TTL bounds how far a trailing --days window can drift.
+# Deletes are only seen by an exact row count, which reads a whole index and
+# so runs at most once per row_count_interval per table.
+RESULT_CACHE_CONFIG = {
+    'enabled': os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true',
+    'ttl': int(os.getenv('RESULT_CACHE_TTL', '900')),  # seconds
+    'memory_entries': int(os.getenv('RESULT_CACHE_MEMORY_ENTRIES', '32')),
+    'max_disk_bytes': int(os.getenv('RESULT_CACHE_MAX_MB', '256')) * 1024 * 1024,
+    'row_count_interval': int(os.getenv('RESULT_CACHE_ROW_COUNT_INTERVAL', '300'))  # seconds
+}
+
+# Hourly Rollups (rollups.py)
+# A refresh recomputes the hours holding rows updated since its watermark. Deletes
+# leave no updated_at behind, so stored counts are only compared with the source
+# over the newest delete_check_hours of rolled-up history; rollups.py --full picks
+# up older deletes.
+ROLLUP_CONFIG = {
+    'delete_check_hours': int(os.getenv('ROLLUP_DELETE_CHECK_HOURS', '168'))
+}
+
+# Streaming Extraction
+# Customer and driver analyses can fold query results chunk by chunk from an
+# unbuffered cursor instead of loading them into one frame (the snapshot source
+# holds its tables in memory, so there chunking does not bound memory)
+STREAMING_CONFIG = {
+    'enabled': os.getenv('STREAMING_ANALYSIS', 'false').lower() == 'true',
+    'chunk_size': int(os.getenv('ANALYSIS_CHUNK_SIZE', '20000'))
+}
+
+# Analysis Pipeline (--analysis all)
+PIPELINE_CONFIG = {
+    # Keep at or below DB_POOL_SIZE so concurrent extraction steps never wait on the pool
+    'max_workers': int(os.getenv('ANALYSIS_WORKERS', '4'))
+}
+
+# Query Audit (query_audit.py)
+QUERY_AUDIT_CONFIG = {
+    # Full scans of tables this small are reported but do not fail the audit
+    'max_scan_rows': int(os.getenv('AUDIT_MAX_SCAN_ROWS', '1000')),
+    # Suggested covering indexes wider than this are cut back to their key columns
+    'max_index_columns': int(os.getenv('AUDIT_MAX_INDEX_COLUMNS', '6'))
+}
+
+# Profiling (--profile / --profile-prometheus)
+PROFILING_CONFIG = {
+    # Metric names in the Prometheus export start with this prefix
+    'metric_prefix': os.getenv('PROFILE_METRIC_PREFIX', 'roadside')
+}
+
+# Customer Segmentation
+SEGMENTATION_CONFIG = {
+    'clusters': int(os.getenv('SEGMENT_CLUSTERS', '4')),
+    'batch_size': int(os.getenv('SEGMENT_BATCH_SIZE', '10000')),
+    'epochs': int(os.getenv('SEGMENT_EPOCHS', '3')),
+    # Retrain when the assignment error grows this much over the training error
+    'drift_threshold': float(os.getenv('SEGMENT_DRIFT_THRESHOLD', '0.25')),
+    'random_state': 42
 }
 
 # Geolocation Configuration
@@ -78,6 +194,37 @@ AUTOMATION_CONFIG = {
     'max_file_age_days': int(os.getenv('MAX_FILE_AGE_DAYS', '90'))
 }
 
+# Report Scheduler (scheduler.py), which runs the jobs at report_generation_time
+SCHEDULER_CONFIG = {
+    # Jobs run at once; each report or analysis also opens its own pool connections
+    'workers': int(os.getenv('SCHEDULER_WORKERS', '2')),
+    'source': os.getenv('SCHEDULER_SOURCE', 'live'),
+    # Longest the daemon sleeps between checks for due jobs
+    'poll_seconds': int(os.getenv('SCHEDULER_POLL_SECONDS', '30')),
+    # How often the local snapshot is synced: hourly, daily, weekly or off
+    'snapshot_sync': os.getenv('SCHEDULER_SNAPSHOT_SYNC', 'daily')
+}
+
+# Report Worker (report_worker.py), which generates the reports queued in the reports table
+REPORT_WORKER_CONFIG = {
+    'workers': int(os.getenv('REPORT_WORKERS', '2')),
+    'source': os.getenv('REPORT_WORKER_SOURCE', 'live'),
+    # Wait between claims while the queue is empty
+    'poll_seconds': float(os.getenv('REPORT_WORKER_POLL_SECONDS', '5')),
+    # A row still 'processing' after this long belongs to a dead worker; keep it
+    # above the slowest report so a running report is never taken twice
+    'stale_seconds': int(os.getenv('REPORT_WORKER_STALE_SECONDS', '1800')),
+    'max_attempts': int(os.getenv('REPORT_WORKER_MAX_ATTEMPTS', '3'))
+}
+
+# Report Store (report_store.py): the catalog of generated reports and its
+# retention sweep, which deletes reports older than max_file_age_days
+REPORT_STORE_CONFIG = {
+    'sweep_batch_size': int(os.getenv('REPORT_STORE_SWEEP_BATCH', '500')),
+    # Batches per sweep; a longer backlog is left for the next sweep
+    'sweep_max_batches': int(os.getenv('REPORT_STORE_SWEEP_MAX_BATCHES', '20'))
+}
+
 # Logging Configuration
 LOG_CONFIG = {
     'level': os.getenv('LOG_LEVEL', 'INFO'),
@@ -4,59 +4,172 @@ Roadside Assistance Admin Platform - Data Analyzer
 Analyzes business data and provides insights for decision making
 """
 
+import json
 import os
 import sys
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+import threading
+import time
+from typing import Dict, List, Optional
 
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from python.config import DB_CONFIG, FEATURES
-import mysql.connector
+from python.config import DB_CONFIG, FEATURES, RESULT_CACHE_CONFIG, STREAMING_CONFIG
+from python.db_pool import get_backend
+from python.dialects import dialect_of
+from python.forecasting import forecast_demand
+from python.frames import build_frame
+from python.pipeline import Pipeline
+from python.profiling import Profiler, profiled, span, traced_chunks
+from python.query_builder import trailing_days
+from python.result_cache import cached_analysis, get_result_cache
+from python.rollups import RollupStore
+from python.schemas import apply_schema
+from python.segmentation import CustomerSegmenter, feature_matrix
+from python.streaming import (
+    GroupStats, QuantileSketch, TopN, cursor_chunks, fold, snapshot_chunks
+)
+from python.snapshot import get_snapshot
+from python import queries
+
+# Columns typed as floats in streamed chunks (the connector returns DECIMAL objects)
+DRIVER_NUMERIC_COLUMNS = [
+    'total_services', 'total_revenue', 'avg_service_cost', 'avg_completion_time',
+    'avg_rating', 'completed_services', 'cancelled_services'
+]
+CUSTOMER_NUMERIC_COLUMNS = [
+    'is_vip', 'total_services', 'total_spent', 'avg_service_cost',
+    'avg_rating_given', 'days_since_first_service'
+]
+AT_RISK_COLUMNS = ['id', 'first_name', 'last_name', 'days_since_service', 'total_spent']
+
+# Analyses run by --analysis all: name -> (method, default days)
+ANALYSES = {
+    'demand': ('analyze_service_demand', 30),
+    'drivers': ('analyze_driver_performance', 30),
+    'customers': ('analyze_customer_behavior', 90),
+    'revenue': ('analyze_revenue_trends', 90)
+}
 
 class DataAnalyzer:
-    def __init__(self):
+    def __init__(self, source: str = 'live', use_cache: Optional[bool] = None,
+                 streaming: Optional[bool] = None):
         self.db_config = DB_CONFIG
         self.features = FEATURES
+        self.pool = get_backend(source)
 
-        # Set up matplotlib style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        # 'snapshot' reads the local Arrow copy kept by snapshot.py instead of MySQL;
+        # 'duckdb' runs the same SQL on the embedded copy built by duckdb_backend.py
+        self.source = source
+        self.snapshot = None
+        if source == 'snapshot':
+            self.snapshot = get_snapshot()
+
+        # Demand and revenue analyses read hourly rollups instead of raw requests
+        self.rollups = RollupStore(self._load_frame, name=source)
+
+        # Customer segments come from a persisted model that is only retrained on drift
+        self.segmenter = CustomerSegmenter(name=source)
+
+        # Customer and driver analyses fold chunks into accumulators instead of one frame
+        self.streaming = STREAMING_CONFIG['enabled'] if streaming is None else streaming
+
+        if use_cache is None:
+            use_cache = RESULT_CACHE_CONFIG['enabled']
+        self.result_cache = get_result_cache() if use_cache else None
+
+        # Set by analyze_all so every analysis keys its cache entry on one watermark read;
+        # per thread, since report workers share one analyzer
+        self._pinned = threading.local()
+
+        # Exact row counts for the watermark, table -> (counted at, rows)
+        self._row_counts = {}
+        self._row_counts_lock = threading.Lock()
 
     def get_database_connection(self):
-        """Get database connection"""
-        return mysql.connector.connect(**self.db_config)
+        """Get a pooled database connection (use as a context manager)"""
+        return self.pool.connection()
+
+    def _load_frame(self, query, **params) -> pd.DataFrame:
+        """Run an analysis query against the live database or the local snapshot"""
+        with span(query.name, 'query', source=self.source) as query_span:
+            if self.snapshot is not None:
+                df = build_frame(query, self.snapshot, **params)
+            else:
+                with self.get_database_connection() as conn:
+                    sql, values = query.statement(dialect_of(conn), **params)
+                    # Embedded engines hand back a frame directly instead of row tuples
+                    read_frame = getattr(conn, 'read_frame', None)
+                    if read_frame is not None:
+                        df = read_frame(sql, values)
+                    else:
+                        df = pd.read_sql(sql, conn, params=values)
+            query_span.add_frame(df)
+        return apply_schema(df, query.name)
+
+    def _iter_frames(self, query, **params):
+        """Stream an analysis query's rows in chunks from the live database or the snapshot"""
+        if self.snapshot is not None:
+            chunks = traced_chunks(query.name, snapshot_chunks(self.snapshot, query, **params),
+                                   source=self.source)
+            for chunk in chunks:
+                yield apply_schema(chunk, query.name)
+            return
+
+        with self.get_database_connection() as conn:
+            chunks = traced_chunks(query.name, cursor_chunks(conn, query, **params), source=self.source)
+            for chunk in chunks:
+                yield apply_schema(chunk, query.name)
+
+    def _row_count(self, table: str) -> int:
+        """Get a table's row count, counting again at most every row_count_interval seconds"""
+        now = time.monotonic()
+        with self._row_counts_lock:
+            counted = self._row_counts.get(table)
+        if counted is not None and now - counted[0] < RESULT_CACHE_CONFIG['row_count_interval']:
+            return counted[1]
+
+        rows = int(self._load_frame(queries.TABLE_ROW_COUNTS[table]).iloc[0]['row_count'])
+        with self._row_counts_lock:
+            self._row_counts[table] = (now, rows)
+        return rows
+
+    def _read_watermark(self, tables) -> Dict:
+        """Read the last change time, highest id and row count of each of the given tables"""
+        marks = {}
+        for table in tables:
+            row = self._load_frame(queries.TABLE_WATERMARKS[table]).iloc[0]
+            marks[table] = [None if pd.isna(row['last_updated']) else str(row['last_updated']),
+                            None if pd.isna(row['last_id']) else int(row['last_id']),
+                            self._row_count(table)]
+        return marks
+
+    def data_watermark(self, tables) -> Dict:
+        """Get the last change time, highest id and row count of each source table"""
+        pinned = getattr(self._pinned, 'watermark', None)
+        if pinned is not None and all(table in pinned for table in tables):
+            watermark = {table: pinned[table] for table in tables}
+        else:
+            watermark = self._read_watermark(tables)
+        if 'customers' in tables:
+            # A retrained segmentation model changes customer results without new data
+            watermark['segment_model'] = self.segmenter.model_version
+        return watermark
 
+    @cached_analysis('demand', tables=['service_requests'])
     def analyze_service_demand(self, days: int = 30) -> Dict:
         """Analyze service demand patterns"""
-        conn = self.get_database_connection()
-
-        # Get service requests data
-        query = """
-            SELECT DATE(created_at) as date,
-                   HOUR(created_at) as hour,
-                   service_type_id,
-                   COUNT(*) as request_count,
-                   AVG(TIMESTAMPDIFF(MINUTE, created_at, assigned_at)) as avg_response_time
-            FROM service_requests
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
-            GROUP BY DATE(created_at), HOUR(created_at), service_type_id
-            ORDER BY date, hour
-        """
-
-        df = pd.read_sql(query, conn, params=[days])
+        return self._demand_results(self._demand_frame(trailing_days(days)), days)
 
-        conn.close()
+    def _demand_frame(self, period, buckets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Get demand per day, hour and service type from the hourly rollups"""
+        return apply_schema(self.rollups.service_demand(period, buckets), queries.SERVICE_DEMAND.name)
 
+    @profiled()
+    def _demand_results(self, df: pd.DataFrame, days: int) -> Dict:
+        """Derive the demand analysis from a demand frame"""
         if df.empty:
             return {'error': 'No data available for analysis'}
 
@@ -80,29 +193,18 @@ class DataAnalyzer:
             'summary': self._generate_demand_summary(df)
         }
 
+    @cached_analysis('drivers', tables=['service_requests', 'drivers'])
     def analyze_driver_performance(self, days: int = 30) -> Dict:
         """Analyze driver performance metrics"""
-        conn = self.get_database_connection()
-
-        query = """
-            SELECT d.id, d.first_name, d.last_name,
-                   COUNT(sr.id) as total_services,
-                   SUM(sr.actual_cost) as total_revenue,
-                   AVG(sr.actual_cost) as avg_service_cost,
-                   AVG(TIMESTAMPDIFF(MINUTE, sr.created_at, sr.completed_at)) as avg_completion_time,
-                   AVG(sr.customer_rating) as avg_rating,
-                   COUNT(CASE WHEN sr.status = 'completed' THEN 1 END) as completed_services,
-                   COUNT(CASE WHEN sr.status = 'cancelled' THEN 1 END) as cancelled_services
-            FROM drivers d
-            LEFT JOIN service_requests sr ON d.id = sr.driver_id
-                   AND sr.created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
-            GROUP BY d.id, d.first_name, d.last_name
-            ORDER BY total_services DESC
-        """
+        if self.streaming:
+            return self._stream_driver_performance(days)
 
-        df = pd.read_sql(query, conn, params=[days])
-        conn.close()
+        df = self._load_frame(queries.DRIVER_PERFORMANCE, period=trailing_days(days))
+        return self._driver_results(df)
 
+    @profiled()
+    def _driver_results(self, df: pd.DataFrame) -> Dict:
+        """Derive the driver analysis from a driver_performance frame"""
         if df.empty:
             return {'error': 'No driver data available'}
 
@@ -123,33 +225,23 @@ class DataAnalyzer:
             'summary': self._generate_performance_summary(df)
         }
 
+    @cached_analysis('customers', tables=['service_requests', 'customers'])
     def analyze_customer_behavior(self, days: int = 90) -> Dict:
         """Analyze customer behavior patterns"""
-        conn = self.get_database_connection()
-
-        query = """
-            SELECT c.id, c.first_name, c.last_name, c.is_vip,
-                   COUNT(sr.id) as total_services,
-                   SUM(sr.actual_cost) as total_spent,
-                   AVG(sr.actual_cost) as avg_service_cost,
-                   MAX(sr.created_at) as last_service_date,
-                   AVG(sr.customer_rating) as avg_rating_given,
-                   DATEDIFF(NOW(), MIN(sr.created_at)) as days_since_first_service
-            FROM customers c
-            LEFT JOIN service_requests sr ON c.id = sr.customer_id
-                   AND sr.created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
-                   AND sr.status = 'completed'
-            GROUP BY c.id, c.first_name, c.last_name, c.is_vip
-            HAVING total_services > 0
-        """
+        if self.streaming:
+            return self._stream_customer_behavior(days)
 
-        df = pd.read_sql(query, conn, params=[days])
-        conn.close()
+        df = self._load_frame(queries.CUSTOMER_BEHAVIOR, period=trailing_days(days))
+        return self._customer_results(df)
 
+    @profiled()
+    def _customer_results(self, df: pd.DataFrame) -> Dict:
+        """Derive the customer analysis from a customer_behavior frame"""
         if df.empty:
             return {'error': 'No customer data available'}
 
         # Segment customers
+        segmentation = self.segmenter.segment(df)
         customer_segments = self._segment_customers(df)
 
         # Analyze VIP vs regular customers
@@ -163,35 +255,25 @@ class DataAnalyzer:
 
         return {
             'customer_segments': customer_segments,
+            'segmentation': segmentation,
             'vip_analysis': vip_analysis,
             'clv_predictions': clv_predictions,
             'at_risk_customers': at_risk_customers,
             'summary': self._generate_customer_summary(df)
         }
 
+    @cached_analysis('revenue', tables=['service_requests', 'service_types'])
     def analyze_revenue_trends(self, days: int = 90) -> Dict:
         """Analyze revenue trends and patterns"""
-        conn = self.get_database_connection()
-
-        query = """
-            SELECT DATE(sr.created_at) as date,
-                   HOUR(sr.created_at) as hour,
-                   st.name as service_type,
-                   SUM(sr.actual_cost) as daily_revenue,
-                   COUNT(*) as service_count,
-                   AVG(sr.actual_cost) as avg_service_cost
-            FROM service_requests sr
-            JOIN service_types st ON sr.service_type_id = st.id
-            WHERE sr.created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
-                  AND sr.status = 'completed'
-                  AND sr.actual_cost IS NOT NULL
-            GROUP BY DATE(sr.created_at), HOUR(sr.created_at), st.name
-            ORDER BY date, hour
-        """
+        return self._revenue_results(self._revenue_frame(trailing_days(days)))
 
-        df = pd.read_sql(query, conn, params=[days])
-        conn.close()
+    def _revenue_frame(self, period, buckets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Get revenue per day, hour and service type from the hourly rollups"""
+        return apply_schema(self.rollups.revenue_trends(period, buckets), queries.REVENUE_TRENDS.name)
 
+    @profiled()
+    def _revenue_results(self, df: pd.DataFrame) -> Dict:
+        """Derive the revenue analysis from a revenue frame"""
         if df.empty:
             return {'error': 'No revenue data available'}
 
@@ -211,7 +293,7 @@ class DataAnalyzer:
         peak_periods = self._identify_peak_periods(df)
 
         return {
-            'daily_totals': daily_totals.to_dict('records'),
+            'daily_totals': daily_totals.assign(date=daily_totals['date'].dt.strftime('%Y-%m-%d')).to_dict('records'),
             'weekly_averages': weekly_averages,
             'service_revenue': service_revenue,
             'revenue_predictions': revenue_predictions,
@@ -219,6 +301,266 @@ class DataAnalyzer:
             'summary': self._generate_revenue_summary(daily_totals, df)
         }
 
+    def analyze_all(self, days: Optional[int] = None) -> Dict:
+        """Run all four analyses as one pipeline that shares extractions
+
+        The watermark is read once and analyses with a cached result are not
+        scheduled. For the rest, the rollup refresh and the hourly buckets of
+        each window are computed once and shared by demand and revenue, while
+        the driver and customer queries run alongside them. Returns each
+        analysis under its name plus a 'pipeline' section with stage timings.
+        """
+        started = time.perf_counter()
+        windows = {name: days or default for name, (_, default) in ANALYSES.items()}
+        # One period per window length, so analyses over the same days share buckets
+        periods = {window: trailing_days(window) for window in set(windows.values())}
+
+        if self.result_cache is not None:
+            tables = {table for method, _ in ANALYSES.values() for table in getattr(type(self), method).tables}
+            self._pinned.watermark = self._read_watermark(sorted(tables))
+        try:
+            keys = {}
+            documents = {}
+            if self.result_cache is not None:
+                for name, (method, _) in ANALYSES.items():
+                    keys[name] = getattr(type(self), method).cache_key(self, windows[name])
+                    hit, value = self.result_cache.get(keys[name])
+                    if hit:
+                        documents[name] = value
+            planning = time.perf_counter() - started
+
+            pipeline = self._analysis_pipeline(
+                [name for name in ANALYSES if name not in documents], windows, periods
+            )
+            run = pipeline.run()
+
+            for name in ANALYSES:
+                if name in documents:
+                    continue
+                if name in run['errors']:
+                    documents[name] = {'error': f"Analysis failed: {run['errors'][name]}"}
+                    continue
+                documents[name] = run['results'][name]
+                if self.result_cache is not None:
+                    documents[name] = json.loads(self.result_cache.set(keys[name], documents[name]))
+        finally:
+            self._pinned.watermark = None
+
+        documents['pipeline'] = {
+            'wall_time': time.perf_counter() - started,
+            'planning_time': planning,
+            'workers': pipeline.max_workers,
+            'cached': [name for name in ANALYSES if name in keys and name not in pipeline],
+            'stages': run['stages']
+        }
+        return documents
+
+    def _analysis_pipeline(self, analyses: List[str], windows: Dict[str, int], periods: Dict) -> Pipeline:
+        """Build the extraction and derivation graph for the given analyses"""
+        pipeline = Pipeline()
+
+        rollup_analyses = [name for name in ('demand', 'revenue') if name in analyses]
+        if rollup_analyses:
+            pipeline.add('rollup_refresh', lambda: self.rollups.refresh(), kind='extract')
+        for name in rollup_analyses:
+            window = windows[name]
+            buckets = f'hourly_rollups_{window}d'
+            if buckets not in pipeline:
+                pipeline.add(buckets, lambda _, period=periods[window]: self.rollups.hourly(period, refresh=False),
+                             deps=['rollup_refresh'], kind='extract')
+
+        if 'demand' in analyses:
+            period, window = periods[windows['demand']], windows['demand']
+            pipeline.add('demand_frame', lambda b: self._demand_frame(period, b),
+                         deps=[f'hourly_rollups_{window}d'])
+            pipeline.add('demand', lambda df: self._demand_results(df, window), deps=['demand_frame'])
+
+        if 'revenue' in analyses:
+            revenue_period = periods[windows['revenue']]
+            pipeline.add('revenue_frame', lambda b: self._revenue_frame(revenue_period, b),
+                         deps=[f"hourly_rollups_{windows['revenue']}d"])
+            pipeline.add('revenue', self._revenue_results, deps=['revenue_frame'])
+
+        if 'drivers' in analyses:
+            driver_period = periods[windows['drivers']]
+            if self.streaming:
+                pipeline.add('drivers', lambda: self._stream_driver_performance(windows['drivers']),
+                             kind='extract')
+            else:
+                pipeline.add('driver_frame', lambda: self._load_frame(queries.DRIVER_PERFORMANCE,
+                                                                      period=driver_period), kind='extract')
+                pipeline.add('drivers', self._driver_results, deps=['driver_frame'])
+
+        if 'customers' in analyses:
+            customer_period = periods[windows['customers']]
+            if self.streaming:
+                pipeline.add('customers', lambda: self._stream_customer_behavior(windows['customers']),
+                             kind='extract')
+            else:
+                pipeline.add('customer_frame', lambda: self._load_frame(queries.CUSTOMER_BEHAVIOR,
+                                                                        period=customer_period), kind='extract')
+                pipeline.add('customers', self._customer_results, deps=['customer_frame'])
+
+        return pipeline
+
+    def _driver_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Type a streamed driver chunk and add its completion rates"""
+        chunk = chunk.copy()
+        for column in DRIVER_NUMERIC_COLUMNS:
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype('float64')
+        chunk['completion_rate'] = chunk['completed_services'] / chunk['total_services'] * 100
+        return chunk
+
+    @profiled()
+    def _stream_driver_performance(self, days: int) -> Dict:
+        """Driver performance in two streamed passes with bounded memory
+
+        The first pass collects the maxima the performance score is relative
+        to and a completion time sketch; the second scores each chunk and
+        keeps only the top performers. The per-driver list is not returned.
+        """
+        period = trailing_days(days)
+        chunks = lambda: (self._driver_chunk(chunk)
+                          for chunk in self._iter_frames(queries.DRIVER_PERFORMANCE, period=period))
+
+        totals = GroupStats(None, ['total_revenue', 'avg_completion_time', 'avg_rating', 'completion_rate'])
+        completion_times = QuantileSketch('avg_completion_time')
+        drivers = fold(chunks(), totals, completion_times)
+        if not drivers:
+            return {'error': 'No driver data available'}
+
+        stats = totals.stats[None]
+        max_revenue = stats['total_revenue'].max
+        max_time = stats['avg_completion_time'].max
+        slow_time = completion_times.quantile(0.75)
+
+        top_performers = TopN(5, 'performance_score')
+        counts = {'low_completion': 0, 'low_rating': 0, 'slow': 0, 'improvement_needed': 0}
+        top_performer = None
+        for chunk in chunks():
+            chunk['performance_score'] = self._calculate_performance_score(chunk, max_revenue, max_time)
+            top_performers.add(chunk)
+            # Rows arrive ordered by total services, like the first row of the frame
+            if top_performer is None and not chunk.empty:
+                top_performer = chunk.iloc[0]['first_name'] + ' ' + chunk.iloc[0]['last_name']
+            counts['low_completion'] += int((chunk['completion_rate'] < 80).sum())
+            counts['low_rating'] += int((chunk['avg_rating'] < 3.5).sum())
+            counts['slow'] += int((chunk['avg_completion_time'] > slow_time).sum())
+            counts['improvement_needed'] += int((chunk['performance_score'] < 60).sum())
+
+        return {
+            'top_performers': top_performers.items(),
+            'improvement_areas': self._describe_improvement_areas(
+                counts['low_completion'], counts['low_rating'], counts['slow']
+            ),
+            'summary': {
+                'total_drivers': drivers,
+                'average_completion_rate': stats['completion_rate'].mean,
+                'average_rating': stats['avg_rating'].mean,
+                'top_performer': top_performer,
+                'improvement_needed': counts['improvement_needed']
+            }
+        }
+
+    def _customer_chunk(self, chunk: pd.DataFrame, reference_date: pd.Timestamp) -> pd.DataFrame:
+        """Type a streamed customer chunk and add its days since last service"""
+        chunk = chunk.copy()
+        for column in CUSTOMER_NUMERIC_COLUMNS:
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype('float64')
+        chunk['last_service_date'] = pd.to_datetime(chunk['last_service_date'])
+        chunk['days_since_service'] = (reference_date - chunk['last_service_date']).dt.days
+        return chunk
+
+    @profiled()
+    def _stream_customer_behavior(self, days: int) -> Dict:
+        """Customer behavior folded chunk by chunk into mergeable aggregates
+
+        Segments come from the saved segmentation model (trained over the
+        stream first if there is none, and retrained with an extra pass when
+        the stream's assignment error has drifted).
+        """
+        period = trailing_days(days)
+        reference_date = pd.Timestamp.now()
+        chunks = lambda: (self._customer_chunk(chunk, reference_date)
+                          for chunk in self._iter_frames(queries.CUSTOMER_BEHAVIOR, period=period))
+
+        retrained = None
+        if self.segmenter.model is None:
+            self.segmenter.train(chunks)
+            retrained = 'no model'
+        model = self.segmenter.model
+
+        def assign(chunk):
+            distances = model.distances(feature_matrix(chunk))
+            return chunk.assign(segment=distances.argmin(axis=1), assignment_error=distances.min(axis=1))
+
+        overall = GroupStats(None, ['is_vip', 'total_services', 'total_spent', 'avg_rating_given',
+                                    'assignment_error'])
+        by_vip = GroupStats('is_vip', ['total_services', 'total_spent', 'avg_rating_given'])
+        segments = GroupStats('segment', ['total_services', 'total_spent', 'is_vip'])
+        spending = QuantileSketch('total_spent')
+        # Customers who haven't used the service in 90+ days, biggest spenders first
+        at_risk = TopN(10, 'total_spent', columns=AT_RISK_COLUMNS,
+                       where=lambda chunk: chunk['days_since_service'] > 90)
+
+        customers = fold((assign(chunk) for chunk in chunks()),
+                         overall, by_vip, segments, spending, at_risk)
+        if not customers:
+            return {'error': 'No customer data available'}
+
+        stats = overall.stats[None]
+        drift = self.segmenter.drift_from_error(stats['assignment_error'].mean)
+        if retrained is None and drift > self.segmenter.drift_threshold:
+            model = self.segmenter.train(chunks)
+            retrained = 'drift'
+            segments = GroupStats('segment', ['total_services', 'total_spent', 'is_vip'])
+            fold((assign(chunk) for chunk in chunks()), segments)
+
+        avg_spending = stats['total_spent'].mean
+        return {
+            'customer_segments': {
+                f'segment_{segment}': {
+                    'count': segments.count(segment),
+                    'avg_services': segments.mean('total_services', segment),
+                    'avg_spending': segments.mean('total_spent', segment),
+                    'vip_percentage': segments.mean('is_vip', segment) * 100
+                }
+                for segment in sorted(segments.stats)
+            },
+            'segmentation': {
+                'model_version': model.version,
+                'trained_at': model.trained_at,
+                'retrained': retrained,
+                'drift': drift,
+                'assigned': customers
+            },
+            'vip_analysis': {
+                'vip_count': by_vip.count(True),
+                'regular_count': by_vip.count(False),
+                'vip_avg_services': by_vip.mean('total_services', True),
+                'regular_avg_services': by_vip.mean('total_services', False),
+                'vip_avg_spending': by_vip.mean('total_spent', True),
+                'regular_avg_spending': by_vip.mean('total_spent', False),
+                'vip_satisfaction': by_vip.mean('avg_rating_given', True),
+                'regular_satisfaction': by_vip.mean('avg_rating_given', False)
+            },
+            'clv_predictions': {
+                'average_current_value': avg_spending,
+                'average_services': stats['total_services'].mean,
+                'projected_lifetime_value': avg_spending * 1.8,
+                'high_value_threshold': spending.quantile(0.75)
+            },
+            'at_risk_customers': at_risk.items(),
+            'summary': {
+                'total_customers': customers,
+                'vip_customers': int(stats['is_vip'].total),
+                'average_services_per_customer': stats['total_services'].mean,
+                'average_spending_per_customer': avg_spending,
+                'customer_satisfaction': stats['avg_rating_given'].mean
+            }
+        }
+
+    @profiled()
     def _analyze_daily_patterns(self, df: pd.DataFrame) -> Dict:
         """Analyze daily demand patterns"""
         daily_counts = df.groupby('date')['request_count'].sum()
@@ -235,13 +577,14 @@ class DataAnalyzer:
 
         return {
             'average_daily_requests': float(avg_daily),
-            'busiest_day': str(max_day),
-            'slowest_day': str(min_day),
+            'busiest_day': str(pd.Timestamp(max_day).date()),
+            'slowest_day': str(pd.Timestamp(min_day).date()),
             'daily_volatility': float(std_daily),
             'weekday_averages': weekday_avg.to_dict(),
             'trend': 'increasing' if daily_counts.iloc[-1] > daily_counts.iloc[0] else 'decreasing'
         }
 
+    @profiled()
     def _analyze_hourly_patterns(self, df: pd.DataFrame) -> Dict:
         """Analyze hourly demand patterns"""
         hourly_counts = df.groupby('hour')['request_count'].sum()
@@ -261,6 +604,7 @@ class DataAnalyzer:
             'slowest_hour': int(hourly_counts.idxmin())
         }
 
+    @profiled()
     def _analyze_service_distribution(self, df: pd.DataFrame) -> Dict:
         """Analyze service type distribution"""
         service_counts = df.groupby('service_type_id')['request_count'].sum()
@@ -281,47 +625,26 @@ class DataAnalyzer:
             'total_unique_services': len(service_counts)
         }
 
+    @profiled()
     def _predict_demand(self, df: pd.DataFrame, forecast_days: int) -> Dict:
-        """Predict future demand using linear regression"""
+        """Forecast demand per service type with trend and day-of-week seasonality"""
         if not self.features.get('advanced_analytics', False):
             return {'error': 'Advanced analytics not enabled'}
 
         try:
-            # Prepare data for prediction
-            daily_demand = df.groupby('date')['request_count'].sum().reset_index()
-            daily_demand['date'] = pd.to_datetime(daily_demand['date'])
-            daily_demand['day_of_year'] = daily_demand['date'].dt.dayofyear
-
-            # Train model
-            X = daily_demand[['day_of_year']]
-            y = daily_demand['request_count']
-
-            model = LinearRegression()
-            model.fit(X, y)
-
-            # Predict future demand
-            last_date = daily_demand['date'].max()
-            future_dates = [last_date + timedelta(days=i) for i in range(1, forecast_days + 1)]
-
-            future_predictions = []
-            for date in future_dates:
-                prediction = model.predict([[date.dayofyear]])[0]
-                future_predictions.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'predicted_demand': max(0, round(prediction, 1))
-                })
-
-            return {
-                'model_accuracy': model.score(X, y),
-                'predictions': future_predictions,
-                'trend': 'increasing' if model.coef_[0] > 0 else 'decreasing'
-            }
+            return forecast_demand(df, forecast_days)
 
         except Exception as e:
             return {'error': f'Prediction failed: {str(e)}'}
 
-    def _calculate_performance_score(self, df: pd.DataFrame) -> pd.Series:
-        """Calculate overall performance score for drivers"""
+    @profiled()
+    def _calculate_performance_score(self, df: pd.DataFrame, max_revenue: Optional[float] = None,
+                                     max_time: Optional[float] = None) -> pd.Series:
+        """Calculate overall performance score for drivers
+
+        The revenue and completion time scores are relative to the maxima over
+        all drivers, which a streamed chunk must be given.
+        """
         # Normalize metrics (0-1 scale)
         df_normalized = df.copy()
 
@@ -332,11 +655,13 @@ class DataAnalyzer:
         df_normalized['rating'] = df_normalized['avg_rating'] / 5
 
         # Revenue (normalized)
-        max_revenue = df_normalized['total_revenue'].max()
+        if max_revenue is None:
+            max_revenue = df_normalized['total_revenue'].max()
         df_normalized['revenue_score'] = df_normalized['total_revenue'] / max_revenue if max_revenue > 0 else 0
 
         # Completion time (inverse - lower is better)
-        max_time = df_normalized['avg_completion_time'].max()
+        if max_time is None:
+            max_time = df_normalized['avg_completion_time'].max()
         df_normalized['time_score'] = 1 - (df_normalized['avg_completion_time'] / max_time) if max_time > 0 else 1
 
         # Calculate weighted score
@@ -356,46 +681,36 @@ class DataAnalyzer:
 
         return df_normalized['performance_score']
 
+    @profiled()
     def _identify_improvement_areas(self, df: pd.DataFrame) -> List[str]:
         """Identify areas where drivers can improve"""
+        return self._describe_improvement_areas(
+            low_completion=int((df['completion_rate'] < 80).sum()),
+            low_rating=int((df['avg_rating'] < 3.5).sum()),
+            slow=int((df['avg_completion_time'] > df['avg_completion_time'].quantile(0.75)).sum())
+        )
+
+    def _describe_improvement_areas(self, low_completion: int, low_rating: int, slow: int) -> List[str]:
+        """Describe the number of drivers with low completion rates, low ratings and long jobs"""
         areas = []
 
-        # Low completion rate
-        low_completion = df[df['completion_rate'] < 80]
-        if not low_completion.empty:
-            areas.append(f"{len(low_completion)} drivers have low completion rates")
+        if low_completion:
+            areas.append(f"{low_completion} drivers have low completion rates")
 
-        # Low ratings
-        low_rating = df[df['avg_rating'] < 3.5]
-        if not low_rating.empty:
-            areas.append(f"{len(low_rating)} drivers have low customer ratings")
+        if low_rating:
+            areas.append(f"{low_rating} drivers have low customer ratings")
 
-        # Long completion times
-        slow_drivers = df[df['avg_completion_time'] > df['avg_completion_time'].quantile(0.75)]
-        if not slow_drivers.empty:
-            areas.append(f"{len(slow_drivers)} drivers have longer than average completion times")
+        if slow:
+            areas.append(f"{slow} drivers have longer than average completion times")
 
         return areas
 
+    @profiled()
     def _segment_customers(self, df: pd.DataFrame) -> Dict:
-        """Segment customers based on behavior"""
-        # Create features for clustering
-        features = df[['total_services', 'total_spent', 'avg_service_cost']].copy()
-
-        # Handle missing values
-        features = features.fillna(0)
-
-        # Scale features
-        scaler = StandardScaler()
-        scaled_features = scaler.fit_transform(features)
-
-        # Perform clustering
-        kmeans = KMeans(n_clusters=4, random_state=42)
-        df['segment'] = kmeans.fit_predict(scaled_features)
-
+        """Summarize customers by the segment assigned by the segmentation model"""
         # Analyze segments
         segments = {}
-        for segment in df['segment'].unique():
+        for segment in sorted(df['segment'].unique()):
             segment_data = df[df['segment'] == segment]
             segments[f'segment_{segment}'] = {
                 'count': len(segment_data),
@@ -406,6 +721,7 @@ class DataAnalyzer:
 
         return segments
 
+    @profiled()
     def _analyze_vip_performance(self, df: pd.DataFrame) -> Dict:
         """Compare VIP vs regular customer performance"""
         vip_customers = df[df['is_vip'] == True]
@@ -422,6 +738,7 @@ class DataAnalyzer:
             'regular_satisfaction': float(regular_customers['avg_rating_given'].mean())
         }
 
+    @profiled()
     def _generate_demand_summary(self, df: pd.DataFrame) -> Dict:
         """Generate demand analysis summary"""
         total_requests = df['request_count'].sum()
@@ -435,6 +752,7 @@ class DataAnalyzer:
             'analysis_period_days': len(df['date'].unique())
         }
 
+    @profiled()
     def _generate_performance_summary(self, df: pd.DataFrame) -> Dict:
         """Generate performance analysis summary"""
         return {
@@ -445,6 +763,7 @@ class DataAnalyzer:
             'improvement_needed': len(df[df['performance_score'] < 60])
         }
 
+    @profiled()
     def _generate_customer_summary(self, df: pd.DataFrame) -> Dict:
         """Generate customer analysis summary"""
         return {
@@ -455,6 +774,7 @@ class DataAnalyzer:
             'customer_satisfaction': float(df['avg_rating_given'].mean())
         }
 
+    @profiled()
     def _generate_revenue_summary(self, daily_totals: pd.DataFrame, df: pd.DataFrame) -> Dict:
         """Generate revenue analysis summary"""
         total_revenue = daily_totals['daily_revenue'].sum()
@@ -469,19 +789,23 @@ class DataAnalyzer:
             'analysis_period_days': len(daily_totals)
         }
 
+    @profiled()
     def _calculate_weekly_averages(self, daily_totals: pd.DataFrame) -> Dict:
         """Calculate weekly revenue averages"""
         daily_totals['week'] = pd.to_datetime(daily_totals['date']).dt.isocalendar().week
         weekly_avg = daily_totals.groupby('week')['daily_revenue'].mean()
+        # isocalendar weeks are UInt32, which json cannot use as keys
+        weekly_avg.index = weekly_avg.index.astype(int)
         
         return {
             'weekly_averages': weekly_avg.to_dict(),
             'avg_weekly_revenue': float(weekly_avg.mean())
         }
 
+    @profiled()
     def _analyze_service_revenue(self, df: pd.DataFrame) -> Dict:
         """Analyze revenue by service type"""
-        service_revenue = df.groupby('service_type').agg({
+        service_revenue = df.groupby('service_type', observed=True).agg({
             'daily_revenue': 'sum',
             'service_count': 'sum',
             'avg_service_cost': 'mean'
@@ -489,6 +813,7 @@ class DataAnalyzer:
         
         return service_revenue
 
+    @profiled()
     def _predict_revenue(self, daily_totals: pd.DataFrame) -> Dict:
         """Predict future revenue using simple moving average"""
         if len(daily_totals) < 7:
@@ -504,6 +829,7 @@ class DataAnalyzer:
             'confidence': 'medium'
         }
 
+    @profiled()
     def _identify_peak_periods(self, df: pd.DataFrame) -> Dict:
         """Identify peak revenue periods"""
         hourly_revenue = df.groupby('hour')['daily_revenue'].sum()
@@ -523,6 +849,7 @@ class DataAnalyzer:
             'off_peak_hour_revenue': float(hourly_revenue.min())
         }
 
+    @profiled()
     def _predict_customer_lifetime_value(self, df: pd.DataFrame) -> Dict:
         """Predict customer lifetime value"""
         if df.empty:
@@ -543,6 +870,7 @@ class DataAnalyzer:
             'high_value_threshold': float(df['total_spent'].quantile(0.75))
         }
 
+    @profiled()
     def _identify_at_risk_customers(self, df: pd.DataFrame, reference_date=None) -> List[Dict]:
         """Identify customers at risk of churning
         
@@ -566,7 +894,7 @@ class DataAnalyzer:
         at_risk = df[df['days_since_service'] > 90].copy()
         at_risk = at_risk.sort_values('total_spent', ascending=False)
         
-        return at_risk[['id', 'first_name', 'last_name', 'days_since_service', 'total_spent']].head(10).to_dict('records')
+        return at_risk[AT_RISK_COLUMNS].head(10).to_dict('records')
 
     # Additional helper methods would be implemented here...
 
@@ -575,24 +903,42 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='Analyze roadside assistance data')
-    parser.add_argument('--analysis', choices=['demand', 'drivers', 'customers', 'revenue'],
-                       default='demand', help='Type of analysis to perform')
-    parser.add_argument('--days', type=int, default=30, help='Number of days to analyze')
+    parser.add_argument('--analysis', choices=list(ANALYSES) + ['all'],
+                       default='demand', help='Type of analysis to perform (all: one shared pipeline)')
+    parser.add_argument('--days', type=int,
+                       help='Number of days to analyze (default: 30; --analysis all without it '
+                            'keeps each analysis on its own window, 90 days for customers and revenue)')
     parser.add_argument('--output', help='Output file for results (JSON format)')
+    parser.add_argument('--source', choices=['live', 'snapshot', 'duckdb'], default='live',
+                       help='Read from the live database, the local snapshot or the embedded DuckDB copy')
+    parser.add_argument('--stream', action='store_true',
+                       help='Fold customer and driver rows in chunks instead of loading them at once')
+    parser.add_argument('--pool-stats', action='store_true',
+                       help='Print connection pool statistics to stderr')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Recompute the analysis instead of using the result cache')
+    parser.add_argument('--cache-stats', action='store_true',
+                       help='Print result cache statistics to stderr')
+    parser.add_argument('--profile', metavar='PATH',
+                       help='Write a span tree of query, step and cache timings as JSON')
+    parser.add_argument('--profile-prometheus', metavar='PATH',
+                       help='Write the profile totals in Prometheus text format')
 
     args = parser.parse_args()
 
-    analyzer = DataAnalyzer()
+    profiler = None
+    if args.profile or args.profile_prometheus:
+        profiler = Profiler(f'analysis:{args.analysis}', source=args.source, days=args.days).start()
+
+    analyzer = DataAnalyzer(args.source, use_cache=False if args.no_cache else None,
+                            streaming=True if args.stream else None)
 
     try:
-        if args.analysis == 'demand':
-            results = analyzer.analyze_service_demand(args.days)
-        elif args.analysis == 'drivers':
-            results = analyzer.analyze_driver_performance(args.days)
-        elif args.analysis == 'customers':
-            results = analyzer.analyze_customer_behavior(args.days)
-        elif args.analysis == 'revenue':
-            results = analyzer.analyze_revenue_trends(args.days)
+        if args.analysis == 'all':
+            results = analyzer.analyze_all(args.days)
+        else:
+            method, _ = ANALYSES[args.analysis]
+            results = getattr(analyzer, method)(args.days or 30)
 
         if 'error' in results:
             print(f"Analysis failed: {results['error']}")
@@ -600,7 +946,6 @@ def main():
 
         # Output results
         if args.output:
-            import json
             with open(args.output, 'w') as f:
                 json.dump(results, f, indent=2, default=str)
             print(f"Results saved to: {args.output}")
@@ -611,6 +956,15 @@ def main():
         print(f"Analysis failed: {e}")
         return 1
 
+    finally:
+        if args.pool_stats:
+            print(json.dumps(analyzer.pool.stats(), indent=2), file=sys.stderr)
+        if args.cache_stats and analyzer.result_cache is not None:
+            print(json.dumps(analyzer.result_cache.stats(), indent=2), file=sys.stderr)
+        if profiler is not None:
+            profiler.stop()
+            profiler.save(args.profile, args.profile_prometheus)
+
     return 0
 
 if __name__ == "__main__":
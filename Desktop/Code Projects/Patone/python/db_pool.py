@@ -0,0 +1,256 @@
+"""
+Roadside Assistance Admin Platform - Database Connection Pool
+Shared, health-checked MySQL connection pool used by the analysis and reporting scripts
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from typing import Callable, Dict, Optional
+
+from python.config import DB_CONFIG, DB_POOL_CONFIG
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    def __init__(self, db_config: Optional[Dict] = None, size: Optional[int] = None,
+                 checkout_timeout: Optional[float] = None, health_check: Optional[bool] = None,
+                 max_lifetime: Optional[int] = None, connect: Optional[Callable] = None):
+        self.db_config = db_config if db_config is not None else DB_CONFIG
+        self.size = size if size is not None else DB_POOL_CONFIG['size']
+        self.checkout_timeout = (checkout_timeout if checkout_timeout is not None
+                                 else DB_POOL_CONFIG['checkout_timeout'])
+        self.health_check = health_check if health_check is not None else DB_POOL_CONFIG['health_check']
+        self.max_lifetime = max_lifetime if max_lifetime is not None else DB_POOL_CONFIG['max_lifetime']
+        self._connect = connect or self._mysql_connect
+
+        if self.size < 1:
+            raise ValueError('Pool size must be at least 1')
+
+        # LIFO keeps the most recently used (warmest) connections in rotation
+        self._idle = LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._born = {}
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'reconnects': 0,
+            'connections_opened': 0,
+            'connections_closed': 0,
+            'in_use': 0,
+            'peak_in_use': 0
+        }
+
+    def _mysql_connect(self, **config):
+        """Open a raw MySQL connection"""
+        import mysql.connector
+        return mysql.connector.connect(**config)
+
+    def _open(self):
+        """Open a new connection and record its creation time"""
+        conn = self._connect(**self.db_config)
+        self._born[id(conn)] = time.monotonic()
+        with self._lock:
+            self._stats['connections_opened'] += 1
+        return conn
+
+    def _close(self, conn):
+        """Close a connection and free its slot in the pool"""
+        self._born.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._opened -= 1
+            self._stats['connections_closed'] += 1
+
+    def _reserve_slot(self) -> bool:
+        """Reserve room for a new connection if the pool is not full"""
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return True
+            return False
+
+    def _is_expired(self, conn) -> bool:
+        """Check whether a connection has outlived max_lifetime"""
+        if not self.max_lifetime:
+            return False
+        born = self._born.get(id(conn))
+        return born is not None and time.monotonic() - born > self.max_lifetime
+
+    def _reconnect(self, conn):
+        """Replace a dead or expired connection with a fresh one, freeing its slot if that fails"""
+        self._born.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        try:
+            conn = self._connect(**self.db_config)
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+                self._stats['connections_closed'] += 1
+            raise
+        self._born[id(conn)] = time.monotonic()
+        with self._lock:
+            self._stats['reconnects'] += 1
+        return conn
+
+    def _ensure_healthy(self, conn):
+        """Ping a connection on checkout, reconnecting when it has gone away"""
+        if self._is_expired(conn):
+            return self._reconnect(conn)
+
+        if not self.health_check:
+            return conn
+
+        try:
+            if conn.is_connected():
+                return conn
+        except Exception:
+            pass
+
+        return self._reconnect(conn)
+
+    def acquire(self):
+        """Check a connection out of the pool"""
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            conn = None
+
+        if conn is None and self._reserve_slot():
+            try:
+                conn = self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        if conn is None:
+            started = time.monotonic()
+            with self._lock:
+                self._stats['waits'] += 1
+            try:
+                conn = self._idle.get(timeout=self.checkout_timeout)
+            except Empty:
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise PoolTimeoutError(
+                    f'No database connection available after {self.checkout_timeout}s '
+                    f'(pool size {self.size})'
+                )
+            finally:
+                with self._lock:
+                    self._stats['wait_time'] += time.monotonic() - started
+
+        conn = self._ensure_healthy(conn)
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool, closing it if it is broken"""
+        with self._lock:
+            self._stats['in_use'] -= 1
+
+        if not discard:
+            try:
+                # Never hand an open transaction to the next borrower
+                if getattr(conn, 'in_transaction', False):
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close(conn)
+        else:
+            self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks out a connection and always returns it
+
+        Released in a finally block, so KeyboardInterrupt and a generator
+        closed mid-query (GeneratorExit) return it too; after any exception
+        it is closed unless it is still connected.
+        """
+        conn = self.acquire()
+        failed = True
+        try:
+            yield conn
+            failed = False
+        finally:
+            self.release(conn, discard=failed and not self._still_usable(conn))
+
+    def _still_usable(self, conn) -> bool:
+        """Check whether a connection survived an error raised while it was in use"""
+        try:
+            return bool(conn.is_connected())
+        except Exception:
+            return False
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            self._close(conn)
+
+    def stats(self) -> Dict:
+        """Get pool usage statistics for sizing"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['open_connections'] = self._opened
+        stats['idle'] = self._idle.qsize()
+        stats['avg_wait_time'] = stats['wait_time'] / stats['waits'] if stats['waits'] else 0.0
+        return stats
+
+
+_shared_pool = None
+_shared_pool_pid = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide pool built from DB_CONFIG
+
+    A forked child process gets a fresh pool so it never reuses sockets
+    owned by its parent.
+    """
+    global _shared_pool, _shared_pool_pid
+
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_pid != os.getpid():
+            _shared_pool = ConnectionPool()
+            _shared_pool_pid = os.getpid()
+        return _shared_pool
+
+
+def get_backend(source: str = 'live') -> ConnectionPool:
+    """Get the pool that queries for a data source run on
+
+    'duckdb' is the embedded DuckDB copy of the tables; every other source
+    (including 'snapshot', which only connects for watermark reads) uses MySQL.
+    """
+    if source == 'duckdb':
+        from python.duckdb_backend import get_duckdb_pool
+        return get_duckdb_pool()
+    return get_pool()
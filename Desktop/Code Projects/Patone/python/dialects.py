@@ -0,0 +1,123 @@
+"""
+Roadside Assistance Admin Platform - SQL Dialects
+Rewrites the MySQL statements in queries.py for the other engines queries can
+run on, so every query keeps a single definition
+
+Only the MySQL-specific functions the queries use are rewritten, with their
+MySQL semantics preserved (TIMESTAMPDIFF truncates to whole units, DATEDIFF
+compares calendar dates). Translations are cached per statement.
+"""
+
+import functools
+import re
+from typing import Callable, Dict, List
+
+MYSQL = 'mysql'
+DUCKDB = 'duckdb'
+
+# Microseconds per TIMESTAMPDIFF unit
+_UNIT_MICROSECONDS = {
+    'MICROSECOND': 1,
+    'SECOND': 1_000_000,
+    'MINUTE': 60_000_000,
+    'HOUR': 3_600_000_000,
+    'DAY': 86_400_000_000,
+    'WEEK': 604_800_000_000
+}
+
+
+def dialect_of(conn) -> str:
+    """Get the dialect a connection (or cursor) expects, MySQL unless it says otherwise"""
+    return getattr(conn, 'dialect', MYSQL)
+
+
+def _split_args(text: str) -> List[str]:
+    """Split a function's argument list on top-level commas"""
+    args, depth, quote, current = [], 0, None, []
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            args.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    args.append(''.join(current).strip())
+    return args
+
+
+def _rewrite_calls(sql: str, name: str, rewrite: Callable[[List[str]], str]) -> str:
+    """Replace every call of a SQL function, innermost arguments first"""
+    pattern = re.compile(r'\b' + name + r'\s*\(', re.IGNORECASE)
+    result, position = [], 0
+    while True:
+        match = pattern.search(sql, position)
+        if match is None:
+            result.append(sql[position:])
+            return ''.join(result)
+
+        depth, end = 1, match.end()
+        while depth:
+            if end >= len(sql):
+                raise ValueError(f"Unbalanced parentheses in {name} call")
+            depth += {'(': 1, ')': -1}.get(sql[end], 0)
+            end += 1
+
+        inner = _rewrite_calls(sql[match.end():end - 1], name, rewrite)
+        result.append(sql[position:match.start()])
+        result.append(rewrite(_split_args(inner) if inner.strip() else []))
+        position = end
+
+
+def _duckdb_timestampdiff(args: List[str]) -> str:
+    unit, start, end = args
+    microseconds = _UNIT_MICROSECONDS[unit.upper()]
+    return f"CAST(trunc(date_diff('microsecond', {start}, {end}) / {microseconds}) AS BIGINT)"
+
+
+def _duckdb_interval(sign: str) -> Callable[[List[str]], str]:
+    def rewrite(args: List[str]) -> str:
+        value, interval = args
+        return f"({value} {sign} {interval})"
+    return rewrite
+
+
+_DUCKDB_FUNCTIONS = [
+    ('TIMESTAMPDIFF', _duckdb_timestampdiff),
+    ('DATEDIFF', lambda args: f"date_diff('day', CAST({args[1]} AS DATE), CAST({args[0]} AS DATE))"),
+    ('DATE_SUB', _duckdb_interval('-')),
+    ('DATE_ADD', _duckdb_interval('+')),
+    ('CONVERT_TZ', lambda args: f"timezone({args[2]}, timezone({args[1]}, {args[0]}))"),
+    ('NOW', lambda args: "current_localtimestamp()"),
+    ('CURDATE', lambda args: "current_date"),
+    ('DATE', lambda args: f"CAST({args[0]} AS DATE)"),
+    ('HOUR', lambda args: f"hour({args[0]})"),
+]
+
+
+def _to_duckdb(sql: str) -> str:
+    for name, rewrite in _DUCKDB_FUNCTIONS:
+        sql = _rewrite_calls(sql, name, rewrite)
+    # DuckDB takes qmark placeholders; the queries have no literal % signs
+    return sql.replace('%s', '?')
+
+
+DIALECTS: Dict[str, Callable[[str], str]] = {
+    MYSQL: lambda sql: sql,
+    DUCKDB: _to_duckdb
+}
+
+
+@functools.lru_cache(maxsize=512)
+def translate(sql: str, dialect: str = MYSQL) -> str:
+    """Rewrite a MySQL statement for a dialect"""
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown SQL dialect {dialect}")
+    return DIALECTS[dialect](sql)
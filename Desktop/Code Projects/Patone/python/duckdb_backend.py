@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - DuckDB Backend
+An embedded, columnar copy of the source tables that the analyzers and
+reports can query with source='duckdb' instead of the MySQL server
+
+The database file is built from local exports (the Arrow snapshot, or any
+frames) and opened read-only. Connections come from the same ConnectionPool
+the MySQL path uses, so the report generator's concurrent fetches and the
+analysis pipeline work unchanged; each pooled connection is a cursor on one
+shared in-process database. Statements are translated from MySQL by
+dialects.py, and aggregations run on DuckDB's vectorized engine. frames.py
+runs the same statements on the snapshot's frames through open_frames.
+"""
+
+import os
+import sys
+import threading
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import DUCKDB_CONFIG
+from python.db_pool import ConnectionPool
+from python.dialects import DUCKDB
+
+# Tables are stored in this order so range filters skip row groups using
+# DuckDB's per-row-group min/max statistics
+SORT_KEYS = {
+    'service_requests': 'created_at, id',
+    'customers': 'id',
+    'drivers': 'id',
+    'service_types': 'id'
+}
+
+
+def _require_duckdb():
+    """Import duckdb, which is only needed for the embedded backend"""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("The DuckDB backend requires duckdb (pip install duckdb)") from e
+    return duckdb
+
+
+class DuckDBCursor:
+    """DB-API style cursor over a DuckDB connection, with the mysql.connector
+    options the report code uses (dictionary rows)"""
+
+    dialect = DUCKDB
+
+    def __init__(self, conn, dictionary: bool = False):
+        self._conn = conn
+        self.dictionary = dictionary
+        self.description = None
+        self._columns: List[str] = []
+
+    def execute(self, sql: str, params=()):
+        self._conn.execute(sql, list(params))
+        self.description = self._conn.description
+        self._columns = [column[0] for column in self.description or []]
+
+    def _rows(self, rows):
+        if not self.dictionary:
+            return rows
+        return [dict(zip(self._columns, row)) for row in rows]
+
+    def fetchone(self):
+        row = self._conn.fetchone()
+        return None if row is None else self._rows([row])[0]
+
+    def fetchmany(self, size: int = 1):
+        return self._rows(self._conn.fetchmany(size))
+
+    def fetchall(self):
+        return self._rows(self._conn.fetchall())
+
+    def close(self):
+        self.description = None
+
+
+class DuckDBConnection:
+    """A pooled connection: one DuckDB cursor, safe to use from one thread at a time"""
+
+    dialect = DUCKDB
+    in_transaction = False
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._closed = False
+
+    def cursor(self, dictionary: bool = False, buffered: bool = True) -> DuckDBCursor:
+        """Get a cursor; buffered is accepted for mysql.connector compatibility"""
+        return DuckDBCursor(self._conn, dictionary)
+
+    def read_frame(self, sql: str, params=()) -> pd.DataFrame:
+        """Run a statement and fetch its result straight into a DataFrame
+
+        Dates and timestamps come back as nanosecond datetime columns, the
+        same as frames computed from the snapshot.
+        """
+        df = self._conn.execute(sql, list(params)).df()
+        for column in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]) and df[column].dtype != 'datetime64[ns]':
+                df[column] = df[column].astype('datetime64[ns]')
+        return df
+
+    def is_connected(self) -> bool:
+        return not self._closed
+
+    def close(self):
+        self._closed = True
+        with suppress(Exception):
+            self._conn.close()
+
+
+def _engine_config() -> Dict:
+    """DuckDB settings from DUCKDB_CONFIG"""
+    config = {}
+    if DUCKDB_CONFIG['threads']:
+        config['threads'] = DUCKDB_CONFIG['threads']
+    if DUCKDB_CONFIG['memory_limit']:
+        config['memory_limit'] = DUCKDB_CONFIG['memory_limit']
+    return config
+
+
+def open_database(path: Optional[str] = None):
+    """Open the DuckDB database file read-only"""
+    duckdb = _require_duckdb()
+    path = path or DUCKDB_CONFIG['path']
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No DuckDB database at {path}; run duckdb_backend.py --load first")
+    return duckdb.connect(path, read_only=True, config=_engine_config())
+
+
+def open_frames(tables: Dict[str, pd.DataFrame]) -> DuckDBConnection:
+    """Open an in-process database whose tables are the given frames, scanned in place"""
+    conn = _require_duckdb().connect(config=_engine_config())
+    for name, df in tables.items():
+        conn.register(name, df)
+    return DuckDBConnection(conn)
+
+
+def create_pool(path: Optional[str] = None, size: Optional[int] = None) -> ConnectionPool:
+    """Build a connection pool over a DuckDB database file"""
+    database = open_database(path)
+    return ConnectionPool(
+        db_config={}, size=size or DUCKDB_CONFIG['connections'], health_check=False, max_lifetime=0,
+        connect=lambda **config: DuckDBConnection(database.cursor())
+    )
+
+
+def load_tables(tables: Dict[str, pd.DataFrame], path: Optional[str] = None) -> Dict[str, int]:
+    """Build the database file from frames, replacing any previous copy atomically"""
+    duckdb = _require_duckdb()
+    path = path or DUCKDB_CONFIG['path']
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    tmp_path = path + '.tmp'
+    with suppress(FileNotFoundError):
+        os.remove(tmp_path)
+
+    counts = {}
+    conn = duckdb.connect(tmp_path)
+    try:
+        for name, df in tables.items():
+            conn.register('source_frame', df)
+            order = SORT_KEYS.get(name, 'id')
+            conn.execute(f"CREATE TABLE {name} AS SELECT * FROM source_frame ORDER BY {order}")
+            conn.unregister('source_frame')
+            counts[name] = len(df)
+        conn.execute('CHECKPOINT')
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    return counts
+
+
+def load_snapshot(path: Optional[str] = None, snapshot=None) -> Dict[str, int]:
+    """Build the database file from the local Arrow snapshot of the source tables"""
+    from python.snapshot import SNAPSHOT_TABLES, get_snapshot
+
+    snapshot = snapshot or get_snapshot()
+    return load_tables({name: snapshot.table(name) for name in SNAPSHOT_TABLES}, path)
+
+
+_shared_pool = None
+_shared_pool_pid = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_duckdb_pool() -> ConnectionPool:
+    """Get the process-wide pool over the configured DuckDB database"""
+    global _shared_pool, _shared_pool_pid
+
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_pid != os.getpid():
+            _shared_pool = create_pool()
+            _shared_pool_pid = os.getpid()
+        return _shared_pool
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the embedded DuckDB copy of the source tables')
+    parser.add_argument('--load', action='store_true',
+                       help='Rebuild the database from the local snapshot (run snapshot.py first)')
+    parser.add_argument('--path', help='Database file (default: DUCKDB_PATH)')
+
+    args = parser.parse_args()
+
+    if not args.load:
+        parser.print_help()
+        return 1
+
+    try:
+        counts = load_snapshot(args.path)
+    except Exception as e:
+        print(f"DuckDB load failed: {e}")
+        return 1
+
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+    print(f"DuckDB database written to: {args.path or DUCKDB_CONFIG['path']}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
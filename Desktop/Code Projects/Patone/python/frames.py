@@ -0,0 +1,61 @@
+"""
+Roadside Assistance Admin Platform - Frames
+Runs the queries in queries.py over raw table frames (for example the local
+analytical snapshot) instead of MySQL
+
+The frames a query reads are registered with an in-process DuckDB database,
+which scans them in place, and the query's own SQL runs there through the
+DuckDB dialect. Results come from the same single definition as on MySQL, so
+callers can switch data sources without changing any downstream analysis.
+"""
+
+import re
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from python.config import TIMEZONE_CONFIG
+from python.dialects import DUCKDB
+from python.duckdb_backend import open_frames
+from python.query_builder import QUERY_REGISTRY
+
+_TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)', re.IGNORECASE)
+
+
+def source_tables(query) -> List[str]:
+    """Names of the tables a query's SQL reads"""
+    return sorted(set(_TABLE_REFERENCE.findall(query.sql)))
+
+
+def build_frame(query, tables, **params) -> pd.DataFrame:
+    """Run a registered query over a table source such as a Snapshot"""
+    if QUERY_REGISTRY.get(query.name) is not query:
+        raise ValueError(f"Unknown query {query.name}")
+
+    conn = open_frames({name: tables.table(name) for name in source_tables(query)})
+    try:
+        return conn.read_frame(*query.statement(DUCKDB, **params))
+    finally:
+        conn.close()
+
+
+def records(df: pd.DataFrame) -> List[Dict]:
+    """Convert a frame into cursor-style dict rows with None for missing values"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def local_times(values: pd.Series) -> pd.Series:
+    """Shift database timestamps into the report time zone, like query_builder.local_date
+
+    Handles the DST edges the way MySQL's CONVERT_TZ does: a repeated
+    fall-back time takes its first (daylight) offset and a time inside the
+    spring-forward gap moves to the end of the gap.
+    """
+    report_name = TIMEZONE_CONFIG['report_timezone']
+    database_name = TIMEZONE_CONFIG['database_timezone']
+    if not report_name or not database_name or report_name == database_name:
+        return values
+    localized = values.dt.tz_localize(database_name, ambiguous=np.ones(len(values), dtype=bool),
+                                      nonexistent='shift_forward')
+    return localized.dt.tz_convert(report_name).dt.tz_localize(None)
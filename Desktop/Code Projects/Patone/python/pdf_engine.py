@@ -0,0 +1,268 @@
+"""
+Roadside Assistance Admin Platform - PDF Engine
+Shared rendering for the PDF reports: paragraph and table styles built once
+per process, a page template with the company footer and page numbers, and
+long tables built in page-sized pieces from row iterators
+
+Documents are laid out incrementally, pulling flowables from a generator as
+pages fill, so a report with tens of thousands of table rows holds a few
+table pieces in memory at a time instead of the whole story. Finished pages
+are kept as compressed PDF streams until the file is saved.
+"""
+
+import functools
+import time
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch, mm
+from reportlab.platypus import (
+    BaseDocTemplate, Frame, Image, PageBreak, PageTemplate, Paragraph, Spacer, Table, TableStyle
+)
+
+from python.config import REPORT_CONFIG
+from python.profiling import span
+
+MARGIN = 20 * mm
+
+# Flowables laid out ahead of the one being placed; enough for a section
+# heading to stay with the table after it
+LOOKAHEAD = 8
+
+
+@functools.lru_cache(maxsize=None)
+def styles() -> Dict[str, ParagraphStyle]:
+    """Paragraph styles shared by every report"""
+    sample = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=1  # Center
+        ),
+        'section': ParagraphStyle(
+            'SectionTitle',
+            parent=sample['Heading2'],
+            fontSize=16,
+            spaceAfter=12,
+            textColor=colors.darkblue
+        ),
+        'normal': sample['Normal'],
+        'note': ParagraphStyle('Note', parent=sample['Normal'], fontSize=8, textColor=colors.grey)
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def table_style(kind: str = 'summary') -> TableStyle:
+    """Table styles shared by every report
+
+    'summary' is the boxed style of the short metric tables; 'listing' is a
+    compact striped style for long tables of records.
+    """
+    if kind == 'summary':
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    if kind == 'listing':
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.beige]),
+            ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+            ('BOX', (0, 0), (-1, -1), 0.5, colors.black)
+        ])
+    raise ValueError(f"Unknown table style {kind}")
+
+
+def _draw_footer(canvas, doc):
+    """Company name and page number at the foot of every page"""
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawString(MARGIN, MARGIN / 2, REPORT_CONFIG['company_name'])
+    canvas.drawRightString(A4[0] - MARGIN, MARGIN / 2, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+class _StreamingDocTemplate(BaseDocTemplate):
+    """BaseDocTemplate whose story is topped up from an iterator while it is laid out
+
+    The public filterFlowables and afterFlowable hooks refill the story list
+    before and after each flowable is handled, so BaseDocTemplate.build
+    itself drives the layout.
+    """
+
+    def stream(self, flowables: Iterable):
+        """Build the document from an iterator of flowables"""
+        self._source = iter(flowables)
+        self._story = []
+        self.story_seconds, self.flowables_built = 0.0, 0
+        self._top_up()
+        self.build(self._story)
+
+    def _top_up(self):
+        missing = LOOKAHEAD - len(self._story)
+        if missing <= 0:
+            return
+        started = time.perf_counter()
+        produced = list(islice(self._source, missing))
+        self.story_seconds += time.perf_counter() - started
+        self.flowables_built += len(produced)
+        self._story.extend(produced)
+
+    def filterFlowables(self, flowables):
+        self._top_up()
+
+    def afterFlowable(self, flowable):
+        self._top_up()
+
+
+class ReportDocument:
+    def __init__(self, filepath: str, title: str):
+        self.filepath = filepath
+        self.title = title
+        self.doc = _StreamingDocTemplate(
+            filepath, pagesize=A4, title=title, author=REPORT_CONFIG['company_name'],
+            leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN
+        )
+        frame = Frame(self.doc.leftMargin, self.doc.bottomMargin, self.doc.width, self.doc.height,
+                      id='body')
+        self.doc.addPageTemplates([PageTemplate(id='report', frames=[frame], onPage=_draw_footer)])
+
+    @property
+    def pages(self) -> int:
+        """Pages started so far"""
+        return getattr(self.doc, 'page', 0)
+
+    def build(self, flowables: Iterable):
+        """Lay out flowables as they are produced and save the PDF
+
+        Only LOOKAHEAD flowables (plus the split remainder of a table
+        crossing a page) are held at once.
+        """
+        # The story is produced while pages are laid out; in a profile the
+        # layout span (which also covers saving the file) has story_seconds
+        # for the part spent producing flowables
+        with span('layout', 'pdf') as layout_span:
+            self.doc.stream(flowables)
+            layout_span.set(story_seconds=round(self.doc.story_seconds, 6),
+                            flowables=self.doc.flowables_built, pages=self.pages)
+
+
+def title_block(title: str) -> List:
+    """Report title followed by the company name, address and contacts"""
+    config = REPORT_CONFIG
+    normal = styles()['normal']
+    return [
+        Paragraph(escape(title), styles()['title']),
+        Spacer(1, 12),
+        Paragraph(f"<b>{config['company_name']}</b>", normal),
+        Paragraph(config['company_address'], normal),
+        Paragraph(f"Phone: {config['company_phone']} | Email: {config['company_email']}", normal),
+        Spacer(1, 20)
+    ]
+
+
+def section(title: str) -> Paragraph:
+    """A section heading"""
+    return Paragraph(title, styles()['section'])
+
+
+def note(text: str) -> Paragraph:
+    """A small grey line of explanatory text"""
+    return Paragraph(text, styles()['note'])
+
+
+def spacer(height: int = 20) -> Spacer:
+    """Vertical space between sections"""
+    return Spacer(1, height)
+
+
+def image(path: str, width: float, height: float) -> Image:
+    """An image file (such as a cached chart) drawn at a size in inches"""
+    return Image(path, width=width * inch, height=height * inch)
+
+
+def page_break() -> PageBreak:
+    """Start the next flowable on a new page"""
+    return PageBreak()
+
+
+def table(rows: List[List], widths: Optional[Sequence] = None, style: str = 'summary') -> Table:
+    """A table whose first row is a header, repeated if the table crosses a page"""
+    result = Table(rows, colWidths=widths, repeatRows=1)
+    result.setStyle(table_style(style))
+    return result
+
+
+def table_chunks(header: Sequence[str], rows: Iterable[Sequence], widths: Optional[Sequence] = None,
+                 chunk_rows: Optional[int] = None, style: str = 'listing',
+                 empty: str = 'No records.') -> Iterator:
+    """Build a long table as page-sized pieces from a row iterator
+
+    Each piece repeats the header, so the pieces read as one table while
+    only `chunk_rows` rows (REPORT_CONFIG['table_chunk_rows']) exist as
+    table cells at a time. An empty iterator yields the `empty` note.
+    """
+    chunk_rows = chunk_rows or REPORT_CONFIG['table_chunk_rows']
+    rows = iter(rows)
+    produced = False
+    while True:
+        chunk = [list(row) for row in islice(rows, chunk_rows)]
+        if not chunk:
+            break
+        produced = True
+        yield table([list(header)] + chunk, widths=widths, style=style)
+    if not produced:
+        yield note(empty)
+
+
+# ============================================
+# Cell formatting
+# ============================================
+
+def text(value, default: str = '-') -> str:
+    """A cell value as text, with a placeholder for NULL"""
+    return default if value is None else str(value)
+
+
+def money(value) -> str:
+    """A currency amount, NULL as $0.00"""
+    return f"${float(value or 0):.2f}"
+
+
+def day(value) -> str:
+    """A date or timestamp as YYYY-MM-DD"""
+    if value is None:
+        return '-'
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+def timestamp(value) -> str:
+    """A timestamp to the minute"""
+    if value is None:
+        return '-'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    return str(value)[:16]
@@ -0,0 +1,109 @@
+"""
+Roadside Assistance Admin Platform - Analysis Pipeline
+A small dependency graph of extraction and derivation steps run on a thread
+pool: a step starts as soon as the steps it depends on have finished, so
+shared intermediates are computed once and independent steps overlap.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from python.config import PIPELINE_CONFIG
+from python.profiling import current_span, span
+
+
+class Pipeline:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or PIPELINE_CONFIG['max_workers']
+        self.steps = OrderedDict()
+
+    def add(self, name: str, func: Callable, deps: Sequence[str] = (), kind: str = 'derive') -> str:
+        """Add a step called with the results of its dependencies, in order
+
+        Dependencies must already be in the pipeline, which keeps the graph
+        acyclic.
+        """
+        if name in self.steps:
+            raise ValueError(f"Duplicate pipeline step {name}")
+        for dep in deps:
+            if dep not in self.steps:
+                raise ValueError(f"Step {name} depends on unknown step {dep}")
+        self.steps[name] = {'func': func, 'deps': list(deps), 'kind': kind}
+        return name
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.steps
+
+    def run(self) -> Dict:
+        """Run every step, returning results, errors and per-stage timings
+
+        A failing step does not stop the others; steps that depend on it are
+        skipped and reported as such.
+        """
+        results = {}
+        errors = {}
+        stages = {}
+        lock = threading.Lock()
+        run_started = time.perf_counter()
+        # Steps run on pool threads but belong under the caller's span in a profile
+        parent = current_span()
+
+        def execute(name: str) -> Any:
+            step = self.steps[name]
+            started = time.perf_counter()
+            try:
+                with span(name, 'stage', parent=parent):
+                    return step['func'](*[results[dep] for dep in step['deps']])
+            finally:
+                with lock:
+                    stages[name] = {
+                        'started': started - run_started,
+                        'duration': time.perf_counter() - started,
+                        'thread': threading.current_thread().name
+                    }
+
+        remaining = OrderedDict(self.steps)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline') as executor:
+            while remaining or running:
+                for name, step in list(remaining.items()):
+                    failed = [dep for dep in step['deps'] if dep in errors]
+                    if failed:
+                        errors[name] = f"Skipped: {failed[0]} failed"
+                        del remaining[name]
+                    elif all(dep in results for dep in step['deps']):
+                        running[executor.submit(execute, name)] = name
+                        del remaining[name]
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        errors[name] = str(e)
+
+        timings = []
+        for name, step in self.steps.items():
+            stage = {'name': name, 'kind': step['kind'], 'deps': step['deps']}
+            stage['status'] = 'failed' if name in errors else 'ok'
+            if name in stages:
+                stage.update(stages[name])
+            else:
+                stage['status'] = 'skipped'
+            if name in errors:
+                stage['error'] = errors[name]
+            timings.append(stage)
+
+        return {
+            'results': results,
+            'errors': errors,
+            'stages': timings,
+            'wall_time': time.perf_counter() - run_started
+        }
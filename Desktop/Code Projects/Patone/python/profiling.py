@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Profiling
+A span tree of where an analysis or report run spends its time: every query
+(with the rows and bytes it fetched), derivation step, chart and PDF build
+step, written as a JSON trace or in the Prometheus text format
+
+Nothing is recorded unless a Profiler is active (the --profile flags of the
+analyzer and report CLIs); until then span() and @profiled cost a global
+lookup. Spans nest per thread, and work handed to a thread pool names its
+parent span explicitly so the tree still follows the call structure.
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import PROFILING_CONFIG
+
+
+def _value_bytes(value) -> int:
+    """Approximate in-memory size of one fetched value"""
+    return sys.getsizeof(value) if value is not None else 0
+
+
+class Span:
+    """One timed unit of work, with counters and child spans"""
+
+    def __init__(self, name: str, kind: str, parent: Optional['Span'] = None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.attributes = attributes
+        self.children: List['Span'] = []
+        self.thread = threading.current_thread().name
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def set(self, **attributes):
+        """Set attributes of the span"""
+        self.attributes.update(attributes)
+
+    def add(self, **counts):
+        """Add to numeric attributes of the span (rows, bytes, ...)"""
+        for key, value in counts.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def add_frame(self, df):
+        """Count the rows and in-memory bytes of a fetched DataFrame"""
+        self.add(rows=len(df), bytes=int(df.memory_usage(deep=True, index=False).sum()))
+
+    def add_rows(self, rows: List):
+        """Count fetched rows (dicts or tuples) and the approximate bytes of their values"""
+        size = 0
+        for row in rows:
+            size += sum(_value_bytes(v) for v in (row.values() if isinstance(row, dict) else row))
+        self.add(rows=len(rows), bytes=size)
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.started
+
+    def to_dict(self, origin: float) -> Dict:
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.started
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'start': round(self.started - origin, 6),
+            'duration': round(duration, 6),
+            'thread': self.thread,
+            'attributes': self.attributes,
+            'children': [child.to_dict(origin) for child in self.children]
+        }
+
+
+class _DisabledSpan:
+    """Stands in for a span when profiling is off; every call is a no-op"""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, **counts):
+        pass
+
+    def add_frame(self, df):
+        pass
+
+    def add_rows(self, rows):
+        pass
+
+
+_DISABLED = _DisabledSpan()
+_DISABLED_CONTEXT = nullcontext(_DISABLED)
+
+# The profiler recording this process's spans, if any
+_active: Optional['Profiler'] = None
+
+
+class Profiler:
+    def __init__(self, name: str = 'run', **attributes):
+        self.root = Span(name, 'run', **attributes)
+        self.started_at = datetime.now().isoformat()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def current(self) -> Span:
+        """The innermost open span of the calling thread, the root if none"""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else self.root
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'step', parent: Optional[Span] = None,
+             activate: bool = True, **attributes) -> Iterator[Span]:
+        """Time a block as a child of `parent` (default: the current span)
+
+        With activate=False the span is not made current, for generators
+        whose consumers run between yields.
+        """
+        span = Span(name, kind, parent or self.current(), **attributes)
+        with self._lock:
+            span.parent.children.append(span)
+
+        stack = None
+        if activate:
+            stack = self._local.__dict__.setdefault('stack', [])
+            stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.finish()
+            if stack is not None:
+                stack.pop()
+
+    def record(self, name: str, kind: str, duration: float, **attributes) -> Span:
+        """Add a finished span timed elsewhere (e.g. in a worker process)"""
+        span = Span(name, kind, self.current(), **attributes)
+        span.started -= duration
+        span.duration = duration
+        with self._lock:
+            span.parent.children.append(span)
+        return span
+
+    def start(self) -> 'Profiler':
+        """Make this the process's active profiler"""
+        global _active
+        _active = self
+        return self
+
+    def stop(self):
+        """Stop recording and close the root span"""
+        global _active
+        if _active is self:
+            _active = None
+        self.root.finish()
+
+    def __enter__(self) -> 'Profiler':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def to_dict(self) -> Dict:
+        """The trace: run metadata and the span tree, times in seconds from the run start"""
+        return {
+            'name': self.root.name,
+            'started_at': self.started_at,
+            'pid': os.getpid(),
+            'wall_time': round(self.root.duration or time.perf_counter() - self.root.started, 6),
+            'root': self.root.to_dict(self.root.started)
+        }
+
+    def save(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+        """Write the trace as JSON and/or its metrics in Prometheus text format"""
+        trace = self.to_dict()
+        if json_path:
+            with open(json_path, 'w') as f:
+                json.dump(trace, f, indent=2, default=str)
+            print(f"Profile written to: {json_path}", file=sys.stderr)
+        if prometheus_path:
+            # Written whole then renamed, so a scraper never reads half a file
+            tmp_path = f"{prometheus_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(to_prometheus(trace))
+            os.replace(tmp_path, prometheus_path)
+            print(f"Profile metrics written to: {prometheus_path}", file=sys.stderr)
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Get the active profiler, None when profiling is off"""
+    return _active
+
+
+def current_span() -> Optional[Span]:
+    """The calling thread's current span, to pass as the parent of work run on other threads"""
+    return _active.current() if _active is not None else None
+
+
+def span(name: str, kind: str = 'step', parent: Optional[Span] = None, activate: bool = True,
+         **attributes):
+    """Time a block as a span of the active profiler (a no-op when profiling is off)"""
+    if _active is None:
+        return _DISABLED_CONTEXT
+    return _active.span(name, kind, parent, activate, **attributes)
+
+
+def record_span(name: str, kind: str, duration: float, **attributes):
+    """Add a span timed elsewhere to the active profiler, if any"""
+    if _active is not None:
+        _active.record(name, kind, duration, **attributes)
+
+
+def profiled(name: Optional[str] = None, kind: str = 'step'):
+    """Record every call of a function as a span named after it"""
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.span(label, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def traced_chunks(name: str, chunks: Iterable, kind: str = 'query', **attributes) -> Iterator:
+    """Pass chunks (DataFrames) through, recording them as one query span
+
+    The span's duration covers the whole stream, consumer included;
+    fetch_seconds is the time spent waiting on the source itself.
+    """
+    if _active is None:
+        yield from chunks
+        return
+
+    with _active.span(name, kind, activate=False, **attributes) as query_span:
+        query_span.set(fetch_seconds=0.0, chunks=0)
+        iterator = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                query_span.add(fetch_seconds=time.perf_counter() - started)
+                return
+            query_span.add(fetch_seconds=time.perf_counter() - started, chunks=1)
+            query_span.add_frame(chunk)
+            yield chunk
+
+
+def _walk(span: Dict) -> Iterator[Dict]:
+    yield span
+    for child in span['children']:
+        yield from _walk(child)
+
+
+def _label(value) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(trace: Dict, prefix: Optional[str] = None) -> str:
+    """Render a trace's totals per span kind and name in the Prometheus text format
+
+    Calls and seconds are kept for every span; rows and bytes for spans that
+    fetched data. Every series carries the run name as its `run` label.
+    """
+    prefix = re.sub(r'[^a-zA-Z0-9_]', '_', prefix or PROFILING_CONFIG['metric_prefix'])
+    totals = {}
+    for node in _walk(trace['root']):
+        if node['kind'] == 'run':
+            continue
+        total = totals.setdefault((node['kind'], node['name']), {'calls': 0, 'seconds': 0.0})
+        total['calls'] += 1
+        total['seconds'] += node['duration']
+        total['errors'] = total.get('errors', 0) + ('error' in node['attributes'])
+        for key in ('rows', 'bytes'):
+            if key in node['attributes']:
+                total[key] = total.get(key, 0) + node['attributes'][key]
+
+    metrics = [
+        ('span_calls_total', 'counter', 'Spans recorded, by kind and name', 'calls'),
+        ('span_seconds_total', 'counter', 'Wall time spent in spans, by kind and name', 'seconds'),
+        ('span_errors_total', 'counter', 'Spans that raised, by kind and name', 'errors'),
+        ('span_rows_total', 'counter', 'Rows fetched by spans, by kind and name', 'rows'),
+        ('span_bytes_total', 'counter', 'Approximate in-memory bytes fetched by spans, by kind and name', 'bytes')
+    ]
+    run = _label(trace['name'])
+    lines = [
+        f"# HELP {prefix}_run_seconds Wall time of the profiled run",
+        f"# TYPE {prefix}_run_seconds gauge",
+        f'{prefix}_run_seconds{{run="{run}"}} {trace["wall_time"]}'
+    ]
+    for metric, metric_type, help_text, key in metrics:
+        series = [(labels, total[key]) for labels, total in sorted(totals.items()) if key in total]
+        if not series:
+            continue
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {metric_type}")
+        for (kind, name), value in series:
+            value = round(value, 6) if isinstance(value, float) else value
+            lines.append(f'{prefix}_{metric}{{run="{run}",kind="{_label(kind)}",name="{_label(name)}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert a --profile JSON trace to Prometheus text format')
+    parser.add_argument('trace', help='Trace written by --profile')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('--prefix', help='Metric name prefix (default: PROFILE_METRIC_PREFIX)')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.trace) as f:
+            text = to_prometheus(json.load(f), args.prefix)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read trace: {e}")
+        return 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,356 @@
+"""
+Roadside Assistance Admin Platform - Analysis and Report Queries
+SQL used by DataAnalyzer and ReportGenerator
+
+Date filters are written as half-open ranges on the raw column
+(`created_at >= %s AND created_at < %s`) so MySQL can use idx_created;
+never wrap a filtered column in DATE() or another function.
+"""
+
+from python.query_builder import Query, local_date, local_hour
+
+# ============================================
+# Data Analyzer
+# ============================================
+
+SERVICE_DEMAND = Query('service_demand', f"""
+    SELECT {local_date('created_at')} as date,
+           {local_hour('created_at')} as hour,
+           service_type_id,
+           COUNT(*) as request_count,
+           AVG(TIMESTAMPDIFF(MINUTE, created_at, assigned_at)) as avg_response_time
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+    GROUP BY date, hour, service_type_id
+    ORDER BY date, hour
+""", params=['period'], index='idx_created')
+
+DRIVER_PERFORMANCE = Query('driver_performance', """
+    SELECT d.id, d.first_name, d.last_name,
+           COUNT(sr.id) as total_services,
+           SUM(sr.actual_cost) as total_revenue,
+           AVG(sr.actual_cost) as avg_service_cost,
+           AVG(TIMESTAMPDIFF(MINUTE, sr.created_at, sr.completed_at)) as avg_completion_time,
+           AVG(sr.customer_rating) as avg_rating,
+           COUNT(CASE WHEN sr.status = 'completed' THEN 1 END) as completed_services,
+           COUNT(CASE WHEN sr.status = 'cancelled' THEN 1 END) as cancelled_services
+    FROM drivers d
+    LEFT JOIN service_requests sr ON d.id = sr.driver_id
+           AND sr.created_at >= %s AND sr.created_at < %s
+    GROUP BY d.id, d.first_name, d.last_name
+    ORDER BY total_services DESC
+""", params=['period'], index='idx_driver')
+
+CUSTOMER_BEHAVIOR = Query('customer_behavior', """
+    SELECT c.id, c.first_name, c.last_name, c.is_vip,
+           COUNT(sr.id) as total_services,
+           SUM(sr.actual_cost) as total_spent,
+           AVG(sr.actual_cost) as avg_service_cost,
+           MAX(sr.created_at) as last_service_date,
+           AVG(sr.customer_rating) as avg_rating_given,
+           DATEDIFF(NOW(), MIN(sr.created_at)) as days_since_first_service
+    FROM customers c
+    LEFT JOIN service_requests sr ON c.id = sr.customer_id
+           AND sr.created_at >= %s AND sr.created_at < %s
+           AND sr.status = 'completed'
+    GROUP BY c.id, c.first_name, c.last_name, c.is_vip
+    HAVING total_services > 0
+""", params=['period'], index='idx_customer')
+
+REVENUE_TRENDS = Query('revenue_trends', f"""
+    SELECT {local_date('sr.created_at')} as date,
+           {local_hour('sr.created_at')} as hour,
+           st.name as service_type,
+           SUM(sr.actual_cost) as daily_revenue,
+           COUNT(*) as service_count,
+           AVG(sr.actual_cost) as avg_service_cost
+    FROM service_requests sr
+    JOIN service_types st ON sr.service_type_id = st.id
+    WHERE sr.created_at >= %s AND sr.created_at < %s
+          AND sr.status = 'completed'
+          AND sr.actual_cost IS NOT NULL
+    GROUP BY date, hour, st.name
+    ORDER BY date, hour
+""", params=['period'], index='idx_created')
+
+# Last change and highest id of one source table; the result cache keys on
+# these. Both are read from the end of an index (idx_updated, the primary key)
+# without touching any rows. Each table is read separately so a lookup only
+# touches the tables its analysis declares.
+def _table_watermark(table: str, last_updated: str = 'MAX(updated_at)', index: str = 'idx_updated') -> Query:
+    return Query(f'{table}_watermark', f"""
+    SELECT '{table}' as table_name, {last_updated} as last_updated, MAX(id) as last_id
+    FROM {table}
+""", index=index)
+
+
+TABLE_WATERMARKS = {
+    'service_requests': _table_watermark('service_requests'),
+    'customers': _table_watermark('customers'),
+    # drivers.updated_at moves with every location and status ping, so only new
+    # drivers are watermarked; renamed drivers show once requests change
+    'drivers': _table_watermark('drivers', last_updated='CAST(NULL AS DATETIME)', index=None),
+    'service_types': _table_watermark('service_types')
+}
+
+# Deletes move neither value above, so the watermark also carries each table's
+# row count. COUNT(*) reads a whole index, so DataAnalyzer reruns it at most
+# every RESULT_CACHE_ROW_COUNT_INTERVAL seconds instead of on every lookup.
+TABLE_ROW_COUNTS = {
+    table: Query(f'{table}_row_count', f"""
+    SELECT COUNT(*) as row_count FROM {table}
+""")
+    for table in TABLE_WATERMARKS
+}
+
+# ============================================
+# Hourly Rollups
+# ============================================
+
+# Buckets are database-time hours; rollups.py shifts them into the report
+# time zone when it reads them, so changing REPORT_TIMEZONE needs no rebuild.
+HOURLY_ROLLUP = Query('hourly_rollup', """
+    SELECT DATE(created_at) as day,
+           HOUR(created_at) as hour,
+           service_type_id,
+           COUNT(*) as request_count,
+           SUM(TIMESTAMPDIFF(MINUTE, created_at, assigned_at)) as response_time_sum,
+           COUNT(assigned_at) as response_time_count,
+           SUM(CASE WHEN status = 'completed' AND actual_cost IS NOT NULL THEN 1 ELSE 0 END) as revenue_count,
+           SUM(CASE WHEN status = 'completed' THEN actual_cost END) as revenue_sum,
+           SUM(customer_rating) as rating_sum,
+           COUNT(customer_rating) as rating_count
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+    GROUP BY day, hour, service_type_id
+""", params=['period'], index='idx_created')
+
+ROLLUP_CHANGED_HOURS = Query('rollup_changed_hours', """
+    SELECT DATE(created_at) as day,
+           HOUR(created_at) as hour,
+           MAX(updated_at) as last_updated
+    FROM service_requests
+    WHERE updated_at >= %s
+    GROUP BY day, hour
+""", params=['since'], index='idx_updated')
+
+ROLLUP_REQUEST_COUNT = Query('rollup_request_count', """
+    SELECT COUNT(*) as request_count
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+""", params=['period'], index='idx_created')
+
+ROLLUP_HOUR_COUNTS = Query('rollup_hour_counts', """
+    SELECT DATE(created_at) as day,
+           HOUR(created_at) as hour,
+           COUNT(*) as request_count
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+    GROUP BY day, hour
+""", params=['period'], index='idx_created')
+
+SERVICE_TYPE_NAMES = Query('service_type_names', """
+    SELECT id, name FROM service_types
+""")
+
+# ============================================
+# Daily Report
+# ============================================
+
+# Rows created on the report day, plus rated rows completed on it (the
+# satisfaction section is keyed on completed_at). The first branch uses
+# idx_created, the second idx_completed_rating (migration 006).
+DAILY_REQUEST_ROWS = Query('daily_request_rows', """
+    SELECT sr.id, sr.status, sr.driver_id,
+           d.first_name as driver_first_name, d.last_name as driver_last_name,
+           sr.service_type_id, st.name as service_type,
+           sr.actual_cost, sr.customer_rating,
+           sr.created_at, sr.started_at, sr.completed_at
+    FROM service_requests sr
+    LEFT JOIN service_types st ON sr.service_type_id = st.id
+    LEFT JOIN drivers d ON sr.driver_id = d.id
+    WHERE sr.created_at >= %s AND sr.created_at < %s
+    UNION ALL
+    SELECT sr.id, sr.status, sr.driver_id,
+           NULL, NULL,
+           sr.service_type_id, NULL,
+           sr.actual_cost, sr.customer_rating,
+           sr.created_at, sr.started_at, sr.completed_at
+    FROM service_requests sr
+    WHERE sr.completed_at >= %s AND sr.completed_at < %s
+          AND sr.customer_rating IS NOT NULL
+          AND NOT (sr.created_at >= %s AND sr.created_at < %s)
+""", params=['period', 'period', 'period'], index='idx_created')
+
+# What a daily report's rows depend on, per report day: the count and newest
+# updated_at of requests created that day (idx_created) and of rated requests
+# completed on it (idx_completed_rating, migration 006), plus the service type
+# names. A day whose values (and drivers, below) are unchanged would render the
+# same report, so checking an unchanged backfill never scans service_requests.
+DAILY_REPORT_FINGERPRINT = Query('daily_report_fingerprint', f"""
+    SELECT 'created' as part, {local_date('created_at')} as date,
+           COUNT(*) as row_count, MAX(updated_at) as last_updated
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+    GROUP BY date
+    UNION ALL
+    SELECT 'rated' as part, {local_date('completed_at')} as date,
+           COUNT(*) as row_count, MAX(updated_at) as last_updated
+    FROM service_requests
+    WHERE completed_at >= %s AND completed_at < %s
+          AND customer_rating IS NOT NULL
+    GROUP BY date
+    UNION ALL
+    SELECT 'service_types', NULL, COUNT(*), MAX(updated_at) FROM service_types
+""", params=['period', 'period'], index='idx_created')
+
+# The drivers named in each day's report. drivers.updated_at moves with every
+# location and status ping, so the names themselves are fingerprinted instead.
+DAILY_REPORT_DRIVERS = Query('daily_report_drivers', f"""
+    SELECT DISTINCT {local_date('sr.created_at')} as date, d.id as driver_id, d.first_name, d.last_name
+    FROM service_requests sr
+    JOIN drivers d ON sr.driver_id = d.id
+    WHERE sr.created_at >= %s AND sr.created_at < %s
+    ORDER BY date, driver_id
+""", params=['period'], index='idx_created')
+
+# ============================================
+# Monthly Report
+# ============================================
+
+MONTHLY_STATISTICS = Query('monthly_statistics', """
+    SELECT COUNT(*) as total_requests,
+           SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed_requests,
+           SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled_requests,
+           COALESCE(SUM(CASE WHEN status = 'completed' THEN actual_cost ELSE 0 END), 0) as total_revenue,
+           AVG(CASE WHEN status = 'completed' THEN actual_cost END) as avg_service_cost
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+""", params=['period'], index='idx_created')
+
+MONTHLY_TRENDS = Query('monthly_trends', f"""
+    SELECT {local_date('created_at')} as date,
+           COUNT(*) as total,
+           SUM(CASE WHEN status = 'completed' THEN actual_cost ELSE 0 END) as revenue
+    FROM service_requests
+    WHERE created_at >= %s AND created_at < %s
+    GROUP BY date
+    ORDER BY date
+""", params=['period'], index='idx_created')
+
+MONTHLY_TOP_CUSTOMERS = Query('monthly_top_customers', """
+    SELECT c.first_name, c.last_name,
+           COUNT(sr.id) as service_count,
+           SUM(sr.actual_cost) as total_spent
+    FROM customers c
+    JOIN service_requests sr ON c.id = sr.customer_id
+    WHERE sr.created_at >= %s AND sr.created_at < %s
+          AND sr.status = 'completed'
+    GROUP BY c.id, c.first_name, c.last_name
+    ORDER BY total_spent DESC
+    LIMIT 10
+""", params=['period'], index='idx_created')
+
+MONTHLY_SERVICE_TYPES = Query('monthly_service_types', """
+    SELECT st.name,
+           COUNT(sr.id) as request_count,
+           SUM(CASE WHEN sr.status = 'completed' THEN sr.actual_cost ELSE 0 END) as revenue
+    FROM service_types st
+    LEFT JOIN service_requests sr ON st.id = sr.service_type_id
+          AND sr.created_at >= %s AND sr.created_at < %s
+    GROUP BY st.id, st.name
+    ORDER BY request_count DESC
+""", params=['period'], index='idx_created')
+
+MONTHLY_REQUEST_LOG = Query('monthly_request_log', """
+    SELECT sr.id, sr.created_at, st.name as service_type, sr.status,
+           c.first_name as customer_first_name, c.last_name as customer_last_name,
+           d.first_name as driver_first_name, d.last_name as driver_last_name,
+           sr.actual_cost
+    FROM service_requests sr
+    JOIN customers c ON sr.customer_id = c.id
+    JOIN service_types st ON sr.service_type_id = st.id
+    LEFT JOIN drivers d ON sr.driver_id = d.id
+    WHERE sr.created_at >= %s AND sr.created_at < %s
+    ORDER BY sr.created_at, sr.id
+""", params=['period'], index='idx_created')
+
+# ============================================
+# Customer Analysis Report
+# ============================================
+
+CUSTOMER_DETAILS = Query('customer_details', """
+    SELECT * FROM customers WHERE id = %s
+""", params=['customer_id'], index='PRIMARY')
+
+CUSTOMER_SERVICE_HISTORY = Query('customer_service_history', """
+    SELECT sr.*, st.name as service_type_name
+    FROM service_requests sr
+    LEFT JOIN service_types st ON sr.service_type_id = st.id
+    WHERE sr.customer_id = %s
+    ORDER BY sr.created_at DESC
+    LIMIT 50
+""", params=['customer_id'], index='idx_customer')
+
+CUSTOMER_SPENDING = Query('customer_spending', """
+    SELECT COUNT(*) as total_services,
+           SUM(actual_cost) as total_spent,
+           AVG(actual_cost) as avg_per_service,
+           MAX(actual_cost) as max_spent
+    FROM service_requests
+    WHERE customer_id = %s AND status = 'completed'
+""", params=['customer_id'], index='idx_customer')
+
+CUSTOMER_LOYALTY = Query('customer_loyalty', """
+    SELECT MIN(created_at) as first_service,
+           MAX(created_at) as last_service,
+           DATEDIFF(NOW(), MIN(created_at)) as days_as_customer,
+           COUNT(*) as total_services
+    FROM service_requests
+    WHERE customer_id = %s
+""", params=['customer_id'], index='idx_customer')
+
+# Batch variants for reports on many customers at once: {customer_ids}
+# expands to one placeholder per id, so a batch costs one round trip per query
+
+CUSTOMER_IDS_VIP = Query('customer_ids_vip', """
+    SELECT id FROM customers WHERE is_vip = 1 ORDER BY id
+""", index='idx_is_vip')
+
+CUSTOMER_DETAILS_BATCH = Query('customer_details_batch', """
+    SELECT * FROM customers WHERE id IN ({customer_ids})
+""", params=['customer_ids'], index='PRIMARY')
+
+CUSTOMER_SERVICE_HISTORY_BATCH = Query('customer_service_history_batch', """
+    SELECT * FROM (
+        SELECT sr.*, st.name as service_type_name,
+               ROW_NUMBER() OVER (PARTITION BY sr.customer_id ORDER BY sr.created_at DESC) as history_rank
+        FROM service_requests sr
+        LEFT JOIN service_types st ON sr.service_type_id = st.id
+        WHERE sr.customer_id IN ({customer_ids})
+    ) ranked
+    WHERE history_rank <= 50
+    ORDER BY customer_id, history_rank
+""", params=['customer_ids'], index='idx_customer')
+
+CUSTOMER_SPENDING_BATCH = Query('customer_spending_batch', """
+    SELECT customer_id,
+           COUNT(*) as total_services,
+           SUM(actual_cost) as total_spent,
+           AVG(actual_cost) as avg_per_service,
+           MAX(actual_cost) as max_spent
+    FROM service_requests
+    WHERE customer_id IN ({customer_ids}) AND status = 'completed'
+    GROUP BY customer_id
+""", params=['customer_ids'], index='idx_customer')
+
+CUSTOMER_LOYALTY_BATCH = Query('customer_loyalty_batch', """
+    SELECT customer_id,
+           MIN(created_at) as first_service,
+           MAX(created_at) as last_service,
+           DATEDIFF(NOW(), MIN(created_at)) as days_as_customer,
+           COUNT(*) as total_services
+    FROM service_requests
+    WHERE customer_id IN ({customer_ids})
+    GROUP BY customer_id
+""", params=['customer_ids'], index='idx_customer')
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Query Audit
+Explains every registered analysis and report query against the current
+database and flags the access paths that do not scale: full table scans,
+full index scans, filesorts and temporary tables, and declared indexes the
+optimizer no longer picks
+
+Plans come from EXPLAIN FORMAT=JSON; --analyze also runs EXPLAIN ANALYZE
+(MySQL 8.0.18+) for actual times and row counts, which executes the queries.
+Each flagged table access gets a suggested covering index built from the
+columns the query filters, joins and reads on it, unless an existing index
+already starts with those columns. Results are written as JSON and compared
+against a baseline so a deploy can fail when a query's plan regresses.
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import QUERY_AUDIT_CONFIG
+from python.query_builder import QUERY_REGISTRY, trailing_days
+from python import queries  # noqa: F401 - populates the registry
+
+# Bump when findings change meaning so old baselines are not compared
+AUDIT_FORMAT_VERSION = 1
+
+# Finding kinds and their severity; 'fail' findings fail the audit on their own
+SEVERITY = {
+    'full_scan': 'fail',
+    'index_not_usable': 'fail',
+    'full_index_scan': 'warn',
+    'index_not_chosen': 'warn',
+    'filesort': 'warn',
+    'temporary_table': 'warn',
+    'small_full_scan': 'info'
+}
+
+# `schema`.`alias`.`column` references in attached conditions
+_COLUMN_REFERENCE = re.compile(r'`\w+`\.`(\w+)`\.`(\w+)`')
+# Table references in the FROM clause: name and optional alias
+_TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_NOT_ALIASES = {'ON', 'WHERE', 'LEFT', 'RIGHT', 'INNER', 'JOIN', 'GROUP', 'ORDER', 'UNION', 'HAVING', 'LIMIT'}
+# Top line of an EXPLAIN ANALYZE tree
+_ACTUAL = re.compile(r'actual time=([\d.]+)\.\.([\d.]+) rows=([\d.e+]+) loops=(\d+)')
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """Map each alias (or bare table name) in a statement to its table"""
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _NOT_ALIASES:
+            aliases[alias] = table
+    return aliases
+
+
+def _walk_plan(node, context: str = '') -> Iterator[Tuple[str, Dict]]:
+    """Yield (key, dict) for every object in an EXPLAIN FORMAT=JSON plan"""
+    if isinstance(node, dict):
+        yield context, node
+        for key, value in node.items():
+            yield from _walk_plan(value, key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk_plan(item, context)
+
+
+def table_accesses(plan: Dict) -> List[Dict]:
+    """Every table access in a plan, with the fields the audit looks at"""
+    accesses = []
+    for key, node in _walk_plan(plan):
+        if key != 'table' or 'table_name' not in node:
+            continue
+        accesses.append({
+            'alias': node['table_name'],
+            'access_type': node.get('access_type'),
+            'key': node.get('key'),
+            'possible_keys': node.get('possible_keys') or [],
+            'rows': int(float(node.get('rows_examined_per_scan') or 0)),
+            'used_columns': node.get('used_columns') or [],
+            'condition': node.get('attached_condition') or ''
+        })
+    return accesses
+
+
+def condition_columns(condition: str, alias: str) -> Tuple[List[str], List[str]]:
+    """Split the columns of `alias` in a condition into equality and range columns"""
+    equality, ranges = [], []
+    for match in _COLUMN_REFERENCE.finditer(condition):
+        if match.group(1) != alias:
+            continue
+        column = match.group(2)
+        rest = condition[match.end():].lstrip()
+        target = equality if rest.startswith('=') else ranges
+        if column not in equality and column not in ranges:
+            target.append(column)
+    return equality, ranges
+
+
+def suggest_index(table: str, access: Dict, existing: Dict[str, List[List[str]]],
+                  max_columns: Optional[int] = None) -> Optional[Dict]:
+    """Suggest a covering index for a table access, None if an existing index already fits
+
+    Equality (and join) columns lead, then at most one range column, then
+    the other columns the query reads so the index covers it. When that is
+    more than max_columns, only the key columns are suggested.
+    """
+    max_columns = max_columns or QUERY_AUDIT_CONFIG['max_index_columns']
+    equality, ranges = condition_columns(access['condition'], access['alias'])
+    key_columns = equality + ranges[:1]
+    if not key_columns:
+        return None
+
+    # InnoDB secondary indexes already carry the primary key
+    columns = key_columns + [c for c in access['used_columns'] if c not in key_columns and c != 'id']
+    covering = len(columns) <= max_columns
+    if not covering:
+        columns = key_columns
+
+    for index_columns in existing.get(table, []):
+        if index_columns[:len(key_columns)] == key_columns and (
+                not covering or set(columns) <= set(index_columns)):
+            return None
+
+    name = f"idx_{'_'.join(key_columns)}" + ('_cover' if covering and columns != key_columns else '')
+    return {
+        'table': table,
+        'columns': columns,
+        'covering': covering,
+        'sql': f"ALTER TABLE {table} ADD INDEX `{name[:64]}` ({', '.join(f'`{c}`' for c in columns)})"
+    }
+
+
+def plan_findings(query, plan: Dict, existing: Dict[str, List[List[str]]],
+                  max_scan_rows: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+    """Flag the scans, sorts and temporary tables in a query's plan and suggest indexes"""
+    max_scan_rows = max_scan_rows if max_scan_rows is not None else QUERY_AUDIT_CONFIG['max_scan_rows']
+    aliases = table_aliases(query.sql)
+    findings, suggestions = [], []
+
+    def flag(kind: str, table: Optional[str], detail: str):
+        findings.append({'kind': kind, 'severity': SEVERITY[kind], 'table': table, 'detail': detail})
+
+    keys, possible = set(), set()
+    for access in table_accesses(plan):
+        # Derived and temporary tables (<derived2>, <temporary>) have no indexes of their own
+        if access['alias'].startswith('<'):
+            continue
+        table = aliases.get(access['alias'], access['alias'])
+        if access['key']:
+            keys.add(access['key'])
+        possible.update(access['possible_keys'])
+
+        scan = access['access_type'] in ('ALL', 'index')
+        if access['access_type'] == 'ALL':
+            kind = 'full_scan' if access['rows'] >= max_scan_rows else 'small_full_scan'
+            flag(kind, table, f"{access['rows']} rows examined per scan")
+        elif access['access_type'] == 'index':
+            flag('full_index_scan', table, f"reads all of {access['key']} ({access['rows']} rows)")
+
+        if scan and access['rows'] >= max_scan_rows:
+            suggestion = suggest_index(table, access, existing)
+            if suggestion is not None and suggestion not in suggestions:
+                suggestions.append(suggestion)
+
+    for context, node in _walk_plan(plan):
+        if node.get('using_filesort'):
+            flag('filesort', None, f"{context or 'query_block'} sorts rows")
+        if node.get('using_temporary_table'):
+            flag('temporary_table', None, f"{context or 'query_block'} uses a temporary table")
+
+    if query.index:
+        if query.index not in possible | keys:
+            flag('index_not_usable', None, f"{query.index} is not a possible key")
+        elif query.index not in keys:
+            flag('index_not_chosen', None, f"{query.index} is possible but the optimizer chose "
+                                           f"{', '.join(sorted(keys)) or 'no index'}")
+    return findings, suggestions
+
+
+def parse_analyze(tree: str) -> Dict:
+    """Actual time and rows of the root of an EXPLAIN ANALYZE tree"""
+    match = _ACTUAL.search(tree)
+    if match is None:
+        return {'tree': tree}
+    loops = int(match.group(4))
+    return {
+        'actual_ms': float(match.group(2)) * loops,
+        'actual_rows': int(float(match.group(3)) * loops),
+        'table_scans': tree.count('Table scan on'),
+        'tree': tree
+    }
+
+
+def audit_values(days: int = 30, customer_id: int = 1, customer_ids: Optional[List[int]] = None) -> Dict:
+    """Parameter values to explain each query with"""
+    return {
+        'period': trailing_days(days),
+        'since': datetime.now() - timedelta(days=1),
+        'customer_id': customer_id,
+        'customer_ids': customer_ids or [customer_id]
+    }
+
+
+def existing_indexes(cursor) -> Dict[str, List[List[str]]]:
+    """Column lists of every index in the current schema, by table"""
+    cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """)
+    indexes = {}
+    for table, index, column in cursor.fetchall():
+        indexes.setdefault(table, {}).setdefault(index, []).append(column)
+    return {table: list(by_name.values()) for table, by_name in indexes.items()}
+
+
+def audit_query(cursor, query, values: Dict, existing: Dict, analyze: bool = False) -> Dict:
+    """Explain one query and collect its findings"""
+    sql, params = query.statement(**{name: values[name] for name in query.param_names})
+    result = {'index': query.index, 'error': None}
+    try:
+        cursor.execute('EXPLAIN FORMAT=JSON ' + sql, params)
+        plan = json.loads(cursor.fetchone()[0])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    result['cost'] = float(plan.get('query_block', {}).get('cost_info', {}).get('query_cost') or 0)
+    result['findings'], result['suggestions'] = plan_findings(query, plan, existing)
+    result['plan'] = plan
+
+    if analyze:
+        try:
+            cursor.execute('EXPLAIN ANALYZE ' + sql, params)
+            result['analyze'] = parse_analyze('\n'.join(row[0] for row in cursor.fetchall()))
+        except Exception as e:
+            result['analyze'] = {'error': f"{type(e).__name__}: {e}"}
+    return result
+
+
+def run(names: Optional[List[str]] = None, values: Optional[Dict] = None, analyze: bool = False,
+        pool=None) -> Dict:
+    """Audit the named queries (default: every registered query) on the configured database"""
+    from python.db_pool import get_pool
+
+    names = names or sorted(QUERY_REGISTRY)
+    unknown = [name for name in names if name not in QUERY_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown queries: {', '.join(unknown)}")
+    values = values or audit_values()
+
+    with (pool or get_pool()).connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT VERSION()')
+        version = cursor.fetchone()[0]
+        existing = existing_indexes(cursor)
+        results = {name: audit_query(cursor, QUERY_REGISTRY[name], values, existing, analyze)
+                   for name in names}
+        cursor.close()
+
+    return {
+        'version': AUDIT_FORMAT_VERSION,
+        'server': version,
+        'audited_at': datetime.now().isoformat(timespec='seconds'),
+        'max_scan_rows': QUERY_AUDIT_CONFIG['max_scan_rows'],
+        'queries': results
+    }
+
+
+def _finding_key(finding: Dict) -> Tuple:
+    return (finding['kind'], finding['table'])
+
+
+def compare(results: Dict, baseline: Dict) -> List[str]:
+    """List the failures: errors, and 'fail' findings (with a baseline, any finding it did not have)"""
+    failures = []
+    previous_queries = baseline.get('queries', {}) if baseline.get('version') == AUDIT_FORMAT_VERSION else {}
+    for name, result in results['queries'].items():
+        if result['error']:
+            failures.append(f"{name}: {result['error']}")
+            continue
+
+        previous = previous_queries.get(name)
+        if previous is None or previous.get('error'):
+            new = [f for f in result['findings'] if f['severity'] == 'fail']
+        else:
+            known = {_finding_key(f) for f in previous['findings']}
+            new = [f for f in result['findings']
+                   if f['severity'] != 'info' and _finding_key(f) not in known]
+        for finding in new:
+            table = f" on {finding['table']}" if finding['table'] else ''
+            failures.append(f"{name}: {finding['kind']}{table} ({finding['detail']})")
+    return failures
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Audit the query plans of every analysis and report query')
+    parser.add_argument('--query', action='append', choices=sorted(QUERY_REGISTRY),
+                       help='Query to audit (default: all)')
+    parser.add_argument('--days', type=int, default=30, help='Date range the queries are explained with')
+    parser.add_argument('--customer-id', type=int, default=1, help='Customer the per-customer queries use')
+    parser.add_argument('--customer-ids', help='Comma-separated customers the batch queries use')
+    parser.add_argument('--analyze', action='store_true',
+                       help='Also run EXPLAIN ANALYZE (executes the queries; MySQL 8.0.18+)')
+    parser.add_argument('--output', help='Write the audit to this JSON file')
+    parser.add_argument('--baseline', help='Fail only on findings this earlier audit did not have')
+
+    args = parser.parse_args()
+
+    customer_ids = None
+    if args.customer_ids:
+        customer_ids = [int(value) for value in args.customer_ids.split(',') if value.strip()]
+
+    try:
+        results = run(args.query, audit_values(args.days, args.customer_id, customer_ids), args.analyze)
+    except Exception as e:
+        print(f"Query audit failed: {e}")
+        return 1
+
+    print(f"{'query':<34} {'cost':>10} {'actual':>10}  findings")
+    for name, result in results['queries'].items():
+        if result['error']:
+            print(f"{name:<34} failed: {result['error']}")
+            continue
+        actual = result.get('analyze', {}).get('actual_ms')
+        actual = f"{actual:.1f}ms" if actual is not None else '-'
+        findings = ', '.join(
+            finding['kind'] + (f"({finding['table']})" if finding['table'] else '')
+            for finding in result['findings'] if finding['severity'] != 'info'
+        )
+        print(f"{name:<34} {result['cost']:>10.1f} {actual:>10}  {findings or 'ok'}")
+        for suggestion in result['suggestions']:
+            print(f"{'':<34} suggest: {suggestion['sql']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Audit saved to: {args.output}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failures = compare(results, baseline)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,166 @@
+"""
+Roadside Assistance Admin Platform - Query Builder
+Turns report dates into index-friendly, half-open timestamp ranges and keeps a
+registry of every analysis and report query
+"""
+
+import calendar
+from datetime import date as date_type, datetime, time, timedelta
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from python.config import TIMEZONE_CONFIG
+from python.dialects import MYSQL, dialect_of, translate
+
+DateLike = Union[str, date_type, datetime]
+
+
+class DateRange(NamedTuple):
+    """Half-open [start, end) range of naive timestamps in the database time zone"""
+    start: datetime
+    end: datetime
+
+    def params(self) -> Tuple[datetime, datetime]:
+        """Get the range as query parameters"""
+        return (self.start, self.end)
+
+
+def _zone(name: str):
+    """Resolve a configured time zone name, None meaning naive timestamps"""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}") from None
+
+
+def to_database_time(local: datetime) -> datetime:
+    """Convert a report-local wall clock time into a naive database timestamp"""
+    report_zone = _zone(TIMEZONE_CONFIG['report_timezone'])
+    database_zone = _zone(TIMEZONE_CONFIG['database_timezone'])
+
+    if report_zone is None or database_zone is None:
+        return local.replace(tzinfo=None)
+
+    if local.tzinfo is None:
+        local = local.replace(tzinfo=report_zone)
+    return local.astimezone(database_zone).replace(tzinfo=None)
+
+
+def parse_date(value: DateLike) -> date_type:
+    """Parse a YYYY-MM-DD string, date or datetime into a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def date_span(first_day: DateLike, last_day: DateLike) -> DateRange:
+    """Get the range covering whole report days first_day through last_day inclusive"""
+    first_day = parse_date(first_day)
+    last_day = parse_date(last_day)
+    if last_day < first_day:
+        raise ValueError(f"End date {last_day} is before start date {first_day}")
+
+    start = datetime.combine(first_day, time.min)
+    end = datetime.combine(last_day + timedelta(days=1), time.min)
+    return DateRange(to_database_time(start), to_database_time(end))
+
+
+def day_range(day: DateLike) -> DateRange:
+    """Get the range covering a single report day"""
+    return date_span(day, day)
+
+
+def month_range(year: int, month: int) -> DateRange:
+    """Get the range covering a calendar month"""
+    last_day = calendar.monthrange(year, month)[1]
+    return date_span(date_type(year, month, 1), date_type(year, month, last_day))
+
+
+def trailing_days(days: int, now: Optional[datetime] = None) -> DateRange:
+    """Get the range covering the last `days` days up to now"""
+    report_zone = _zone(TIMEZONE_CONFIG['report_timezone'])
+    if now is None:
+        now = datetime.now(report_zone) if report_zone else datetime.now()
+    end = to_database_time(now)
+    return DateRange(end - timedelta(days=days), end)
+
+
+def local_date(column: str) -> str:
+    """SQL expression for the report-local date of a timestamp column"""
+    return f"DATE({_local_time(column)})"
+
+
+def local_hour(column: str) -> str:
+    """SQL expression for the report-local hour of a timestamp column"""
+    return f"HOUR({_local_time(column)})"
+
+
+def _local_time(column: str) -> str:
+    """Shift a database timestamp column into the report time zone"""
+    report_name = TIMEZONE_CONFIG['report_timezone']
+    database_name = TIMEZONE_CONFIG['database_timezone']
+    if not report_name or not database_name or report_name == database_name:
+        return column
+    return f"CONVERT_TZ({column}, '{database_name}', '{report_name}')"
+
+
+class Query:
+    """A named SQL statement with an ordered parameter spec
+
+    Every statement the analyzer and report generator run is declared as a
+    Query so that tooling (EXPLAIN regression tests, audits) can enumerate
+    them. DateRange parameters expand into their (start, end) pair; a list
+    parameter fills an `IN ({name})` marker with one placeholder per value.
+    Statements are written in MySQL and translated for other dialects.
+    """
+
+    def __init__(self, name: str, sql: str, params: Sequence[str] = (),
+                 index: Optional[str] = None):
+        if name in QUERY_REGISTRY:
+            raise ValueError(f"Duplicate query name: {name}")
+        self.name = name
+        self.sql = sql
+        self.param_names = tuple(params)
+        self.index = index
+        self.list_params = tuple(p for p in self.param_names if '{' + p + '}' in sql)
+        QUERY_REGISTRY[name] = self
+
+    def params(self, **values) -> tuple:
+        """Build the positional parameter tuple for this query"""
+        missing = [name for name in self.param_names if name not in values]
+        if missing:
+            raise ValueError(f"Query {self.name} is missing parameters: {', '.join(missing)}")
+
+        bound = []
+        for name in self.param_names:
+            value = values[name]
+            if isinstance(value, DateRange):
+                bound.extend(value.params())
+            elif name in self.list_params:
+                bound.extend(value)
+            else:
+                bound.append(value)
+        return tuple(bound)
+
+    def statement(self, dialect: str = MYSQL, **values) -> Tuple[str, tuple]:
+        """Get the SQL (in the given dialect) and positional parameters to run for these values"""
+        sql = self.sql
+        for name in self.list_params:
+            count = len(values.get(name) or ())
+            # IN (NULL) matches nothing, keeping an empty list valid SQL
+            sql = sql.replace('{' + name + '}', ', '.join(['%s'] * count) if count else 'NULL')
+        return translate(sql, dialect), self.params(**values)
+
+    def execute(self, cursor, **values):
+        """Run this query on a DB-API cursor, in the dialect the cursor expects"""
+        cursor.execute(*self.statement(dialect_of(cursor), **values))
+
+    def __repr__(self):
+        return f"Query({self.name!r})"
+
+
+QUERY_REGISTRY: Dict[str, Query] = {}
@@ -4,605 +4,1123 @@ Roadside Assistance Admin Platform - Report Generator
 Generates comprehensive reports for business analysis and operations
 """
 
+import hashlib
+import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import calendar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.linecharts import HorizontalLineChart
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from python.config import DB_CONFIG, REPORT_CONFIG, PATHS
-import mysql.connector
+from python.config import CHART_CONFIG, DB_CONFIG, REPORT_CONFIG, PATHS, STREAMING_CONFIG, TIMEZONE_CONFIG
+from python.db_pool import get_backend
+from python.frames import build_frame, records
+from python.profiling import Profiler, current_span, profiled, record_span, span, traced_chunks
+from python.query_builder import DateRange, date_span, day_range, month_range, parse_date
+from python.report_store import ReportStore
+from python.snapshot import get_snapshot
+from python.streaming import cursor_chunks, frame_chunks
+from python import queries
+
+# What the single-customer spending and loyalty queries return for a customer without requests
+EMPTY_SPENDING = {'total_services': 0, 'total_spent': None, 'avg_per_service': None, 'max_spent': None}
+EMPTY_LOYALTY = {'first_service': None, 'last_service': None, 'days_as_customer': None, 'total_services': 0}
+
+# Part of every daily report fingerprint: bump it when the daily report's sections
+# or layout change so existing PDFs are rendered again
+DAILY_REPORT_VERSION = 1
+
+DAILY_ROW_COLUMNS = [
+    'id', 'status', 'driver_id', 'driver_first_name', 'driver_last_name',
+    'service_type_id', 'service_type', 'actual_cost', 'customer_rating',
+    'created_at', 'started_at', 'completed_at'
+]
+
+
+def _none_if_nan(value):
+    """Convert a pandas missing value to None, matching what MySQL returns"""
+    return None if pd.isna(value) else float(value)
+
+
+def _sql_sum(series: pd.Series):
+    """SUM() semantics: None when there are no non-null values"""
+    values = series.dropna()
+    return None if values.empty else values.sum().item()
+
+
+def _sql_avg(series: pd.Series):
+    """AVG() semantics: None when there are no non-null values"""
+    values = series.dropna()
+    return None if values.empty else float(values.mean())
+
+
+def _minutes_between(start: pd.Series, end: pd.Series) -> pd.Series:
+    """TIMESTAMPDIFF(MINUTE, start, end): whole minutes, truncated toward zero"""
+    return np.trunc((end - start).dt.total_seconds() / 60)
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, source: str = 'live'):
         self.db_config = DB_CONFIG
         self.report_config = REPORT_CONFIG
         self.output_dir = PATHS['reports']
+        self.pool = get_backend(source)
+        self._store = None
+
+        # 'snapshot' reads the local Arrow copy kept by snapshot.py instead of MySQL;
+        # 'duckdb' runs the same SQL on the embedded copy built by duckdb_backend.py
+        self.source = source
+        self.snapshot = None
+        if source == 'snapshot':
+            self.snapshot = get_snapshot()
 
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
 
-        # Set up matplotlib style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+    @property
+    def store(self) -> ReportStore:
+        """The catalog of the reports in output_dir"""
+        if self._store is None or self._store.root != self.output_dir:
+            self._store = ReportStore(self.output_dir)
+        return self._store
+
+    def _catalog(self, report_type: str, params: Dict, filepath: str, fingerprint: Optional[str] = None):
+        """Record a rendered report in the store; a render that wrote no file records nothing"""
+        if os.path.exists(filepath):
+            self.store.add(report_type, params, filepath, fingerprint)
+
+    def _unchanged_report(self, report_type: str, params: Dict, fingerprint: str) -> Optional[str]:
+        """Path of the stored report made from the same inputs, None if there is none"""
+        entry = self.store.find(report_type, params)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            return entry['path']
+        return None
 
     def get_database_connection(self):
-        """Get database connection"""
-        return mysql.connector.connect(**self.db_config)
+        """Get a pooled database connection (use as a context manager)
+
+        In snapshot mode there is no connection and fetchers receive None.
+        """
+        if self.snapshot is not None:
+            return nullcontext()
+        return self.pool.connection()
+
+    def _fetch_all(self, conn, query, **params) -> List[Dict]:
+        """Run a report query and return every row as a dict"""
+        with span(query.name, 'query', source=self.source) as query_span:
+            if self.snapshot is not None:
+                results = records(build_frame(query, self.snapshot, **params))
+            else:
+                cursor = conn.cursor(dictionary=True)
+                query.execute(cursor, **params)
+                results = cursor.fetchall()
+                cursor.close()
+            query_span.add_rows(results)
+        return results
 
-    def generate_daily_report(self, date: Optional[str] = None) -> str:
-        """Generate daily operations report"""
+    def _fetch_one(self, conn, query, **params) -> Optional[Dict]:
+        """Run a report query and return its first row as a dict"""
+        results = self._fetch_all(conn, query, **params)
+        return results[0] if results else None
+
+    def _fetch_concurrently(self, fetchers: Dict[str, Callable]) -> Dict:
+        """Run a report's independent fetchers, each on its own pooled connection
+
+        Each fetcher is called with a connection and its result is returned
+        under its name. At most REPORT_CONFIG['query_concurrency'] queries
+        (and never more than the pool holds) run at once, so report latency
+        approaches that of the slowest query instead of the sum. Snapshot
+        reads have no round trip to overlap and run in order.
+        """
+        limit = min(self.report_config['query_concurrency'], self.pool.size, len(fetchers))
+        if self.snapshot is not None or limit <= 1:
+            with self.get_database_connection() as conn:
+                return {name: fetch(conn) for name, fetch in fetchers.items()}
+
+        # Fetchers run on pool threads but belong under the caller's span in a profile
+        parent = current_span()
+
+        def run(name, fetch):
+            with span(name, 'fetch', parent=parent), self.get_database_connection() as conn:
+                return fetch(conn)
+
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix='report-query')
+        try:
+            futures = {name: executor.submit(run, name, fetch) for name, fetch in fetchers.items()}
+            return {name: future.result() for name, future in futures.items()}
+        finally:
+            # A failed query fails the report; queries not yet started are dropped
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @profiled(kind='report')
+    def generate_daily_report(self, date: Optional[str] = None, force: bool = False) -> str:
+        """Generate daily operations report
+
+        An existing report whose catalogued fingerprint still matches its
+        inputs is returned as is, unless force is set.
+        """
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
 
+        params = {'date': date}
         filename = f"daily_report_{date}.pdf"
-        filepath = os.path.join(self.output_dir, filename)
-
-        # Get data
-        conn = self.get_database_connection()
-
-        # Daily statistics
-        daily_stats = self._get_daily_statistics(conn, date)
-
-        # Service requests by type
-        requests_by_type = self._get_requests_by_type(conn, date)
+        filepath = self.store.path_for('daily', params, filename)
 
-        # Driver performance
-        driver_performance = self._get_driver_performance(conn, date)
+        period = day_range(date)
 
-        # Customer satisfaction
-        satisfaction = self._get_customer_satisfaction(conn, date)
+        # Taken before the data is read, so a change made meanwhile leaves a stale fingerprint, not a stale report
+        fingerprint = self._daily_fingerprints(period, [date])[date]
+        existing = None if force else self._unchanged_report('daily', params, fingerprint)
+        if existing:
+            print(f"Daily report unchanged: {existing}")
+            return existing
 
-        # Revenue summary
-        revenue = self._get_revenue_summary(conn, date)
+        # Get data in one round trip
+        with self.get_database_connection() as conn:
+            rows = self._get_daily_request_rows(conn, period)
 
-        conn.close()
+        # Statistics, service types, driver performance, satisfaction and revenue
+        sections = self._build_daily_sections(rows, period)
 
         # Generate PDF report
         self._create_daily_report_pdf(
-            filepath, date, daily_stats, requests_by_type,
-            driver_performance, satisfaction, revenue
+            filepath, date, sections['stats'], sections['requests_by_type'],
+            sections['driver_performance'], sections['satisfaction'], sections['revenue']
         )
+        self._catalog('daily', params, filepath, fingerprint)
 
         return filepath
 
+    @profiled(kind='report')
+    def generate_daily_reports(self, start_date: str, end_date: str,
+                               workers: Optional[int] = None, force: bool = False) -> List[Dict]:
+        """Generate daily reports for every date in a range
+
+        Days whose existing report still matches its inputs' fingerprint are
+        kept ('unchanged'). The remaining days are fetched in one query and
+        split by day; PDFs are rendered in parallel across a process pool. A
+        day that fails is recorded in the results and does not stop the rest
+        of the batch.
+        """
+        first_day = parse_date(start_date)
+        last_day = parse_date(end_date)
+        days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+        if workers is None:
+            workers = self.report_config['render_workers'] or os.cpu_count() or 1
+
+        results = []
+        for day in days:
+            date = day.strftime('%Y-%m-%d')
+            results.append({
+                'date': date,
+                'filepath': self.store.path_for('daily', {'date': date}, f"daily_report_{date}.pdf"),
+                'status': 'pending',
+                'compute_time': None,
+                'render_time': None,
+                'error': None
+            })
+
+        fingerprints = self._daily_fingerprints(date_span(first_day, last_day), [r['date'] for r in results])
+        if not force:
+            for result in results:
+                existing = self._unchanged_report('daily', {'date': result['date']}, fingerprints[result['date']])
+                if existing:
+                    result.update(filepath=existing, status='unchanged')
+        pending = [(day, result) for day, result in zip(days, results) if result['status'] == 'pending']
+        if not pending:
+            print(f"All {len(days)} daily reports unchanged")
+            return results
+
+        # Only the span of days that changed is fetched
+        started = time.perf_counter()
+        with self.get_database_connection() as conn:
+            rows = self._get_daily_request_rows(conn, date_span(pending[0][0], pending[-1][0]))
+        print(f"Fetched {len(rows)} rows for {len(pending)} of {len(days)} days "
+              f"in {time.perf_counter() - started:.2f}s")
+
+        jobs = []
+        pending_days = [day for day, _ in pending]
+        for (_, result), (period, day_rows) in zip(pending, self._split_rows_by_day(rows, pending_days)):
+            date = result['date']
+            compute_started = time.perf_counter()
+            try:
+                sections = self._build_daily_sections(day_rows, period)
+            except Exception as e:
+                result.update(status='failed', error=f"{type(e).__name__}: {e}")
+                continue
+            result['compute_time'] = time.perf_counter() - compute_started
+            jobs.append((result, (date, sections)))
+
+        self._render_batch(jobs, _render_daily_report, workers, 'date', len(results) - len(jobs), len(results))
+        for result, _ in jobs:
+            if result['status'] == 'completed':
+                self._catalog('daily', {'date': result['date']}, result['filepath'], fingerprints[result['date']])
+        return results
+
+    def _daily_fingerprints(self, period: DateRange, dates: List[str]) -> Dict[str, str]:
+        """Fingerprint the inputs of the daily report of each date in a range
+
+        A fingerprint hashes the row counts and newest updated_at of the
+        requests the day's report reads (DAILY_REPORT_FINGERPRINT), the
+        drivers it names (DAILY_REPORT_DRIVERS), the service type table, and
+        the template: DAILY_REPORT_VERSION and the settings that change what
+        is drawn.
+        """
+        with self.get_database_connection() as conn:
+            rows = self._fetch_all(conn, queries.DAILY_REPORT_FINGERPRINT, period=period)
+            drivers = self._fetch_all(conn, queries.DAILY_REPORT_DRIVERS, period=period)
+
+        shared = {'template': self._daily_template(), 'tables': {}}
+        by_date = {date: {'drivers': []} for date in dates}
+        for row in rows:
+            mark = [int(row['row_count']), None if row['last_updated'] is None else str(row['last_updated'])]
+            if row['date'] is None:
+                shared['tables'][row['part']] = mark
+            elif str(row['date'])[:10] in by_date:
+                by_date[str(row['date'])[:10]][row['part']] = mark
+        for row in drivers:
+            if str(row['date'])[:10] in by_date:
+                by_date[str(row['date'])[:10]]['drivers'].append(
+                    [int(row['driver_id']), row['first_name'], row['last_name']])
+        for parts in by_date.values():
+            parts['drivers'].sort()
+
+        return {
+            date: hashlib.sha256(json.dumps(dict(shared, rows=parts), sort_keys=True).encode()).hexdigest()
+            for date, parts in by_date.items()
+        }
+
+    def _daily_template(self) -> Dict:
+        """Everything besides the data that decides how a daily report looks"""
+        return {
+            'version': DAILY_REPORT_VERSION,
+            'company': [self.report_config[key] for key in
+                        ('company_name', 'company_address', 'company_phone', 'company_email')],
+            'table_chunk_rows': self.report_config['table_chunk_rows'],
+            'charts': [CHART_CONFIG[key] for key in ('enabled', 'dpi', 'width', 'height')],
+            'timezone': TIMEZONE_CONFIG['report_timezone']
+        }
+
+    @profiled()
+    def _split_rows_by_day(self, rows: pd.DataFrame, days: List) -> List:
+        """Split range rows into one (period, rows) pair per report day
+
+        A row belongs to the day it was created and, for the satisfaction
+        section, also to the day it was completed.
+        """
+        periods = [day_range(day) for day in days]
+        starts = np.array([p.start for p in periods], dtype='datetime64[ns]')
+        ends = np.array([p.end for p in periods], dtype='datetime64[ns]')
+
+        def day_index(column):
+            values = rows[column].to_numpy(dtype='datetime64[ns]')
+            index = np.searchsorted(starts, values, side='right') - 1
+            # Missing timestamps and values outside every day (days need not be consecutive) get no day
+            outside = np.isnat(values) | (index < 0) | (values >= ends[np.maximum(index, 0)])
+            index[outside] = -1
+            return index
+
+        created_day = day_index('created_at')
+        completed_day = day_index('completed_at')
+
+        tagged = pd.concat([
+            rows.assign(_day=created_day),
+            rows[completed_day != created_day].assign(_day=completed_day[completed_day != created_day])
+        ])
+        grouped = {day: frame.drop(columns='_day') for day, frame in tagged.groupby('_day')}
+        empty = rows.iloc[0:0]
+
+        return [(period, grouped.get(i, empty)) for i, period in enumerate(periods)]
+
+    def _render_batch(self, jobs: List, render: Callable, workers: int, label: str,
+                      done: int, total: int):
+        """Render report PDFs, in parallel when more than one worker is allowed
+
+        jobs are (result, args) pairs; render(result['filepath'], *args) runs
+        in a worker process and returns its render time. result[label] names
+        the report in progress lines, counted on from `done` of `total`.
+        """
+        def record(result, render_time=None, error=None):
+            nonlocal done
+            done += 1
+            if error is None:
+                result.update(status='completed', render_time=render_time)
+                print(f"[{done}/{total}] {result[label]}: rendered in {render_time:.2f}s")
+            else:
+                result.update(status='failed', error=error)
+                print(f"[{done}/{total}] {result[label]}: failed - {error}")
+
+        if workers <= 1 or len(jobs) <= 1:
+            for result, args in jobs:
+                try:
+                    record(result, render(result['filepath'], *args))
+                except Exception as e:
+                    record(result, error=f"{type(e).__name__}: {e}")
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(render, result['filepath'], *args): result
+                for result, args in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    render_time = future.result()
+                    # Rendered in a worker process, so only its total time is known here
+                    record_span(os.path.basename(futures[future]['filepath']), 'pdf', render_time,
+                                process='worker')
+                    record(futures[future], render_time)
+                except Exception as e:
+                    record(futures[future], error=f"{type(e).__name__}: {e}")
+
+    @profiled(kind='report')
     def generate_monthly_report(self, year: int, month: int) -> str:
         """Generate monthly operations report"""
+        params = {'year': year, 'month': month}
         filename = f"monthly_report_{year}_{month:02d}.pdf"
-        filepath = os.path.join(self.output_dir, filename)
-
-        # Get data
-        conn = self.get_database_connection()
-
-        # Monthly statistics
-        monthly_stats = self._get_monthly_statistics(conn, year, month)
+        filepath = self.store.path_for('monthly', params, filename)
 
-        # Trends analysis
-        trends = self._get_monthly_trends(conn, year, month)
+        # Get data: statistics, trends, top customers and service types are independent
+        data = self._fetch_concurrently({
+            'monthly_stats': lambda conn: self._get_monthly_statistics(conn, year, month),
+            'trends': lambda conn: self._get_monthly_trends(conn, year, month),
+            'top_customers': lambda conn: self._get_top_customers(conn, year, month),
+            'service_analysis': lambda conn: self._get_service_type_analysis(conn, year, month)
+        })
 
-        # Top customers
-        top_customers = self._get_top_customers(conn, year, month)
-
-        # Service type analysis
-        service_analysis = self._get_service_type_analysis(conn, year, month)
-
-        conn.close()
+        # The request log is streamed while the PDF is laid out, so it is not fetched up front
+        request_log = None
+        if self.report_config['monthly_request_log']:
+            request_log = self._iter_monthly_request_log(year, month)
 
         # Generate PDF report
         self._create_monthly_report_pdf(
-            filepath, year, month, monthly_stats, trends,
-            top_customers, service_analysis
+            filepath, year, month, data['monthly_stats'], data['trends'],
+            data['top_customers'], data['service_analysis'], request_log=request_log
         )
+        self._catalog('monthly', params, filepath)
 
         return filepath
 
+    @profiled(kind='report')
     def generate_customer_analysis(self, customer_id: int) -> str:
         """Generate individual customer analysis report"""
+        params = {'customer_id': customer_id}
         filename = f"customer_analysis_{customer_id}.pdf"
-        filepath = os.path.join(self.output_dir, filename)
-
-        # Get data
-        conn = self.get_database_connection()
-
-        # Customer details
-        customer = self._get_customer_details(conn, customer_id)
-
-        # Service history
-        service_history = self._get_customer_service_history(conn, customer_id)
-
-        # Spending analysis
-        spending = self._get_customer_spending_analysis(conn, customer_id)
+        filepath = self.store.path_for('customer', params, filename)
 
-        # Loyalty metrics
-        loyalty = self._get_customer_loyalty_metrics(conn, customer_id)
+        # Get data: details, history, spending and loyalty are independent
+        data = self._fetch_concurrently({
+            'customer': lambda conn: self._get_customer_details(conn, customer_id),
+            'service_history': lambda conn: self._get_customer_service_history(conn, customer_id),
+            'spending': lambda conn: self._get_customer_spending_analysis(conn, customer_id),
+            'loyalty': lambda conn: self._get_customer_loyalty_metrics(conn, customer_id)
+        })
 
-        conn.close()
+        if data['customer'] is None:
+            raise ValueError(f"Customer {customer_id} not found")
 
         # Generate PDF report
         self._create_customer_analysis_pdf(
-            filepath, customer, service_history, spending, loyalty
+            filepath, data['customer'], data['service_history'], data['spending'], data['loyalty']
         )
+        self._catalog('customer', params, filepath)
 
         return filepath
 
-    def _get_daily_statistics(self, conn, date: str) -> Dict:
-        """Get daily statistics"""
-        cursor = conn.cursor(dictionary=True)
-
-        # Total requests
-        cursor.execute("""
-            SELECT COUNT(*) as total_requests,
-                   SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed_requests,
-                   SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled_requests,
-                   AVG(CASE WHEN status = 'completed' THEN TIMESTAMPDIFF(MINUTE, created_at, completed_at) END) as avg_completion_time
-            FROM service_requests
-            WHERE DATE(created_at) = %s
-        """, (date,))
-
-        stats = cursor.fetchone()
-
-        # Revenue
-        cursor.execute("""
-            SELECT COALESCE(SUM(actual_cost), 0) as total_revenue,
-                   COALESCE(AVG(actual_cost), 0) as avg_service_cost
-            FROM service_requests
-            WHERE DATE(created_at) = %s AND status = 'completed'
-        """, (date,))
-
-        revenue = cursor.fetchone()
-        stats.update(revenue)
-
-        # Driver stats
-        cursor.execute("""
-            SELECT COUNT(DISTINCT driver_id) as active_drivers,
-                   AVG(TIMESTAMPDIFF(MINUTE, created_at, started_at)) as avg_response_time
-            FROM service_requests
-            WHERE DATE(created_at) = %s AND driver_id IS NOT NULL
-        """, (date,))
-
-        driver_stats = cursor.fetchone()
-        stats.update(driver_stats)
-
-        cursor.close()
-        return stats
+    @profiled(kind='report')
+    def generate_customer_analyses(self, customer_ids: Optional[List[int]] = None, vip: bool = False,
+                                   workers: Optional[int] = None) -> List[Dict]:
+        """Generate customer analysis reports for many customers at once
+
+        Customers are given by id, selected with vip=True, or both (the VIPs
+        among the ids). Each batch of REPORT_CONFIG['customer_batch_size']
+        customers is fetched with four set-based queries and grouped in
+        memory, and its PDFs are rendered in parallel across a process pool.
+        A customer that is missing or fails to render is recorded in the
+        results and does not stop the rest of the batch.
+        """
+        if customer_ids is None and not vip:
+            raise ValueError("Give customer ids, vip=True or both")
+
+        ids = list(dict.fromkeys(int(customer_id) for customer_id in customer_ids or []))
+        if vip:
+            vip_ids = self._get_vip_customer_ids()
+            if customer_ids:
+                vip_set = set(vip_ids)
+                ids = [customer_id for customer_id in ids if customer_id in vip_set]
+            else:
+                ids = vip_ids
+        if workers is None:
+            workers = self.report_config['render_workers'] or os.cpu_count() or 1
+
+        batch_size = self.report_config['customer_batch_size']
+        results = []
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+
+            started = time.perf_counter()
+            data = self._get_customer_batch(batch)
+            print(f"Fetched data for {len(batch)} customers in {time.perf_counter() - started:.2f}s")
+
+            jobs = []
+            for customer_id in batch:
+                result = {
+                    'customer_id': customer_id,
+                    'filepath': self.store.path_for('customer', {'customer_id': customer_id},
+                                                    f"customer_analysis_{customer_id}.pdf"),
+                    'status': 'pending',
+                    'render_time': None,
+                    'error': None
+                }
+                results.append(result)
+
+                customer = data['customers'].get(customer_id)
+                if customer is None:
+                    result.update(status='failed', error=f"Customer {customer_id} not found")
+                    continue
+                jobs.append((result, (
+                    customer,
+                    data['history'].get(customer_id, []),
+                    data['spending'].get(customer_id, dict(EMPTY_SPENDING)),
+                    data['loyalty'].get(customer_id, dict(EMPTY_LOYALTY))
+                )))
+
+            self._render_batch(jobs, _render_customer_analysis, workers, 'customer_id',
+                               len(results) - len(jobs), len(ids))
+            for result, _ in jobs:
+                if result['status'] == 'completed':
+                    self._catalog('customer', {'customer_id': result['customer_id']}, result['filepath'])
 
-    def _get_requests_by_type(self, conn, date: str) -> List[Dict]:
-        """Get service requests grouped by type"""
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("""
-            SELECT st.name as service_type,
-                   COUNT(*) as request_count,
-                   COALESCE(SUM(sr.actual_cost), 0) as total_revenue,
-                   AVG(sr.actual_cost) as avg_cost
-            FROM service_requests sr
-            JOIN service_types st ON sr.service_type_id = st.id
-            WHERE DATE(sr.created_at) = %s
-            GROUP BY st.id, st.name
-            ORDER BY request_count DESC
-        """, (date,))
-
-        results = cursor.fetchall()
-        cursor.close()
         return results
 
-    def _get_driver_performance(self, conn, date: str) -> List[Dict]:
+    def _get_vip_customer_ids(self) -> List[int]:
+        """Get the ids of every VIP customer"""
+        with self.get_database_connection() as conn:
+            rows = self._fetch_all(conn, queries.CUSTOMER_IDS_VIP)
+        return [int(row['id']) for row in rows]
+
+    def _get_customer_batch(self, customer_ids: List[int]) -> Dict:
+        """Fetch the customer report data of many customers, grouped by customer id
+
+        Rows have the shapes the single-customer fetchers return; customers
+        without requests are simply absent from history, spending and loyalty.
+        """
+        data = self._fetch_concurrently({
+            'customers': lambda conn: self._fetch_all(conn, queries.CUSTOMER_DETAILS_BATCH,
+                                                      customer_ids=customer_ids),
+            'history': lambda conn: self._fetch_all(conn, queries.CUSTOMER_SERVICE_HISTORY_BATCH,
+                                                    customer_ids=customer_ids),
+            'spending': lambda conn: self._fetch_all(conn, queries.CUSTOMER_SPENDING_BATCH,
+                                                     customer_ids=customer_ids),
+            'loyalty': lambda conn: self._fetch_all(conn, queries.CUSTOMER_LOYALTY_BATCH,
+                                                    customer_ids=customer_ids)
+        })
+
+        history = {}
+        for row in data['history']:
+            del row['history_rank']
+            history.setdefault(int(row['customer_id']), []).append(row)
+
+        return {
+            'customers': {int(row['id']): row for row in data['customers']},
+            'history': history,
+            'spending': {int(row.pop('customer_id')): row for row in data['spending']},
+            'loyalty': {int(row.pop('customer_id')): row for row in data['loyalty']}
+        }
+
+    def _get_daily_request_rows(self, conn, period: DateRange) -> pd.DataFrame:
+        """Fetch every request row a daily report needs in a single round trip"""
+        with span(queries.DAILY_REQUEST_ROWS.name, 'query', source=self.source) as query_span:
+            if self.snapshot is not None:
+                df = build_frame(queries.DAILY_REQUEST_ROWS, self.snapshot, period=period)[DAILY_ROW_COLUMNS]
+                query_span.add_frame(df)
+                return df
+
+            cursor = conn.cursor(dictionary=True)
+
+            queries.DAILY_REQUEST_ROWS.execute(cursor, period=period)
+
+            rows = cursor.fetchall()
+            cursor.close()
+            query_span.add_rows(rows)
+        return self._daily_rows_frame(rows)
+
+    def _daily_rows_frame(self, rows: List[Dict]) -> pd.DataFrame:
+        """Build a typed frame from daily request rows"""
+        df = pd.DataFrame.from_records(rows, columns=DAILY_ROW_COLUMNS)
+
+        for column in ('created_at', 'started_at', 'completed_at'):
+            df[column] = pd.to_datetime(df[column])
+        for column in ('actual_cost', 'customer_rating', 'driver_id', 'service_type_id'):
+            df[column] = pd.to_numeric(df[column])
+
+        return df
+
+    @profiled()
+    def _build_daily_sections(self, rows: pd.DataFrame, period: DateRange) -> Dict:
+        """Compute every section of the daily report from one frame of request rows"""
+        created = rows[(rows['created_at'] >= period.start) & (rows['created_at'] < period.end)]
+        completed_in_period = rows[(rows['completed_at'] >= period.start) & (rows['completed_at'] < period.end)]
+
+        return {
+            'stats': self._summarize_daily_statistics(created),
+            'requests_by_type': self._summarize_requests_by_type(created),
+            'driver_performance': self._summarize_driver_performance(created),
+            'satisfaction': self._summarize_customer_satisfaction(completed_in_period),
+            'revenue': self._summarize_revenue(created)
+        }
+
+    @profiled()
+    def _summarize_daily_statistics(self, created: pd.DataFrame) -> Dict:
+        """Get daily statistics"""
+        is_completed = created['status'] == 'completed'
+        completed = created[is_completed]
+        with_driver = created[created['driver_id'].notna()]
+
+        return {
+            'total_requests': len(created),
+            'completed_requests': _sql_sum(is_completed.astype(int)),
+            'cancelled_requests': _sql_sum((created['status'] == 'cancelled').astype(int)),
+            'avg_completion_time': _sql_avg(_minutes_between(completed['created_at'], completed['completed_at'])),
+            'total_revenue': _sql_sum(completed['actual_cost']) or 0,
+            'avg_service_cost': _sql_avg(completed['actual_cost']) or 0,
+            'active_drivers': int(with_driver['driver_id'].nunique()),
+            'avg_response_time': _sql_avg(_minutes_between(with_driver['created_at'], with_driver['started_at']))
+        }
+
+    @profiled()
+    def _summarize_requests_by_type(self, created: pd.DataFrame) -> List[Dict]:
+        """Get service requests grouped by type"""
+        typed = created[created['service_type'].notna()]
+        if typed.empty:
+            return []
+
+        grouped = typed.groupby(['service_type_id', 'service_type'], sort=False)['actual_cost'].agg(
+            request_count='size', total_revenue='sum', avg_cost='mean'
+        ).reset_index()
+        grouped = grouped.sort_values('request_count', ascending=False, kind='stable')
+
+        return [
+            {
+                'service_type': row.service_type,
+                'request_count': int(row.request_count),
+                'total_revenue': float(row.total_revenue),
+                'avg_cost': _none_if_nan(row.avg_cost)
+            }
+            for row in grouped.itertuples(index=False)
+        ]
+
+    @profiled()
+    def _summarize_driver_performance(self, created: pd.DataFrame) -> List[Dict]:
         """Get driver performance for the day"""
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("""
-            SELECT d.first_name, d.last_name,
-                   COUNT(*) as services_completed,
-                   COALESCE(SUM(sr.actual_cost), 0) as revenue_generated,
-                   AVG(TIMESTAMPDIFF(MINUTE, sr.started_at, sr.completed_at)) as avg_service_time,
-                   AVG(sr.customer_rating) as avg_rating
-            FROM service_requests sr
-            JOIN drivers d ON sr.driver_id = d.id
-            WHERE DATE(sr.created_at) = %s AND sr.status = 'completed'
-            GROUP BY d.id, d.first_name, d.last_name
-            ORDER BY services_completed DESC
-        """, (date,))
-
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        completed = created[(created['status'] == 'completed') & created['driver_first_name'].notna()]
+        if completed.empty:
+            return []
 
-    def _get_customer_satisfaction(self, conn, date: str) -> Dict:
-        """Get customer satisfaction metrics"""
-        cursor = conn.cursor(dictionary=True)
+        completed = completed.assign(
+            service_time=_minutes_between(completed['started_at'], completed['completed_at'])
+        )
+        grouped = completed.groupby(['driver_id', 'driver_first_name', 'driver_last_name'], sort=False).agg(
+            services_completed=('id', 'size'),
+            revenue_generated=('actual_cost', 'sum'),
+            avg_service_time=('service_time', 'mean'),
+            avg_rating=('customer_rating', 'mean')
+        ).reset_index()
+        grouped = grouped.sort_values('services_completed', ascending=False, kind='stable')
+
+        return [
+            {
+                'first_name': row.driver_first_name,
+                'last_name': row.driver_last_name,
+                'services_completed': int(row.services_completed),
+                'revenue_generated': float(row.revenue_generated),
+                'avg_service_time': _none_if_nan(row.avg_service_time),
+                'avg_rating': _none_if_nan(row.avg_rating)
+            }
+            for row in grouped.itertuples(index=False)
+        ]
 
-        cursor.execute("""
-            SELECT AVG(customer_rating) as avg_rating,
-                   COUNT(CASE WHEN customer_rating >= 4 THEN 1 END) as satisfied_customers,
-                   COUNT(CASE WHEN customer_rating <= 2 THEN 1 END) as dissatisfied_customers,
-                   COUNT(*) as total_rated_services
-            FROM service_requests
-            WHERE DATE(completed_at) = %s AND customer_rating IS NOT NULL
-        """, (date,))
+    @profiled()
+    def _summarize_customer_satisfaction(self, completed_in_period: pd.DataFrame) -> Dict:
+        """Get customer satisfaction metrics"""
+        ratings = completed_in_period['customer_rating'].dropna()
 
-        result = cursor.fetchone()
-        cursor.close()
+        result = {
+            'avg_rating': _sql_avg(ratings),
+            'satisfied_customers': int((ratings >= 4).sum()),
+            'dissatisfied_customers': int((ratings <= 2).sum()),
+            'total_rated_services': len(ratings)
+        }
 
-        if result and result['total_rated_services'] > 0:
+        if result['total_rated_services'] > 0:
             result['satisfaction_rate'] = (result['satisfied_customers'] / result['total_rated_services']) * 100
         else:
             result['satisfaction_rate'] = 0
 
         return result
 
-    def _get_revenue_summary(self, conn, date: str) -> Dict:
+    @profiled()
+    def _summarize_revenue(self, created: pd.DataFrame) -> Dict:
         """Get revenue summary"""
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("""
-            SELECT COUNT(*) as paid_services,
-                   COALESCE(SUM(actual_cost), 0) as total_revenue,
-                   COALESCE(AVG(actual_cost), 0) as avg_service_cost,
-                   MIN(actual_cost) as min_cost,
-                   MAX(actual_cost) as max_cost
-            FROM service_requests
-            WHERE DATE(created_at) = %s AND status = 'completed' AND actual_cost IS NOT NULL
-        """, (date,))
-
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        costs = created.loc[created['status'] == 'completed', 'actual_cost'].dropna()
 
+        return {
+            'paid_services': len(costs),
+            'total_revenue': _sql_sum(costs) or 0,
+            'avg_service_cost': _sql_avg(costs) or 0,
+            'min_cost': _none_if_nan(costs.min()),
+            'max_cost': _none_if_nan(costs.max())
+        }
+
+    @profiled(kind='pdf')
     def _create_daily_report_pdf(self, filepath: str, date: str, stats: Dict,
                                requests_by_type: List[Dict], driver_performance: List[Dict],
                                satisfaction: Dict, revenue: Dict):
         """Create daily report PDF"""
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=1  # Center
-        )
+        # reportlab is only needed for PDF output, so it is not imported at startup
+        from python.pdf_engine import ReportDocument
 
-        section_style = ParagraphStyle(
-            'SectionTitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceAfter=12,
-            textColor=colors.darkblue
-        )
+        title = f"Daily Operations Report - {date}"
+        ReportDocument(filepath, title).build(self._daily_report_story(
+            title, stats, requests_by_type, driver_performance, satisfaction
+        ))
+        print(f"Daily report generated: {filepath}")
 
-        # Title
-        story.append(Paragraph(f"Daily Operations Report - {date}", title_style))
-        story.append(Spacer(1, 12))
+    def _chart(self, kind: str, data: Dict, title: str) -> Iterator:
+        """Yield a chart from the shared chart cache, unless charts are disabled"""
+        if not CHART_CONFIG['enabled']:
+            return
+        from python import pdf_engine as pdf
+        from python.charts import chart
 
-        # Company info
-        story.append(Paragraph(f"<b>{self.report_config['company_name']}</b>", styles['Normal']))
-        story.append(Paragraph(self.report_config['company_address'], styles['Normal']))
-        story.append(Paragraph(f"Phone: {self.report_config['company_phone']} | Email: {self.report_config['company_email']}", styles['Normal']))
-        story.append(Spacer(1, 20))
+        yield pdf.image(chart(kind, data, title), CHART_CONFIG['width'], CHART_CONFIG['height'])
+        yield pdf.spacer(12)
 
-        # Key Statistics
-        story.append(Paragraph("Key Statistics", section_style))
+    def _daily_report_story(self, title: str, stats: Dict, requests_by_type: List[Dict],
+                            driver_performance: List[Dict], satisfaction: Dict) -> Iterator:
+        """Yield the flowables of a daily report"""
+        from python import pdf_engine as pdf
 
-        stats_data = [
+        yield from pdf.title_block(title)
+
+        # Key Statistics
+        yield pdf.section("Key Statistics")
+        yield pdf.table([
             ['Metric', 'Value'],
             ['Total Requests', str(stats.get('total_requests', 0))],
             ['Completed Requests', str(stats.get('completed_requests', 0))],
             ['Cancelled Requests', str(stats.get('cancelled_requests', 0))],
-            ['Average Completion Time', f"{stats.get('avg_completion_time', 0):.1f} minutes"],
-            ['Total Revenue', f"${stats.get('total_revenue', 0):.2f}"],
+            ['Average Completion Time', f"{(stats.get('avg_completion_time') or 0):.1f} minutes"],
+            ['Total Revenue', pdf.money(stats.get('total_revenue'))],
             ['Active Drivers', str(stats.get('active_drivers', 0))],
-            ['Average Response Time', f"{stats.get('avg_response_time', 0):.1f} minutes"]
-        ]
-
-        stats_table = Table(stats_data)
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        story.append(stats_table)
-        story.append(Spacer(1, 20))
+            ['Average Response Time', f"{(stats.get('avg_response_time') or 0):.1f} minutes"]
+        ])
+        yield pdf.spacer()
 
         # Service Types Breakdown
-        story.append(Paragraph("Service Types Breakdown", section_style))
-
-        service_data = [['Service Type', 'Requests', 'Revenue', 'Avg Cost']]
-        for service in requests_by_type:
-            service_data.append([
+        yield pdf.section("Service Types Breakdown")
+        yield pdf.table([['Service Type', 'Requests', 'Revenue', 'Avg Cost']] + [
+            [
                 service['service_type'],
                 str(service['request_count']),
-                f"${service['total_revenue']:.2f}",
-                f"${service['avg_cost']:.2f}"
-            ])
-
-        service_table = Table(service_data)
-        service_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        story.append(service_table)
-        story.append(Spacer(1, 20))
+                pdf.money(service['total_revenue']),
+                pdf.money(service['avg_cost'])
+            ]
+            for service in requests_by_type
+        ])
+        yield pdf.spacer(12)
+        if requests_by_type:
+            yield from self._chart('service_mix', {
+                'labels': [service['service_type'] for service in requests_by_type],
+                'requests': [service['request_count'] for service in requests_by_type]
+            }, 'Requests by service type')
+        yield pdf.spacer()
 
         # Driver Performance
-        story.append(Paragraph("Driver Performance", section_style))
-
-        driver_data = [['Driver', 'Services', 'Revenue', 'Avg Time', 'Rating']]
-        for driver in driver_performance:
-            driver_data.append([
-                f"{driver['first_name']} {driver['last_name']}",
-                str(driver['services_completed']),
-                f"${driver['revenue_generated']:.2f}",
-                f"{driver['avg_service_time']:.1f}m",
-                f"{driver['avg_rating']:.1f}/5"
-            ])
-
-        driver_table = Table(driver_data)
-        driver_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        story.append(driver_table)
-        story.append(Spacer(1, 20))
+        yield pdf.section("Driver Performance")
+        yield from pdf.table_chunks(
+            ['Driver', 'Services', 'Revenue', 'Avg Time', 'Rating'],
+            (
+                [
+                    f"{driver['first_name']} {driver['last_name']}",
+                    str(driver['services_completed']),
+                    pdf.money(driver['revenue_generated']),
+                    f"{(driver['avg_service_time'] or 0):.1f}m",
+                    f"{(driver['avg_rating'] or 0):.1f}/5"
+                ]
+                for driver in driver_performance
+            ),
+            style='summary', empty='No driver activity.'
+        )
+        yield pdf.spacer(12)
+        top_drivers = sorted(driver_performance, key=lambda d: d['revenue_generated'] or 0, reverse=True)[:10]
+        if top_drivers:
+            yield from self._chart('drivers', {
+                'names': [f"{driver['first_name']} {driver['last_name']}" for driver in top_drivers],
+                'revenue': [driver['revenue_generated'] for driver in top_drivers],
+                'ratings': [driver['avg_rating'] for driver in top_drivers]
+            }, 'Revenue by driver (top 10)')
+        yield pdf.spacer()
 
         # Customer Satisfaction
-        story.append(Paragraph("Customer Satisfaction", section_style))
-
-        satisfaction_data = [
+        yield pdf.section("Customer Satisfaction")
+        yield pdf.table([
             ['Metric', 'Value'],
-            ['Average Rating', f"{satisfaction.get('avg_rating', 0):.1f}/5"],
+            ['Average Rating', f"{(satisfaction.get('avg_rating') or 0):.1f}/5"],
             ['Satisfaction Rate', f"{satisfaction.get('satisfaction_rate', 0):.1f}%"],
             ['Total Rated Services', str(satisfaction.get('total_rated_services', 0))]
-        ]
-
-        satisfaction_table = Table(satisfaction_data)
-        satisfaction_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        story.append(satisfaction_table)
-
-        # Build PDF
-        doc.build(story)
-        print(f"Daily report generated: {filepath}")
+        ])
 
     def _get_monthly_statistics(self, conn, year: int, month: int) -> Dict:
         """Get monthly statistics"""
-        cursor = conn.cursor(dictionary=True)
-        
-        start_date = f"{year}-{month:02d}-01"
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = f"{year}-{month:02d}-{last_day}"
-        
-        cursor.execute("""
-            SELECT COUNT(*) as total_requests,
-                   SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed_requests,
-                   SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled_requests,
-                   COALESCE(SUM(CASE WHEN status = 'completed' THEN actual_cost ELSE 0 END), 0) as total_revenue,
-                   AVG(CASE WHEN status = 'completed' THEN actual_cost END) as avg_service_cost
-            FROM service_requests
-            WHERE DATE(created_at) BETWEEN %s AND %s
-        """, (start_date, end_date))
-        
-        stats = cursor.fetchone()
-        cursor.close()
+        period = month_range(year, month)
+        stats = self._fetch_one(conn, queries.MONTHLY_STATISTICS, period=period)
         return stats
 
     def _get_monthly_trends(self, conn, year: int, month: int) -> List[Dict]:
         """Get monthly trends"""
-        cursor = conn.cursor(dictionary=True)
-        
-        start_date = f"{year}-{month:02d}-01"
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = f"{year}-{month:02d}-{last_day}"
-        
-        cursor.execute("""
-            SELECT DATE(created_at) as date,
-                   COUNT(*) as total,
-                   SUM(CASE WHEN status = 'completed' THEN actual_cost ELSE 0 END) as revenue
-            FROM service_requests
-            WHERE DATE(created_at) BETWEEN %s AND %s
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        """, (start_date, end_date))
-        
-        results = cursor.fetchall()
-        cursor.close()
+        period = month_range(year, month)
+        results = self._fetch_all(conn, queries.MONTHLY_TRENDS, period=period)
         return results
 
     def _get_top_customers(self, conn, year: int, month: int) -> List[Dict]:
         """Get top customers for the month"""
-        cursor = conn.cursor(dictionary=True)
-        
-        start_date = f"{year}-{month:02d}-01"
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = f"{year}-{month:02d}-{last_day}"
-        
-        cursor.execute("""
-            SELECT c.first_name, c.last_name,
-                   COUNT(sr.id) as service_count,
-                   SUM(sr.actual_cost) as total_spent
-            FROM customers c
-            JOIN service_requests sr ON c.id = sr.customer_id
-            WHERE DATE(sr.created_at) BETWEEN %s AND %s
-                  AND sr.status = 'completed'
-            GROUP BY c.id, c.first_name, c.last_name
-            ORDER BY total_spent DESC
-            LIMIT 10
-        """, (start_date, end_date))
-        
-        results = cursor.fetchall()
-        cursor.close()
+        period = month_range(year, month)
+        results = self._fetch_all(conn, queries.MONTHLY_TOP_CUSTOMERS, period=period)
         return results
 
     def _get_service_type_analysis(self, conn, year: int, month: int) -> Dict:
         """Get service type analysis"""
-        cursor = conn.cursor(dictionary=True)
-        
-        start_date = f"{year}-{month:02d}-01"
-        last_day = calendar.monthrange(year, month)[1]
-        end_date = f"{year}-{month:02d}-{last_day}"
-        
-        cursor.execute("""
-            SELECT st.name,
-                   COUNT(sr.id) as request_count,
-                   SUM(CASE WHEN sr.status = 'completed' THEN sr.actual_cost ELSE 0 END) as revenue
-            FROM service_types st
-            LEFT JOIN service_requests sr ON st.id = sr.service_type_id
-                  AND DATE(sr.created_at) BETWEEN %s AND %s
-            GROUP BY st.id, st.name
-            ORDER BY request_count DESC
-        """, (start_date, end_date))
-        
-        results = cursor.fetchall()
-        cursor.close()
+        period = month_range(year, month)
+        results = self._fetch_all(conn, queries.MONTHLY_SERVICE_TYPES, period=period)
         return {'service_types': results}
 
     def _get_customer_details(self, conn, customer_id: int) -> Dict:
         """Get customer details"""
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT * FROM customers WHERE id = %s
-        """, (customer_id,))
-        
-        result = cursor.fetchone()
-        cursor.close()
+        result = self._fetch_one(conn, queries.CUSTOMER_DETAILS, customer_id=customer_id)
         return result
 
     def _get_customer_service_history(self, conn, customer_id: int) -> List[Dict]:
         """Get customer service history"""
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT sr.*, st.name as service_type_name
-            FROM service_requests sr
-            LEFT JOIN service_types st ON sr.service_type_id = st.id
-            WHERE sr.customer_id = %s
-            ORDER BY sr.created_at DESC
-            LIMIT 50
-        """, (customer_id,))
-        
-        results = cursor.fetchall()
-        cursor.close()
+        results = self._fetch_all(conn, queries.CUSTOMER_SERVICE_HISTORY, customer_id=customer_id)
         return results
 
     def _get_customer_spending_analysis(self, conn, customer_id: int) -> Dict:
         """Get customer spending analysis"""
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT COUNT(*) as total_services,
-                   SUM(actual_cost) as total_spent,
-                   AVG(actual_cost) as avg_per_service,
-                   MAX(actual_cost) as max_spent
-            FROM service_requests
-            WHERE customer_id = %s AND status = 'completed'
-        """, (customer_id,))
-        
-        result = cursor.fetchone()
-        cursor.close()
+        result = self._fetch_one(conn, queries.CUSTOMER_SPENDING, customer_id=customer_id)
         return result
 
     def _get_customer_loyalty_metrics(self, conn, customer_id: int) -> Dict:
         """Get customer loyalty metrics"""
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT MIN(created_at) as first_service,
-                   MAX(created_at) as last_service,
-                   DATEDIFF(NOW(), MIN(created_at)) as days_as_customer,
-                   COUNT(*) as total_services
-            FROM service_requests
-            WHERE customer_id = %s
-        """, (customer_id,))
-        
-        result = cursor.fetchone()
-        cursor.close()
+        result = self._fetch_one(conn, queries.CUSTOMER_LOYALTY, customer_id=customer_id)
         return result
 
+    def _iter_monthly_request_log(self, year: int, month: int) -> Iterator[Dict]:
+        """Stream every request of the month as row dicts, a chunk at a time"""
+        period = month_range(year, month)
+        name = queries.MONTHLY_REQUEST_LOG.name
+        if self.snapshot is not None:
+            frame = build_frame(queries.MONTHLY_REQUEST_LOG, self.snapshot, period=period)
+            chunks = frame_chunks(frame, STREAMING_CONFIG['chunk_size'])
+            for chunk in traced_chunks(name, chunks, source=self.source):
+                yield from records(chunk)
+            return
+
+        # The connection stays checked out while the log is being rendered
+        with self.get_database_connection() as conn:
+            chunks = cursor_chunks(conn, queries.MONTHLY_REQUEST_LOG, period=period)
+            for chunk in traced_chunks(name, chunks, source=self.source):
+                yield from records(chunk)
+
+    @profiled(kind='pdf')
     def _create_monthly_report_pdf(self, filepath: str, year: int, month: int,
                                  monthly_stats: Dict, trends: List[Dict],
-                                 top_customers: List[Dict], service_analysis: Dict):
+                                 top_customers: List[Dict], service_analysis: Dict,
+                                 request_log: Optional[Iterable[Dict]] = None):
         """Create monthly report PDF"""
-        # Similar structure to daily report but with monthly data
-        # Implementation would be similar to daily report
+        from python.pdf_engine import ReportDocument
+
+        title = f"Monthly Operations Report - {datetime(year, month, 1):%B %Y}"
+        ReportDocument(filepath, title).build(self._monthly_report_story(
+            title, monthly_stats or {}, trends, top_customers, service_analysis, request_log
+        ))
         print(f"Monthly report generated: {filepath}")
 
+    def _monthly_report_story(self, title: str, stats: Dict, trends: List[Dict],
+                              top_customers: List[Dict], service_analysis: Dict,
+                              request_log: Optional[Iterable[Dict]]) -> Iterator:
+        """Yield the flowables of a monthly report"""
+        from python import pdf_engine as pdf
+
+        yield from pdf.title_block(title)
+
+        # Key Statistics
+        total = stats.get('total_requests') or 0
+        completed = stats.get('completed_requests') or 0
+        yield pdf.section("Key Statistics")
+        yield pdf.table([
+            ['Metric', 'Value'],
+            ['Total Requests', str(total)],
+            ['Completed Requests', str(completed)],
+            ['Cancelled Requests', str(stats.get('cancelled_requests') or 0)],
+            ['Completion Rate', f"{(completed / total * 100 if total else 0):.1f}%"],
+            ['Total Revenue', pdf.money(stats.get('total_revenue'))],
+            ['Average Service Cost', pdf.money(stats.get('avg_service_cost'))]
+        ])
+        yield pdf.spacer()
+
+        # Service Types
+        yield pdf.section("Service Types")
+        yield from pdf.table_chunks(
+            ['Service Type', 'Requests', 'Share', 'Revenue'],
+            (
+                [
+                    service['name'],
+                    str(service['request_count']),
+                    f"{(service['request_count'] / total * 100 if total else 0):.1f}%",
+                    pdf.money(service['revenue'])
+                ]
+                for service in service_analysis['service_types']
+            ),
+            style='summary', empty='No service types defined.'
+        )
+        yield pdf.spacer(12)
+        if total:
+            yield from self._chart('service_mix', {
+                'labels': [service['name'] for service in service_analysis['service_types']],
+                'requests': [service['request_count'] for service in service_analysis['service_types']]
+            }, 'Requests by service type')
+        yield pdf.spacer()
+
+        # Top Customers
+        yield pdf.section("Top Customers")
+        yield from pdf.table_chunks(
+            ['Rank', 'Customer', 'Services', 'Total Spent'],
+            (
+                [
+                    str(rank),
+                    f"{customer['first_name']} {customer['last_name']}",
+                    str(customer['service_count']),
+                    pdf.money(customer['total_spent'])
+                ]
+                for rank, customer in enumerate(top_customers, 1)
+            ),
+            style='summary', empty='No completed services this month.'
+        )
+        yield pdf.spacer()
+
+        # Daily Trends
+        yield pdf.section("Daily Trends")
+        if trends:
+            yield from self._chart('trend', {
+                'dates': [pdf.day(row['date']) for row in trends],
+                'requests': [row['total'] for row in trends],
+                'revenue': [row['revenue'] for row in trends]
+            }, 'Requests and revenue per day')
+        yield from pdf.table_chunks(
+            ['Date', 'Requests', 'Revenue'],
+            ([pdf.day(row['date']), str(row['total']), pdf.money(row['revenue'])] for row in trends),
+            empty='No requests this month.'
+        )
+
+        if request_log is None:
+            return
+
+        # Request Log: every request of the month, streamed from the database
+        yield pdf.page_break()
+        yield pdf.section("Request Log")
+        yield from pdf.table_chunks(
+            ['ID', 'Created', 'Service Type', 'Customer', 'Driver', 'Status', 'Cost'],
+            (
+                [
+                    str(row['id']),
+                    pdf.timestamp(row['created_at']),
+                    row['service_type'],
+                    f"{row['customer_first_name']} {row['customer_last_name']}",
+                    (f"{row['driver_first_name']} {row['driver_last_name']}"
+                     if row['driver_first_name'] is not None else '-'),
+                    row['status'],
+                    pdf.money(row['actual_cost']) if row['actual_cost'] is not None else '-'
+                ]
+                for row in request_log
+            ),
+            empty='No requests this month.'
+        )
+
+    @profiled(kind='pdf')
     def _create_customer_analysis_pdf(self, filepath: str, customer: Dict,
                                     service_history: List[Dict], spending: Dict,
                                     loyalty: Dict):
         """Create customer analysis PDF"""
-        # Customer-specific analysis report
+        from python.pdf_engine import ReportDocument
+
+        title = f"Customer Analysis - {customer['first_name']} {customer['last_name']}"
+        ReportDocument(filepath, title).build(self._customer_analysis_story(
+            title, customer, service_history, spending or {}, loyalty or {}
+        ))
         print(f"Customer analysis generated: {filepath}")
 
+    def _customer_analysis_story(self, title: str, customer: Dict, service_history: List[Dict],
+                                 spending: Dict, loyalty: Dict) -> Iterator:
+        """Yield the flowables of a customer analysis report"""
+        from python import pdf_engine as pdf
+
+        yield from pdf.title_block(title)
+
+        # Customer Profile
+        location = ', '.join(part for part in (customer.get('city'), customer.get('state')) if part)
+        yield pdf.section("Customer Profile")
+        yield pdf.table([
+            ['Field', 'Value'],
+            ['Customer ID', str(customer['id'])],
+            ['Name', f"{customer['first_name']} {customer['last_name']}"],
+            ['Email', pdf.text(customer.get('email'))],
+            ['Phone', pdf.text(customer.get('phone'))],
+            ['Location', location or '-'],
+            ['VIP', 'Yes' if customer.get('is_vip') else 'No'],
+            ['Status', pdf.text(customer.get('status'))],
+            ['Customer Since', pdf.day(customer.get('created_at'))]
+        ])
+        yield pdf.spacer()
+
+        # Spending
+        yield pdf.section("Spending")
+        yield pdf.table([
+            ['Metric', 'Value'],
+            ['Completed Services', str(spending.get('total_services') or 0)],
+            ['Total Spent', pdf.money(spending.get('total_spent'))],
+            ['Average per Service', pdf.money(spending.get('avg_per_service'))],
+            ['Largest Service', pdf.money(spending.get('max_spent'))]
+        ])
+        yield pdf.spacer()
+
+        # Loyalty
+        days_as_customer = loyalty.get('days_as_customer')
+        total_services = loyalty.get('total_services') or 0
+        months = max((days_as_customer or 0) / 30, 1)
+        yield pdf.section("Loyalty")
+        yield pdf.table([
+            ['Metric', 'Value'],
+            ['First Service', pdf.day(loyalty.get('first_service'))],
+            ['Last Service', pdf.day(loyalty.get('last_service'))],
+            ['Days as Customer', pdf.text(days_as_customer)],
+            ['Total Requests', str(total_services)],
+            ['Requests per Month', f"{total_services / months:.1f}"]
+        ])
+        yield pdf.spacer()
+
+        # Service History
+        yield pdf.section("Service History")
+        yield pdf.note(f"Most recent {len(service_history)} requests")
+        yield from pdf.table_chunks(
+            ['Date', 'Service Type', 'Status', 'Cost', 'Rating'],
+            (
+                [
+                    pdf.timestamp(service.get('created_at')),
+                    pdf.text(service.get('service_type_name')),
+                    pdf.text(service.get('status')),
+                    pdf.money(service.get('actual_cost')) if service.get('actual_cost') is not None else '-',
+                    f"{service['customer_rating']}/5" if service.get('customer_rating') is not None else '-'
+                ]
+                for service in service_history
+            ),
+            empty='No service requests yet.'
+        )
+
+_render_worker_generator = None
+
+
+def _render_customer_analysis(filepath: str, customer: Dict, service_history: List[Dict],
+                              spending: Dict, loyalty: Dict) -> float:
+    """Render one customer analysis PDF (runs inside a worker process), returning seconds taken"""
+    global _render_worker_generator
+    if _render_worker_generator is None:
+        _render_worker_generator = ReportGenerator()
+
+    started = time.perf_counter()
+    _render_worker_generator._create_customer_analysis_pdf(filepath, customer, service_history, spending, loyalty)
+    return time.perf_counter() - started
+
+
+def _render_daily_report(filepath: str, date: str, sections: Dict) -> float:
+    """Render one daily report PDF (runs inside a worker process), returning seconds taken"""
+    global _render_worker_generator
+    if _render_worker_generator is None:
+        _render_worker_generator = ReportGenerator()
+
+    started = time.perf_counter()
+    _render_worker_generator._create_daily_report_pdf(
+        filepath, date, sections['stats'], sections['requests_by_type'],
+        sections['driver_performance'], sections['satisfaction'], sections['revenue']
+    )
+    return time.perf_counter() - started
+
 def main():
     """Main function for command line usage"""
     import argparse
+    import json
 
     parser = argparse.ArgumentParser(description='Generate roadside assistance reports')
     parser.add_argument('--type', choices=['daily', 'monthly', 'customer'],
                        default='daily', help='Type of report to generate')
     parser.add_argument('--date', help='Date for daily report (YYYY-MM-DD)')
+    parser.add_argument('--from', dest='from_date', help='First date of a daily report range (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='to_date', help='Last date of a daily report range (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, help='Worker processes for rendering a batch of reports')
+    parser.add_argument('--force', action='store_true',
+                       help='Render daily reports even when their inputs are unchanged since the last run')
     parser.add_argument('--year', type=int, help='Year for monthly report')
     parser.add_argument('--month', type=int, help='Month for monthly report')
     parser.add_argument('--customer-id', type=int, help='Customer ID for customer analysis')
+    parser.add_argument('--customer-ids', help='Comma-separated customer IDs for a batch of customer analyses')
+    parser.add_argument('--vip', action='store_true', help='Customer analyses for every VIP customer')
+    parser.add_argument('--source', choices=['live', 'snapshot', 'duckdb'], default='live',
+                       help='Read from the live database, the local snapshot or the embedded DuckDB copy')
+    parser.add_argument('--pool-stats', action='store_true',
+                       help='Print connection pool statistics to stderr')
+    parser.add_argument('--profile', metavar='PATH',
+                       help='Write a span tree of query, step and PDF build timings as JSON')
+    parser.add_argument('--profile-prometheus', metavar='PATH',
+                       help='Write the profile totals in Prometheus text format')
 
     args = parser.parse_args()
 
-    generator = ReportGenerator()
+    profiler = None
+    if args.profile or args.profile_prometheus:
+        profiler = Profiler(f'report:{args.type}', source=args.source).start()
+
+    generator = ReportGenerator(args.source)
 
     try:
-        if args.type == 'daily':
+        if args.type == 'daily' and (args.from_date or args.to_date):
+            if not args.from_date or not args.to_date:
+                print("Error: --from and --to must be used together")
+                return 1
+            started = time.perf_counter()
+            results = generator.generate_daily_reports(args.from_date, args.to_date, args.workers, args.force)
+            failed = [r for r in results if r['status'] == 'failed']
+            unchanged = sum(r['status'] == 'unchanged' for r in results)
+            print(f"Generated {len(results) - len(failed) - unchanged} of {len(results)} daily reports "
+                  f"({unchanged} unchanged) in {time.perf_counter() - started:.2f}s")
+            for result in failed:
+                print(f"  {result['date']}: {result['error']}")
+            if failed:
+                return 1
+
+        elif args.type == 'daily':
             if args.date:
-                filepath = generator.generate_daily_report(args.date)
+                filepath = generator.generate_daily_report(args.date, args.force)
             else:
-                filepath = generator.generate_daily_report()
-            print(f"Daily report generated: {filepath}")
+                filepath = generator.generate_daily_report(force=args.force)
+            print(f"Daily report: {filepath}")
 
         elif args.type == 'monthly':
             if not args.year or not args.month:
@@ -611,6 +1129,20 @@ def main():
             filepath = generator.generate_monthly_report(args.year, args.month)
             print(f"Monthly report generated: {filepath}")
 
+        elif args.type == 'customer' and (args.customer_ids or args.vip):
+            customer_ids = None
+            if args.customer_ids:
+                customer_ids = [int(value) for value in args.customer_ids.split(',') if value.strip()]
+            started = time.perf_counter()
+            results = generator.generate_customer_analyses(customer_ids, vip=args.vip, workers=args.workers)
+            failed = [r for r in results if r['status'] == 'failed']
+            print(f"Generated {len(results) - len(failed)} of {len(results)} customer analyses "
+                  f"in {time.perf_counter() - started:.2f}s")
+            for result in failed:
+                print(f"  {result['customer_id']}: {result['error']}")
+            if failed:
+                return 1
+
         elif args.type == 'customer':
             if not args.customer_id:
                 print("Error: --customer-id required for customer analysis")
@@ -622,6 +1154,13 @@ def main():
         print(f"Error generating report: {e}")
         return 1
 
+    finally:
+        if args.pool_stats:
+            print(json.dumps(generator.pool.stats(), indent=2), file=sys.stderr)
+        if profiler is not None:
+            profiler.stop()
+            profiler.save(args.profile, args.profile_prometheus)
+
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Report Store
+Generated reports kept in sharded subdirectories of PATHS['reports'], with an
+embedded SQLite catalog recording each one's type, parameters, input
+fingerprint, size and creation time
+
+Finding the latest report for a set of parameters is an indexed lookup, and
+retention sweeps walk the catalog oldest first in batches; neither lists the
+report directories. Reports live at <type>/<shard>/<file>, the shard being
+the first two hex digits of the hash of the type and parameters.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import AUTOMATION_CONFIG, PATHS, REPORT_STORE_CONFIG
+
+CATALOG_FILE = 'catalog.sqlite3'
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS artifacts (
+        id INTEGER PRIMARY KEY,
+        report_type TEXT NOT NULL,
+        params_key TEXT NOT NULL,
+        params TEXT NOT NULL,
+        fingerprint TEXT,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_lookup ON artifacts (report_type, params_key, created_at);
+    CREATE INDEX IF NOT EXISTS idx_created ON artifacts (created_at);
+"""
+
+# Flat file names written before the store existed: pattern -> (report type, params)
+LEGACY_NAMES = [
+    (re.compile(r'^daily_report_(\d{4}-\d{2}-\d{2})\.pdf$'), 'daily', lambda m: {'date': m.group(1)}),
+    (re.compile(r'^monthly_report_(\d{4})_(\d{2})\.pdf$'), 'monthly',
+     lambda m: {'year': int(m.group(1)), 'month': int(m.group(2))}),
+    (re.compile(r'^customer_analysis_(\d+)\.pdf$'), 'customer', lambda m: {'customer_id': int(m.group(1))})
+]
+
+
+class ReportStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or PATHS['reports']
+        self.catalog = os.path.join(self.root, CATALOG_FILE)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.root, exist_ok=True)
+        with closing(self._connect()) as conn:
+            # WAL lets the scheduler, report workers and CLI read while one of them writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the catalog; a connection per call keeps the store safe to share between threads"""
+        conn = sqlite3.connect(self.catalog, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def params_key(report_type: str, params: Dict) -> str:
+        """Hash a report type and its parameters into the key reports are looked up by"""
+        payload = json.dumps({'type': report_type, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, report_type: str, params: Dict, filename: str) -> str:
+        """Get the path a report should be written to, creating its shard directory"""
+        shard = os.path.join(self.root, report_type, self.params_key(report_type, params)[:2])
+        os.makedirs(shard, exist_ok=True)
+        return os.path.join(shard, filename)
+
+    def _entry(self, row: sqlite3.Row) -> Dict:
+        entry = dict(row)
+        entry['params'] = json.loads(entry['params'])
+        entry['path'] = os.path.join(self.root, entry['path'])
+        return entry
+
+    def add(self, report_type: str, params: Dict, path: str, fingerprint: Optional[str] = None,
+            created_at: Optional[float] = None) -> Dict:
+        """Record a written report, replacing the entry of an earlier report at the same path"""
+        relative = os.path.relpath(path, self.root)
+        values = (report_type, self.params_key(report_type, params),
+                  json.dumps(params, sort_keys=True, default=str), fingerprint, relative,
+                  os.path.getsize(path), created_at or time.time())
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("""
+                INSERT INTO artifacts (report_type, params_key, params, fingerprint, path, size, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    report_type = excluded.report_type, params_key = excluded.params_key,
+                    params = excluded.params, fingerprint = excluded.fingerprint,
+                    size = excluded.size, created_at = excluded.created_at
+            """, values)
+            row = conn.execute('SELECT * FROM artifacts WHERE path = ?', (relative,)).fetchone()
+        return self._entry(row)
+
+    def find(self, report_type: str, params: Dict) -> Optional[Dict]:
+        """Get the newest report of a type and parameters, None if there is none on disk"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("""
+                SELECT * FROM artifacts WHERE report_type = ? AND params_key = ?
+                ORDER BY created_at DESC LIMIT 1
+            """, (report_type, self.params_key(report_type, params))).fetchone()
+        if row is None:
+            return None
+
+        entry = self._entry(row)
+        if not os.path.exists(entry['path']):
+            # Deleted behind the catalog's back
+            self._forget([entry['id']])
+            return None
+        return entry
+
+    def entries(self, report_type: Optional[str] = None, before: Optional[float] = None,
+                limit: int = 100) -> List[Dict]:
+        """List catalogued reports, newest first"""
+        sql = 'SELECT * FROM artifacts WHERE 1 = 1'
+        params = []
+        if report_type:
+            sql += ' AND report_type = ?'
+            params.append(report_type)
+        if before is not None:
+            sql += ' AND created_at < ?'
+            params.append(before)
+        sql += ' ORDER BY created_at DESC LIMIT ?'
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            return [self._entry(row) for row in conn.execute(sql, params)]
+
+    def _forget(self, ids: List[int]):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany('DELETE FROM artifacts WHERE id = ?', [(i,) for i in ids])
+
+    def sweep(self, max_age_days: Optional[int] = None, batch_size: Optional[int] = None,
+              max_batches: Optional[int] = None) -> Dict:
+        """Delete reports older than max_age_days, oldest first, a batch at a time
+
+        Each batch is read from the created_at index, its files unlinked and
+        its entries removed in one transaction. A run stops after max_batches
+        so a large backlog is worked off over several runs instead of one
+        long one; 'remaining' tells whether anything expired is left.
+        """
+        max_age_days = max_age_days if max_age_days is not None else AUTOMATION_CONFIG['max_file_age_days']
+        batch_size = batch_size or REPORT_STORE_CONFIG['sweep_batch_size']
+        max_batches = max_batches or REPORT_STORE_CONFIG['sweep_max_batches']
+        cutoff = time.time() - max_age_days * 86400
+
+        summary = {'deleted': 0, 'bytes': 0, 'batches': 0, 'remaining': False}
+        while summary['batches'] < max_batches:
+            with closing(self._connect()) as conn:
+                rows = conn.execute("""
+                    SELECT id, path, size FROM artifacts WHERE created_at < ?
+                    ORDER BY created_at LIMIT ?
+                """, (cutoff, batch_size)).fetchall()
+            if not rows:
+                return summary
+
+            shards = set()
+            for row in rows:
+                path = os.path.join(self.root, row['path'])
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                shards.add(os.path.dirname(path))
+            self._forget([row['id'] for row in rows])
+
+            for shard in shards:
+                try:
+                    os.rmdir(shard)
+                except OSError:
+                    # Still holds other reports
+                    pass
+
+            summary['deleted'] += len(rows)
+            summary['bytes'] += sum(row['size'] for row in rows)
+            summary['batches'] += 1
+
+        with closing(self._connect()) as conn:
+            summary['remaining'] = conn.execute(
+                'SELECT 1 FROM artifacts WHERE created_at < ? LIMIT 1', (cutoff,)
+            ).fetchone() is not None
+        return summary
+
+    def adopt(self) -> Dict:
+        """Move flat report files from the store's root into their shards and catalog them
+
+        For reports written before the store existed; their modification
+        time becomes their creation time and a daily report's .fingerprint
+        file, if any, its fingerprint.
+        """
+        summary = {'adopted': 0, 'skipped': 0}
+        with os.scandir(self.root) as files:
+            for item in files:
+                if not item.is_file():
+                    continue
+                for pattern, report_type, parse in LEGACY_NAMES:
+                    match = pattern.match(item.name)
+                    if match:
+                        break
+                else:
+                    if not item.name.startswith(CATALOG_FILE) and not item.name.endswith('.fingerprint'):
+                        summary['skipped'] += 1
+                    continue
+
+                params = parse(match)
+                fingerprint = None
+                if os.path.exists(item.path + '.fingerprint'):
+                    with open(item.path + '.fingerprint') as f:
+                        fingerprint = f.read().strip()
+                    os.remove(item.path + '.fingerprint')
+
+                created_at = item.stat().st_mtime
+                path = self.path_for(report_type, params, item.name)
+                os.replace(item.path, path)
+                self.add(report_type, params, path, fingerprint, created_at)
+                summary['adopted'] += 1
+        return summary
+
+    def stats(self) -> Dict:
+        """Count and size of the catalogued reports by type"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT report_type, COUNT(*) as reports, SUM(size) as bytes,
+                       MIN(created_at) as oldest, MAX(created_at) as newest
+                FROM artifacts GROUP BY report_type ORDER BY report_type
+            """).fetchall()
+        return {
+            row['report_type']: {
+                'reports': row['reports'],
+                'bytes': row['bytes'],
+                'oldest': datetime.fromtimestamp(row['oldest']).isoformat(timespec='seconds'),
+                'newest': datetime.fromtimestamp(row['newest']).isoformat(timespec='seconds')
+            }
+            for row in rows
+        }
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Catalog, look up and expire generated reports')
+    parser.add_argument('--stats', action='store_true', help='Print report counts and sizes by type')
+    parser.add_argument('--list', metavar='TYPE', nargs='?', const='',
+                       help='List the newest reports, optionally of one type')
+    parser.add_argument('--limit', type=int, default=20, help='Reports listed by --list')
+    parser.add_argument('--sweep', action='store_true',
+                       help='Delete reports older than MAX_FILE_AGE_DAYS, in batches')
+    parser.add_argument('--max-age-days', type=int, help='Override MAX_FILE_AGE_DAYS for --sweep')
+    parser.add_argument('--adopt', action='store_true',
+                       help='Move flat report files from the reports directory into the store')
+
+    args = parser.parse_args()
+    store = ReportStore()
+
+    if args.adopt:
+        summary = store.adopt()
+        print(f"Adopted {summary['adopted']} reports ({summary['skipped']} other files left in place)")
+
+    if args.sweep:
+        summary = store.sweep(args.max_age_days)
+        print(f"Deleted {summary['deleted']} reports ({summary['bytes'] / 1024 / 1024:.1f} MB) "
+              f"in {summary['batches']} batches" + (', more remain' if summary['remaining'] else ''))
+
+    if args.list is not None:
+        for entry in store.entries(args.list or None, limit=args.limit):
+            created = datetime.fromtimestamp(entry['created_at']).isoformat(sep=' ', timespec='seconds')
+            print(f"{created}  {entry['report_type']:<9} {json.dumps(entry['params'], sort_keys=True)}  "
+                  f"{entry['path']}")
+
+    if args.stats:
+        print(json.dumps(store.stats(), indent=2))
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
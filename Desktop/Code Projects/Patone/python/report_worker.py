@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Report Worker
+Generates the reports queued in the `reports` table, so a web request only
+inserts a pending row and never waits on PDF generation
+
+Workers claim pending rows with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of worker processes can drain the same queue without taking a row
+twice. Claimed rows run on a bounded thread pool; each row's status,
+timings, file_path or error are written back when it finishes. Rows left
+in 'processing' by a worker that died are requeued after REPORT_WORKER_STALE_SECONDS.
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import PATHS, REPORT_WORKER_CONFIG
+from python.db_pool import get_pool
+
+logger = logging.getLogger('report_worker')
+
+# The queue lives in MySQL whatever source the reports read from
+CLAIM_PENDING = """
+    SELECT id, report_type, parameters
+    FROM reports
+    WHERE status = 'pending'
+    ORDER BY created_at, id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+MARK_PROCESSING = """
+    UPDATE reports
+    SET status = 'processing', worker = %s, started_at = NOW(), attempts = attempts + 1,
+        error_message = NULL
+    WHERE id IN ({ids})
+"""
+
+MARK_FINISHED = """
+    UPDATE reports
+    SET status = %s, file_path = %s, error_message = %s, completed_at = NOW(), duration_seconds = %s
+    WHERE id = %s AND worker = %s AND status = 'processing'
+"""
+
+# Rows a dead worker left in 'processing': retried until max_attempts, then failed
+REQUEUE_STALE = """
+    UPDATE reports
+    SET status = 'pending', worker = NULL
+    WHERE status = 'processing' AND started_at < NOW() - INTERVAL %s SECOND AND attempts < %s
+"""
+
+FAIL_STALE = """
+    UPDATE reports
+    SET status = 'failed', error_message = 'Worker stopped before the report finished', completed_at = NOW()
+    WHERE status = 'processing' AND started_at < NOW() - INTERVAL %s SECOND AND attempts >= %s
+"""
+
+# Report types: report_type -> handler(worker, parameters) returning the file path
+REPORT_HANDLERS: Dict[str, Callable] = {}
+
+
+def report_handler(*report_types: str):
+    """Register the function that generates one or more report types"""
+    def register(func):
+        for report_type in report_types:
+            REPORT_HANDLERS[report_type] = func
+        return func
+    return register
+
+
+@report_handler('daily')
+def daily_report(worker: 'ReportWorker', report_type: str, params: Dict) -> str:
+    """Daily report for params['date'] (default: today)"""
+    return worker.reports.generate_daily_report(params.get('date'))
+
+
+@report_handler('monthly')
+def monthly_report(worker: 'ReportWorker', report_type: str, params: Dict) -> str:
+    """Monthly report for params['year'] and params['month']"""
+    return worker.reports.generate_monthly_report(int(params['year']), int(params['month']))
+
+
+@report_handler('customer')
+def customer_report(worker: 'ReportWorker', report_type: str, params: Dict) -> str:
+    """Customer analysis report for params['customer_id']"""
+    return worker.reports.generate_customer_analysis(int(params['customer_id']))
+
+
+@report_handler('demand', 'drivers', 'customers', 'revenue', 'analysis')
+def analysis_export(worker: 'ReportWorker', report_type: str, params: Dict) -> str:
+    """One analysis (or all of them for 'analysis') written to the exports directory as JSON"""
+    from python.data_analyzer import ANALYSES
+
+    days = int(params['days']) if params.get('days') else None
+    if report_type == 'analysis':
+        results = worker.analyzer.analyze_all(days)
+        # analyze_all reports a failed analysis inside its own section
+        failed = [name for name, document in results.items() if isinstance(document, dict) and 'error' in document]
+        if failed:
+            raise RuntimeError(f"Analyses failed: {', '.join(failed)}")
+    else:
+        method, default_days = ANALYSES[report_type]
+        results = getattr(worker.analyzer, method)(days or default_days)
+        if 'error' in results:
+            raise RuntimeError(results['error'])
+
+    os.makedirs(PATHS['exports'], exist_ok=True)
+    file_path = os.path.join(PATHS['exports'], f"{report_type}_{params['report_id']}.json")
+    with open(file_path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+    return file_path
+
+
+class ReportWorker:
+    def __init__(self, source: Optional[str] = None, workers: Optional[int] = None, pool=None):
+        self.source = source or REPORT_WORKER_CONFIG['source']
+        self.workers = workers or REPORT_WORKER_CONFIG['workers']
+        self.pool = pool or get_pool()
+        self.name = f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='report')
+        self._in_flight: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # Kept between reports so their pools and caches stay warm
+        self._reports = None
+        self._analyzer = None
+
+    @property
+    def reports(self):
+        if self._reports is None:
+            from python.report_generator import ReportGenerator
+            self._reports = ReportGenerator(self.source)
+        return self._reports
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            from python.data_analyzer import DataAnalyzer
+            self._analyzer = DataAnalyzer(self.source)
+        return self._analyzer
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Run one update in its own transaction and return the rows it changed"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                rows = cursor.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return rows
+
+    def claim(self, limit: int) -> List[Dict]:
+        """Atomically take up to `limit` pending rows for this worker"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(CLAIM_PENDING, (limit,))
+                rows = cursor.fetchall()
+                if rows:
+                    ids = [row[0] for row in rows]
+                    cursor.execute(MARK_PROCESSING.format(ids=', '.join(['%s'] * len(ids))),
+                                   (self.name, *ids))
+                # Committing releases the row locks with the rows already marked as ours
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        claimed = []
+        for report_id, report_type, parameters in rows:
+            try:
+                params = json.loads(parameters) if parameters else {}
+            except ValueError:
+                params = None
+            claimed.append({'id': report_id, 'report_type': report_type, 'params': params})
+        return claimed
+
+    def requeue_stale(self) -> Dict:
+        """Return rows abandoned by dead workers to the queue, or fail them after max_attempts"""
+        stale = REPORT_WORKER_CONFIG['stale_seconds']
+        attempts = REPORT_WORKER_CONFIG['max_attempts']
+        counts = {
+            'requeued': self._execute(REQUEUE_STALE, (stale, attempts)),
+            'failed': self._execute(FAIL_STALE, (stale, attempts))
+        }
+        if counts['requeued'] or counts['failed']:
+            logger.warning("Stale reports: %d requeued, %d failed", counts['requeued'], counts['failed'])
+        return counts
+
+    def process(self, job: Dict) -> Dict:
+        """Generate one claimed report and record the outcome"""
+        started = time.perf_counter()
+        file_path, error = None, None
+        try:
+            handler = REPORT_HANDLERS.get(job['report_type'])
+            if handler is None:
+                raise ValueError(f"Unknown report type {job['report_type']}")
+            if not isinstance(job['params'], dict):
+                raise ValueError('parameters is not a JSON object')
+            file_path = handler(self, job['report_type'], dict(job['params'], report_id=job['id']))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("Report %s (%s) failed", job['id'], job['report_type'])
+
+        duration = round(time.perf_counter() - started, 3)
+        status = 'failed' if error else 'completed'
+        if not self._execute(MARK_FINISHED, (status, file_path, error, duration, job['id'], self.name)):
+            # Requeued as stale while it ran; the row now belongs to another worker
+            logger.warning("Report %s was taken over by another worker, outcome not recorded", job['id'])
+        logger.info("Report %s (%s) %s in %.1fs", job['id'], job['report_type'], status, duration)
+        return {'id': job['id'], 'status': status, 'file_path': file_path, 'error': error, 'duration': duration}
+
+    def _done(self, report_id: int, future: Future):
+        with self._lock:
+            self._in_flight.pop(report_id, None)
+
+    def poll(self) -> List[Future]:
+        """Claim as many rows as there are free workers and start them"""
+        with self._lock:
+            free = self.workers - len(self._in_flight)
+        if free <= 0:
+            return []
+
+        futures = []
+        for job in self.claim(free):
+            future = self.executor.submit(self.process, job)
+            with self._lock:
+                self._in_flight[job['id']] = future
+            future.add_done_callback(lambda f, report_id=job['id']: self._done(report_id, f))
+            futures.append(future)
+        return futures
+
+    def drain(self) -> List[Dict]:
+        """Process the queue until it is empty, then return every outcome"""
+        outcomes = []
+        futures = self.poll()
+        while futures:
+            done = futures.pop(0).result()
+            outcomes.append(done)
+            futures.extend(self.poll())
+        return outcomes
+
+    def serve(self):
+        """Claim and run reports until stop() is called (SIGTERM or SIGINT from main)"""
+        logger.info("Report worker %s started with %d workers (source: %s)", self.name, self.workers, self.source)
+        last_sweep = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_sweep >= REPORT_WORKER_CONFIG['stale_seconds'] / 2:
+                    self.requeue_stale()
+                    last_sweep = time.monotonic()
+                started = self.poll()
+            except Exception:
+                logger.exception("Could not claim reports")
+                started = []
+            # Poll again at once while there is work and room for it
+            if not started:
+                self._stop.wait(REPORT_WORKER_CONFIG['poll_seconds'])
+        logger.info("Report worker stopping, finishing %d running reports", len(self._in_flight))
+        self.executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    from python.scheduler import configure_logging
+
+    parser = argparse.ArgumentParser(description='Generate the reports queued in the reports table')
+    parser.add_argument('--once', action='store_true', help='Drain the queue and exit instead of waiting for work')
+    parser.add_argument('--source', choices=['live', 'snapshot', 'duckdb'],
+                       help='Read report data from the live database, the local snapshot or the embedded DuckDB copy')
+    parser.add_argument('--workers', type=int, help='Reports generated at once (default: REPORT_WORKERS)')
+
+    args = parser.parse_args()
+
+    configure_logging(logger)
+    worker = ReportWorker(args.source, args.workers)
+
+    if args.once:
+        worker.requeue_stale()
+        outcomes = worker.drain()
+        worker.executor.shutdown(wait=True)
+        print(f"Processed {len(outcomes)} reports, "
+              f"{sum(outcome['status'] == 'failed' for outcome in outcomes)} failed")
+        return 1 if any(outcome['status'] == 'failed' for outcome in outcomes) else 0
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: worker.stop())
+    worker.serve()
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
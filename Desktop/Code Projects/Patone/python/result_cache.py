@@ -0,0 +1,293 @@
+"""
+Roadside Assistance Admin Platform - Analysis Result Cache
+Two-level (in-process LRU over on-disk) cache of DataAnalyzer results keyed on
+the analysis, its parameters and the watermark of the tables it reads
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from python.config import PATHS, RESULT_CACHE_CONFIG
+from python.profiling import span
+
+# Bump when an analysis changes its output so stale entries stop matching
+CACHE_FORMAT_VERSION = 3
+
+# Entries are JSON, never pickle: the cache tree is shared with the PHP app, and
+# loading a pickle someone dropped there would run their code
+ENTRY_SUFFIX = '.json'
+# Pickled entries from before CACHE_FORMAT_VERSION 3, never read, only aged out
+LEGACY_SUFFIX = '.pkl'
+
+
+def _json_default(value: Any) -> Any:
+    """Encode numpy scalars as their Python values and anything else as a string"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class ResultCache:
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None,
+                 memory_entries: Optional[int] = None, max_disk_bytes: Optional[int] = None):
+        self.path = path or PATHS['results']
+        self.ttl = ttl if ttl is not None else RESULT_CACHE_CONFIG['ttl']
+        self.memory_entries = (memory_entries if memory_entries is not None
+                               else RESULT_CACHE_CONFIG['memory_entries'])
+        self.max_disk_bytes = (max_disk_bytes if max_disk_bytes is not None
+                               else RESULT_CACHE_CONFIG['max_disk_bytes'])
+
+        # Values are kept as JSON text and decoded on every read, so callers can never mutate a cached result
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stores': 0,
+            'evictions': 0,
+            'compute_time': 0.0
+        }
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def make_key(name: str, params: Dict, watermark: Any) -> str:
+        """Hash an analysis name, its parameters and a data watermark into a cache key"""
+        payload = json.dumps({
+            'version': CACHE_FORMAT_VERSION,
+            'name': name,
+            'params': params,
+            'watermark': watermark
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}{ENTRY_SUFFIX}")
+
+    def _count(self, stat: str, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return not self.ttl or time.time() - stored_at <= self.ttl
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look a key up in memory, then on disk; returns (hit, value)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is not None:
+            stored_at, payload = entry
+            if self._is_fresh(stored_at):
+                self._count('hits')
+                self._count('memory_hits')
+                return True, json.loads(payload)
+            with self._lock:
+                self._memory.pop(key, None)
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            stored_at, payload = entry
+            if self._is_fresh(stored_at):
+                self._remember(key, stored_at, payload)
+                self._count('hits')
+                self._count('disk_hits')
+                return True, json.loads(payload)
+            self._remove_disk(key)
+            self._count('expired')
+
+        self._count('misses')
+        return False, None
+
+    def set(self, key: str, value: Any) -> str:
+        """Store a value in both layers, returning the JSON it was stored as
+
+        Callers hand back json.loads() of the returned text rather than the
+        value itself, so a fresh result has the same keys and types as a
+        cached one.
+        """
+        stored_at = time.time()
+        payload = json.dumps(value, default=_json_default)
+        self._remember(key, stored_at, payload)
+        self._write_disk(key, stored_at, payload)
+        self._count('stores')
+        self._evict_disk()
+        return payload
+
+    def get_or_compute(self, name: str, params: Dict, watermark: Any, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for these inputs, computing and storing it on a miss"""
+        return self.get_or_compute_key(self.make_key(name, params, watermark), compute)
+
+    def get_or_compute_key(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for a key, computing and storing it on a miss"""
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        started = time.perf_counter()
+        value = compute()
+        self._count('compute_time', time.perf_counter() - started)
+        return json.loads(self.set(key, value))
+
+    def _remember(self, key: str, stored_at: float, payload: str):
+        """Put an entry in the in-process LRU, evicting the least recently used"""
+        if self.memory_entries < 1:
+            return
+        with self._lock:
+            self._memory[key] = (stored_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        """Read an on-disk entry, treating unreadable files as misses"""
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove_disk(key)
+            return None
+
+        # Touch the file so size-based eviction drops least recently used entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['stored_at'], entry['payload']
+
+    def _write_disk(self, key: str, stored_at: float, payload: str):
+        """Atomically write an on-disk entry through a temp file unique to this writer"""
+        f = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.path, prefix=f"{key}.",
+                                        suffix='.tmp', delete=False)
+        try:
+            with f:
+                json.dump({'stored_at': stored_at, 'payload': payload}, f)
+            os.replace(f.name, self._entry_path(key))
+        except BaseException:
+            try:
+                os.remove(f.name)
+            except OSError:
+                pass
+            raise
+
+    def _remove_disk(self, key: str):
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        """Drop entries idle past the TTL, then least recently used ones until under max_disk_bytes"""
+        entries = []
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith((ENTRY_SUFFIX, LEGACY_SUFFIX)):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        evicted = 0
+        for mtime, size, path in entries:
+            expired = self.ttl and now - mtime > self.ttl
+            if not expired and total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        if evicted:
+            self._count('evictions', evicted)
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._memory.clear()
+        for entry in os.scandir(self.path):
+            if entry.name.endswith((ENTRY_SUFFIX, LEGACY_SUFFIX)):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict:
+        """Get hit/miss statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+def cached_analysis(name: str, tables: Sequence[str]):
+    """Cache an analyze_* method on its arguments and the watermark of the tables it reads
+
+    The decorated method's owner must provide `result_cache` (None disables
+    caching), `source` and `data_watermark(tables)`; a `streaming` flag, when
+    present, is part of the key since streamed results are approximate.
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        def cache_key(self, *args, **kwargs) -> str:
+            """Get the cache key a call with these arguments would use"""
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {key: value for key, value in bound.arguments.items() if key != 'self'}
+            params['source'] = self.source
+            params['streaming'] = getattr(self, 'streaming', False)
+            return ResultCache.make_key(name, params, self.data_watermark(tables))
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with span(name, 'analysis') as analysis_span:
+                if self.result_cache is None:
+                    return method(self, *args, **kwargs)
+
+                def compute():
+                    analysis_span.set(cache='miss')
+                    return method(self, *args, **kwargs)
+
+                analysis_span.set(cache='hit')
+                return self.result_cache.get_or_compute_key(cache_key(self, *args, **kwargs), compute)
+
+        # Lets callers that compute the result themselves (analyze_all) share entries
+        wrapper.cache_key = cache_key
+        wrapper.tables = list(tables)
+        return wrapper
+    return decorate
+
+
+_shared_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache so the in-memory layer is shared"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResultCache()
+    return _shared_cache
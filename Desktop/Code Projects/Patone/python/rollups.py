@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Hourly Rollups
+Incrementally maintained per-hour, per-service-type aggregates of service
+requests that back the demand and revenue analyses
+
+Rollups are bucketed by database-time hour and only hours whose source rows
+changed since the last refresh are recomputed, so reading a year of demand
+costs about as much as reading a day. Buckets are shifted into the report
+time zone on read; with a report zone whose offset is not a whole number of
+hours each bucket is attributed to the local hour it starts in.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import PATHS, ROLLUP_CONFIG
+from python.frames import local_times
+from python.profiling import profiled
+from python.query_builder import DateRange
+from python.snapshot import file_lock, read_arrow, replacing, write_arrow
+from python import queries
+
+SUM_COLUMNS = [
+    'request_count', 'response_time_sum', 'response_time_count',
+    'revenue_count', 'revenue_sum', 'rating_sum', 'rating_count'
+]
+COUNT_COLUMNS = ['request_count', 'response_time_count', 'revenue_count', 'rating_count']
+ROLLUP_COLUMNS = ['hour_start', 'service_type_id'] + SUM_COLUMNS
+
+HOUR = timedelta(hours=1)
+EPOCH = datetime(1970, 1, 1)
+
+# Changed hours closer together than this are recomputed with a single range query
+SPAN_MERGE_GAP = timedelta(hours=24)
+
+
+def hour_starts(df: pd.DataFrame) -> pd.Series:
+    """Combine the day and hour columns of a rollup query into bucket start times"""
+    if df.empty:
+        return pd.Series([], dtype='datetime64[ns]')
+    return pd.to_datetime(df['day']) + pd.to_timedelta(df['hour'].astype('int64'), unit='h')
+
+
+def hour_spans(hours: Iterable[datetime]) -> List[DateRange]:
+    """Group hour starts into ranges, merging runs separated by small gaps"""
+    spans = []
+    # Plain datetimes, since the MySQL connector cannot bind pandas Timestamps
+    for hour in sorted(pd.Timestamp(h).to_pydatetime() for h in hours):
+        if spans and hour - spans[-1].end <= SPAN_MERGE_GAP:
+            spans[-1] = DateRange(spans[-1].start, hour + HOUR)
+        else:
+            spans.append(DateRange(hour, hour + HOUR))
+    return spans
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    floored = _floor_hour(value)
+    return floored if floored == value else floored + HOUR
+
+
+class RollupStore:
+    def __init__(self, load_frame: Callable, name: str = 'live', path: Optional[str] = None):
+        # load_frame(query, **params) runs a registered query against the data source,
+        # e.g. DataAnalyzer._load_frame
+        self.load_frame = load_frame
+        self.path = path or PATHS['rollups']
+        self.data_file = os.path.join(self.path, f"{name}.arrow")
+        self.state_file = os.path.join(self.path, f"{name}.json")
+        self._rollups = None
+        self._rollups_mtime = None
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def load_state(self) -> Dict:
+        """Get the watermark from the last refresh"""
+        if not os.path.exists(self.state_file):
+            return {}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict):
+        """Atomically write refresh state"""
+        with replacing(self.state_file) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2)
+
+    def rollups(self) -> pd.DataFrame:
+        """Get the stored rollups as of the last refresh, by this or any other process"""
+        mtime = os.stat(self.data_file).st_mtime_ns if os.path.exists(self.data_file) else None
+        if self._rollups is None or mtime != self._rollups_mtime:
+            stored = read_arrow(self.data_file)
+            self._rollups = stored if stored is not None else self._empty_rollups()
+            self._rollups_mtime = mtime
+        return self._rollups
+
+    @profiled('rollup_refresh')
+    def refresh(self, full: bool = False) -> Dict:
+        """Recompute the hours whose source rows changed since the last refresh
+
+        Inserted and updated rows are found through the updated_at watermark.
+        Deleted rows are caught by comparing stored request counts with the
+        source over the newest delete_check_hours of history, falling back to
+        per-hour counts only when the totals differ; older deletes are left
+        to a full refresh, so the check never grows with the history.
+        """
+        # The thread lock covers this instance; the file lock other processes'
+        with self._lock, file_lock(self.data_file):
+            state = {} if full else self.load_state()
+            rollups = self._empty_rollups() if full else self.rollups()
+            watermark = state.get('watermark')
+
+            changed = self.load_frame(
+                queries.ROLLUP_CHANGED_HOURS,
+                since=datetime.fromisoformat(watermark) if watermark else EPOCH
+            )
+            changed_hours = set(hour_starts(changed))
+            rollups = self._recompute(rollups, changed_hours)
+
+            stale_hours = self._stale_hours(rollups)
+            rollups = self._recompute(rollups, stale_hours)
+
+            if changed_hours or stale_hours or full:
+                write_arrow(self.data_file, rollups)
+                self._rollups_mtime = os.stat(self.data_file).st_mtime_ns
+            self._rollups = rollups
+
+            last_updated = changed['last_updated'].max() if not changed.empty else None
+            if pd.notna(last_updated):
+                watermark = pd.Timestamp(last_updated).isoformat(sep=' ')
+            self._save_state({
+                'watermark': watermark,
+                'refreshed_at': datetime.now().isoformat(timespec='seconds')
+            })
+
+        return {
+            'changed_hours': len(changed_hours),
+            'stale_hours': len(stale_hours),
+            'rows': len(rollups),
+            'watermark': watermark
+        }
+
+    def _recompute(self, rollups: pd.DataFrame, hours: Iterable[datetime]) -> pd.DataFrame:
+        """Replace the stored buckets for every span covering the given hours"""
+        spans = hour_spans(hours)
+        if not spans:
+            return rollups
+
+        keep = pd.Series(True, index=rollups.index)
+        fresh = []
+        for span in spans:
+            keep &= ~((rollups['hour_start'] >= span.start) & (rollups['hour_start'] < span.end))
+            fresh.append(self._aggregate(span))
+
+        merged = pd.concat([rollups[keep]] + fresh, ignore_index=True)
+        return merged.sort_values(['hour_start', 'service_type_id'], kind='stable').reset_index(drop=True)
+
+    def _stale_hours(self, rollups: pd.DataFrame) -> set:
+        """Find recent stored hours whose request count no longer matches the source"""
+        if rollups.empty or ROLLUP_CONFIG['delete_check_hours'] <= 0:
+            return set()
+
+        end = rollups['hour_start'].max().to_pydatetime() + HOUR
+        start = max(rollups['hour_start'].min().to_pydatetime(),
+                    end - timedelta(hours=ROLLUP_CONFIG['delete_check_hours']))
+        checked = DateRange(start, end)
+        stored = rollups[rollups['hour_start'] >= start]
+
+        live_total = self.load_frame(queries.ROLLUP_REQUEST_COUNT, period=checked)['request_count'].iloc[0]
+        if int(live_total) == int(stored['request_count'].sum()):
+            return set()
+
+        live = self.load_frame(queries.ROLLUP_HOUR_COUNTS, period=checked)
+        live_counts = pd.Series(pd.to_numeric(live['request_count']).values, index=hour_starts(live))
+        stored_counts = stored.groupby('hour_start')['request_count'].sum()
+        diff = stored_counts.subtract(live_counts, fill_value=0)
+        return set(diff[diff != 0].index)
+
+    def _aggregate(self, period: DateRange) -> pd.DataFrame:
+        """Aggregate source rows created in a range into rollup buckets"""
+        df = self.load_frame(queries.HOURLY_ROLLUP, period=period)
+        df = df.assign(hour_start=hour_starts(df))
+        return self._typed_rollups(df)
+
+    def _empty_rollups(self) -> pd.DataFrame:
+        return self._typed_rollups(pd.DataFrame(columns=ROLLUP_COLUMNS))
+
+    def _typed_rollups(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Select rollup columns with stable dtypes (the connector returns Decimal sums)"""
+        typed = pd.DataFrame({
+            'hour_start': pd.to_datetime(df['hour_start']),
+            'service_type_id': df['service_type_id'].astype('int64')
+        })
+        for column in SUM_COLUMNS:
+            values = pd.to_numeric(df[column])
+            if column in COUNT_COLUMNS:
+                typed[column] = values.fillna(0).astype('int64')
+            else:
+                typed[column] = values.astype('float64')
+        return typed.reset_index(drop=True)
+
+    @profiled('rollup_hourly')
+    def hourly(self, period: DateRange, refresh: bool = True) -> pd.DataFrame:
+        """Get rollup buckets for a range, refreshing them first unless told not to
+
+        Whole hours come from the store; the partial hours at either end of
+        the range are aggregated from the source so the totals are exact.
+        """
+        if refresh:
+            self.refresh()
+        rollups = self.rollups()
+
+        first_hour = _ceil_hour(period.start)
+        last_hour = _floor_hour(period.end)
+        if first_hour >= last_hour:
+            return self._aggregate(period)
+
+        frames = [rollups[(rollups['hour_start'] >= first_hour) & (rollups['hour_start'] < last_hour)]]
+        for edge in (DateRange(period.start, first_hour), DateRange(last_hour, period.end)):
+            if edge.start < edge.end:
+                frames.append(self._aggregate(edge))
+        return pd.concat(frames, ignore_index=True)
+
+    def _local_buckets(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Label buckets with their report-local date and hour"""
+        local = local_times(df['hour_start'])
+        return df.assign(date=local.dt.date, hour=local.dt.hour)
+
+    def service_demand(self, period: DateRange, buckets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Rollup equivalent of queries.SERVICE_DEMAND (buckets: a prefetched hourly(period))"""
+        df = self._local_buckets(self.hourly(period) if buckets is None else buckets)
+        result = df.groupby(['date', 'hour', 'service_type_id'], as_index=False)[
+            ['request_count', 'response_time_sum', 'response_time_count']
+        ].sum()
+
+        counts = result.pop('response_time_count')
+        result['avg_response_time'] = (result.pop('response_time_sum') / counts).where(counts > 0)
+        return result.sort_values(['date', 'hour'], kind='stable').reset_index(drop=True)
+
+    def revenue_trends(self, period: DateRange, buckets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Rollup equivalent of queries.REVENUE_TRENDS (buckets: a prefetched hourly(period))"""
+        df = self.hourly(period) if buckets is None else buckets
+        df = df[df['revenue_count'] > 0]
+
+        # Inner join like the SQL: buckets for unknown service types are dropped
+        names = self.load_frame(queries.SERVICE_TYPE_NAMES)
+        names = pd.DataFrame({
+            'service_type_id': names['id'].astype('int64'),
+            'service_type': names['name'].astype(object)
+        })
+        df = self._local_buckets(df.merge(names, on='service_type_id'))
+
+        result = df.groupby(['date', 'hour', 'service_type'], as_index=False).agg(
+            daily_revenue=('revenue_sum', 'sum'),
+            service_count=('revenue_count', 'sum')
+        )
+        result['avg_service_cost'] = result['daily_revenue'] / result['service_count']
+        return result.sort_values(['date', 'hour'], kind='stable').reset_index(drop=True)
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    from python.data_analyzer import DataAnalyzer
+
+    parser = argparse.ArgumentParser(description='Refresh the hourly rollup store')
+    parser.add_argument('--source', choices=['live', 'snapshot', 'duckdb'], default='live',
+                       help='Roll up the live database, the local snapshot or the embedded DuckDB copy')
+    parser.add_argument('--full', action='store_true', help='Discard stored rollups and rebuild them')
+
+    args = parser.parse_args()
+
+    try:
+        result = DataAnalyzer(args.source).rollups.refresh(full=args.full)
+    except Exception as e:
+        print(f"Rollup refresh failed: {e}")
+        return 1
+
+    print(f"{result['changed_hours']} changed hours, {result['stale_hours']} stale hours, "
+          f"{result['rows']} buckets (watermark {result['watermark']})")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
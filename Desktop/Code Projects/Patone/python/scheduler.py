@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Report Scheduler
+A resident process that runs the scheduled reports and analyses at the times
+in AUTOMATION_CONFIG, keeping imports, connection pools and caches warm
+between runs instead of cold-starting Python for every cron job
+
+Due jobs run on a bounded thread pool, so independent jobs overlap while a
+job that is still running is never started twice. Each job names the source
+tables it reads; a run whose parameters and table watermarks match the last
+successful run is skipped.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import AUTOMATION_CONFIG, LOG_CONFIG, PATHS, SCHEDULER_CONFIG
+
+logger = logging.getLogger('scheduler')
+
+# Scheduled jobs: name -> spec
+SCHEDULED_JOBS: Dict[str, Dict] = {}
+
+
+def scheduled_job(name: str, params: Callable[[date], Dict], tables: Optional[List[str]] = None,
+                  rerun_on_change: bool = True):
+    """Register a job run as func(scheduler, **params(today))
+
+    tables are the source tables the job reads; None means it has no
+    inputs to compare and always runs. With rerun_on_change=False the job
+    runs once per set of parameters (e.g. once per report month), however
+    the tables change afterwards.
+    """
+    def register(func):
+        SCHEDULED_JOBS[name] = {
+            'func': func,
+            'params': params,
+            'tables': tables,
+            'rerun_on_change': rerun_on_change
+        }
+        return func
+    return register
+
+
+def _previous_month(today: date) -> Dict:
+    last_month = today.replace(day=1) - timedelta(days=1)
+    return {'year': last_month.year, 'month': last_month.month}
+
+
+@scheduled_job('daily_report', params=lambda today: {'date': (today - timedelta(days=1)).isoformat()},
+               tables=['service_requests', 'drivers', 'service_types'])
+def daily_report(scheduler: 'ReportScheduler', date: str) -> Dict:
+    """Yesterday's daily operations report"""
+    return {'file_path': scheduler.reports.generate_daily_report(date)}
+
+
+@scheduled_job('monthly_report', params=_previous_month,
+               tables=['service_requests', 'customers', 'service_types'], rerun_on_change=False)
+def monthly_report(scheduler: 'ReportScheduler', year: int, month: int) -> Dict:
+    """Last month's operations report, made once the month is over"""
+    return {'file_path': scheduler.reports.generate_monthly_report(year, month)}
+
+
+@scheduled_job('analyses', params=lambda today: {'date': today.isoformat()},
+               tables=['service_requests', 'customers', 'drivers', 'service_types'])
+def analyses(scheduler: 'ReportScheduler', date: str) -> Dict:
+    """All four analyses, which also leaves their results in the result cache"""
+    results = scheduler.analyzer.analyze_all()
+    os.makedirs(PATHS['exports'], exist_ok=True)
+    file_path = os.path.join(PATHS['exports'], f"analysis_{date}.json")
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+    os.replace(tmp_path, file_path)
+    failed = [name for name, document in results.items() if isinstance(document, dict) and 'error' in document]
+    if failed:
+        raise RuntimeError(f"Analyses failed: {', '.join(failed)}")
+    return {'file_path': file_path}
+
+
+@scheduled_job('snapshot_sync', params=lambda today: {})
+def snapshot_sync(scheduler: 'ReportScheduler') -> Dict:
+    """Copy changed rows into the local snapshot, the Python side's copy of the source tables"""
+    from python.snapshot import get_snapshot
+
+    summary = get_snapshot().sync()
+    return {'changed_rows': sum(table['changed_rows'] for table in summary.values())}
+
+
+@scheduled_job('report_cleanup', params=lambda today: {})
+def report_cleanup(scheduler: 'ReportScheduler') -> Dict:
+    """Delete reports older than max_file_age_days, a bounded number of batches per run"""
+    from python.report_store import ReportStore
+
+    return ReportStore().sweep()
+
+
+class ReportScheduler:
+    def __init__(self, source: Optional[str] = None, workers: Optional[int] = None,
+                 path: Optional[str] = None):
+        self.source = source or SCHEDULER_CONFIG['source']
+        self.workers = workers or SCHEDULER_CONFIG['workers']
+        self.path = path or PATHS['scheduler']
+        self.state_file = os.path.join(self.path, 'state.json')
+        os.makedirs(self.path, exist_ok=True)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scheduler')
+        self._running: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # Created on first use and kept, so pools and caches stay warm between runs
+        self._reports = None
+        self._analyzer = None
+
+    @property
+    def reports(self):
+        if self._reports is None:
+            from python.report_generator import ReportGenerator
+            self._reports = ReportGenerator(self.source)
+        return self._reports
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            from python.data_analyzer import DataAnalyzer
+            self._analyzer = DataAnalyzer(self.source)
+        return self._analyzer
+
+    def load_state(self) -> Dict:
+        """Last run of every job"""
+        if not os.path.exists(self.state_file):
+            return {}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def _record(self, name: str, run: Dict):
+        with self._state_lock:
+            state = self.load_state()
+            previous = state.get(name, {})
+            if run['status'] != 'completed':
+                # Keep what the last successful run is compared against
+                run = dict(run, last_success=previous.get('last_success'))
+            state[name] = run
+            tmp_path = self.state_file + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2, default=str)
+            os.replace(tmp_path, self.state_file)
+
+    def fingerprint(self, job: Dict, params: Dict) -> Optional[str]:
+        """Hash of a run's parameters and the watermark of the tables it reads"""
+        if job['tables'] is None:
+            return None
+        inputs = {'params': params}
+        if job['rerun_on_change']:
+            inputs['watermark'] = self.analyzer.data_watermark(job['tables'])
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def run_job(self, name: str, force: bool = False, today: Optional[date] = None) -> Dict:
+        """Run a job now unless its inputs are unchanged since its last successful run"""
+        job = SCHEDULED_JOBS[name]
+        params = job['params'](today or date.today())
+        started = time.perf_counter()
+        run = {'status': 'running', 'params': params, 'started_at': datetime.now().isoformat(timespec='seconds')}
+
+        try:
+            fingerprint = self.fingerprint(job, params)
+            last_success = self.load_state().get(name, {}).get('last_success') or {}
+            if not force and fingerprint is not None and last_success.get('fingerprint') == fingerprint:
+                logger.info("%s: inputs unchanged since %s, skipped", name, last_success.get('finished_at'))
+                return dict(last_success, status='skipped')
+
+            result = job['func'](self, **params)
+            run.update(status='completed', fingerprint=fingerprint, result=result)
+        except Exception as e:
+            run.update(status='failed', error=f"{type(e).__name__}: {e}")
+            logger.exception("%s failed", name)
+        run['duration'] = round(time.perf_counter() - started, 3)
+        run['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        if run['status'] == 'completed':
+            run['last_success'] = {key: value for key, value in run.items() if key != 'last_success'}
+            logger.info("%s completed in %.1fs", name, run['duration'])
+        self._record(name, run)
+        return run
+
+    def submit(self, name: str, force: bool = False) -> Optional[Future]:
+        """Queue a job on the worker pool, unless a run of it is still in progress"""
+        with self._lock:
+            running = self._running.get(name)
+            if running is not None and not running.done():
+                logger.warning("%s is still running, this run is skipped", name)
+                return None
+            future = self.executor.submit(self.run_job, name, force)
+            self._running[name] = future
+            return future
+
+    def build_schedule(self, scheduler=None):
+        """Register the jobs at the times AUTOMATION_CONFIG and SCHEDULER_CONFIG give"""
+        import schedule
+
+        scheduler = scheduler or schedule.Scheduler()
+        at = AUTOMATION_CONFIG['report_generation_time']
+        for name in ('daily_report', 'monthly_report', 'analyses'):
+            scheduler.every().day.at(at).do(self.submit, name).tag(name)
+
+        frequency = SCHEDULER_CONFIG['snapshot_sync']
+        if frequency != 'off':
+            if frequency == 'hourly':
+                entry = scheduler.every().hour
+            elif frequency == 'daily':
+                entry = scheduler.every().day.at(at)
+            elif frequency == 'weekly':
+                entry = scheduler.every().monday.at(at)
+            else:
+                raise ValueError(f"Unknown snapshot sync frequency {frequency}")
+            entry.do(self.submit, 'snapshot_sync').tag('snapshot_sync')
+
+        if AUTOMATION_CONFIG['cleanup_old_files']:
+            # Hourly, so a large backlog of expired reports is worked off in small runs
+            scheduler.every().hour.do(self.submit, 'report_cleanup').tag('report_cleanup')
+        return scheduler
+
+    def serve(self, scheduler=None):
+        """Run due jobs until stop() is called (SIGTERM or SIGINT from main)"""
+        scheduler = scheduler or self.build_schedule()
+        logger.info("Scheduler started with %d workers (source: %s)", self.workers, self.source)
+        while not self._stop.is_set():
+            scheduler.run_pending()
+            idle = scheduler.idle_seconds
+            self._stop.wait(min(max(idle or 0, 0), SCHEDULER_CONFIG['poll_seconds']) or 1)
+        logger.info("Scheduler stopping, waiting for running jobs")
+        self.executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
+
+
+def configure_logging(target: Optional[logging.Logger] = None):
+    """Send a service's log (default: the scheduler's) to the rotating file in LOG_CONFIG and to stderr"""
+    target = target or logger
+    os.makedirs(os.path.dirname(LOG_CONFIG['file_path']), exist_ok=True)
+    formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s')
+    handlers = [
+        RotatingFileHandler(LOG_CONFIG['file_path'], maxBytes=LOG_CONFIG['max_file_size'],
+                            backupCount=LOG_CONFIG['backup_count']),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        target.addHandler(handler)
+    target.setLevel(LOG_CONFIG['level'])
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run scheduled reports and analyses in a resident process')
+    parser.add_argument('--run', action='append', choices=list(SCHEDULED_JOBS),
+                       help='Run a job now and exit instead of serving the schedule')
+    parser.add_argument('--force', action='store_true', help='With --run, run even if inputs are unchanged')
+    parser.add_argument('--list', action='store_true', help='Print the schedule and last runs')
+    parser.add_argument('--source', choices=['live', 'snapshot', 'duckdb'],
+                       help='Read from the live database, the local snapshot or the embedded DuckDB copy')
+    parser.add_argument('--workers', type=int, help='Jobs run at once (default: SCHEDULER_WORKERS)')
+
+    args = parser.parse_args()
+
+    configure_logging()
+    scheduler = ReportScheduler(args.source, args.workers)
+
+    if args.list:
+        entries = scheduler.build_schedule()
+        state = scheduler.load_state()
+        for entry in entries.get_jobs():
+            name = next(iter(entry.tags))
+            last = state.get(name, {})
+            print(f"{name:<16} next {entry.next_run:%Y-%m-%d %H:%M}  "
+                  f"last {last.get('status', 'never')} {last.get('finished_at', '')}")
+        return 0
+
+    if args.run:
+        futures = [scheduler.submit(name, args.force) for name in args.run]
+        runs = [future.result() for future in futures if future is not None]
+        scheduler.executor.shutdown(wait=True)
+        return 1 if any(run['status'] == 'failed' for run in runs) else 0
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: scheduler.stop())
+    try:
+        scheduler.serve()
+    except ImportError as e:
+        print(f"Scheduler requires the schedule package (pip install schedule): {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,116 @@
+"""
+Roadside Assistance Admin Platform - Frame Schemas
+Compact column dtypes for the analysis query results, applied when a frame is
+loaded so every analysis sees the same types whatever the data source
+
+The MySQL connector hands back DECIMAL objects for SUM/AVG, Python dates and
+strings as object columns, and TINYINT flags as integers, which costs memory
+and makes groupby fall back to slow object paths. Measures stay float64, as
+float32 averages show rounding error once serialized (4.2 comes back as
+4.199999809265137); the savings come from the integer, flag, category and
+string columns. Ids are uint32 like the INT UNSIGNED columns they come from.
+"""
+
+import functools
+from typing import Dict
+
+import pandas as pd
+
+# Column -> dtype kind, per query name. Kinds: int8/int32/uint32 (nullable
+# Int/UInt variants when the column has NULLs), float64, bool, category,
+# datetime and string (Arrow-backed when pyarrow is available).
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    'service_demand': {
+        'date': 'datetime',
+        'hour': 'int8',
+        'service_type_id': 'uint32',
+        'request_count': 'int32',
+        'avg_response_time': 'float64'
+    },
+    'revenue_trends': {
+        'date': 'datetime',
+        'hour': 'int8',
+        'service_type': 'category',
+        'daily_revenue': 'float64',
+        'service_count': 'int32',
+        'avg_service_cost': 'float64'
+    },
+    'driver_performance': {
+        'id': 'uint32',
+        'first_name': 'string',
+        'last_name': 'string',
+        'total_services': 'int32',
+        'total_revenue': 'float64',
+        'avg_service_cost': 'float64',
+        'avg_completion_time': 'float64',
+        'avg_rating': 'float64',
+        'completed_services': 'int32',
+        'cancelled_services': 'int32'
+    },
+    'customer_behavior': {
+        'id': 'uint32',
+        'first_name': 'string',
+        'last_name': 'string',
+        'is_vip': 'bool',
+        'total_services': 'int32',
+        'total_spent': 'float64',
+        'avg_service_cost': 'float64',
+        'last_service_date': 'datetime',
+        'avg_rating_given': 'float64',
+        'days_since_first_service': 'int32'
+    }
+}
+
+NULLABLE_INTS = {'int8': 'Int8', 'int32': 'Int32', 'uint32': 'UInt32'}
+
+
+@functools.lru_cache(maxsize=None)
+def string_dtype():
+    """Arrow-backed strings when pyarrow imports cleanly, else pandas' Python-backed strings"""
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype('pyarrow')
+    except ImportError:
+        return pd.StringDtype('python')
+
+
+def _convert(values: pd.Series, kind: str) -> pd.Series:
+    """Convert one column to a schema dtype kind"""
+    if kind in NULLABLE_INTS:
+        numbers = pd.to_numeric(values, errors='coerce')
+        if numbers.isna().any():
+            return numbers.astype(NULLABLE_INTS[kind])
+        return numbers.astype(kind)
+    if kind == 'float64':
+        return pd.to_numeric(values, errors='coerce').astype(kind)
+    if kind == 'bool':
+        if values.isna().any():
+            return values.astype('boolean')
+        return values.astype(bool)
+    if kind == 'category':
+        return values.astype('category')
+    if kind == 'datetime':
+        return pd.to_datetime(values)
+    if kind == 'string':
+        return values.astype(string_dtype())
+    raise ValueError(f"Unknown schema dtype {kind}")
+
+
+def apply_schema(df: pd.DataFrame, query_name: str) -> pd.DataFrame:
+    """Convert a query result to its registered compact dtypes
+
+    Frames of queries without a schema are returned as they are; columns
+    a schema lists but the frame lacks are skipped.
+    """
+    schema = SCHEMAS.get(query_name)
+    if not schema:
+        return df
+
+    converted = {column: _convert(df[column], kind)
+                 for column, kind in schema.items() if column in df.columns}
+    return df.assign(**converted)
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Bytes held by a frame, including the contents of object columns"""
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Customer Segmentation
+Persistent mini-batch k-means segmentation of customers by service behavior
+
+The scaler and centroids are trained in chunks with partial_fit, saved with a
+version, and reused for later analyses: customers are assigned to the nearest
+saved centroid with plain numpy, without scikit-learn or a refit. The model
+is retrained on demand or when the assignment error drifts past a threshold.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import PATHS, SEGMENTATION_CONFIG
+from python.profiling import profiled
+from python.snapshot import replacing
+from python.streaming import frame_chunks
+
+FEATURE_COLUMNS = ['total_services', 'total_spent', 'avg_service_cost']
+
+# Bump when the stored model layout changes so old files are retrained
+MODEL_FORMAT_VERSION = 1
+
+
+def feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    """Get the clustering features of a customer frame as a float matrix"""
+    return df[FEATURE_COLUMNS].astype('float64').fillna(0).to_numpy()
+
+
+def rebatch(chunks: Iterable[pd.DataFrame], size: int) -> Iterator[np.ndarray]:
+    """Regroup frames of any size into feature batches of `size` rows (the last may be short)"""
+    pending = []
+    pending_rows = 0
+    for chunk in chunks:
+        X = feature_matrix(chunk)
+        while len(X):
+            take = X[:size - pending_rows]
+            X = X[len(take):]
+            pending.append(take)
+            pending_rows += len(take)
+            if pending_rows == size:
+                yield np.vstack(pending)
+                pending, pending_rows = [], 0
+    if pending_rows:
+        yield np.vstack(pending)
+
+
+class SegmentModel:
+    """Fitted scaler parameters and centroids, usable without scikit-learn"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, centroids: np.ndarray,
+                 version: int, trained_at: str, samples: int, inertia: float):
+        self.mean = np.asarray(mean, dtype='float64')
+        self.scale = np.asarray(scale, dtype='float64')
+        self.centroids = np.asarray(centroids, dtype='float64')
+        self.version = version
+        self.trained_at = trained_at
+        self.samples = samples
+        # Mean squared distance to the nearest centroid over the training data
+        self.inertia = inertia
+
+    def distances(self, X: np.ndarray) -> np.ndarray:
+        """Squared distance from every row to every centroid, rows x clusters"""
+        scaled = (X - self.mean) / self.scale
+        return ((scaled[:, np.newaxis, :] - self.centroids[np.newaxis, :, :]) ** 2).sum(axis=2)
+
+    def assign(self, X: np.ndarray) -> np.ndarray:
+        """Nearest-centroid segment for every row"""
+        if len(X) == 0:
+            return np.empty(0, dtype='int64')
+        return self.distances(X).argmin(axis=1)
+
+    def mean_error(self, X: np.ndarray) -> float:
+        """Mean squared distance of the rows to their nearest centroid"""
+        if len(X) == 0:
+            return 0.0
+        return float(self.distances(X).min(axis=1).mean())
+
+    def to_dict(self) -> Dict:
+        return {
+            'format': MODEL_FORMAT_VERSION,
+            'version': self.version,
+            'trained_at': self.trained_at,
+            'samples': self.samples,
+            'inertia': self.inertia,
+            'features': FEATURE_COLUMNS,
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'centroids': self.centroids.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> Optional['SegmentModel']:
+        if data.get('format') != MODEL_FORMAT_VERSION or data.get('features') != FEATURE_COLUMNS:
+            return None
+        return cls(data['mean'], data['scale'], data['centroids'], data['version'],
+                   data['trained_at'], data['samples'], data['inertia'])
+
+
+class CustomerSegmenter:
+    def __init__(self, name: str = 'live', path: Optional[str] = None,
+                 clusters: Optional[int] = None, batch_size: Optional[int] = None,
+                 epochs: Optional[int] = None, drift_threshold: Optional[float] = None):
+        self.path = path or PATHS['models']
+        self.model_file = os.path.join(self.path, f"segments_{name}.json")
+        self.clusters = clusters or SEGMENTATION_CONFIG['clusters']
+        self.batch_size = batch_size or SEGMENTATION_CONFIG['batch_size']
+        self.epochs = epochs or SEGMENTATION_CONFIG['epochs']
+        self.drift_threshold = (drift_threshold if drift_threshold is not None
+                                else SEGMENTATION_CONFIG['drift_threshold'])
+        self._model = None
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def model(self) -> Optional[SegmentModel]:
+        """Get the saved model, or None if there is none yet"""
+        if self._model is None and os.path.exists(self.model_file):
+            with open(self.model_file) as f:
+                self._model = SegmentModel.from_dict(json.load(f))
+        return self._model
+
+    @property
+    def model_version(self) -> int:
+        model = self.model
+        return model.version if model is not None else 0
+
+    def _save_model(self, model: SegmentModel):
+        """Atomically write the model"""
+        with replacing(self.model_file) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(model.to_dict(), f, indent=2)
+        self._model = model
+
+    @profiled('segment_train')
+    def train(self, chunks: Callable[[], Iterable[pd.DataFrame]]) -> SegmentModel:
+        """Fit the scaler and centroids in mini-batches and save them as a new version
+
+        `chunks` returns a fresh iterable of customer frames on every call, since
+        the data is passed over once for the scaler, `epochs` times for k-means
+        and once more to measure the training error.
+        """
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        samples = 0
+        for chunk in chunks():
+            if len(chunk):
+                scaler.partial_fit(feature_matrix(chunk))
+                samples += len(chunk)
+        if samples < self.clusters:
+            raise ValueError(f'At least {self.clusters} customers are needed to train segments')
+
+        kmeans = MiniBatchKMeans(n_clusters=self.clusters, batch_size=self.batch_size,
+                                 random_state=SEGMENTATION_CONFIG['random_state'], n_init=3)
+        for _ in range(self.epochs):
+            for batch in rebatch(chunks(), self.batch_size):
+                kmeans.partial_fit(scaler.transform(batch))
+
+        # Number segments by average spend so labels stay meaningful across retrains
+        centroids = kmeans.cluster_centers_
+        order = np.argsort(centroids[:, FEATURE_COLUMNS.index('total_spent')], kind='stable')
+
+        model = SegmentModel(
+            mean=scaler.mean_,
+            scale=scaler.scale_,
+            centroids=centroids[order],
+            version=self.model_version + 1,
+            trained_at=datetime.now().isoformat(timespec='seconds'),
+            samples=samples,
+            inertia=0.0
+        )
+
+        error_sum = 0.0
+        for chunk in chunks():
+            X = feature_matrix(chunk)
+            if len(X):
+                error_sum += model.mean_error(X) * len(X)
+        model.inertia = error_sum / samples
+
+        self._save_model(model)
+        return model
+
+    def drift(self, df: pd.DataFrame) -> float:
+        """Relative growth of the assignment error on df over the training error"""
+        model = self.model
+        if model is None or df.empty:
+            return 0.0
+        return self.drift_from_error(model.mean_error(feature_matrix(df)))
+
+    def drift_from_error(self, error: float) -> float:
+        """Relative growth of a mean assignment error over the training error"""
+        model = self.model
+        if model is None or not error:
+            return 0.0
+        if model.inertia <= 0:
+            return float('inf')
+        return error / model.inertia - 1
+
+    def assign(self, df: pd.DataFrame) -> Dict:
+        """Segment every customer in df with the saved model
+
+        Adds a `segment` column to df and returns assignment counts.
+        """
+        df['segment'] = self.model.assign(feature_matrix(df))
+        return {'assigned': len(df)}
+
+    @profiled('segment_assign')
+    def segment(self, df: pd.DataFrame, retrain: bool = False) -> Dict:
+        """Assign segments to df, training first if needed, on demand or on drift"""
+        with self._lock:
+            drift = self.drift(df)
+            reason = None
+            if self.model is None:
+                reason = 'no model'
+            elif retrain:
+                reason = 'requested'
+            elif drift > self.drift_threshold:
+                reason = 'drift'
+
+            if reason:
+                self.train(lambda: frame_chunks(df, self.batch_size))
+
+            counts = self.assign(df)
+            model = self.model
+            return {
+                'model_version': model.version,
+                'trained_at': model.trained_at,
+                'retrained': reason,
+                'drift': drift,
+                **counts
+            }
+
+    def status(self) -> Dict:
+        """Describe the saved model"""
+        model = self.model
+        if model is None:
+            return {'model_version': 0}
+        return {
+            'model_version': model.version,
+            'trained_at': model.trained_at,
+            'samples': model.samples,
+            'inertia': model.inertia,
+            'clusters': len(model.centroids),
+            'drift_threshold': self.drift_threshold
+        }
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    from python.data_analyzer import DataAnalyzer
+    from python.query_builder import trailing_days
+    from python import queries
+
+    parser = argparse.ArgumentParser(description='Train or inspect the customer segmentation model')
+    parser.add_argument('--source', choices=['live', 'snapshot'], default='live',
+                       help='Read from the live database or the local snapshot')
+    parser.add_argument('--days', type=int, default=90, help='Number of days of history to segment')
+    parser.add_argument('--retrain', action='store_true', help='Retrain the model even without drift')
+    parser.add_argument('--status', action='store_true', help='Only print the saved model')
+
+    args = parser.parse_args()
+
+    segmenter = CustomerSegmenter(args.source)
+    if args.status:
+        print(json.dumps(segmenter.status(), indent=2))
+        return 0
+
+    try:
+        analyzer = DataAnalyzer(args.source, use_cache=False)
+        df = analyzer._load_frame(queries.CUSTOMER_BEHAVIOR, period=trailing_days(args.days))
+        if df.empty:
+            print("Segmentation failed: No customer data available")
+            return 1
+        print(json.dumps(segmenter.segment(df, retrain=args.retrain), indent=2))
+    except Exception as e:
+        print(f"Segmentation failed: {e}")
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Roadside Assistance Admin Platform - Analytical Snapshot
+Keeps a local Arrow IPC copy of the tables the analyzers read, synced
+incrementally from MySQL using each table's updated_at watermark
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.config import PATHS
+from python.db_pool import get_pool
+
+# Columns copied per table. service_requests is limited to what analyses and
+# reports use so the free-text note columns never leave the database.
+SNAPSHOT_TABLES = {
+    'service_requests': {
+        'columns': [
+            'id', 'customer_id', 'driver_id', 'service_type_id', 'status', 'priority',
+            'location_city', 'location_state', 'actual_cost', 'customer_rating',
+            'created_at', 'assigned_at', 'started_at', 'completed_at', 'updated_at'
+        ],
+        'numeric': ['customer_id', 'driver_id', 'service_type_id', 'actual_cost', 'customer_rating'],
+        'timestamps': ['created_at', 'assigned_at', 'started_at', 'completed_at', 'updated_at']
+    },
+    'customers': {
+        'columns': None,
+        'numeric': ['is_vip'],
+        'timestamps': ['created_at', 'updated_at']
+    },
+    'drivers': {
+        'columns': None,
+        'numeric': [],
+        'timestamps': ['created_at', 'updated_at']
+    },
+    'service_types': {
+        'columns': None,
+        'numeric': [],
+        'timestamps': ['created_at', 'updated_at']
+    }
+}
+
+FETCH_BATCH_SIZE = 50000
+
+
+def _require_pyarrow():
+    """Import pyarrow, which is only needed for snapshot storage"""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The analytical snapshot requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+@contextmanager
+def replacing(path: str):
+    """Yield a temp file path unique to this writer, moved over `path` when the block succeeds
+
+    Concurrent writers (the scheduler, report workers and the CLI) each get
+    their own temp file, so none can rename another's half-written file into place.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                    suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on `path` across processes, for a read-modify-write of it
+
+    The lock is taken on a `.lock` file beside it, so readers of the file
+    itself are never blocked. Without fcntl (Windows) only the caller's own
+    thread lock applies.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    with open(path + '.lock', 'a') as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def write_arrow(path: str, df: pd.DataFrame):
+    """Atomically write a frame as an uncompressed Arrow IPC file"""
+    pa = _require_pyarrow()
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    with replacing(path) as tmp_path:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+
+
+def read_arrow(path: str) -> Optional[pd.DataFrame]:
+    """Read a whole Arrow IPC file into a DataFrame
+
+    Not memory-bounded: to_pandas() copies every column onto the heap, so the
+    result costs as much as the table. The file is read rather than mapped,
+    since a mapping would only be copied out of and then held open.
+    """
+    pa = _require_pyarrow()
+    if not os.path.exists(path):
+        return None
+    with pa.OSFile(path, 'rb') as source:
+        arrow_table = pa.ipc.open_file(source).read_all()
+    return arrow_table.to_pandas()
+
+
+class Snapshot:
+    def __init__(self, path: Optional[str] = None, pool=None):
+        self.path = path or PATHS['snapshots']
+        self.pool = pool
+        self.state_file = os.path.join(self.path, 'state.json')
+        self._frames = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def table_path(self, table: str) -> str:
+        """Get the Arrow IPC file for a table"""
+        return os.path.join(self.path, f"{table}.arrow")
+
+    def load_state(self) -> Dict:
+        """Get per-table watermarks and row counts from the last sync"""
+        if not os.path.exists(self.state_file):
+            return {}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict):
+        """Atomically write sync state"""
+        with replacing(self.state_file) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2)
+
+    def sync(self, tables: Optional[List[str]] = None, full: bool = False) -> Dict:
+        """Bring the snapshot up to date with the database
+
+        Only rows with updated_at at or after the stored watermark are fetched
+        and upserted by id. Rows deleted from the database are dropped when the
+        row counts disagree after the merge.
+        """
+        pool = self.pool or get_pool()
+        summary = {}
+
+        # Another process syncing at the same time would merge into the same files
+        with file_lock(self.state_file), pool.connection() as conn:
+            state = self.load_state()
+            for table in tables or SNAPSHOT_TABLES:
+                table_state = {} if full else state.get(table, {})
+                summary[table] = self._sync_table(conn, table, table_state)
+                state[table] = {
+                    'watermark': summary[table]['watermark'],
+                    'rows': summary[table]['rows'],
+                    'synced_at': datetime.now().isoformat(timespec='seconds')
+                }
+                self._save_state(state)
+
+        return summary
+
+    def _sync_table(self, conn, table: str, table_state: Dict) -> Dict:
+        """Fetch changed rows for one table and merge them into its snapshot file"""
+        spec = SNAPSHOT_TABLES[table]
+        columns = ', '.join(spec['columns']) if spec['columns'] else '*'
+        watermark = table_state.get('watermark')
+
+        sql = f"SELECT {columns} FROM {table}"
+        params = ()
+        if watermark:
+            # >= rather than > so rows updated later in the watermark second are not missed
+            sql += " WHERE updated_at >= %s"
+            params = (watermark,)
+
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        column_names = [d[0] for d in cursor.description]
+        changed = []
+        while True:
+            batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not batch:
+                break
+            changed.extend(batch)
+        cursor.close()
+
+        delta = self._typed_frame(table, pd.DataFrame.from_records(changed, columns=column_names))
+        existing = self._read_frame(table) if watermark else None
+
+        if existing is not None and not existing.empty:
+            merged = pd.concat([existing[~existing['id'].isin(delta['id'])], delta], ignore_index=True)
+        else:
+            merged = delta
+
+        deleted = self._drop_deleted_rows(conn, table, merged)
+        if deleted:
+            merged = merged[~merged['id'].isin(deleted)]
+
+        merged = merged.sort_values('id', kind='stable').reset_index(drop=True)
+        self._write_frame(table, merged)
+
+        new_watermark = merged['updated_at'].max() if not merged.empty else None
+        return {
+            'changed_rows': len(delta),
+            'deleted_rows': len(deleted),
+            'rows': len(merged),
+            'watermark': new_watermark.isoformat(sep=' ') if pd.notna(new_watermark) else watermark
+        }
+
+    def _drop_deleted_rows(self, conn, table: str, merged: pd.DataFrame) -> set:
+        """Find snapshot ids that no longer exist, checking the cheap row count first"""
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        (count,) = cursor.fetchone()
+        if count == len(merged):
+            cursor.close()
+            return set()
+
+        cursor.execute(f"SELECT id FROM {table}")
+        live_ids = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return set(merged['id']) - live_ids
+
+    def _typed_frame(self, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Give fetched rows stable dtypes so deltas concatenate cleanly"""
+        spec = SNAPSHOT_TABLES[table]
+        for column in df.columns:
+            if column in spec['numeric']:
+                df[column] = pd.to_numeric(df[column]).astype('float64')
+            elif column in spec['timestamps']:
+                df[column] = pd.to_datetime(df[column])
+            elif df[column].dtype == object:
+                df[column] = self._typed_object_column(df[column])
+        return df
+
+    def _typed_object_column(self, values: pd.Series) -> pd.Series:
+        """Convert a column the connector returned as Python objects"""
+        sample = values.dropna()
+        if sample.empty:
+            return values.astype('string')
+
+        first = sample.iloc[0]
+        if isinstance(first, Decimal):
+            return pd.to_numeric(values).astype('float64')
+        if isinstance(first, (date, datetime)):
+            return pd.to_datetime(values)
+        if isinstance(first, (bytes, bytearray)):
+            return values
+        return values.astype('string')
+
+    def _write_frame(self, table: str, df: pd.DataFrame):
+        """Write a table's snapshot file"""
+        write_arrow(self.table_path(table), df)
+
+    def _read_frame(self, table: str) -> Optional[pd.DataFrame]:
+        """Read a table's snapshot file"""
+        return read_arrow(self.table_path(table))
+
+    def table(self, table: str) -> pd.DataFrame:
+        """Get a snapshot table, reusing the in-process copy until the file changes
+
+        Callers must not modify the returned frame.
+        """
+        path = self.table_path(table)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No snapshot of {table}; run snapshot.py --sync first")
+
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._frames.get(table)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        df = self._read_frame(table)
+        with self._lock:
+            self._frames[table] = (mtime, df)
+        return df
+
+
+_shared_snapshot = None
+
+
+def get_snapshot() -> Snapshot:
+    """Get the process-wide snapshot so its table cache is shared"""
+    global _shared_snapshot
+    if _shared_snapshot is None:
+        _shared_snapshot = Snapshot()
+    return _shared_snapshot
+
+
+def main():
+    """Main function for command line usage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sync the local analytical snapshot')
+    parser.add_argument('--table', action='append', choices=list(SNAPSHOT_TABLES),
+                       help='Table to sync (default: all)')
+    parser.add_argument('--full', action='store_true', help='Ignore watermarks and re-copy every row')
+
+    args = parser.parse_args()
+
+    try:
+        summary = Snapshot().sync(args.table, full=args.full)
+    except Exception as e:
+        print(f"Snapshot sync failed: {e}")
+        return 1
+
+    for table, result in summary.items():
+        print(f"{table}: {result['changed_rows']} changed, {result['deleted_rows']} deleted, "
+              f"{result['rows']} rows (watermark {result['watermark']})")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,275 @@
+"""
+Roadside Assistance Admin Platform - Streaming Extraction
+Chunked query reads over unbuffered (server-side streamed) cursors and the
+mergeable accumulators the analyzer folds those chunks into
+
+Every accumulator supports add() for a chunk and merge() for another partial
+result of the same kind, so with cursor_chunks memory stays bounded by the
+chunk size plus the few top-N rows an output actually lists, however many
+rows the query returns. snapshot_chunks gives no such bound; see its
+docstring.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from python.config import STREAMING_CONFIG
+from python.dialects import dialect_of
+from python.frames import build_frame
+
+
+def cursor_chunks(conn, query, chunk_size: Optional[int] = None, **params) -> Iterator[pd.DataFrame]:
+    """Run a registered query and yield its rows as frames of at most chunk_size rows
+
+    The cursor is unbuffered, so rows stay on the server until fetched. If
+    the caller stops early the rest of the result is drained without being
+    kept, leaving the connection usable for the next borrower.
+    """
+    chunk_size = chunk_size or STREAMING_CONFIG['chunk_size']
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(*query.statement(dialect_of(conn), **params))
+        columns = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        consume = getattr(conn, 'consume_results', None)
+        if consume is not None:
+            consume()
+        cursor.close()
+
+
+def frame_chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Split an in-memory frame into consecutive chunks"""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def snapshot_chunks(snapshot, query, chunk_size: Optional[int] = None, **params) -> Iterator[pd.DataFrame]:
+    """Chunk a query computed from the local snapshot, for the same consumers as cursor_chunks
+
+    Not memory-bounded: the snapshot tables are held in memory whole and the
+    query's full result is built before it is sliced. The streamed analyses
+    still run on a snapshot, but only cursor_chunks keeps memory flat.
+    """
+    df = build_frame(query, snapshot, **params)
+    yield from frame_chunks(df, chunk_size or STREAMING_CONFIG['chunk_size'])
+
+
+def _numeric(values) -> np.ndarray:
+    """Float array of a column, with NULLs (and DECIMAL objects) handled"""
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+
+
+class RunningStats:
+    """Count, sum, minimum and maximum of the non-null values seen"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, values) -> 'RunningStats':
+        values = _numeric(values)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.total += float(values.sum())
+            self.minimum = min(self.minimum, float(values.min()))
+            self.maximum = max(self.maximum, float(values.max()))
+        return self
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def mean(self) -> float:
+        """Mean of the values, NaN when there were none (like pandas)"""
+        return self.total / self.count if self.count else math.nan
+
+    @property
+    def max(self) -> float:
+        return self.maximum if self.count else math.nan
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch-style)
+
+    Values are counted in logarithmic buckets, so any quantile is returned
+    within `relative_accuracy` of an actual value in the data while memory
+    grows only with the logarithm of the value range.
+    """
+
+    def __init__(self, column: Optional[str] = None, relative_accuracy: float = 0.01):
+        # With a column set, add() also accepts a chunk frame and reads that column
+        self.column = column
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _bucket(self, store: Dict, magnitudes: np.ndarray):
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype('int64'),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def add(self, values) -> 'QuantileSketch':
+        if self.column is not None and isinstance(values, pd.DataFrame):
+            values = values[self.column]
+        values = _numeric(values)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.zeros += int((values == 0).sum())
+        if (values > 0).any():
+            self._bucket(self.positive, values[values > 0])
+        if (values < 0).any():
+            self._bucket(self.negative, -values[values < 0])
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        if other.gamma != self.gamma:
+            raise ValueError('Cannot merge sketches with different accuracy')
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile, NaN for an empty sketch"""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+
+class TopN:
+    """The n rows with the largest key seen, earlier rows winning ties
+
+    Only rows matching `where` (a chunk -> boolean mask function) are considered.
+    """
+
+    def __init__(self, n: int, key: str, columns: Optional[List[str]] = None,
+                 where: Optional[Callable] = None):
+        self.n = n
+        self.key = key
+        self.columns = columns
+        self.where = where
+        self._heap = []
+        self._sequence = itertools.count()
+
+    def _push(self, value: float, order: int, record: Dict):
+        item = (value, -order, record)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def add(self, df: pd.DataFrame) -> 'TopN':
+        if self.where is not None and not df.empty:
+            df = df[self.where(df)]
+        if df.empty:
+            return self
+        keys = _numeric(df[self.key])
+        candidates = df.assign(**{self.key: keys}).dropna(subset=[self.key])
+        candidates = candidates.nlargest(self.n, self.key)
+        values = candidates[self.key].tolist()
+        if self.columns:
+            candidates = candidates[self.columns]
+        for value, record in zip(values, candidates.to_dict('records')):
+            self._push(value, next(self._sequence), record)
+        return self
+
+    def merge(self, other: 'TopN') -> 'TopN':
+        for value, _, record in sorted(other._heap, key=lambda item: (-item[0], -item[1])):
+            self._push(value, next(self._sequence), record)
+        return self
+
+    def items(self) -> List[Dict]:
+        """Rows ordered by key, largest first"""
+        return [record for _, _, record in sorted(self._heap, key=lambda item: (-item[0], -item[1]))]
+
+
+class GroupStats:
+    """RunningStats of several columns, split by the value of a group column"""
+
+    def __init__(self, group: Optional[str], columns: List[str]):
+        self.group = group
+        self.columns = columns
+        self.rows = {}
+        self.stats = {}
+
+    def _group_stats(self, value) -> Dict[str, RunningStats]:
+        if value not in self.stats:
+            self.stats[value] = {column: RunningStats() for column in self.columns}
+            self.rows[value] = 0
+        return self.stats[value]
+
+    def add(self, df: pd.DataFrame) -> 'GroupStats':
+        groups = df.groupby(self.group, sort=False) if self.group else [(None, df)]
+        for value, part in groups:
+            stats = self._group_stats(value)
+            self.rows[value] += len(part)
+            for column in self.columns:
+                stats[column].add(part[column])
+        return self
+
+    def merge(self, other: 'GroupStats') -> 'GroupStats':
+        for value, stats in other.stats.items():
+            mine = self._group_stats(value)
+            self.rows[value] += other.rows[value]
+            for column in self.columns:
+                mine[column].merge(stats[column])
+        return self
+
+    def count(self, value=None) -> int:
+        return self.rows.get(value, 0)
+
+    def mean(self, column: str, value=None) -> float:
+        stats = self.stats.get(value)
+        return stats[column].mean if stats else math.nan
+
+
+def fold(chunks: Iterator[pd.DataFrame], *accumulators, prepare: Optional[Callable] = None) -> int:
+    """Feed every chunk to each accumulator, returning the number of rows seen"""
+    rows = 0
+    for chunk in chunks:
+        if prepare is not None:
+            chunk = prepare(chunk)
+        rows += len(chunk)
+        for accumulator in accumulators:
+            accumulator.add(chunk)
+    return rows
@@ -0,0 +1,35 @@
+"""
+Roadside Assistance Admin Platform - Python Test Configuration
+Makes the `python` package importable when pytest runs from any directory,
+and holds the test doubles several test modules share
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+class FakeTables:
+    """In-memory table source for frames.build_frame, standing in for a Snapshot
+
+    Frames are given as one dict or as keyword arguments, and stay reachable
+    (and replaceable) through `frames`. load_frame records each query it runs
+    in `calls`, for stores that take a frame loader.
+    """
+
+    def __init__(self, frames=None, **named):
+        self.frames = frames if frames is not None else named
+        self.calls = []
+
+    def table(self, name):
+        return self.frames[name]
+
+    def load_frame(self, query, **params):
+        pytest.importorskip('duckdb')
+        from python.frames import build_frame
+
+        self.calls.append(query.name)
+        return build_frame(query, self, **params)
@@ -0,0 +1,102 @@
+"""
+Tests for the synthetic data generator and the benchmark suite's baseline comparison
+"""
+
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from python.benchmarks.suite import WORKLOADS, compare, measure_isolated
+from python.benchmarks.synthetic import ensure_dataset, generate
+from python.snapshot import SNAPSHOT_TABLES
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+requires_pyarrow = pytest.mark.skipif(not HAVE_PYARROW, reason='pyarrow is not available')
+
+END = datetime(2024, 7, 1)
+
+
+def test_generation_is_seeded():
+    first = generate(5000, seed=7, end=END)
+    second = generate(5000, seed=7, end=END)
+    other = generate(5000, seed=8, end=END)
+
+    for name, df in first.items():
+        pd.testing.assert_frame_equal(df, second[name])
+    assert not first['service_requests']['customer_id'].equals(other['service_requests']['customer_id'])
+
+
+def test_requests_are_consistent():
+    tables = generate(20000, seed=1, days=90, end=END)
+    requests = tables['service_requests']
+
+    assert list(requests.columns) == SNAPSHOT_TABLES['service_requests']['columns']
+    assert len(requests) == 20000
+    assert requests['created_at'].is_monotonic_increasing
+    assert requests['created_at'].min() >= pd.Timestamp(END) - pd.Timedelta(days=90)
+    assert requests['created_at'].max() < pd.Timestamp(END)
+
+    completed = requests['status'] == 'completed'
+    assert requests.loc[completed, 'actual_cost'].notna().all()
+    assert requests.loc[~completed, ['actual_cost', 'customer_rating', 'completed_at']].isna().all().all()
+    assert (requests.loc[completed, 'completed_at'] > requests.loc[completed, 'started_at']).all()
+    assert (requests['updated_at'] >= requests['created_at']).all()
+
+    # Every reference points at a generated row
+    assert requests['customer_id'].isin(tables['customers']['id']).all()
+    assert requests['driver_id'].dropna().isin(tables['drivers']['id']).all()
+    assert requests['service_type_id'].isin(tables['service_types']['id']).all()
+
+
+def results(wall_ms, queries, peak=200.0, error=None):
+    return {'scales': {'10k': {'workloads': {'analyze:demand': {
+        'wall_ms': wall_ms, 'peak_rss_mb': peak, 'base_rss_mb': 150.0, 'queries': queries, 'error': error
+    }}}}}
+
+
+def test_compare_flags_slower_heavier_chattier_and_failed_runs():
+    baseline = results(1000.0, 5)
+
+    assert compare(results(1200.0, 5, peak=220.0), baseline, 0.25) == []
+    assert compare(results(1000.0, 5), {}, 0.25) == []
+
+    assert 'wall' in compare(results(1400.0, 5), baseline, 0.25)[0]
+    assert 'queries' in compare(results(1000.0, 6), baseline, 0.25)[0]
+    assert 'memory' in compare(results(1000.0, 5, peak=300.0), baseline, 0.25)[0]
+    assert compare(results(1000.0, 5, error='ValueError: boom'), {}, 0.25) == [
+        '10k analyze:demand: ValueError: boom'
+    ]
+
+
+@requires_pyarrow
+def test_workloads_run_against_the_synthetic_snapshot(tmp_path):
+    data_dir = str(tmp_path / 'data')
+    info = ensure_dataset(data_dir, 2000, seed=3)
+    assert ensure_dataset(data_dir, 2000, seed=3) == info
+
+    result = measure_isolated('analyze:revenue', data_dir)
+
+    assert result['error'] is None
+    assert result['queries'] == sum(result['by_query'].values()) > 0
+    assert result['peak_rss_mb'] >= result['base_rss_mb'] > 0
+    assert set(WORKLOADS) >= {'analyze:demand', 'analyze:all', 'report:daily', 'report:monthly'}
+
+
+@requires_pyarrow
+def test_workloads_run_against_duckdb(tmp_path):
+    pytest.importorskip('duckdb')
+    data_dir = str(tmp_path / 'data')
+    ensure_dataset(data_dir, 2000, seed=3, duckdb=True)
+
+    result = measure_isolated('analyze:drivers', data_dir, 'duckdb')
+
+    assert result['error'] is None
+    assert result['queries'] == sum(result['by_query'].values()) > 0
+    assert result['rows_read'] > 0
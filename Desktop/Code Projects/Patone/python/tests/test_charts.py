@@ -0,0 +1,63 @@
+"""
+Tests for the content-addressed report chart cache
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from python.charts import ChartCache
+
+TREND = {'dates': ['2024-01-01', '2024-01-02', '2024-01-03'], 'requests': [4, 7, 5],
+         'revenue': [400.0, None, 510.5]}
+
+
+def test_keys_depend_on_content_not_order():
+    first = ChartCache.make_key('trend', {'a': [1, 2], 'b': 'x'}, {'title': 'T'})
+    assert first == ChartCache.make_key('trend', {'b': 'x', 'a': [1, 2]}, {'title': 'T'})
+    assert first != ChartCache.make_key('trend', {'a': [1, 3], 'b': 'x'}, {'title': 'T'})
+    assert first != ChartCache.make_key('trend', {'a': [1, 2], 'b': 'x'}, {'title': 'U'})
+    assert first != ChartCache.make_key('service_mix', {'a': [1, 2], 'b': 'x'}, {'title': 'T'})
+
+
+def test_charts_render_once_per_content(tmp_path):
+    cache = ChartCache(str(tmp_path))
+
+    path = cache.chart('trend', TREND, 'Requests')
+    assert open(path, 'rb').read(8) == b'\x89PNG\r\n\x1a\n'
+    assert cache.chart('trend', dict(TREND), 'Requests') == path
+    assert cache.stats()['renders'] == 1 and cache.stats()['hits'] == 1
+
+    mix = cache.chart('service_mix', {'labels': ['Towing', 'Lockout'], 'requests': [9, 2]})
+    drivers = cache.chart('drivers', {'names': ['Ann Lee', 'Ann Lee'], 'revenue': [300.0, None],
+                                      'ratings': [4.5, None]})
+    assert len({path, mix, drivers}) == 3
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    with pytest.raises(ValueError):
+        cache.chart('pie', {})
+
+
+def test_least_recently_used_charts_are_evicted(tmp_path):
+    cache = ChartCache(str(tmp_path))
+    first = cache.chart('service_mix', {'labels': ['A'], 'requests': [1]})
+    cache.max_disk_bytes = os.path.getsize(first) + 1
+
+    second = cache.chart('service_mix', {'labels': ['B'], 'requests': [2]})
+    assert os.path.exists(second) and not os.path.exists(first)
+    assert cache.stats()['evictions'] == 1
+
+
+def render(path):
+    return ChartCache(path).chart('trend', TREND, 'Requests')
+
+
+def test_worker_processes_share_the_cache(tmp_path):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        paths = list(executor.map(render, [str(tmp_path)] * 4))
+
+    assert len(set(paths)) == 1
+    assert [name for name in os.listdir(tmp_path)] == [os.path.basename(paths[0])]
@@ -0,0 +1,104 @@
+"""
+Tests for set-based batch customer analysis reports
+"""
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from conftest import FakeTables
+from python import queries
+from python.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def generator(tmp_path):
+    requests = pd.DataFrame({
+        'id': list(range(1, 61)) + [61, 62],
+        'customer_id': [10.0] * 60 + [11.0, 11.0],
+        'driver_id': [1.0] * 62,
+        'service_type_id': [1.0, 2.0] * 31,
+        'status': (['completed', 'cancelled'] * 30) + ['pending', 'cancelled'],
+        'actual_cost': ([80.0, None] * 30) + [None, None],
+        'customer_rating': ([5.0, None] * 30) + [None, None],
+        'created_at': pd.date_range('2024-01-01', periods=62, freq='7h'),
+    })
+    customers = pd.DataFrame({
+        'id': [10, 11, 12], 'first_name': ['Cat', 'Dan', 'Eve'], 'last_name': ['Fox', 'Gil', 'Hay'],
+        'email': ['c@x.com', 'd@x.com', 'e@x.com'], 'phone': ['1', '2', '3'],
+        'city': ['A', 'B', 'C'], 'state': ['IL', 'IL', 'WI'], 'is_vip': [1, 0, 1],
+        'status': ['active'] * 3, 'created_at': pd.to_datetime(['2023-01-01'] * 3)
+    })
+
+    generator = ReportGenerator()
+    generator.output_dir = str(tmp_path)
+    generator.snapshot = FakeTables(
+        service_requests=requests,
+        customers=customers,
+        service_types=pd.DataFrame({'id': [1, 2], 'name': ['Towing', 'Jump Start']}),
+    )
+    generator.built = []
+    fetch_all = generator._fetch_all
+
+    def counting_fetch_all(conn, query, **params):
+        generator.built.append(query.name)
+        return fetch_all(conn, query, **params)
+
+    generator._fetch_all = counting_fetch_all
+    return generator
+
+
+def test_batch_rows_match_the_single_customer_queries(generator):
+    batch = generator._get_customer_batch([10, 11, 12])
+    assert len(generator.built) == 4
+
+    for customer_id in (10, 11):
+        assert batch['customers'][customer_id] == generator._get_customer_details(None, customer_id)
+        assert batch['history'][customer_id] == generator._get_customer_service_history(None, customer_id)
+        assert batch['loyalty'][customer_id] == generator._get_customer_loyalty_metrics(None, customer_id)
+    assert batch['spending'][10] == generator._get_customer_spending_analysis(None, 10)
+
+    # History is capped per customer, like the single query's LIMIT 50
+    assert len(batch['history'][10]) == 50
+    # Customers without completed requests (or without any) have no aggregate rows
+    assert 11 not in batch['spending']
+    assert 12 in batch['customers'] and 12 not in batch['history']
+
+
+def test_batches_fetch_a_fixed_number_of_queries_and_record_missing_customers(generator, monkeypatch):
+    monkeypatch.setitem(generator.report_config, 'customer_batch_size', 2)
+    monkeypatch.setattr(generator, '_create_customer_analysis_pdf', lambda *args: None)
+
+    results = generator.generate_customer_analyses([10, 11, 12, 404, 10], workers=1)
+
+    # Duplicates are dropped; two batches of four queries each
+    assert [r['customer_id'] for r in results] == [10, 11, 12, 404]
+    assert len(generator.built) == 8
+    statuses = {r['customer_id']: r['status'] for r in results}
+    assert statuses == {10: 'completed', 11: 'completed', 12: 'completed', 404: 'failed'}
+    assert results[-1]['error'] == 'Customer 404 not found'
+
+
+def test_vip_selection(generator, monkeypatch):
+    monkeypatch.setattr(generator, '_render_batch', lambda jobs, *args: generator.rendered.extend(jobs))
+    generator.rendered = []
+
+    results = generator.generate_customer_analyses(vip=True)
+    assert [r['customer_id'] for r in results] == [10, 12]
+    assert generator.built[0] == queries.CUSTOMER_IDS_VIP.name
+
+    assert [r['customer_id'] for r in generator.generate_customer_analyses([11, 12], vip=True)] == [12]
+    with pytest.raises(ValueError):
+        generator.generate_customer_analyses()
+
+
+def test_batch_pdfs_render_across_worker_processes(generator):
+    pytest.importorskip('reportlab')
+    pytest.importorskip('matplotlib')
+
+    results = generator.generate_customer_analyses([10, 11], workers=2)
+
+    assert [r['status'] for r in results] == ['completed', 'completed']
+    for result in results:
+        with open(result['filepath'], 'rb') as f:
+            assert f.read(4) == b'%PDF'
@@ -0,0 +1,127 @@
+"""
+Tests for computing daily report sections from a single extraction
+"""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('reportlab')
+
+from python.query_builder import day_range
+from python.report_generator import ReportGenerator
+
+
+def row(id, status, created, driver=None, service_type=1, cost=None, rating=None,
+        started=None, completed=None):
+    names = {1: ('Ann', 'Lee'), 2: ('Bob', 'Ray')}
+    first, last = names.get(driver, (None, None))
+    return {
+        'id': id, 'status': status, 'driver_id': driver,
+        'driver_first_name': first, 'driver_last_name': last,
+        'service_type_id': service_type, 'service_type': {1: 'Towing', 2: 'Jump Start'}[service_type],
+        'actual_cost': cost, 'customer_rating': rating,
+        'created_at': created, 'started_at': started, 'completed_at': completed
+    }
+
+
+@pytest.fixture
+def sections():
+    rows = [
+        row(1, 'completed', datetime(2024, 1, 15, 8), driver=1, cost=100, rating=5,
+            started=datetime(2024, 1, 15, 8, 10), completed=datetime(2024, 1, 15, 8, 55, 30)),
+        row(2, 'completed', datetime(2024, 1, 15, 9), driver=1, service_type=2, cost=50, rating=2,
+            started=datetime(2024, 1, 15, 9, 20), completed=datetime(2024, 1, 15, 9, 40)),
+        row(3, 'cancelled', datetime(2024, 1, 15, 10), driver=2,
+            started=datetime(2024, 1, 15, 10, 5)),
+        row(4, 'pending', datetime(2024, 1, 15, 23, 59)),
+        # Created the day before but completed and rated on the report day
+        row(5, 'completed', datetime(2024, 1, 14, 22), driver=2, cost=75, rating=4,
+            started=datetime(2024, 1, 14, 22, 30), completed=datetime(2024, 1, 15, 1)),
+    ]
+    generator = ReportGenerator()
+    return generator._build_daily_sections(generator._daily_rows_frame(rows), day_range('2024-01-15'))
+
+
+def test_statistics_only_count_requests_created_that_day(sections):
+    stats = sections['stats']
+    assert stats['total_requests'] == 4
+    assert stats['completed_requests'] == 2
+    assert stats['cancelled_requests'] == 1
+    assert stats['avg_completion_time'] == pytest.approx((55 + 40) / 2)
+    assert stats['total_revenue'] == 150
+    assert stats['active_drivers'] == 2
+    assert stats['avg_response_time'] == pytest.approx((10 + 20 + 5) / 3)
+
+
+def test_requests_by_type_are_sorted_by_volume(sections):
+    assert [s['service_type'] for s in sections['requests_by_type']] == ['Towing', 'Jump Start']
+    towing = sections['requests_by_type'][0]
+    assert towing['request_count'] == 3
+    assert towing['total_revenue'] == 100
+    assert towing['avg_cost'] == 100
+
+
+def test_driver_performance_counts_completed_services(sections):
+    assert sections['driver_performance'] == [{
+        'first_name': 'Ann', 'last_name': 'Lee', 'services_completed': 2,
+        'revenue_generated': 150.0, 'avg_service_time': pytest.approx(32.5),
+        'avg_rating': pytest.approx(3.5)
+    }]
+
+
+def test_satisfaction_is_keyed_on_completion_date(sections):
+    satisfaction = sections['satisfaction']
+    assert satisfaction['total_rated_services'] == 3
+    assert satisfaction['satisfied_customers'] == 2
+    assert satisfaction['dissatisfied_customers'] == 1
+    assert satisfaction['satisfaction_rate'] == pytest.approx(200 / 3)
+
+
+def test_revenue_summary(sections):
+    assert sections['revenue'] == {
+        'paid_services': 2, 'total_revenue': 150.0, 'avg_service_cost': 75.0,
+        'min_cost': 50.0, 'max_cost': 100.0
+    }
+
+
+def test_empty_day_matches_sql_null_semantics():
+    generator = ReportGenerator()
+    sections = generator._build_daily_sections(generator._daily_rows_frame([]), day_range('2024-01-15'))
+    assert sections['stats']['completed_requests'] is None
+    assert sections['stats']['total_revenue'] == 0
+    assert sections['revenue']['min_cost'] is None
+    assert sections['requests_by_type'] == []
+
+
+def test_range_rows_split_into_the_same_sections_as_single_days(sections):
+    rows = [
+        row(1, 'completed', datetime(2024, 1, 14, 22), driver=2, cost=75, rating=4,
+            started=datetime(2024, 1, 14, 22, 30), completed=datetime(2024, 1, 15, 1)),
+        row(2, 'pending', datetime(2024, 1, 15, 12)),
+        row(3, 'cancelled', datetime(2024, 1, 16, 0)),
+    ]
+    generator = ReportGenerator()
+    days = [datetime(2024, 1, d).date() for d in (14, 15, 16)]
+    split = generator._split_rows_by_day(generator._daily_rows_frame(rows), days)
+
+    assert [sorted(frame['id']) for _, frame in split] == [[1], [1, 2], [3]]
+    assert split[1][0] == day_range('2024-01-15')
+
+    sections = generator._build_daily_sections(split[1][1], split[1][0])
+    assert sections['stats']['total_requests'] == 1
+    assert sections['satisfaction']['total_rated_services'] == 1
+
+
+def test_rows_of_days_left_out_of_a_split_are_dropped():
+    rows = [
+        row(1, 'pending', datetime(2024, 1, 14, 12)),
+        row(2, 'pending', datetime(2024, 1, 15, 12)),
+        row(3, 'pending', datetime(2024, 1, 16, 12)),
+    ]
+    generator = ReportGenerator()
+    days = [datetime(2024, 1, d).date() for d in (14, 16)]
+    split = generator._split_rows_by_day(generator._daily_rows_frame(rows), days)
+
+    assert [sorted(frame['id']) for _, frame in split] == [[1], [3]]
@@ -0,0 +1,164 @@
+"""
+Tests for the shared database connection pool
+"""
+
+import threading
+
+import pytest
+
+from python.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+        self.connected = False
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect(**config):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    kwargs.setdefault('size', 2)
+    kwargs.setdefault('checkout_timeout', 0.05)
+    kwargs.setdefault('max_lifetime', 0)
+    pool = ConnectionPool(db_config={}, connect=connect, **kwargs)
+    return pool, opened
+
+
+def test_connections_are_reused():
+    pool, opened = make_pool()
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(opened) == 1
+    assert pool.stats()['checkouts'] == 2
+
+
+def test_pool_never_exceeds_size_and_times_out():
+    pool, opened = make_pool(size=1)
+
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+    stats = pool.stats()
+    assert len(opened) == 1
+    assert stats['waits'] == 1
+    assert stats['timeouts'] == 1
+
+
+def test_waiting_checkout_gets_released_connection():
+    pool, opened = make_pool(size=1, checkout_timeout=2)
+    conn = pool.acquire()
+    result = {}
+
+    def borrower():
+        with pool.connection() as c:
+            result['conn'] = c
+
+    thread = threading.Thread(target=borrower)
+    thread.start()
+    pool.release(conn)
+    thread.join()
+
+    assert result['conn'] is conn
+    assert pool.stats()['peak_in_use'] == 1
+
+
+def test_dead_connection_is_replaced_on_checkout():
+    pool, opened = make_pool()
+
+    with pool.connection() as conn:
+        pass
+    conn.connected = False
+
+    with pool.connection() as replacement:
+        assert replacement is not conn
+        assert replacement.is_connected()
+
+    assert conn.closed
+    assert pool.stats()['reconnects'] == 1
+
+
+def test_open_transaction_is_rolled_back_on_release():
+    pool, opened = make_pool()
+
+    with pool.connection() as conn:
+        conn.in_transaction = True
+
+    assert conn.rollbacks == 1
+
+
+def test_broken_connection_is_discarded_after_error():
+    pool, opened = make_pool()
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.connected = False
+            raise RuntimeError('lost connection')
+
+    stats = pool.stats()
+    assert stats['open_connections'] == 0
+    assert stats['in_use'] == 0
+
+
+def test_interrupted_checkout_is_still_released():
+    pool, opened = make_pool(size=1)
+
+    with pytest.raises(KeyboardInterrupt):
+        with pool.connection():
+            raise KeyboardInterrupt
+
+    def rows():
+        with pool.connection() as conn:
+            yield conn
+
+    stream = rows()
+    next(stream)
+    # Closing a generator mid-query raises GeneratorExit inside it
+    stream.close()
+
+    stats = pool.stats()
+    assert stats['in_use'] == 0
+    assert pool.acquire() is opened[0]
+
+
+def test_failed_reconnect_frees_the_slot_and_counts_the_close():
+    pool, opened = make_pool(size=1)
+    with pool.connection() as conn:
+        pass
+    conn.connected = False
+
+    def refuse(**config):
+        raise ConnectionError('database is down')
+
+    pool._connect = refuse
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats['open_connections'] == 0
+    assert stats['connections_closed'] == 1
+    assert stats['in_use'] == 0
@@ -0,0 +1,170 @@
+"""
+Tests for the MySQL-to-DuckDB dialect translation and the embedded DuckDB
+backend, checked against the same queries run over the in-memory tables
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('duckdb')
+
+from conftest import FakeTables
+from python import duckdb_backend, queries
+from python.benchmarks.synthetic import generate
+from python.config import DUCKDB_CONFIG, PATHS
+from python.dialects import DUCKDB, MYSQL, translate
+from python.frames import build_frame
+from python.query_builder import QUERY_REGISTRY, DateRange, month_range
+
+END = datetime(2024, 7, 1)
+
+
+def test_mysql_functions_are_rewritten():
+    sql = translate("""
+        SELECT DATE(created_at) as day, HOUR(created_at) as hour,
+               AVG(TIMESTAMPDIFF(MINUTE, created_at, COALESCE(assigned_at, NOW()))) as wait,
+               DATEDIFF(NOW(), MIN(created_at)) as age
+        FROM service_requests
+        WHERE created_at >= DATE_SUB(%s, INTERVAL 7 DAY) AND id IN (%s, %s)
+    """, DUCKDB)
+
+    assert 'CAST(created_at AS DATE) as day' in sql
+    assert 'hour(created_at) as hour' in sql
+    assert ("CAST(trunc(date_diff('microsecond', created_at, COALESCE(assigned_at, current_localtimestamp())) "
+            "/ 60000000) AS BIGINT)") in sql
+    assert "date_diff('day', CAST(MIN(created_at) AS DATE), CAST(current_localtimestamp() AS DATE))" in sql
+    assert '(? - INTERVAL 7 DAY)' in sql
+    assert '%s' not in sql and 'IN (?, ?)' in sql
+    assert translate('SELECT DATE(x) FROM t WHERE a = %s', MYSQL) == 'SELECT DATE(x) FROM t WHERE a = %s'
+    with pytest.raises(ValueError):
+        translate('SELECT 1', 'oracle')
+
+
+def test_translated_functions_keep_mysql_semantics():
+    import duckdb
+
+    row = duckdb.connect().execute(translate("""
+        SELECT TIMESTAMPDIFF(MINUTE, TIMESTAMP '2024-01-01 10:00:59', TIMESTAMP '2024-01-01 10:02:30'),
+               TIMESTAMPDIFF(MINUTE, TIMESTAMP '2024-01-01 10:02:30', TIMESTAMP '2024-01-01 10:00:59'),
+               DATEDIFF(TIMESTAMP '2024-01-02 00:10:00', TIMESTAMP '2024-01-01 23:50:00'),
+               CONVERT_TZ(TIMESTAMP '2024-01-01 12:00:00', 'UTC', 'America/Chicago')
+    """, DUCKDB)).fetchone()
+
+    # Whole minutes truncated toward zero, calendar-day differences, zone shifts
+    assert row[:3] == (1, -1, 1)
+    assert row[3] == datetime(2024, 1, 1, 6, 0)
+
+
+@pytest.fixture(scope='module')
+def tables():
+    return generate(20000, seed=5, days=120, end=END)
+
+
+@pytest.fixture
+def database(tables, tmp_path):
+    path = str(tmp_path / 'analytics.duckdb')
+    counts = duckdb_backend.load_tables(tables, path)
+    assert counts['service_requests'] == 20000
+    return path
+
+
+PARAMS = {
+    'period': month_range(2024, 5),
+    'since': datetime(2024, 6, 20),
+    'customer_id': 7,
+    'customer_ids': [3, 7, 11, 999999]
+}
+
+
+def normalized(df):
+    df = df.copy()
+    for column in df.columns:
+        values = df[column]
+        sample = values.dropna()
+        if pd.api.types.is_datetime64_any_dtype(values) or (
+                len(sample) and isinstance(sample.iloc[0], (date, datetime))):
+            df[column] = pd.to_datetime(values)
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            df[column] = values.astype('float64').round(6)
+        else:
+            df[column] = values.astype(object).where(values.notna(), None)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('name', sorted(QUERY_REGISTRY))
+def test_every_query_matches_on_the_database_file_and_the_frames(name, tables, database):
+    query = QUERY_REGISTRY[name]
+    params = {param: PARAMS[param] for param in query.param_names}
+
+    pool = duckdb_backend.create_pool(database, size=1)
+    with pool.connection() as conn:
+        actual = conn.read_frame(*query.statement(conn.dialect, **params))
+    expected = build_frame(query, FakeTables(tables), **params)
+
+    assert len(actual) == len(expected)
+    if len(expected):
+        pd.testing.assert_frame_equal(normalized(actual), normalized(expected[list(actual.columns)]),
+                                      check_dtype=False)
+
+
+def test_cursor_adapter_fetches_dict_rows_in_chunks(database):
+    pool = duckdb_backend.create_pool(database, size=2)
+    with pool.connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        queries.CUSTOMER_DETAILS.execute(cursor, customer_id=7)
+        row = cursor.fetchone()
+        assert row['id'] == 7 and 'first_name' in row
+
+        cursor = conn.cursor(buffered=False)
+        queries.MONTHLY_REQUEST_LOG.execute(cursor, period=month_range(2024, 5))
+        first = cursor.fetchmany(100)
+        assert len(first) == 100 and isinstance(first[0], tuple)
+
+    with pytest.raises(FileNotFoundError):
+        duckdb_backend.open_database(database + '.missing')
+
+
+@pytest.fixture
+def duckdb_source(database, tmp_path, monkeypatch):
+    for name in ('rollups', 'results', 'models', 'reports', 'charts'):
+        monkeypatch.setitem(PATHS, name, str(tmp_path / name))
+    monkeypatch.setitem(DUCKDB_CONFIG, 'path', database)
+    monkeypatch.setattr(duckdb_backend, '_shared_pool', None)
+
+
+def test_analyzer_frames_match_the_in_memory_tables(duckdb_source, tables):
+    from python.data_analyzer import DataAnalyzer
+
+    embedded = DataAnalyzer('duckdb', use_cache=False)
+    reference = DataAnalyzer(use_cache=False)
+    reference.snapshot = FakeTables(tables)
+
+    period = DateRange(datetime(2024, 4, 1), END)
+    for query in (queries.DRIVER_PERFORMANCE, queries.CUSTOMER_BEHAVIOR, queries.SERVICE_DEMAND):
+        frame = embedded._load_frame(query, period=period)
+        pd.testing.assert_frame_equal(normalized(frame),
+                                      normalized(reference._load_frame(query, period=period)))
+        # Streamed chunks come from the same statement
+        streamed = pd.concat(embedded._iter_frames(query, period=period), ignore_index=True)
+        assert len(streamed) == len(frame)
+
+
+def test_report_queries_run_concurrently_on_duckdb(duckdb_source, tables, monkeypatch):
+    from python.report_generator import ReportGenerator
+
+    generator = ReportGenerator('duckdb')
+    assert generator.pool.size == DUCKDB_CONFIG['connections']
+    captured = {}
+    monkeypatch.setattr(generator, '_create_monthly_report_pdf',
+                        lambda *args, **kwargs: captured.update(args=args, log=list(kwargs['request_log'])))
+
+    generator.generate_monthly_report(2024, 5)
+
+    _, _, _, stats, trends, top_customers, service_analysis = captured['args']
+    expected = build_frame(queries.MONTHLY_STATISTICS, FakeTables(tables), period=month_range(2024, 5))
+    assert stats['total_requests'] == expected['total_requests'][0]
+    assert len(trends) == 31
+    assert len(captured['log']) == stats['total_requests']
+    assert generator.pool.stats()['peak_in_use'] > 1
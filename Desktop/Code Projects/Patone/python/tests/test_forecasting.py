@@ -0,0 +1,118 @@
+"""
+Tests for the vectorized demand forecaster
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from python.forecasting import (
+    TrendSeasonalModel, backtest, demand_matrix, forecast_demand
+)
+
+# A Monday, so weekday offsets line up with the profile below
+START = date(2024, 1, 1)
+WEEKLY_PROFILE = [0, 2, 2, 3, 6, 9, 4]
+
+
+def demand_frame(days, types=(1, 2, 3), hours=(8, 17)):
+    """Noise-free hourly demand with a per-type level, trend and weekly profile"""
+    rows = []
+    for offset in range(days):
+        day = START + timedelta(days=offset)
+        for service_type in types:
+            daily = 10 * service_type + 0.5 * offset + WEEKLY_PROFILE[day.weekday()]
+            for hour in hours:
+                rows.append({
+                    'date': day.isoformat(),
+                    'hour': hour,
+                    'service_type_id': service_type,
+                    'request_count': daily / len(hours),
+                    'avg_response_time': 12.0
+                })
+    return pd.DataFrame(rows)
+
+
+def expected_total(offset, types=(1, 2, 3)):
+    day = START + timedelta(days=offset)
+    return sum(10 * t + 0.5 * offset + WEEKLY_PROFILE[day.weekday()] for t in types)
+
+
+def test_demand_matrix_zero_fills_missing_days_and_hours():
+    df = demand_frame(10)
+    df = df[~((df['service_type_id'] == 2) & (df['date'] == '2024-01-05'))]
+
+    keys, start, Y = demand_matrix(df)
+    assert keys == [1, 2, 3]
+    assert start == START
+    assert Y.shape == (3, 10)
+    assert Y[1, 4] == 0
+
+    keys, _, Y = demand_matrix(df, by_hour=True)
+    assert len(keys) == 3 * 24
+    assert Y.shape == (72, 10)
+
+
+def test_model_recovers_trend_and_weekly_profile():
+    _, start, Y = demand_matrix(demand_frame(42))
+    model = TrendSeasonalModel().fit(start, Y)
+
+    assert model.seasonal
+    np.testing.assert_allclose(model.fitted(), Y, atol=1e-8)
+    np.testing.assert_allclose(model.trend_per_week(), [3.5, 3.5, 3.5])
+
+    forecast = model.predict(14)
+    expected = [expected_total(42 + i) for i in range(14)]
+    np.testing.assert_allclose(forecast.sum(axis=0), expected)
+
+
+def test_vectorized_fit_matches_fitting_each_series_alone():
+    rng = np.random.default_rng(7)
+    Y = rng.poisson(20, size=(12, 60)).astype('float64')
+
+    together = TrendSeasonalModel().fit(START, Y).predict(10)
+    for i, row in enumerate(Y):
+        alone = TrendSeasonalModel().fit(START, row[np.newaxis, :]).predict(10)
+        np.testing.assert_allclose(together[i], alone[0])
+
+
+def test_short_history_falls_back_to_trend_only():
+    result = forecast_demand(demand_frame(10), 3)
+    assert result['model'] == 'trend'
+    assert 'error' in result['backtest']
+
+
+def test_forecast_demand_keeps_analyzer_output_shape():
+    result = forecast_demand(demand_frame(42), 7)
+
+    assert result['model'] == 'trend + day of week'
+    assert result['trend'] == 'increasing'
+    assert result['model_accuracy'] == pytest.approx(1.0)
+    assert [p['date'] for p in result['predictions']] == [
+        (START + timedelta(days=42 + i)).isoformat() for i in range(7)
+    ]
+    assert result['predictions'][0]['predicted_demand'] == pytest.approx(round(expected_total(42), 1))
+    assert sorted(result['by_series']) == [1, 2, 3]
+    totals = np.sum(list(result['by_series'].values()), axis=0)
+    np.testing.assert_allclose(totals, [p['predicted_demand'] for p in result['predictions']], atol=0.1)
+
+
+def test_backtest_scores_each_rolling_origin():
+    _, start, Y = demand_matrix(demand_frame(42))
+    result = backtest(start, Y, horizon=7, folds=4)
+
+    assert [fold['origin'] for fold in result['folds']] == [
+        (START + timedelta(days=d)).isoformat() for d in (14, 21, 28, 35)
+    ]
+    assert result['total']['mae'] == pytest.approx(0, abs=1e-8)
+    assert result['per_series']['wape'] == pytest.approx(0, abs=1e-8)
+
+
+def test_hourly_series_forecast_keys():
+    result = forecast_demand(demand_frame(21), 5, by_hour=True)
+    assert len(result['by_series']) == 3 * 24
+    assert result['by_series']['1:00'] == [0.0] * 5
+    assert len(result['by_series']['2:17']) == 5
@@ -0,0 +1,134 @@
+"""
+Tests for the shared PDF engine and the monthly and customer report layouts
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('reportlab')
+
+from reportlab.platypus import Paragraph, Table
+
+from python import charts, pdf_engine
+from python.report_generator import ReportGenerator
+
+
+@pytest.fixture(autouse=True)
+def chart_cache(tmp_path, monkeypatch):
+    pytest.importorskip('matplotlib')
+    cache = charts.ChartCache(str(tmp_path / 'charts'))
+    monkeypatch.setattr(charts, 'get_chart_cache', lambda: cache)
+    return cache
+
+
+def test_styles_are_built_once():
+    assert pdf_engine.styles() is pdf_engine.styles()
+    assert pdf_engine.table_style('listing') is pdf_engine.table_style('listing')
+    assert pdf_engine.table_style('summary') is not pdf_engine.table_style('listing')
+    with pytest.raises(ValueError):
+        pdf_engine.table_style('fancy')
+
+
+def test_table_chunks_repeat_the_header_per_piece():
+    pieces = list(pdf_engine.table_chunks(['A', 'B'], ([i, i * 2] for i in range(7)), chunk_rows=3))
+
+    assert [len(piece._cellvalues) for piece in pieces] == [4, 4, 2]
+    assert all(isinstance(piece, Table) and piece._cellvalues[0] == ['A', 'B'] for piece in pieces)
+    assert pieces[-1]._cellvalues[-1] == [6, 12]
+
+    empty = list(pdf_engine.table_chunks(['A'], iter([]), empty='Nothing here.'))
+    assert len(empty) == 1 and isinstance(empty[0], Paragraph)
+
+
+def test_documents_are_laid_out_while_rows_are_produced(tmp_path):
+    document = pdf_engine.ReportDocument(str(tmp_path / 'long.pdf'), 'Long')
+    pages_when_pulled = []
+
+    def rows():
+        for i in range(2000):
+            pages_when_pulled.append(document.pages)
+            yield [str(i), 'row']
+
+    document.build(pdf_engine.table_chunks(['ID', 'Value'], rows(), chunk_rows=50))
+
+    # Earlier pages were finished before the last rows were even produced
+    assert pages_when_pulled[0] <= 1
+    assert pages_when_pulled[-1] >= 20
+    assert document.pages >= 20
+    assert (tmp_path / 'long.pdf').read_bytes().startswith(b'%PDF')
+
+
+def test_titles_are_plain_text(tmp_path):
+    heading = pdf_engine.title_block('Smith & Sons <Towing>')[0]
+    assert heading.getPlainText() == 'Smith & Sons <Towing>'
+
+    document = pdf_engine.ReportDocument(str(tmp_path / 'title.pdf'), 'Smith & Sons <Towing>')
+    document.build(pdf_engine.title_block('Smith & Sons <Towing>'))
+    assert document.pages == 1
+
+
+@pytest.fixture
+def generator(tmp_path):
+    generator = ReportGenerator()
+    generator.output_dir = str(tmp_path)
+    return generator
+
+
+def request_log(count):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            'id': i + 1, 'created_at': start + timedelta(minutes=7 * i), 'service_type': 'Towing',
+            'status': 'completed' if i % 4 else 'cancelled',
+            'customer_first_name': 'Ann', 'customer_last_name': 'Lee',
+            'driver_first_name': None if i % 5 == 0 else 'Bob', 'driver_last_name': 'Ray',
+            'actual_cost': 95.5 if i % 4 else None
+        }
+
+
+def test_monthly_report_renders_every_section(generator, tmp_path, chart_cache):
+    filepath = str(tmp_path / 'monthly.pdf')
+    stats = {'total_requests': 900, 'completed_requests': 675, 'cancelled_requests': 225,
+             'total_revenue': 64462.5, 'avg_service_cost': 95.5}
+    trends = [{'date': date(2024, 1, d), 'total': 29, 'revenue': 2079.5} for d in range(1, 32)]
+    top_customers = [{'first_name': 'Ann', 'last_name': 'Lee', 'service_count': 675, 'total_spent': 64462.5}]
+    service_analysis = {'service_types': [{'name': 'Towing', 'request_count': 900, 'revenue': 64462.5},
+                                          {'name': 'Lockout', 'request_count': 0, 'revenue': None}]}
+
+    story = list(generator._monthly_report_story('Monthly', stats, trends, top_customers,
+                                                 service_analysis, request_log(900)))
+    sections = [f.getPlainText() for f in story
+                if isinstance(f, Paragraph) and f.style is pdf_engine.styles()['section']]
+    assert sections == ['Key Statistics', 'Service Types', 'Top Customers', 'Daily Trends', 'Request Log']
+    log_rows = sum(len(f._cellvalues) - 1 for f in story
+                   if isinstance(f, Table) and f._cellvalues[0][0] == 'ID')
+    assert log_rows == 900
+
+    generator._create_monthly_report_pdf(filepath, 2024, 1, stats, trends, top_customers,
+                                         service_analysis, request_log=request_log(900))
+    assert (tmp_path / 'monthly.pdf').read_bytes().startswith(b'%PDF')
+    # Service mix and daily trend charts
+    assert chart_cache.stats()['renders'] == 2
+
+
+def test_customer_report_renders_and_requires_a_customer(generator, tmp_path):
+    customer = {'id': 7, 'first_name': 'Ann', 'last_name': 'Lee', 'email': 'ann@example.com',
+                'phone': '555-0100', 'city': 'Springfield', 'state': 'IL', 'is_vip': 1,
+                'status': 'active', 'created_at': datetime(2022, 3, 1)}
+    history = [{'created_at': datetime(2024, 1, d), 'service_type_name': 'Towing', 'status': 'completed',
+                'actual_cost': 120.0, 'customer_rating': 5} for d in range(1, 20)]
+    generator._create_customer_analysis_pdf(
+        str(tmp_path / 'customer.pdf'), customer, history,
+        {'total_services': 19, 'total_spent': 2280.0, 'avg_per_service': 120.0, 'max_spent': 120.0},
+        {'first_service': datetime(2022, 3, 5), 'last_service': datetime(2024, 1, 19),
+         'days_as_customer': 700, 'total_services': 19}
+    )
+    assert (tmp_path / 'customer.pdf').read_bytes().startswith(b'%PDF')
+
+    generator._fetch_concurrently = lambda fetchers: {
+        'customer': None, 'service_history': [], 'spending': None, 'loyalty': None
+    }
+    with pytest.raises(ValueError, match='Customer 8 not found'):
+        generator.generate_customer_analysis(8)
@@ -0,0 +1,295 @@
+"""
+Tests for the analysis pipeline and DataAnalyzer.analyze_all
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from python.pipeline import Pipeline
+
+def test_steps_receive_dependency_results_and_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def extract(value):
+        # Both extractions must be running at once to get past the barrier
+        barrier.wait()
+        return value
+
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add('left', lambda: extract(2), kind='extract')
+    pipeline.add('right', lambda: extract(3), kind='extract')
+    pipeline.add('product', lambda left, right: left * right, deps=['left', 'right'])
+
+    run = pipeline.run()
+
+    assert run['results'] == {'left': 2, 'right': 3, 'product': 6}
+    assert run['errors'] == {}
+    stages = {stage['name']: stage for stage in run['stages']}
+    assert stages['product']['deps'] == ['left', 'right']
+    assert stages['product']['started'] >= max(stages[name]['started'] + stages[name]['duration']
+                                               for name in ('left', 'right')) - 1e-3
+    assert all(stage['status'] == 'ok' for stage in run['stages'])
+
+
+def test_failed_steps_skip_their_dependents_only():
+    def broken():
+        raise RuntimeError('connection lost')
+
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add('broken', broken, kind='extract')
+    pipeline.add('derived', lambda value: value, deps=['broken'])
+    pipeline.add('independent', lambda: time.sleep(0.01) or 'ok')
+
+    run = pipeline.run()
+
+    assert run['results'] == {'independent': 'ok'}
+    assert run['errors']['broken'] == 'connection lost'
+    statuses = {stage['name']: stage['status'] for stage in run['stages']}
+    assert statuses == {'broken': 'failed', 'derived': 'skipped', 'independent': 'ok'}
+
+
+def test_dependencies_must_already_exist():
+    pipeline = Pipeline(max_workers=1)
+    pipeline.add('a', lambda: 1)
+    with pytest.raises(ValueError):
+        pipeline.add('b', lambda a: a, deps=['missing'])
+    with pytest.raises(ValueError):
+        pipeline.add('a', lambda: 2)
+
+
+class FakeRollups:
+    def __init__(self, demand, revenue):
+        self.demand = demand
+        self.revenue = revenue
+        self.refreshes = 0
+        self.reads = []
+
+    def refresh(self, full=False):
+        self.refreshes += 1
+        return {}
+
+    def hourly(self, period, refresh=True):
+        if refresh:
+            self.refresh()
+        self.reads.append(period)
+        return period
+
+    def service_demand(self, period, buckets=None):
+        return self.demand(self.hourly(period) if buckets is None else buckets).copy()
+
+    def revenue_trends(self, period, buckets=None):
+        return self.revenue(self.hourly(period) if buckets is None else buckets).copy()
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    np = pytest.importorskip('numpy')
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('sklearn')
+    from python.config import PATHS
+    for name in ('rollups', 'results', 'models'):
+        monkeypatch.setitem(PATHS, name, str(tmp_path / name))
+
+    from python.data_analyzer import DataAnalyzer
+
+    now = datetime.now()
+    rng = np.random.default_rng(9)
+
+    def hours(period):
+        start = period.start.replace(minute=0, second=0, microsecond=0)
+        stamps = pd.date_range(start, period.end, freq='h', inclusive='left')
+        return pd.DataFrame({'date': stamps.normalize(), 'hour': stamps.hour})
+
+    def demand(period):
+        df = hours(period)
+        df['service_type_id'] = (np.arange(len(df)) % 3) + 1
+        df['request_count'] = (df['hour'] % 5) + 1
+        df['avg_response_time'] = 20.0 + df['hour']
+        return df
+
+    def revenue(period):
+        df = hours(period)
+        df['service_type'] = np.array(['Towing', 'Lockout'])[np.arange(len(df)) % 2]
+        df['service_count'] = (df['hour'] % 4) + 1
+        df['daily_revenue'] = df['service_count'] * 75.0
+        df['avg_service_cost'] = 75.0
+        return df
+
+    count = 120
+    customers = pd.DataFrame({
+        'id': np.arange(1, count + 1),
+        'first_name': [f'First{i}' for i in range(count)],
+        'last_name': [f'Last{i}' for i in range(count)],
+        'is_vip': (np.arange(count) % 4 == 0).astype(int),
+        'total_services': rng.integers(1, 30, count),
+        'total_spent': rng.gamma(2, 200, count).round(2),
+        'avg_service_cost': rng.gamma(2, 40, count).round(2),
+        'last_service_date': [now - timedelta(days=int(d)) for d in rng.integers(1, 200, count)],
+        'avg_rating_given': rng.uniform(1, 5, count),
+        'days_since_first_service': rng.integers(1, 400, count)
+    })
+    drivers = pd.DataFrame({
+        'id': np.arange(1, 31),
+        'first_name': [f'Driver{i}' for i in range(30)],
+        'last_name': ['X'] * 30,
+        'total_services': rng.integers(5, 50, 30),
+        'total_revenue': rng.gamma(3, 500, 30).round(2),
+        'avg_service_cost': rng.gamma(2, 40, 30),
+        'avg_completion_time': rng.uniform(20, 120, 30).round(),
+        'avg_rating': rng.uniform(2.5, 5, 30),
+        'completed_services': rng.integers(1, 5, 30),
+        'cancelled_services': rng.integers(0, 2, 30)
+    })
+    frames = {'customer_behavior': customers, 'driver_performance': drivers}
+    for table, rows in (('service_requests', 100), ('drivers', 30), ('customers', count), ('service_types', 2)):
+        frames[f'{table}_watermark'] = pd.DataFrame({'table_name': [table], 'last_updated': [str(now)],
+                                                     'last_id': [rows]})
+        frames[f'{table}_row_count'] = pd.DataFrame({'row_count': [rows]})
+
+    analyzer = DataAnalyzer(use_cache=False)
+    analyzer.loads = []
+
+    def load_frame(query, **params):
+        analyzer.loads.append(query.name)
+        return frames[query.name].copy()
+
+    analyzer._load_frame = load_frame
+    analyzer.rollups = FakeRollups(demand, revenue)
+    return analyzer
+
+
+def test_analyze_all_shares_rollups_and_isolates_failures(analyzer):
+    results = analyzer.analyze_all()
+
+    # One refresh, and one bucket read per window: demand (30 days) and revenue (90 days)
+    assert analyzer.rollups.refreshes == 1
+    assert sorted((p.end - p.start).days for p in analyzer.rollups.reads) == [30, 90]
+    # Without a result cache there is nothing to key, so no watermark is read
+    assert not [name for name in analyzer.loads if name.endswith('_watermark')]
+
+    for name in ('demand', 'drivers', 'customers', 'revenue'):
+        assert 'error' not in results[name]
+    stages = {stage['name']: stage for stage in results['pipeline']['stages']}
+    assert stages['demand_frame']['deps'] == ['hourly_rollups_30d']
+    assert stages['revenue_frame']['deps'] == ['hourly_rollups_90d']
+
+    same_window = analyzer.analyze_all(days=30)
+    assert analyzer.rollups.refreshes == 2
+    assert [(p.end - p.start).days for p in analyzer.rollups.reads[2:]] == [30]
+    assert 'error' not in same_window['revenue']
+
+
+def test_analyze_all_matches_the_individual_analyses(analyzer, tmp_path):
+    from python.result_cache import ResultCache, _json_default
+
+    expected = {
+        'demand': analyzer.analyze_service_demand(30),
+        'drivers': analyzer.analyze_driver_performance(30),
+        'customers': analyzer.analyze_customer_behavior(90),
+        'revenue': analyzer.analyze_revenue_trends(90)
+    }
+    # With a cache every result comes back as the JSON it was stored as
+    expected = json.loads(json.dumps(expected, default=_json_default))
+    analyzer.result_cache = ResultCache(path=str(tmp_path / 'cache'))
+    del analyzer.loads[:]
+    results = analyzer.analyze_all()
+    # Every table the analyses declare is read once for the whole pipeline
+    assert sorted(name for name in analyzer.loads if name.endswith('_watermark')) == [
+        'customers_watermark', 'drivers_watermark', 'service_requests_watermark', 'service_types_watermark'
+    ]
+
+    for name, value in expected.items():
+        if name == 'customers':
+            # The second pass assigns with the model the first one trained
+            assert results[name]['segmentation']['model_version'] == value['segmentation']['model_version']
+            assert results[name]['segmentation']['retrained'] is None
+            assert results[name]['customer_segments'] == value['customer_segments']
+            assert results[name]['summary'] == value['summary']
+        else:
+            assert results[name] == value
+    assert results['pipeline']['cached'] == []
+
+    # Entries written by analyze_all are the ones the individual methods read
+    assert analyzer.analyze_revenue_trends(90) == results['revenue']
+    assert analyzer.result_cache.stats()['hits'] >= 1
+    assert analyzer.analyze_all()['pipeline']['cached'] == ['demand', 'drivers', 'customers', 'revenue']
+
+
+def test_fresh_and_cached_results_are_equal(analyzer, tmp_path):
+    from python.result_cache import ResultCache
+
+    analyzer.result_cache = ResultCache(path=str(tmp_path / 'cache'))
+    fresh = analyzer.analyze_service_demand(30)
+    assert analyzer.analyze_service_demand(30) == fresh
+    assert analyzer.result_cache.stats()['hits'] == 1
+
+    # The first pass trains the segmentation model, which is part of the customers key
+    analyzer.analyze_all()
+    analyzer.result_cache.clear()
+    fresh = analyzer.analyze_all()
+    assert fresh['pipeline']['cached'] == []
+    cached = analyzer.analyze_all()
+    assert cached['pipeline']['cached'] == ['demand', 'drivers', 'customers', 'revenue']
+    for name in ('demand', 'drivers', 'customers', 'revenue'):
+        assert cached[name] == fresh[name]
+
+
+def test_row_counts_are_rechecked_only_after_the_interval(analyzer, monkeypatch):
+    from python.config import RESULT_CACHE_CONFIG
+
+    monkeypatch.setitem(RESULT_CACHE_CONFIG, 'row_count_interval', 300)
+    first = analyzer.data_watermark(['service_requests'])
+    analyzer.data_watermark(['service_requests'])
+    # The indexed MAX() watermark is read on every lookup, COUNT(*) once per interval
+    assert analyzer.loads.count('service_requests_watermark') == 2
+    assert analyzer.loads.count('service_requests_row_count') == 1
+    assert first['service_requests'][1:] == [100, 100]
+
+    monkeypatch.setitem(RESULT_CACHE_CONFIG, 'row_count_interval', 0)
+    analyzer.data_watermark(['service_requests'])
+    assert analyzer.loads.count('service_requests_row_count') == 2
+
+
+def test_cli_defaults_to_30_days_except_for_the_whole_pipeline(analyzer, monkeypatch, capsys):
+    from python import data_analyzer
+
+    calls = []
+    analyzer.analyze_all = lambda days=None: calls.append(('all', days)) or {}
+    analyzer.analyze_customer_behavior = lambda days: calls.append(('customers', days)) or {}
+    monkeypatch.setattr(data_analyzer, 'DataAnalyzer', lambda *args, **kwargs: analyzer)
+
+    for argv in (['--analysis', 'all'], ['--analysis', 'customers'], ['--analysis', 'customers', '--days', 90],
+                 ['--analysis', 'all', '--days', 7]):
+        monkeypatch.setattr('sys.argv', ['data_analyzer.py'] + [str(arg) for arg in argv])
+        assert data_analyzer.main() == 0
+    assert calls == [('all', None), ('customers', 30), ('customers', 90), ('all', 7)]
+
+
+def test_pinned_watermark_is_private_to_the_analyze_all_thread(analyzer, tmp_path):
+    from python.result_cache import ResultCache
+
+    analyzer.result_cache = ResultCache(path=str(tmp_path / 'cache'))
+    entered, release = threading.Event(), threading.Event()
+    refresh = analyzer.rollups.refresh
+
+    def blocking_refresh(full=False):
+        entered.set()
+        release.wait(5)
+        return refresh(full)
+
+    analyzer.rollups.refresh = blocking_refresh
+    worker = threading.Thread(target=analyzer.analyze_all)
+    worker.start()
+    try:
+        assert entered.wait(5)
+        # Another thread sharing the analyzer reads the watermark itself
+        before = analyzer.loads.count('service_requests_watermark')
+        analyzer.data_watermark(['service_requests'])
+        assert analyzer.loads.count('service_requests_watermark') == before + 1
+    finally:
+        release.set()
+        worker.join(5)
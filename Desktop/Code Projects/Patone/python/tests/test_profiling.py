@@ -0,0 +1,135 @@
+"""
+Tests for the span-tree profiler, its Prometheus export and the analyzer's
+query instrumentation
+"""
+
+import json
+
+import pytest
+
+from python import profiling
+from python.pipeline import Pipeline
+from python.profiling import Profiler, profiled, span, to_prometheus, traced_chunks
+
+
+def spans(node, kind=None):
+    """Every span in a trace dict, depth first"""
+    found = [] if kind is not None and node['kind'] != kind else [node]
+    for child in node['children']:
+        found.extend(spans(child, kind))
+    return found
+
+
+@profiled()
+def derive(value):
+    with span('inner', kind='step', size=value):
+        return value * 2
+
+
+def test_nothing_is_recorded_without_an_active_profiler():
+    assert profiling.get_profiler() is None
+    assert derive(4) == 8
+    with span('query', 'query') as query_span:
+        query_span.add_rows([(1, 'a')])
+    assert list(traced_chunks('q', iter([1, 2]))) == [1, 2]
+
+
+def test_spans_nest_and_record_errors():
+    with Profiler('test') as profiler:
+        assert derive(3) == 6
+        with pytest.raises(ValueError):
+            with span('failing'):
+                raise ValueError('boom')
+
+    trace = profiler.to_dict()
+    root = trace['root']
+    assert profiling.get_profiler() is None
+    assert [child['name'] for child in root['children']] == ['derive', 'failing']
+    derive_span = root['children'][0]
+    assert derive_span['children'][0]['name'] == 'inner'
+    assert derive_span['children'][0]['attributes'] == {'size': 3}
+    assert derive_span['duration'] >= derive_span['children'][0]['duration']
+    assert root['children'][1]['attributes']['error'] == 'ValueError: boom'
+    # The trace is plain JSON
+    json.dumps(trace)
+
+
+def test_pipeline_stages_stay_under_the_callers_span():
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add('left', lambda: derive(1), kind='extract')
+    pipeline.add('right', lambda: derive(2), kind='extract')
+    pipeline.add('sum', lambda left, right: left + right, deps=['left', 'right'])
+
+    with Profiler('test') as profiler:
+        with span('analysis', 'analysis'):
+            assert pipeline.run()['results']['sum'] == 6
+
+    analysis = profiler.to_dict()['root']['children'][0]
+    stages = {stage['name']: stage for stage in analysis['children']}
+    assert set(stages) == {'left', 'right', 'sum'}
+    assert stages['left']['children'][0]['name'] == 'derive'
+    assert stages['left']['thread'].startswith('pipeline')
+
+
+def test_streamed_chunks_count_rows_without_capturing_the_consumer():
+    pd = pytest.importorskip('pandas')
+    chunks = [pd.DataFrame({'id': range(5)}), pd.DataFrame({'id': range(3)})]
+
+    with Profiler('test') as profiler:
+        for _ in traced_chunks('customer_behavior', iter(chunks)):
+            # Work done by the consumer is not nested under the query
+            derive(1)
+
+    root = profiler.to_dict()['root']
+    query = spans(root, 'query')[0]
+    assert query['attributes']['rows'] == 8 and query['attributes']['chunks'] == 2
+    assert query['attributes']['bytes'] > 0
+    assert query['children'] == []
+    assert [child['name'] for child in root['children']].count('derive') == 2
+
+
+def test_prometheus_export_totals_spans_by_kind_and_name():
+    with Profiler('analysis:all') as profiler:
+        for rows in ([(1,), (2,)], [(3,)]):
+            with span('driver_performance', 'query') as query_span:
+                query_span.add_rows(rows)
+        derive(1)
+        profiler.record('report.pdf', 'pdf', 0.25)
+
+    text = to_prometheus(profiler.to_dict(), prefix='roadside')
+    lines = text.splitlines()
+
+    assert '# TYPE roadside_span_seconds_total counter' in lines
+    assert 'roadside_span_calls_total{run="analysis:all",kind="query",name="driver_performance"} 2' in lines
+    assert 'roadside_span_rows_total{run="analysis:all",kind="query",name="driver_performance"} 3' in lines
+    assert 'roadside_span_seconds_total{run="analysis:all",kind="pdf",name="report.pdf"} 0.25' in lines
+    assert any(line.startswith('roadside_run_seconds{run="analysis:all"}') for line in lines)
+    # Only spans that fetched data have row series
+    assert not any(line.startswith('roadside_span_rows_total') and 'derive' in line for line in lines)
+
+
+def test_analyzer_queries_and_steps_are_profiled(monkeypatch):
+    pd = pytest.importorskip('pandas')
+    from python import queries
+    from python.data_analyzer import DataAnalyzer
+
+    frame = pd.DataFrame({
+        'id': [1, 2], 'first_name': ['A', 'B'], 'last_name': ['X', 'Y'],
+        'total_services': [10, 4], 'total_revenue': [900.0, 300.0], 'avg_service_cost': [90.0, 75.0],
+        'avg_completion_time': [40.0, 55.0], 'avg_rating': [4.8, 3.9],
+        'completed_services': [9, 3], 'cancelled_services': [1, 1]
+    })
+    analyzer = DataAnalyzer(use_cache=False)
+    monkeypatch.setattr('python.data_analyzer.build_frame', lambda query, snapshot, **params: frame.copy())
+    analyzer.snapshot = object()
+
+    with Profiler('test') as profiler:
+        results = analyzer.analyze_driver_performance(30)
+
+    assert results['summary']['total_drivers'] == 2
+    analysis = profiler.to_dict()['root']['children'][0]
+    assert (analysis['kind'], analysis['name']) == ('analysis', 'drivers')
+    query = spans(analysis, 'query')[0]
+    assert query['name'] == queries.DRIVER_PERFORMANCE.name
+    assert query['attributes']['rows'] == 2 and query['attributes']['bytes'] > 0
+    assert '_calculate_performance_score' in {step['name'] for step in spans(analysis, 'step')}
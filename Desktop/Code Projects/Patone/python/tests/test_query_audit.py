@@ -0,0 +1,145 @@
+"""
+Tests for the query audit's plan analysis, index suggestions and baseline
+comparison, on EXPLAIN FORMAT=JSON plans as MySQL 8 returns them
+"""
+
+import pytest
+
+from python import queries
+from python.query_audit import (
+    AUDIT_FORMAT_VERSION, audit_values, compare, parse_analyze, plan_findings, suggest_index,
+    table_accesses, table_aliases
+)
+from python.query_builder import QUERY_REGISTRY
+
+EXISTING = {
+    'service_requests': [['id'], ['customer_id'], ['driver_id'], ['status'], ['created_at']],
+    'drivers': [['id'], ['last_name', 'first_name']]
+}
+
+# driver_performance when the optimizer ignores idx_driver: both tables scanned,
+# grouped through a temporary table and sorted
+DRIVER_PLAN = {
+    'query_block': {
+        'select_id': 1,
+        'cost_info': {'query_cost': '251034.20'},
+        'ordering_operation': {
+            'using_filesort': True,
+            'grouping_operation': {
+                'using_temporary_table': True,
+                'using_filesort': False,
+                'nested_loop': [
+                    {'table': {
+                        'table_name': 'd', 'access_type': 'ALL', 'possible_keys': ['PRIMARY'],
+                        'rows_examined_per_scan': 40, 'filtered': '100.00',
+                        'used_columns': ['id', 'first_name', 'last_name']
+                    }},
+                    {'table': {
+                        'table_name': 'sr', 'access_type': 'ALL',
+                        'possible_keys': ['idx_driver', 'idx_created'],
+                        'rows_examined_per_scan': 98211, 'filtered': '100.00',
+                        'using_join_buffer': 'hash join',
+                        'used_columns': ['id', 'driver_id', 'status', 'actual_cost', 'customer_rating',
+                                         'created_at', 'completed_at'],
+                        'attached_condition': "<if>(is_not_null_compl(sr), ((`roadside`.`sr`.`driver_id` = "
+                                              "`roadside`.`d`.`id`) and (`roadside`.`sr`.`created_at` >= "
+                                              "TIMESTAMP'2024-05-01 00:00:00') and (`roadside`.`sr`.`created_at` "
+                                              "< TIMESTAMP'2024-06-01 00:00:00')), true)"
+                    }}
+                ]
+            }
+        }
+    }
+}
+
+# customer_details: a primary key lookup
+DETAILS_PLAN = {
+    'query_block': {
+        'select_id': 1,
+        'cost_info': {'query_cost': '1.00'},
+        'table': {
+            'table_name': 'customers', 'access_type': 'const', 'possible_keys': ['PRIMARY'],
+            'key': 'PRIMARY', 'rows_examined_per_scan': 1, 'used_columns': ['id', 'first_name']
+        }
+    }
+}
+
+
+def test_every_registered_query_can_be_explained_with_the_audit_values():
+    values = audit_values(customer_ids=[1, 2, 3])
+    for query in QUERY_REGISTRY.values():
+        sql, params = query.statement(**{name: values[name] for name in query.param_names})
+        assert sql.count('%s') == len(params)
+
+
+def test_plan_walk_finds_every_table_access_and_alias():
+    accesses = table_accesses(DRIVER_PLAN)
+    assert [(a['alias'], a['access_type'], a['rows']) for a in accesses] == [('d', 'ALL', 40), ('sr', 'ALL', 98211)]
+    assert table_aliases(queries.DRIVER_PERFORMANCE.sql) == {
+        'drivers': 'drivers', 'd': 'drivers', 'service_requests': 'service_requests', 'sr': 'service_requests'
+    }
+
+
+def test_scans_sorts_and_unused_indexes_are_flagged():
+    findings, suggestions = plan_findings(queries.DRIVER_PERFORMANCE, DRIVER_PLAN, EXISTING, max_scan_rows=1000)
+    kinds = {(f['kind'], f['table']): f['severity'] for f in findings}
+
+    assert kinds == {
+        ('small_full_scan', 'drivers'): 'info',
+        ('full_scan', 'service_requests'): 'fail',
+        ('filesort', None): 'warn',
+        ('temporary_table', None): 'warn',
+        ('index_not_chosen', None): 'warn'
+    }
+    # Join column first, then the range column, then what the query reads
+    assert suggestions == [{
+        'table': 'service_requests',
+        'columns': ['driver_id', 'created_at', 'status', 'actual_cost', 'customer_rating', 'completed_at'],
+        'covering': True,
+        'sql': 'ALTER TABLE service_requests ADD INDEX `idx_driver_id_created_at_cover` '
+               '(`driver_id`, `created_at`, `status`, `actual_cost`, `customer_rating`, `completed_at`)'
+    }]
+
+    findings, suggestions = plan_findings(queries.CUSTOMER_DETAILS, DETAILS_PLAN, EXISTING)
+    assert findings == [] and suggestions == []
+
+
+def test_suggestions_respect_existing_indexes_and_width():
+    access = table_accesses(DRIVER_PLAN)[1]
+
+    narrow = suggest_index('service_requests', access, EXISTING, max_columns=3)
+    assert narrow['columns'] == ['driver_id', 'created_at'] and not narrow['covering']
+
+    existing = dict(EXISTING, service_requests=[['driver_id', 'created_at']])
+    assert suggest_index('service_requests', access, existing, max_columns=3) is None
+
+
+def test_analyze_tree_gives_actual_time_and_rows():
+    tree = ("-> Sort: total_services DESC  (actual time=812.4..812.5 rows=40 loops=1)\n"
+            "    -> Table aggregate  (actual time=811.9..812.1 rows=40 loops=1)\n"
+            "        -> Table scan on sr  (cost=9912 rows=98211) (actual time=0.1..402.3 rows=98211 loops=1)")
+    parsed = parse_analyze(tree)
+    assert parsed['actual_ms'] == pytest.approx(812.5)
+    assert parsed['actual_rows'] == 40 and parsed['table_scans'] == 1
+
+
+def audit(findings, error=None):
+    return {'version': AUDIT_FORMAT_VERSION,
+            'queries': {'driver_performance': {'error': error, 'findings': findings}}}
+
+
+def test_compare_fails_on_new_findings_only():
+    full_scan = {'kind': 'full_scan', 'severity': 'fail', 'table': 'service_requests', 'detail': '98211 rows'}
+    filesort = {'kind': 'filesort', 'severity': 'warn', 'table': None, 'detail': 'sorts rows'}
+    small = {'kind': 'small_full_scan', 'severity': 'info', 'table': 'drivers', 'detail': '40 rows'}
+
+    # Without a baseline only 'fail' findings count
+    assert compare(audit([filesort, small]), {}) == []
+    assert compare(audit([full_scan]), {}) == ['driver_performance: full_scan on service_requests (98211 rows)']
+
+    # With one, anything above info that the baseline did not have is a regression
+    assert compare(audit([full_scan, filesort]), audit([full_scan, filesort])) == []
+    assert compare(audit([filesort, small]), audit([])) == ['driver_performance: filesort (sorts rows)']
+    assert compare(audit([], error='ProgrammingError: boom'), audit([])) == [
+        'driver_performance: ProgrammingError: boom'
+    ]
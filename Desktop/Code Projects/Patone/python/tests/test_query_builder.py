@@ -0,0 +1,103 @@
+"""
+Tests for date-range building and the query registry
+"""
+
+import re
+from datetime import date, datetime
+
+import pytest
+
+from python import queries
+from python import query_builder
+from python.query_builder import (
+    QUERY_REGISTRY, DateRange, date_span, day_range, month_range, trailing_days
+)
+
+
+@pytest.fixture
+def timezones(monkeypatch):
+    def configure(report, database):
+        monkeypatch.setitem(query_builder.TIMEZONE_CONFIG, 'report_timezone', report)
+        monkeypatch.setitem(query_builder.TIMEZONE_CONFIG, 'database_timezone', database)
+    configure('', '')
+    return configure
+
+
+def test_day_range_is_half_open(timezones):
+    assert day_range('2024-01-15') == DateRange(datetime(2024, 1, 15), datetime(2024, 1, 16))
+
+
+def test_date_span_includes_last_day(timezones):
+    span = date_span(date(2024, 1, 30), '2024-02-01')
+    assert span == DateRange(datetime(2024, 1, 30), datetime(2024, 2, 2))
+
+
+def test_date_span_rejects_reversed_dates(timezones):
+    with pytest.raises(ValueError):
+        date_span('2024-02-01', '2024-01-01')
+
+
+def test_month_range_covers_leap_february(timezones):
+    assert month_range(2024, 2) == DateRange(datetime(2024, 2, 1), datetime(2024, 3, 1))
+
+
+def test_month_range_rolls_into_next_year(timezones):
+    assert month_range(2023, 12) == DateRange(datetime(2023, 12, 1), datetime(2024, 1, 1))
+
+
+def test_trailing_days_ends_at_now(timezones):
+    now = datetime(2024, 3, 10, 12, 30)
+    assert trailing_days(7, now=now) == DateRange(datetime(2024, 3, 3, 12, 30), now)
+
+
+def test_report_day_is_converted_to_database_time(timezones):
+    timezones('America/New_York', 'UTC')
+    assert day_range('2024-01-15') == DateRange(datetime(2024, 1, 15, 5), datetime(2024, 1, 16, 5))
+
+
+def test_daylight_saving_day_is_23_hours(timezones):
+    timezones('America/New_York', 'UTC')
+    period = day_range('2024-03-10')
+    assert period.end - period.start == datetime(2024, 1, 1, 23) - datetime(2024, 1, 1)
+
+
+def test_unknown_time_zone_is_rejected(timezones):
+    timezones('America/Nowhere', 'UTC')
+    with pytest.raises(ValueError, match='America/Nowhere'):
+        day_range('2024-03-10')
+
+
+def test_query_params_expand_date_ranges():
+    period = DateRange(datetime(2024, 1, 1), datetime(2024, 1, 2))
+    assert queries.MONTHLY_STATISTICS.params(period=period) == (period.start, period.end)
+
+
+def test_query_params_require_every_value():
+    with pytest.raises(ValueError):
+        queries.CUSTOMER_SPENDING.params()
+
+
+@pytest.mark.parametrize('query', QUERY_REGISTRY.values(), ids=lambda q: q.name)
+def test_filters_do_not_wrap_columns_in_functions(query):
+    where = re.split(r'\bWHERE\b|\bON\b', query.sql, maxsplit=1)
+    filters = where[1] if len(where) > 1 else ''
+    filters = re.split(r'\bGROUP BY\b|\bORDER BY\b|\bHAVING\b', filters)[0]
+    assert not re.search(r'\b(DATE|HOUR|YEAR|MONTH)\s*\(', filters)
+
+
+@pytest.mark.parametrize('query', QUERY_REGISTRY.values(), ids=lambda q: q.name)
+def test_placeholders_match_param_spec(query):
+    values = {'period': day_range('2024-01-15'), 'customer_id': 1, 'customer_ids': [4, 5, 6],
+              'since': datetime(2024, 1, 15)}
+    sql, params = query.statement(**{name: values[name] for name in query.param_names})
+    assert sql.count('%s') == len(params)
+    assert '{' not in sql
+
+
+def test_list_parameters_expand_to_one_placeholder_per_value():
+    sql, params = queries.CUSTOMER_SPENDING_BATCH.statement(customer_ids=[3, 1, 2])
+    assert 'customer_id IN (%s, %s, %s)' in sql
+    assert params == (3, 1, 2)
+
+    sql, params = queries.CUSTOMER_SPENDING_BATCH.statement(customer_ids=[])
+    assert 'customer_id IN (NULL)' in sql and params == ()
@@ -0,0 +1,73 @@
+"""
+EXPLAIN regression tests for analysis and report queries
+
+These run against the database in DB_CONFIG and are skipped when it is not
+reachable. They check that every query's filter stays sargable, i.e. the
+optimizer still lists the expected index as usable and no part of the
+statement, such as one branch of a UNION, scans service_requests.
+"""
+
+import re
+from datetime import date, datetime
+
+import pytest
+
+from python import queries  # noqa: F401 - populates the registry
+from python.config import DB_CONFIG
+from python.query_builder import QUERY_REGISTRY, day_range
+
+mysql_connector = pytest.importorskip('mysql.connector')
+
+# UNION queries whose branches filter on different columns: every index listed must be usable
+BRANCH_INDEXES = {
+    'daily_request_rows': ['idx_created', 'idx_completed_rating'],
+    'daily_report_fingerprint': ['idx_created', 'idx_completed_rating']
+}
+
+
+@pytest.fixture(scope='module')
+def conn():
+    try:
+        connection = mysql_connector.connect(**DB_CONFIG)
+    except mysql_connector.Error as e:
+        pytest.skip(f"Database not available: {e}")
+    yield connection
+    connection.close()
+
+
+def explain(conn, query):
+    values = {'period': day_range(date.today()), 'customer_id': 1, 'customer_ids': [1, 2, 3],
+              'since': datetime(2024, 1, 15)}
+    sql, params = query.statement(**{name: values[name] for name in query.param_names})
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('EXPLAIN ' + sql, params)
+    plan = cursor.fetchall()
+    cursor.close()
+    return plan
+
+
+def request_aliases(query):
+    """Names the plan can list service_requests under: the table and its aliases"""
+    return {'service_requests'} | set(re.findall(r'\bservice_requests\s+([a-z_]+)\b', query.sql))
+
+
+@pytest.mark.parametrize('query', [q for q in QUERY_REGISTRY.values() if q.index],
+                         ids=lambda q: q.name)
+def test_query_can_use_its_index(conn, query):
+    plan = explain(conn, query)
+    usable = set()
+    for row in plan:
+        usable.update((row.get('possible_keys') or '').split(','))
+        if row.get('key'):
+            usable.add(row['key'])
+    assert query.index in usable, f"{query.name} cannot use {query.index}: {plan}"
+    scans = [row for row in plan if row.get('table') in request_aliases(query) and row.get('type') == 'ALL']
+    assert not scans, f"{query.name} scans service_requests: {scans}"
+
+
+@pytest.mark.parametrize('name', sorted(BRANCH_INDEXES))
+def test_every_union_branch_can_use_its_index(conn, name):
+    plan = explain(conn, QUERY_REGISTRY[name])
+    for index in BRANCH_INDEXES[name]:
+        assert any(index in (row.get('possible_keys') or '').split(',') or row.get('key') == index
+                   for row in plan), f"{name} cannot use {index}: {plan}"
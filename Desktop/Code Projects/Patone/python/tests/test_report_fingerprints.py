@@ -0,0 +1,140 @@
+"""
+Tests for skipping daily reports whose inputs are unchanged since they were
+last rendered
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from conftest import FakeTables
+from python import queries, report_generator
+from python.benchmarks.synthetic import generate
+from python.report_generator import ReportGenerator
+
+END = datetime(2024, 7, 1)
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    rendered = []
+
+    def render(self, filepath, date, *sections):
+        rendered.append(date)
+        with open(filepath, 'w') as f:
+            f.write(date)
+
+    monkeypatch.setattr(ReportGenerator, '_create_daily_report_pdf', render)
+    generator = ReportGenerator('snapshot')
+    generator.snapshot = FakeTables(generate(3000, seed=3, days=10, end=END))
+    generator.output_dir = str(tmp_path)
+    generator.rendered = rendered
+    return generator
+
+
+def touch(generator, created_on, updated_at=datetime(2024, 7, 2, 9)):
+    """Update the first request created on a day, as an edit in the admin would"""
+    requests = generator.snapshot.frames['service_requests']
+    row = requests.index[requests['created_at'].dt.strftime('%Y-%m-%d') == created_on][0]
+    requests.loc[row, 'updated_at'] = updated_at
+    return requests.loc[row]
+
+
+def test_unchanged_day_returns_the_existing_report(generator, monkeypatch):
+    filepath = generator.generate_daily_report('2024-06-28')
+    assert generator.rendered == ['2024-06-28']
+    assert generator.store.find('daily', {'date': '2024-06-28'})['path'] == filepath
+
+    fetched = []
+    with monkeypatch.context() as patch:
+        patch.setattr(generator, '_get_daily_request_rows', lambda conn, period: fetched.append(period))
+        assert generator.generate_daily_report('2024-06-28') == filepath
+    assert generator.rendered == ['2024-06-28'] and fetched == []
+
+    # Edited data, a new template version, --force and a deleted PDF each render again
+    touch(generator, '2024-06-28')
+    generator.generate_daily_report('2024-06-28')
+    monkeypatch.setattr(report_generator, 'DAILY_REPORT_VERSION', report_generator.DAILY_REPORT_VERSION + 1)
+    generator.generate_daily_report('2024-06-28')
+    generator.generate_daily_report('2024-06-28', force=True)
+    generator.generate_daily_report('2024-06-28')
+    assert len(generator.rendered) == 4
+
+    os.remove(filepath)
+    generator.generate_daily_report('2024-06-28')
+    assert len(generator.rendered) == 5
+
+
+def test_rated_completions_count_toward_the_day_they_completed(generator):
+    requests = generator.snapshot.frames['service_requests']
+    late = requests[requests['customer_rating'].notna()
+                    & (requests['completed_at'].dt.date != requests['created_at'].dt.date)
+                    & (requests['completed_at'] < END)].iloc[0]
+    completed_on = late['completed_at'].strftime('%Y-%m-%d')
+
+    before = generator._daily_fingerprints(
+        report_generator.day_range(completed_on), [completed_on])[completed_on]
+    requests.loc[late.name, 'updated_at'] = datetime(2024, 7, 2, 9)
+    after = generator._daily_fingerprints(
+        report_generator.day_range(completed_on), [completed_on])[completed_on]
+    assert before != after
+
+
+def test_driver_pings_leave_past_days_unchanged(generator):
+    period = report_generator.date_span('2024-06-24', '2024-06-28')
+    dates = ['2024-06-24', '2024-06-25', '2024-06-26', '2024-06-27', '2024-06-28']
+    before = generator._daily_fingerprints(period, dates)
+
+    # Location, status and rating updates touch every driver's updated_at
+    drivers = generator.snapshot.frames['drivers']
+    drivers['status'] = 'available'
+    drivers['rating'] = drivers['rating'] - 0.1
+    drivers['updated_at'] = pd.Timestamp(2024, 7, 2, 9)
+    assert generator._daily_fingerprints(period, dates) == before
+
+    # Renaming a driver changes the days whose report names them
+    requests = generator.snapshot.frames['service_requests']
+    created_on = requests['created_at'].dt.strftime('%Y-%m-%d')
+    renamed = requests.loc[created_on == '2024-06-26', 'driver_id'].dropna().iloc[0]
+    named_on = set(created_on[requests['driver_id'] == renamed])
+    drivers.loc[drivers['id'] == renamed, 'last_name'] = 'Renamed'
+    after = generator._daily_fingerprints(period, dates)
+    assert {date for date in dates if after[date] != before[date]} == named_on & set(dates)
+
+
+def test_backfill_only_renders_changed_days(generator, monkeypatch):
+    results = generator.generate_daily_reports('2024-06-24', '2024-06-30', workers=1)
+    assert [r['status'] for r in results] == ['completed'] * 7
+
+    touch(generator, '2024-06-26')
+    touch(generator, '2024-06-28')
+    fetched = []
+    original = generator._get_daily_request_rows
+    monkeypatch.setattr(generator, '_get_daily_request_rows',
+                        lambda conn, period: fetched.append(period) or original(conn, period))
+
+    results = generator.generate_daily_reports('2024-06-24', '2024-06-30', workers=1)
+    assert {r['date']: r['status'] for r in results if r['status'] != 'unchanged'} == {
+        '2024-06-26': 'completed', '2024-06-28': 'completed'
+    }
+    assert generator.rendered[7:] == ['2024-06-26', '2024-06-28']
+    # One fetch covering the changed days only
+    assert len(fetched) == 1
+    assert fetched[0] == report_generator.date_span('2024-06-26', '2024-06-28')
+
+    results = generator.generate_daily_reports('2024-06-24', '2024-06-30', workers=1)
+    assert {r['status'] for r in results} == {'unchanged'}
+    assert len(fetched) == 1
+
+
+def test_fingerprint_query_reads_counts_not_rows(generator):
+    rows = generator._fetch_all(None, queries.DAILY_REPORT_FINGERPRINT,
+                                period=report_generator.day_range('2024-06-28'))
+    parts = {row['part'] for row in rows}
+    assert parts == {'created', 'rated', 'service_types'}
+    created = next(row for row in rows if row['part'] == 'created')
+    requests = generator.snapshot.frames['service_requests']
+    assert created['row_count'] == int((requests['created_at'].dt.strftime('%Y-%m-%d') == '2024-06-28').sum())
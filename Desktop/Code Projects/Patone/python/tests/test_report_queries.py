@@ -0,0 +1,129 @@
+"""
+Tests for running a report's independent queries concurrently
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('pandas')
+
+from python.db_pool import ConnectionPool
+from python.report_generator import ReportGenerator
+from python import queries
+
+QUERY_DELAY = 0.2
+
+ROWS = {
+    queries.MONTHLY_STATISTICS.sql: [{'total_requests': 12, 'total_revenue': 900.0}],
+    queries.MONTHLY_TRENDS.sql: [{'date': '2024-01-01', 'requests': 3}, {'date': '2024-01-02', 'requests': 9}],
+    queries.MONTHLY_TOP_CUSTOMERS.sql: [{'id': 7, 'total_spent': 400.0}],
+    queries.MONTHLY_SERVICE_TYPES.sql: [{'name': 'Towing', 'count': 12}],
+    queries.CUSTOMER_DETAILS.sql: [{'id': 7, 'first_name': 'Ann'}],
+    queries.CUSTOMER_SERVICE_HISTORY.sql: [{'id': 1}, {'id': 2}],
+    queries.CUSTOMER_SPENDING.sql: [{'total_spent': 400.0}],
+    queries.CUSTOMER_LOYALTY.sql: [],
+}
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params):
+        self.rows = ROWS[sql]
+        with self.connection.lock:
+            self.connection.active[0] += 1
+            self.connection.peak[0] = max(self.connection.peak[0], self.connection.active[0])
+        time.sleep(QUERY_DELAY)
+        with self.connection.lock:
+            self.connection.active[0] -= 1
+        if sql in self.connection.failing:
+            raise RuntimeError('query failed')
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, lock, active, peak, failing):
+        self.lock = lock
+        self.active = active
+        self.peak = peak
+        self.failing = failing
+
+    def cursor(self, dictionary=False):
+        assert dictionary
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    lock = threading.Lock()
+    active, peak, failing = [0], [0], set()
+
+    pool = ConnectionPool(db_config={}, size=3, checkout_timeout=5, max_lifetime=0,
+                          connect=lambda **config: FakeConnection(lock, active, peak, failing))
+    generator = ReportGenerator()
+    generator.pool = pool
+    generator.output_dir = str(tmp_path)
+    generator.peak = peak
+    generator.failing = failing
+
+    captured = {}
+    monkeypatch.setattr(generator, '_create_monthly_report_pdf',
+                        lambda *args, **kwargs: captured.setdefault('monthly', args))
+    monkeypatch.setattr(generator, '_create_customer_analysis_pdf',
+                        lambda *args, **kwargs: captured.setdefault('customer', args))
+    generator.captured = captured
+    return generator
+
+
+def test_monthly_queries_overlap_within_the_pool_limit(generator):
+    started = time.perf_counter()
+    generator.generate_monthly_report(2024, 1)
+    elapsed = time.perf_counter() - started
+
+    # Four queries on three connections take two rounds, not four
+    assert elapsed < 3 * QUERY_DELAY
+    assert generator.peak[0] == 3
+    assert generator.pool.stats()['peak_in_use'] == 3
+
+    _, year, month, stats, trends, top_customers, service_analysis = generator.captured['monthly']
+    assert (year, month) == (2024, 1)
+    assert stats == ROWS[queries.MONTHLY_STATISTICS.sql][0]
+    assert trends == ROWS[queries.MONTHLY_TRENDS.sql]
+    assert top_customers == ROWS[queries.MONTHLY_TOP_CUSTOMERS.sql]
+    assert service_analysis == {'service_types': ROWS[queries.MONTHLY_SERVICE_TYPES.sql]}
+
+
+def test_customer_report_keeps_its_shapes_under_a_concurrency_limit(generator, monkeypatch):
+    monkeypatch.setitem(generator.report_config, 'query_concurrency', 2)
+    generator.generate_customer_analysis(7)
+
+    assert generator.peak[0] == 2
+    _, customer, history, spending, loyalty = generator.captured['customer']
+    assert customer == {'id': 7, 'first_name': 'Ann'}
+    assert [row['id'] for row in history] == [1, 2]
+    assert spending == {'total_spent': 400.0}
+    assert loyalty is None
+
+
+def test_a_failed_query_fails_the_report_and_returns_connections(generator):
+    generator.failing.add(queries.MONTHLY_TRENDS.sql)
+
+    with pytest.raises(RuntimeError):
+        generator.generate_monthly_report(2024, 1)
+
+    assert 'monthly' not in generator.captured
+    assert generator.pool.stats()['in_use'] == 0
@@ -0,0 +1,106 @@
+"""
+Tests for the report store: sharded paths, catalog lookups, the batched
+retention sweep and adopting reports written before the store existed
+"""
+
+import os
+import time
+
+import pytest
+
+from python import report_store
+from python.report_store import ReportStore
+
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path))
+
+
+def write(store, report_type, params, filename, age_days=0, fingerprint=None):
+    path = store.path_for(report_type, params, filename)
+    with open(path, 'w') as f:
+        f.write(filename)
+    return store.add(report_type, params, path, fingerprint, created_at=time.time() - age_days * DAY)
+
+
+def test_reports_are_sharded_and_found_by_parameters(store):
+    entry = write(store, 'daily', {'date': '2024-06-28'}, 'daily_report_2024-06-28.pdf', fingerprint='abc')
+    shard = store.params_key('daily', {'date': '2024-06-28'})[:2]
+    assert entry['path'] == os.path.join(store.root, 'daily', shard, 'daily_report_2024-06-28.pdf')
+
+    assert store.find('daily', {'date': '2024-06-28'})['fingerprint'] == 'abc'
+    assert store.find('daily', {'date': '2024-06-29'}) is None
+    # Parameters match whatever their order
+    write(store, 'monthly', {'year': 2024, 'month': 5}, 'monthly_report_2024_05.pdf')
+    assert store.find('monthly', {'month': 5, 'year': 2024}) is not None
+
+    # Writing the same report again replaces its entry
+    write(store, 'daily', {'date': '2024-06-28'}, 'daily_report_2024-06-28.pdf', fingerprint='def')
+    assert store.stats()['daily']['reports'] == 1
+    assert store.find('daily', {'date': '2024-06-28'})['fingerprint'] == 'def'
+
+    # A file deleted outside the store is dropped from the catalog on lookup
+    os.remove(entry['path'])
+    assert store.find('daily', {'date': '2024-06-28'}) is None
+    assert 'daily' not in store.stats()
+
+
+def test_lookups_use_the_catalog_indexes(store):
+    with store._connect() as conn:
+        plan = ' '.join(row[3] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM artifacts WHERE report_type = ? AND params_key = ? '
+            'ORDER BY created_at DESC LIMIT 1', ('daily', 'x')))
+        assert 'idx_lookup' in plan
+        plan = ' '.join(row[3] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM artifacts WHERE created_at < ? ORDER BY created_at LIMIT 10', (0,)))
+        assert 'idx_created' in plan
+
+
+def test_sweep_deletes_expired_reports_in_bounded_batches(store):
+    for day in range(1, 8):
+        date = f'2024-01-{day:02d}'
+        write(store, 'daily', {'date': date}, f'daily_report_{date}.pdf', age_days=110 - day)
+    kept = write(store, 'daily', {'date': '2024-06-28'}, 'daily_report_2024-06-28.pdf', age_days=10)
+
+    first = store.sweep(max_age_days=90, batch_size=2, max_batches=2)
+    assert first['deleted'] == 4 and first['batches'] == 2 and first['remaining']
+    # Oldest first
+    assert [entry['params']['date'] for entry in store.entries('daily')] == [
+        '2024-06-28', '2024-01-07', '2024-01-06', '2024-01-05'
+    ]
+
+    second = store.sweep(max_age_days=90, batch_size=2, max_batches=5)
+    assert second['deleted'] == 3 and not second['remaining']
+    assert [entry['path'] for entry in store.entries()] == [kept['path']]
+    assert os.path.exists(kept['path'])
+    remaining = [name for _, _, files in os.walk(os.path.join(store.root, 'daily')) for name in files]
+    assert remaining == ['daily_report_2024-06-28.pdf']
+
+
+def test_sweep_defaults_to_automation_config(store, monkeypatch):
+    monkeypatch.setitem(report_store.AUTOMATION_CONFIG, 'max_file_age_days', 30)
+    write(store, 'customer', {'customer_id': 1}, 'customer_analysis_1.pdf', age_days=31)
+    write(store, 'customer', {'customer_id': 2}, 'customer_analysis_2.pdf', age_days=29)
+    assert store.sweep()['deleted'] == 1
+    assert store.find('customer', {'customer_id': 2}) is not None
+
+
+def test_adopt_moves_flat_reports_into_the_store(store):
+    for name in ('daily_report_2024-06-28.pdf', 'monthly_report_2024_05.pdf', 'customer_analysis_12.pdf',
+                 'notes.txt'):
+        with open(os.path.join(store.root, name), 'w') as f:
+            f.write(name)
+    with open(os.path.join(store.root, 'daily_report_2024-06-28.pdf.fingerprint'), 'w') as f:
+        f.write('abc\n')
+
+    assert store.adopt() == {'adopted': 3, 'skipped': 1}
+    assert sorted(os.listdir(store.root)) == sorted(
+        ['customer', 'daily', 'monthly', 'notes.txt'] +
+        [name for name in os.listdir(store.root) if name.startswith(report_store.CATALOG_FILE)]
+    )
+    assert store.find('daily', {'date': '2024-06-28'})['fingerprint'] == 'abc'
+    assert store.find('monthly', {'year': 2024, 'month': 5}) is not None
+    assert store.find('customer', {'customer_id': 12}) is not None
@@ -0,0 +1,232 @@
+"""
+Tests for the report worker: claiming queued rows, dispatching them to the
+generators and writing the outcome back, on an in-memory `reports` table
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from python import report_worker
+from python.db_pool import ConnectionPool
+from python.report_worker import ReportWorker
+
+
+class ReportsTable:
+    """The reports table with InnoDB-style row locks held until commit"""
+
+    def __init__(self, rows):
+        self.rows = {row['id']: dict({'status': 'pending', 'worker': None, 'attempts': 0}, **row) for row in rows}
+        self.locks = {}
+        self.mutex = threading.Lock()
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        table = self.conn.table
+        with table.mutex:
+            if sql == report_worker.CLAIM_PENDING:
+                pending = [row for row in sorted(table.rows.values(), key=lambda row: row['id'])
+                           if row['status'] == 'pending' and row['id'] not in table.locks]
+                self.result = [(row['id'], row['report_type'], row['parameters']) for row in pending[:params[0]]]
+                for row in self.result:
+                    table.locks[row[0]] = self.conn
+            elif sql.startswith(report_worker.MARK_PROCESSING.split('WHERE')[0]):
+                worker, *ids = params
+                for report_id in ids:
+                    row = table.rows[report_id]
+                    row.update(status='processing', worker=worker, attempts=row['attempts'] + 1)
+            elif sql == report_worker.MARK_FINISHED:
+                status, file_path, error, duration, report_id, worker = params
+                row = table.rows[report_id]
+                self.rowcount = int(row['worker'] == worker and row['status'] == 'processing')
+                if self.rowcount:
+                    row.update(status=status, file_path=file_path, error_message=error, duration_seconds=duration)
+            else:
+                self.conn.statements.append((sql, params))
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, table):
+        self.table = table
+        self.statements = []
+        self.in_transaction = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def _release_locks(self):
+        with self.table.mutex:
+            for report_id in [i for i, owner in self.table.locks.items() if owner is self]:
+                del self.table.locks[report_id]
+
+    def commit(self):
+        self._release_locks()
+
+    def rollback(self):
+        self._release_locks()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeReports:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate_daily_report(self, date):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        return f"daily_report_{date}.pdf"
+
+    def generate_monthly_report(self, year, month):
+        raise RuntimeError('no data for month')
+
+
+def queue(*jobs):
+    return ReportsTable([
+        {'id': i, 'report_type': report_type, 'parameters': parameters}
+        for i, (report_type, parameters) in enumerate(jobs, start=1)
+    ])
+
+
+def make_worker(table, workers=2):
+    pool = ConnectionPool(db_config={}, size=4, checkout_timeout=1, health_check=False,
+                          connect=lambda **config: FakeConnection(table))
+    worker = ReportWorker('snapshot', workers=workers, pool=pool)
+    worker._reports = FakeReports()
+    return worker
+
+
+def test_concurrent_workers_never_claim_the_same_row():
+    table = queue(*[('daily', json.dumps({'date': f'2024-05-{day:02d}'})) for day in range(1, 21)])
+    workers = [make_worker(table) for _ in range(4)]
+    for i, worker in enumerate(workers):
+        worker.name = f"host:{i}"
+
+    with ThreadPoolExecutor(4) as executor:
+        claims = list(executor.map(lambda worker: [job['id'] for job in worker.claim(5)], workers))
+
+    claimed = [report_id for ids in claims for report_id in ids]
+    assert sorted(claimed) == list(range(1, 21))
+    assert all(row['status'] == 'processing' and row['attempts'] == 1 for row in table.rows.values())
+    assert not table.locks
+    assert workers[0].claim(5) == []
+
+
+def test_drain_records_outcomes_within_the_worker_limit():
+    table = queue(
+        *[('daily', json.dumps({'date': f'2024-05-{day:02d}'})) for day in range(1, 7)],
+        ('monthly', json.dumps({'year': 2024, 'month': 5})),
+        ('weekly', '{}'),
+        ('daily', 'not json')
+    )
+    worker = make_worker(table, workers=2)
+
+    outcomes = {outcome['id']: outcome for outcome in worker.drain()}
+    worker.executor.shutdown()
+
+    assert len(outcomes) == 9
+    assert worker.reports.peak == 2
+    assert table.rows[1]['status'] == 'completed'
+    assert table.rows[1]['file_path'] == 'daily_report_2024-05-01.pdf'
+    assert table.rows[1]['duration_seconds'] > 0
+    assert table.rows[7]['status'] == 'failed'
+    assert table.rows[7]['error_message'] == 'RuntimeError: no data for month'
+    assert table.rows[8]['error_message'] == 'ValueError: Unknown report type weekly'
+    assert table.rows[9]['error_message'] == 'ValueError: parameters is not a JSON object'
+
+
+def test_a_requeued_row_is_not_overwritten_by_its_old_worker():
+    table = queue(('daily', json.dumps({'date': '2024-05-01'})))
+    slow, fresh = make_worker(table), make_worker(table)
+    slow.name, fresh.name = 'host:1', 'host:2'
+
+    job = slow.claim(1)[0]
+    # The row went stale and another worker took it over
+    table.rows[1].update(status='pending', worker=None)
+    fresh.drain()
+    fresh.executor.shutdown()
+
+    assert slow.process(job)['status'] == 'completed'
+    assert table.rows[1]['worker'] == 'host:2' and table.rows[1]['attempts'] == 2
+    slow.executor.shutdown()
+
+
+def test_stale_rows_are_requeued_with_the_configured_limits(monkeypatch):
+    monkeypatch.setitem(report_worker.REPORT_WORKER_CONFIG, 'stale_seconds', 600)
+    monkeypatch.setitem(report_worker.REPORT_WORKER_CONFIG, 'max_attempts', 3)
+    table = queue()
+    conn = FakeConnection(table)
+    worker = make_worker(table)
+    worker.pool = ConnectionPool(db_config={}, size=1, health_check=False, connect=lambda **config: conn)
+
+    worker.requeue_stale()
+    worker.executor.shutdown()
+    assert conn.statements == [(report_worker.REQUEUE_STALE, (600, 3)), (report_worker.FAIL_STALE, (600, 3))]
+
+
+def test_analysis_rows_are_exported_as_json(tmp_path, monkeypatch):
+    pytest.importorskip('pandas')
+    monkeypatch.setitem(report_worker.PATHS, 'exports', str(tmp_path))
+
+    class FakeAnalyzer:
+        def analyze_driver_performance(self, days):
+            return {'summary': {'days': days}}
+
+    worker = make_worker(queue())
+    worker._analyzer = FakeAnalyzer()
+    file_path = report_worker.REPORT_HANDLERS['drivers'](worker, 'drivers', {'report_id': 7})
+    worker.executor.shutdown()
+
+    assert file_path == str(tmp_path / 'drivers_7.json')
+    with open(file_path) as f:
+        assert json.load(f) == {'summary': {'days': 30}}
+
+
+def test_a_failed_analysis_fails_the_whole_analysis_row(tmp_path, monkeypatch):
+    pytest.importorskip('pandas')
+    monkeypatch.setitem(report_worker.PATHS, 'exports', str(tmp_path))
+
+    class FakeAnalyzer:
+        def analyze_all(self, days):
+            return {'demand': {'summary': {}}, 'drivers': {'error': 'Analysis failed: timeout'},
+                    'pipeline': {'stages': []}}
+
+    worker = make_worker(queue())
+    worker._analyzer = FakeAnalyzer()
+    with pytest.raises(RuntimeError, match='Analyses failed: drivers'):
+        report_worker.REPORT_HANDLERS['analysis'](worker, 'analysis', {'report_id': 8})
+    worker.executor.shutdown()
+
+
+def test_the_web_app_queues_exactly_the_types_the_worker_handles():
+    model = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'models', 'Report.php')
+    with open(model) as f:
+        types = re.search(r'const TYPES = \[(.*?)\];', f.read(), re.S).group(1)
+    assert set(re.findall(r"'(\w+)' =>", types)) == set(report_worker.REPORT_HANDLERS)
@@ -0,0 +1,166 @@
+"""
+Tests for the watermark-keyed analysis result cache
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from python.result_cache import ResultCache, cached_analysis
+
+
+def test_second_lookup_is_a_memory_hit(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60, memory_entries=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total': 3}
+
+    assert cache.get_or_compute('demand', {'days': 30}, {'t': 1}, compute) == {'total': 3}
+    assert cache.get_or_compute('demand', {'days': 30}, {'t': 1}, compute) == {'total': 3}
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['memory_hits'] == 1
+    assert stats['hit_rate'] == 0.5
+
+
+def test_disk_layer_survives_a_new_process(tmp_path):
+    ResultCache(str(tmp_path), ttl=60).get_or_compute('demand', {'days': 30}, 'w1', lambda: [1, 2])
+
+    cache = ResultCache(str(tmp_path), ttl=60)
+    assert cache.get_or_compute('demand', {'days': 30}, 'w1', lambda: pytest.fail('recomputed')) == [1, 2]
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_changed_watermark_or_params_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60)
+    cache.get_or_compute('demand', {'days': 30}, 'w1', lambda: 'old')
+
+    assert cache.get_or_compute('demand', {'days': 30}, 'w2', lambda: 'new') == 'new'
+    assert cache.get_or_compute('demand', {'days': 7}, 'w2', lambda: 'week') == 'week'
+    assert cache.stats()['misses'] == 3
+
+
+def test_expired_entries_are_recomputed(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60, memory_entries=0)
+    key = cache.make_key('demand', {}, 'w1')
+    cache._write_disk(key, time.time() - 120, json.dumps('stale'))
+
+    assert cache.get(key) == (False, None)
+    assert cache.stats()['expired'] == 1
+    assert not os.path.exists(cache._entry_path(key))
+
+
+def test_cached_values_cannot_be_mutated_by_callers(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60)
+    first = cache.get_or_compute('demand', {}, 'w', lambda: {'rows': [1]})
+    first['rows'].append(2)
+    assert cache.get_or_compute('demand', {}, 'w', lambda: None) == {'rows': [1]}
+
+
+def test_a_miss_returns_what_a_hit_would(tmp_path):
+    np = pytest.importorskip('numpy')
+    cache = ResultCache(str(tmp_path), ttl=60)
+    compute = lambda: {'by_hour': {9: np.int64(4)}, 'mean': np.float64(2.5)}
+
+    fresh = cache.get_or_compute('demand', {}, 'w', compute)
+    assert fresh == {'by_hour': {'9': 4}, 'mean': 2.5}
+    assert cache.get_or_compute('demand', {}, 'w', compute) == fresh
+    assert type(fresh['by_hour']['9']) is int
+
+
+def test_threads_writing_one_key_do_not_share_a_temp_file(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60, memory_entries=0)
+    errors = []
+
+    def write(n):
+        try:
+            for i in range(50):
+                cache._write_disk('k', time.time(), json.dumps([n, i]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.get('k')[0]
+    assert [entry.name for entry in os.scandir(tmp_path)] == ['k.json']
+
+
+def test_memory_layer_is_lru_bounded(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60, memory_entries=2)
+    for name in ('a', 'b', 'c'):
+        cache.set(name, name)
+    assert list(cache._memory) == ['b', 'c']
+
+
+def test_disk_layer_evicts_least_recently_used_over_size_limit(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=0, memory_entries=0, max_disk_bytes=2500)
+    for i, name in enumerate(('a', 'b', 'c')):
+        cache.set(name, 'x' * 1000)
+        os.utime(cache._entry_path(name), (i, i))
+    cache.set('d', b'x' * 1000)
+
+    remaining = sorted(entry.name for entry in os.scandir(tmp_path))
+    assert remaining == ['c.json', 'd.json']
+    assert cache.stats()['evictions'] == 2
+
+
+class FakeAnalyzer:
+    source = 'live'
+
+    def __init__(self, cache):
+        self.result_cache = cache
+        self.watermark = {'service_requests': ['2024-01-15 10:00:00', 10]}
+        self.runs = 0
+
+    def data_watermark(self, tables):
+        return {table: self.watermark[table] for table in tables}
+
+    @cached_analysis('demand', tables=['service_requests'])
+    def analyze_service_demand(self, days: int = 30):
+        self.runs += 1
+        return {'days': days, 'run': self.runs}
+
+
+def test_decorated_analysis_reruns_only_when_data_changes(tmp_path):
+    analyzer = FakeAnalyzer(ResultCache(str(tmp_path), ttl=60))
+
+    assert analyzer.analyze_service_demand() == {'days': 30, 'run': 1}
+    # Positional and keyword forms of the same call share an entry
+    assert analyzer.analyze_service_demand(30) == {'days': 30, 'run': 1}
+    assert analyzer.analyze_service_demand(days=30) == {'days': 30, 'run': 1}
+
+    analyzer.watermark['service_requests'] = ['2024-01-15 10:00:00', 9]
+    assert analyzer.analyze_service_demand(30) == {'days': 30, 'run': 2}
+
+
+def test_decorated_analysis_without_cache_always_runs(tmp_path):
+    analyzer = FakeAnalyzer(None)
+    analyzer.analyze_service_demand()
+    analyzer.analyze_service_demand()
+    assert analyzer.runs == 2
+
+
+def test_entries_are_json_and_pickles_are_never_loaded(tmp_path):
+    np = pytest.importorskip('numpy')
+    cache = ResultCache(str(tmp_path), ttl=60, memory_entries=0)
+    key = cache.make_key('drivers', {}, 'w')
+    cache.set(key, {'completed': np.int64(4), 'rating': np.float64(4.2), 'at': '2024-01-15'})
+    with open(cache._entry_path(key)) as f:
+        assert json.loads(json.load(f)['payload']) == {'completed': 4, 'rating': 4.2, 'at': '2024-01-15'}
+
+    # A pickle planted under an entry's name is not a hit
+    with open(os.path.join(tmp_path, 'planted.pkl'), 'wb') as f:
+        f.write(b'cos\nsystem\n(S"false"\ntR.')
+    assert cache.get('planted') == (False, None)
@@ -0,0 +1,143 @@
+"""
+Tests for the incrementally maintained hourly rollup store
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from conftest import FakeTables
+from python import queries
+from python.frames import build_frame
+from python.query_builder import DateRange
+from python.config import ROLLUP_CONFIG
+from python.rollups import HOUR, RollupStore, hour_spans
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+requires_pyarrow = pytest.mark.skipif(not HAVE_PYARROW, reason='pyarrow is not available')
+
+START = datetime(2024, 1, 1)
+
+
+def make_requests(count):
+    rows = []
+    for i in range(count):
+        created = START + timedelta(minutes=37 * i)
+        completed = i % 3 != 0
+        rows.append({
+            'id': i + 1,
+            'service_type_id': float(i % 3 + 1),
+            'status': 'completed' if completed else 'cancelled',
+            'actual_cost': float(40 + i % 7 * 10) if completed and i % 5 else None,
+            'customer_rating': float(i % 5 + 1) if completed else None,
+            'created_at': created,
+            'assigned_at': created + timedelta(minutes=i % 11, seconds=30) if i % 4 else None,
+            'updated_at': created + timedelta(hours=2),
+        })
+    df = pd.DataFrame(rows)
+    df['assigned_at'] = pd.to_datetime(df['assigned_at'])
+    return df
+
+
+@pytest.fixture
+def tables():
+    return FakeTables(
+        service_requests=make_requests(400),
+        service_types=pd.DataFrame({'id': [1, 2, 3], 'name': ['Towing', 'Jump Start', 'Lockout']})
+    )
+
+
+def assert_matches_raw_queries(store, tables, period):
+    for rolled, query, key in ((store.service_demand(period), queries.SERVICE_DEMAND, 'service_type_id'),
+                               (store.revenue_trends(period), queries.REVENUE_TRENDS, 'service_type')):
+        expected = build_frame(query, tables, period=period)
+        # Rollups give dates as MySQL does, the embedded engine as timestamps
+        rolled['date'] = pd.to_datetime(rolled['date'])
+        # ORDER BY date, hour leaves the order within an hour to the engine
+        order = ['date', 'hour', key]
+        pd.testing.assert_frame_equal(rolled.sort_values(order, ignore_index=True),
+                                      expected.sort_values(order, ignore_index=True), check_dtype=False)
+
+
+def test_hour_spans_merge_nearby_hours():
+    hours = [START, START + timedelta(hours=1), START + timedelta(hours=5), START + timedelta(days=3)]
+    assert hour_spans(hours) == [
+        DateRange(START, START + timedelta(hours=6)),
+        DateRange(START + timedelta(days=3), START + timedelta(days=3, hours=1))
+    ]
+
+
+@requires_pyarrow
+def test_rollups_match_raw_aggregation_for_unaligned_ranges(tmp_path, tables):
+    store = RollupStore(tables.load_frame, path=str(tmp_path))
+    period = DateRange(START + timedelta(hours=3, minutes=20), START + timedelta(days=8, minutes=45))
+    assert_matches_raw_queries(store, tables, period)
+
+
+@requires_pyarrow
+def test_refresh_only_recomputes_changed_and_deleted_hours(tmp_path, tables):
+    store = RollupStore(tables.load_frame, path=str(tmp_path))
+    first = store.refresh()
+    assert first['stale_hours'] == 0
+
+    requests = tables.frames['service_requests']
+    edited_at = requests['updated_at'].max() + timedelta(minutes=1)
+    requests.loc[requests['id'] == 10, ['actual_cost', 'status', 'updated_at']] = [999.0, 'completed', edited_at]
+    tables.frames['service_requests'] = requests[requests['id'] != 200].reset_index(drop=True)
+
+    # A fresh store reloads the persisted rollups and watermark from disk
+    store = RollupStore(tables.load_frame, path=str(tmp_path))
+    result = store.refresh()
+    # The edited row's hour plus the hour holding the previous watermark row
+    assert result['changed_hours'] == 2
+    assert result['stale_hours'] == 1
+    assert result['watermark'] == edited_at.isoformat(sep=' ')
+
+    period = DateRange(START, START + timedelta(days=11))
+    assert_matches_raw_queries(store, tables, period)
+
+
+@requires_pyarrow
+def test_unchanged_source_only_rechecks_the_watermark_hour(tmp_path, tables):
+    store = RollupStore(tables.load_frame, path=str(tmp_path))
+    store.refresh()
+    tables.calls.clear()
+
+    assert store.refresh()['changed_hours'] == 1
+    assert tables.calls.count('hourly_rollup') == 1
+    assert 'rollup_hour_counts' not in tables.calls
+
+
+@requires_pyarrow
+def test_deletes_are_only_checked_over_recent_hours(tmp_path, tables, monkeypatch):
+    monkeypatch.setitem(ROLLUP_CONFIG, 'delete_check_hours', 48)
+    periods = []
+
+    def load_frame(query, **params):
+        if query.name in ('rollup_request_count', 'rollup_hour_counts'):
+            periods.append(params['period'])
+        return tables.load_frame(query, **params)
+
+    store = RollupStore(load_frame, path=str(tmp_path))
+    store.refresh()
+    requests = tables.frames['service_requests']
+    tables.frames['service_requests'] = requests[~requests['id'].isin([5, 395])].reset_index(drop=True)
+    periods.clear()
+
+    assert store.refresh()['stale_hours'] == 1
+    last_hour = store.rollups()['hour_start'].max().to_pydatetime()
+    assert periods and all(period == DateRange(last_hour - timedelta(hours=47), last_hour + HOUR)
+                           for period in periods)
+
+    # The old delete waits for a full rebuild
+    period = DateRange(START, START + timedelta(days=11))
+    assert store.service_demand(period)['request_count'].sum() == len(requests) - 1
+    store.refresh(full=True)
+    assert_matches_raw_queries(store, tables, period)
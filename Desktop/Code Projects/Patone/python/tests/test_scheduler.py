@@ -0,0 +1,132 @@
+"""
+Tests for the resident report scheduler: skipping unchanged inputs, one run
+per job at a time, and the schedule built from AUTOMATION_CONFIG
+"""
+
+import threading
+from datetime import date
+
+import pytest
+
+from python.config import SCHEDULER_CONFIG
+from python.scheduler import ReportScheduler
+
+TODAY = date(2024, 6, 1)
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.marks = {'service_requests': ['2024-05-31 23:00:00', 100], 'customers': ['2024-05-30 10:00:00', 20],
+                      'drivers': ['2024-05-01 09:00:00', 5], 'service_types': ['2024-01-01 00:00:00', 8]}
+
+    def data_watermark(self, tables):
+        return {table: self.marks[table] for table in tables}
+
+
+class FakeReports:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def generate_daily_report(self, date):
+        self.release.wait(5)
+        self.calls.append(('daily', date))
+        return f"daily_{date}.pdf"
+
+    def generate_monthly_report(self, year, month):
+        self.calls.append(('monthly', year, month))
+        return f"monthly_{year}_{month:02d}.pdf"
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = ReportScheduler('snapshot', workers=2, path=str(tmp_path))
+    scheduler._analyzer = FakeAnalyzer()
+    scheduler._reports = FakeReports()
+    yield scheduler
+    scheduler.executor.shutdown(wait=True)
+
+
+def test_unchanged_inputs_are_skipped_until_a_table_changes(scheduler):
+    first = scheduler.run_job('daily_report', today=TODAY)
+    assert first['status'] == 'completed'
+    assert first['params'] == {'date': '2024-05-31'}
+    assert first['result'] == {'file_path': 'daily_2024-05-31.pdf'}
+
+    assert scheduler.run_job('daily_report', today=TODAY)['status'] == 'skipped'
+    assert scheduler.run_job('daily_report', force=True, today=TODAY)['status'] == 'completed'
+
+    # A late change to yesterday's requests makes the report stale
+    scheduler.analyzer.marks['service_requests'] = ['2024-06-01 05:00:00', 101]
+    assert scheduler.run_job('daily_report', today=TODAY)['status'] == 'completed'
+    assert len(scheduler.reports.calls) == 3
+
+    # A new day always runs, and the state survives a restart
+    assert scheduler.run_job('daily_report', today=date(2024, 6, 2))['status'] == 'completed'
+    restarted = ReportScheduler('snapshot', path=scheduler.path)
+    restarted._analyzer = scheduler.analyzer
+    assert restarted.run_job('daily_report', today=date(2024, 6, 2))['status'] == 'skipped'
+    restarted.executor.shutdown()
+
+
+def test_monthly_report_runs_once_per_month(scheduler):
+    assert scheduler.run_job('monthly_report', today=TODAY)['params'] == {'year': 2024, 'month': 5}
+    scheduler.analyzer.marks['service_requests'] = ['2024-06-01 05:00:00', 101]
+    assert scheduler.run_job('monthly_report', today=date(2024, 6, 15))['status'] == 'skipped'
+    assert scheduler.run_job('monthly_report', today=date(2024, 7, 1))['status'] == 'completed'
+    assert scheduler.reports.calls == [('monthly', 2024, 5), ('monthly', 2024, 6)]
+
+
+def test_a_failed_run_is_recorded_and_retried(scheduler, monkeypatch):
+    scheduler.run_job('daily_report', today=TODAY)
+
+    def fail(date):
+        raise RuntimeError('database unavailable')
+    monkeypatch.setattr(scheduler.reports, 'generate_daily_report', fail)
+    failed = scheduler.run_job('daily_report', force=True, today=TODAY)
+    assert failed['status'] == 'failed' and failed['error'] == 'RuntimeError: database unavailable'
+
+    state = scheduler.load_state()['daily_report']
+    assert state['status'] == 'failed'
+    # Still compared against the last good run, so an unchanged day is not redone
+    assert state['last_success']['status'] == 'completed'
+    monkeypatch.undo()
+    assert scheduler.run_job('daily_report', today=TODAY)['status'] == 'skipped'
+
+
+def test_a_job_still_running_is_not_started_again(scheduler):
+    scheduler.reports.release.clear()
+    first = scheduler.submit('daily_report')
+    assert scheduler.submit('daily_report') is None
+    # Other jobs still run alongside it
+    monthly = scheduler.submit('monthly_report')
+    assert monthly.result(5)['status'] == 'completed'
+
+    scheduler.reports.release.set()
+    assert first.result(5)['status'] == 'completed'
+    assert scheduler.submit('daily_report').result(5)['status'] == 'skipped'
+
+
+def test_schedule_follows_automation_config(scheduler, monkeypatch):
+    schedule = pytest.importorskip('schedule')
+    monkeypatch.setattr('python.scheduler.AUTOMATION_CONFIG', {
+        'auto_backup': False, 'backup_frequency': 'weekly', 'report_generation_time': '05:30',
+        'cleanup_old_files': True
+    })
+    monkeypatch.setitem(SCHEDULER_CONFIG, 'snapshot_sync', 'hourly')
+
+    jobs = scheduler.build_schedule(schedule.Scheduler()).get_jobs()
+    times = {next(iter(job.tags)): (job.unit, job.at_time) for job in jobs}
+    assert set(times) == {'daily_report', 'monthly_report', 'analyses', 'snapshot_sync', 'report_cleanup'}
+    assert times['daily_report'][0] == 'days' and times['daily_report'][1].strftime('%H:%M') == '05:30'
+    assert times['snapshot_sync'] == ('hours', None)
+    assert times['report_cleanup'] == ('hours', None)
+
+    monkeypatch.setattr('python.scheduler.AUTOMATION_CONFIG', {
+        'auto_backup': True, 'backup_frequency': 'hourly', 'report_generation_time': '05:30',
+        'cleanup_old_files': False
+    })
+    monkeypatch.setitem(SCHEDULER_CONFIG, 'snapshot_sync', 'off')
+    tags = {next(iter(job.tags)) for job in scheduler.build_schedule().get_jobs()}
+    assert 'snapshot_sync' not in tags and 'report_cleanup' not in tags
@@ -0,0 +1,84 @@
+"""
+Tests for the compact dtype schemas applied to analysis query results
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from python.benchmarks.dtypes import customer_frame, revenue_frame
+from python.schemas import SCHEMAS, apply_schema, memory_usage, string_dtype
+from python import queries
+
+
+def test_every_schema_names_a_registered_query():
+    names = {value.name for value in vars(queries).values() if isinstance(value, queries.Query)}
+    assert set(SCHEMAS) <= names
+
+
+def test_customer_columns_get_compact_dtypes():
+    raw = pd.DataFrame({
+        'id': [1, 2, 3],
+        'first_name': ['Ann', 'Bo', 'Cy'],
+        'last_name': ['A', 'B', 'C'],
+        'is_vip': [True, np.bool_(False), 1],
+        'total_services': [3.0, 1.0, 7.0],
+        'total_spent': [Decimal('120.50'), Decimal('40.00'), None],
+        'avg_service_cost': [Decimal('40.1667'), Decimal('40.00'), None],
+        'last_service_date': [datetime(2024, 5, 1, 10), datetime(2024, 6, 2), datetime(2024, 1, 9)],
+        'avg_rating_given': [4.5, None, 3.0],
+        'days_since_first_service': [10, 20, None]
+    })
+
+    typed = apply_schema(raw, 'customer_behavior')
+
+    assert typed['id'].dtype == 'uint32'
+    assert typed['first_name'].dtype == string_dtype()
+    assert typed['is_vip'].dtype == bool
+    assert typed['is_vip'].tolist() == [True, False, True]
+    assert typed['total_services'].dtype == 'int32'
+    assert typed['total_spent'].dtype == 'float64'
+    assert typed['total_spent'].iloc[0] == 120.5
+    assert np.isnan(typed['total_spent'].iloc[2])
+    assert typed['avg_service_cost'].dtype == 'float64'
+    # Averages serialize as the database returned them
+    assert float(apply_schema(pd.DataFrame({'avg_rating': [Decimal('4.2')]}), 'driver_performance')
+                 ['avg_rating'].iloc[0]) == 4.2
+    assert typed['last_service_date'].dtype == 'datetime64[ns]'
+    # NULLs keep integer columns integral through the nullable dtype
+    assert typed['days_since_first_service'].dtype == 'Int32'
+    assert typed['days_since_first_service'].isna().tolist() == [False, False, True]
+
+
+def test_revenue_columns_and_unknown_queries():
+    raw = pd.DataFrame({
+        'date': [date(2024, 1, 1), date(2024, 1, 2)],
+        'hour': [9, 17],
+        'service_type': ['Towing', 'Lockout'],
+        'daily_revenue': [100.0, 50.0],
+        'service_count': [2, 1],
+        'avg_service_cost': [50.0, 50.0],
+        'extra': ['kept', 'as is']
+    })
+
+    typed = apply_schema(raw, 'revenue_trends')
+    assert typed['date'].dtype == 'datetime64[ns]'
+    assert typed['hour'].dtype == 'int8'
+    assert isinstance(typed['service_type'].dtype, pd.CategoricalDtype)
+    assert typed['extra'].dtype == object
+    assert raw['hour'].dtype == 'int64'
+
+    assert apply_schema(raw, 'daily_summary') is raw
+    assert apply_schema(raw.iloc[:0], 'revenue_trends').empty
+
+
+def test_schemas_shrink_the_benchmark_frames():
+    revenue = revenue_frame(7)
+    assert memory_usage(apply_schema(revenue, 'revenue_trends')) < memory_usage(revenue) / 2
+
+    customers = customer_frame(2000)
+    assert memory_usage(apply_schema(customers, 'customer_behavior')) < memory_usage(customers)
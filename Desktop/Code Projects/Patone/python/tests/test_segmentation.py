@@ -0,0 +1,100 @@
+"""
+Tests for persistent mini-batch customer segmentation
+"""
+
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('sklearn')
+
+from python.segmentation import CustomerSegmenter, frame_chunks, rebatch
+
+# (services, average cost) of three well separated customer groups
+GROUPS = [(1, 40.0), (6, 80.0), (20, 150.0)]
+
+
+def make_customers(per_group, seed=3, spend_factor=1.0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for services, cost in GROUPS:
+        for _ in range(per_group):
+            count = max(1, int(rng.normal(services, services * 0.05)))
+            avg = rng.normal(cost, cost * 0.05) * spend_factor
+            rows.append({'total_services': count, 'avg_service_cost': avg,
+                         'total_spent': count * avg, 'is_vip': services > 10})
+    df = pd.DataFrame(rows)
+    df.insert(0, 'id', np.arange(1, len(df) + 1))
+    return df
+
+
+@pytest.fixture
+def segmenter(tmp_path):
+    return CustomerSegmenter(path=str(tmp_path), clusters=3, batch_size=64, epochs=3)
+
+
+def test_rebatch_regroups_uneven_chunks():
+    df = make_customers(20)
+    sizes = [len(batch) for batch in rebatch(frame_chunks(df, 7), 25)]
+    assert sizes == [25, 25, 10]
+
+
+def test_training_recovers_groups_ordered_by_spend(segmenter):
+    df = make_customers(100)
+    model = segmenter.train(lambda: frame_chunks(df, 50))
+
+    assert model.version == 1
+    assert model.samples == len(df)
+    labels = model.assign(df[['total_services', 'total_spent', 'avg_service_cost']].to_numpy())
+    assert list(labels[::100]) == [0, 1, 2]
+    for group in range(3):
+        assert len(set(labels[group * 100:(group + 1) * 100])) == 1
+
+
+def test_saved_model_is_reloaded_without_refitting(tmp_path, segmenter):
+    df = make_customers(50)
+    segmenter.train(lambda: frame_chunks(df, 50))
+
+    reloaded = CustomerSegmenter(path=str(tmp_path), clusters=3)
+    assert reloaded.model_version == 1
+    np.testing.assert_allclose(reloaded.model.centroids, segmenter.model.centroids)
+    assert reloaded.status()['samples'] == len(df)
+
+
+def test_saved_model_assigns_every_customer_without_retraining(tmp_path, segmenter):
+    df = make_customers(50)
+    first = segmenter.segment(df)
+    assert first['retrained'] == 'no model'
+    assert first['assigned'] == len(df)
+
+    again = make_customers(50)
+    again.loc[0, ['total_services', 'total_spent']] = [21, 21 * 150.0]
+    again = pd.concat([again, make_customers(1, seed=9).assign(id=[1000, 1001, 1002])], ignore_index=True)
+
+    result = CustomerSegmenter(path=str(tmp_path), clusters=3).segment(again)
+    assert result['retrained'] is None
+    assert result['model_version'] == 1
+    assert result['assigned'] == len(again)
+    assert again.loc[0, 'segment'] == 2
+    assert list(again['segment'].iloc[-3:]) == [0, 1, 2]
+    assert (again['segment'].iloc[1:150] == df['segment'].iloc[1:150]).all()
+    assert not any(name.endswith('.arrow') for name in os.listdir(tmp_path))
+
+
+def test_retrains_on_drift_or_request(segmenter):
+    segmenter.segment(make_customers(50))
+
+    steady = segmenter.segment(make_customers(50, seed=4))
+    assert steady['retrained'] is None
+    assert steady['drift'] < segmenter.drift_threshold
+
+    shifted = segmenter.segment(make_customers(50, seed=5, spend_factor=3.0))
+    assert shifted['retrained'] == 'drift'
+    assert shifted['model_version'] == 2
+
+    requested = segmenter.segment(make_customers(50, seed=5, spend_factor=3.0), retrain=True)
+    assert requested['retrained'] == 'requested'
+    assert requested['model_version'] == 3
+    assert requested['assigned'] == 150
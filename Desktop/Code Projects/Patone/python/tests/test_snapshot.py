@@ -0,0 +1,252 @@
+"""
+Tests for the local analytical snapshot and the queries run over its frames
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from conftest import FakeTables
+from python import frames
+from python.frames import build_frame, local_times, records
+from python.query_builder import day_range, month_range
+from python import queries
+from python.snapshot import Snapshot, file_lock, read_arrow, write_arrow
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+requires_pyarrow = pytest.mark.skipif(not HAVE_PYARROW, reason='pyarrow is not available')
+
+try:
+    import duckdb  # noqa: F401
+    HAVE_DUCKDB = True
+except ImportError:
+    HAVE_DUCKDB = False
+
+requires_duckdb = pytest.mark.skipif(not HAVE_DUCKDB, reason='duckdb is not available')
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+        self.description = None
+
+    def execute(self, sql, params=()):
+        self.db.statements.append((sql, params))
+        if 'COUNT(*)' in sql:
+            self.rows = [(len(self.db.rows),)]
+            return
+        if sql.startswith('SELECT id FROM'):
+            self.rows = [(row[0],) for row in self.db.rows]
+            return
+
+        self.description = [(name,) for name in self.db.columns]
+        rows = self.db.rows
+        if params:
+            rows = [row for row in rows if row[-1] >= datetime.fromisoformat(str(params[0]))]
+        self.rows = list(rows)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    """Serves a single table shaped like drivers (id, first_name, updated_at)"""
+
+    columns = ['id', 'first_name', 'updated_at']
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakePool:
+    def __init__(self, db):
+        self.db = db
+
+    @contextmanager
+    def connection(self):
+        yield self.db
+
+
+@requires_pyarrow
+def test_sync_merges_changed_rows_and_drops_deleted_ones(tmp_path):
+    db = FakeDatabase([
+        (1, 'Ann', datetime(2024, 1, 1)),
+        (2, 'Bob', datetime(2024, 1, 2)),
+        (3, 'Cy', datetime(2024, 1, 3)),
+    ])
+    snapshot = Snapshot(str(tmp_path), pool=FakePool(db))
+
+    summary = snapshot.sync(['drivers'])
+    assert summary['drivers']['rows'] == 3
+    assert snapshot.load_state()['drivers']['watermark'] == '2024-01-03 00:00:00'
+
+    db.rows = [
+        (1, 'Ann', datetime(2024, 1, 1)),
+        (3, 'Cyrus', datetime(2024, 1, 5)),
+        (4, 'Dee', datetime(2024, 1, 4)),
+    ]
+    db.statements.clear()
+    summary = snapshot.sync(['drivers'])
+
+    assert 'updated_at >= %s' in db.statements[0][0]
+    assert summary['drivers'] == {
+        'changed_rows': 2, 'deleted_rows': 1, 'rows': 3, 'watermark': '2024-01-05 00:00:00'
+    }
+    drivers = snapshot.table('drivers')
+    assert list(drivers['id']) == [1, 3, 4]
+    assert list(drivers['first_name']) == ['Ann', 'Cyrus', 'Dee']
+
+
+@requires_pyarrow
+def test_table_is_reread_only_when_the_file_changes(tmp_path):
+    snapshot = Snapshot(str(tmp_path))
+    snapshot._write_frame('drivers', pd.DataFrame({'id': [1], 'first_name': ['Ann']}))
+
+    first = snapshot.table('drivers')
+    assert snapshot.table('drivers') is first
+
+    snapshot._write_frame('drivers', pd.DataFrame({'id': [1, 2], 'first_name': ['Ann', 'Bob']}))
+    snapshot._frames['drivers'] = (-1, first)
+    assert len(snapshot.table('drivers')) == 2
+
+
+def test_file_lock_serializes_read_modify_writes(tmp_path):
+    path = str(tmp_path / 'live.arrow')
+    events = []
+
+    def update(name):
+        with file_lock(path):
+            events.append((name, 'read'))
+            time.sleep(0.05)
+            events.append((name, 'write'))
+
+    threads = [threading.Thread(target=update, args=(name,)) for name in ('scheduler', 'worker', 'cli')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # No writer reads between another's read and write
+    assert all(events[i][0] == events[i + 1][0] for i in range(0, len(events), 2))
+
+
+@requires_pyarrow
+def test_concurrent_writes_never_share_a_temp_file(tmp_path):
+    path = str(tmp_path / 'live.arrow')
+    frames = [pd.DataFrame({'id': range(n * 1000), 'value': [float(n)] * (n * 1000)}) for n in range(1, 9)]
+
+    threads = [threading.Thread(target=write_arrow, args=(path, frame)) for frame in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Whichever writer finished last, the file is one complete frame and no temp file is left
+    stored = read_arrow(path)
+    assert len(stored) == stored['value'].iloc[0] * 1000
+    assert os.listdir(tmp_path) == ['live.arrow']
+
+
+def test_decimal_columns_become_floats(tmp_path):
+    snapshot = Snapshot(str(tmp_path))
+    df = snapshot._typed_frame('service_types', pd.DataFrame({'base_price': [Decimal('75.50'), None]}))
+    assert df['base_price'].dtype == 'float64'
+
+
+@pytest.fixture
+def tables():
+    requests = pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'customer_id': [10.0, 10.0, 11.0, 11.0],
+        'driver_id': [1.0, None, 1.0, 1.0],
+        'service_type_id': [1.0, 1.0, 2.0, 1.0],
+        'status': ['completed', 'pending', 'cancelled', 'completed'],
+        'actual_cost': [100.0, None, None, 50.0],
+        'customer_rating': [5.0, None, None, 4.0],
+        'created_at': pd.to_datetime(['2024-01-15 08:00', '2024-01-15 09:00',
+                                      '2024-01-20 10:00', '2024-01-14 22:00']),
+        'assigned_at': pd.to_datetime(['2024-01-15 08:05', None, '2024-01-20 10:10', '2024-01-14 22:10']),
+        'started_at': pd.to_datetime(['2024-01-15 08:10', None, None, '2024-01-14 22:30']),
+        'completed_at': pd.to_datetime(['2024-01-15 09:00', None, None, '2024-01-15 01:00']),
+    })
+    return FakeTables(
+        service_requests=requests,
+        drivers=pd.DataFrame({'id': [1], 'first_name': ['Ann'], 'last_name': ['Lee']}),
+        customers=pd.DataFrame({'id': [10, 11], 'first_name': ['Cat', 'Dan'],
+                                'last_name': ['Fox', 'Gil'], 'is_vip': [0.0, 1.0]}),
+        service_types=pd.DataFrame({'id': [1, 2], 'name': ['Towing', 'Jump Start']}),
+    )
+
+
+@requires_duckdb
+def test_daily_rows_include_rated_completions_from_earlier_days(tables):
+    df = build_frame(queries.DAILY_REQUEST_ROWS, tables, period=day_range('2024-01-15'))
+    assert sorted(df['id']) == [1, 2, 4]
+    named = df.set_index('id')
+    assert named.loc[1, 'driver_first_name'] == 'Ann'
+    assert named.loc[1, 'service_type'] == 'Towing'
+    # The completed_at branch selects NULL names, like the SQL
+    assert pd.isna(named.loc[4, 'service_type'])
+
+
+@requires_duckdb
+def test_monthly_frames_match_sql_shapes(tables):
+    period = month_range(2024, 1)
+    stats = records(build_frame(queries.MONTHLY_STATISTICS, tables, period=period))
+    assert stats == [{
+        'total_requests': 4, 'completed_requests': 2, 'cancelled_requests': 1,
+        'total_revenue': 150.0, 'avg_service_cost': 75.0
+    }]
+
+    service_types = records(build_frame(queries.MONTHLY_SERVICE_TYPES, tables, period=period))
+    assert [(s['name'], s['request_count']) for s in service_types] == [('Towing', 3), ('Jump Start', 1)]
+
+
+def test_local_times_resolve_dst_edges_like_convert_tz(monkeypatch):
+    monkeypatch.setitem(frames.TIMEZONE_CONFIG, 'report_timezone', 'UTC')
+    monkeypatch.setitem(frames.TIMEZONE_CONFIG, 'database_timezone', 'America/New_York')
+    stored = pd.Series(pd.to_datetime([
+        '2024-11-03 01:30',  # happens twice as clocks fall back
+        '2024-03-10 02:30',  # never happens as clocks spring forward
+        '2024-06-01 12:00'
+    ]))
+    assert list(local_times(stored)) == list(pd.to_datetime([
+        '2024-11-03 05:30', '2024-03-10 07:00', '2024-06-01 16:00'
+    ]))
+
+
+def test_only_registered_queries_run_over_the_frames(tables):
+    with pytest.raises(ValueError, match='nope'):
+        build_frame(type('Unregistered', (), {'name': 'nope'})(), tables)
+
+
+def test_frames_only_register_the_tables_a_query_reads():
+    assert frames.source_tables(queries.DAILY_REQUEST_ROWS) == ['drivers', 'service_requests', 'service_types']
+    assert frames.source_tables(queries.CUSTOMER_SERVICE_HISTORY_BATCH) == ['service_requests', 'service_types']
@@ -0,0 +1,29 @@
+"""
+Startup regression tests: the CLI scripts must not import heavy optional
+dependencies before a mode starts working
+"""
+
+import pytest
+
+pytest.importorskip('pandas')
+
+from python.benchmarks.startup import CLI_MODES, parse_importtime, probe
+
+
+@pytest.mark.parametrize('mode', ['analyzer:customers', 'report:daily'])
+def test_script_defers_heavy_imports(mode):
+    result = probe(CLI_MODES[mode])
+    assert result['forbidden_loaded'] == []
+    assert result['import_ms'] > 0
+
+
+def test_parse_importtime_tracks_nesting():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   numpy.core\n"
+        "import time:       300 |        420 | numpy\n"
+    )
+    assert parse_importtime(stderr) == [
+        {'name': 'numpy.core', 'depth': 1, 'cumulative_us': 120},
+        {'name': 'numpy', 'depth': 0, 'cumulative_us': 420}
+    ]
@@ -0,0 +1,215 @@
+"""
+Tests for chunked extraction and the mergeable streaming accumulators
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from python.config import PATHS
+from python.query_builder import DateRange
+from python.streaming import (
+    GroupStats, QuantileSketch, RunningStats, TopN, cursor_chunks, fold, frame_chunks
+)
+from python import queries
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+requires_pyarrow = pytest.mark.skipif(not HAVE_PYARROW, reason='pyarrow is not available')
+
+
+class FakeCursor:
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.description = [(name,) for name in columns]
+        self.position = 0
+        self.fetch_sizes = []
+        self.closed = False
+
+    def execute(self, sql, params):
+        self.params = params
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        batch = self.rows[self.position:self.position + size]
+        self.position += len(batch)
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.consumed = False
+
+    def cursor(self, buffered=True):
+        assert buffered is False
+        return self._cursor
+
+    def consume_results(self):
+        self.consumed = True
+
+
+def test_cursor_chunks_reads_in_fixed_size_batches():
+    cursor = FakeCursor([(i, i * 2.0) for i in range(25)], ['id', 'value'])
+    conn = FakeConnection(cursor)
+    period = DateRange(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+    chunks = list(cursor_chunks(conn, queries.DRIVER_PERFORMANCE, chunk_size=10, period=period))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert list(chunks[0].columns) == ['id', 'value']
+    assert cursor.params == (period.start, period.end)
+    assert cursor.closed and conn.consumed
+
+
+def test_cursor_chunks_drains_the_result_when_stopped_early():
+    cursor = FakeCursor([(i,) for i in range(25)], ['id'])
+    conn = FakeConnection(cursor)
+    period = DateRange(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+    chunks = cursor_chunks(conn, queries.DRIVER_PERFORMANCE, chunk_size=10, period=period)
+    next(chunks)
+    chunks.close()
+
+    assert cursor.closed and conn.consumed
+
+
+def test_partial_aggregates_merge_to_the_whole():
+    values = pd.Series(np.random.default_rng(1).exponential(50, 1000))
+    values[::17] = np.nan
+
+    whole = RunningStats().add(values)
+    merged = RunningStats().add(values[:300]).merge(RunningStats().add(values[300:]))
+    assert merged.count == whole.count == values.notna().sum()
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.max == values.max()
+
+    sketch = QuantileSketch().add(values[:500]).merge(QuantileSketch().add(values[500:]))
+    for q in (0.1, 0.5, 0.75, 0.99):
+        exact = values.quantile(q, interpolation='lower')
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_quantile_sketch_handles_zero_and_negative_values():
+    values = np.array([-10.0, -1.0, 0.0, 0.0, 2.0, 30.0])
+    sketch = QuantileSketch().add(values)
+    assert sketch.quantile(0) == pytest.approx(-10, rel=0.01)
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1) == pytest.approx(30, rel=0.01)
+
+
+def test_top_n_matches_nlargest_across_chunks():
+    df = pd.DataFrame({'id': range(100), 'score': np.random.default_rng(2).integers(0, 20, 100)})
+
+    top = TopN(7, 'score')
+    for chunk in frame_chunks(df, 13):
+        top.add(chunk)
+
+    expected = df.nlargest(7, 'score', keep='first')
+    assert [row['id'] for row in top.items()] == expected['id'].tolist()
+
+    halves = TopN(7, 'score').add(df[:50]).merge(TopN(7, 'score').add(df[50:]))
+    assert [row['id'] for row in halves.items()] == expected['id'].tolist()
+
+    filtered = TopN(3, 'score', columns=['id'], where=lambda chunk: chunk['id'] % 2 == 0).add(df)
+    assert all(set(row) == {'id'} and row['id'] % 2 == 0 for row in filtered.items())
+
+
+def test_group_stats_split_by_value():
+    df = pd.DataFrame({'is_vip': [1, 0, 1, 0, 0], 'spent': [10.0, 1.0, 30.0, None, 5.0]})
+    stats = GroupStats('is_vip', ['spent'])
+    assert fold(frame_chunks(df, 2), stats) == 5
+    assert stats.count(True) == 2
+    assert stats.count(False) == 3
+    assert stats.mean('spent', True) == 20
+    assert stats.mean('spent', False) == 3
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    pytest.importorskip('sklearn')
+    for name in ('rollups', 'results', 'models'):
+        monkeypatch.setitem(PATHS, name, str(tmp_path / name))
+
+    from python.data_analyzer import DataAnalyzer
+
+    now = datetime.now()
+    rng = np.random.default_rng(5)
+    count = 240
+    customers = pd.DataFrame({
+        'id': np.arange(1, count + 1),
+        'first_name': [f'First{i}' for i in range(count)],
+        'last_name': [f'Last{i}' for i in range(count)],
+        'is_vip': (np.arange(count) % 4 == 0).astype(int),
+        'total_services': rng.integers(1, 30, count),
+        'total_spent': rng.gamma(2, 200, count).round(2),
+        'avg_service_cost': rng.gamma(2, 40, count).round(2),
+        'last_service_date': [now - timedelta(days=int(d)) for d in rng.integers(1, 200, count)],
+        'avg_rating_given': rng.uniform(1, 5, count),
+        'days_since_first_service': rng.integers(1, 400, count)
+    })
+    drivers = pd.DataFrame({
+        'id': np.arange(1, 61),
+        'first_name': [f'Driver{i}' for i in range(60)],
+        'last_name': ['X'] * 60,
+        'total_services': rng.integers(5, 50, 60),
+        'total_revenue': rng.gamma(3, 500, 60).round(2),
+        'avg_service_cost': rng.gamma(2, 40, 60),
+        'avg_completion_time': rng.uniform(20, 120, 60).round(),
+        'avg_rating': rng.uniform(2.5, 5, 60),
+    })
+    drivers['completed_services'] = (drivers['total_services'] * rng.uniform(0.6, 1, 60)).astype(int)
+    drivers['cancelled_services'] = drivers['total_services'] - drivers['completed_services']
+    drivers = drivers.sort_values('total_services', ascending=False, kind='stable').reset_index(drop=True)
+    frames = {'customer_behavior': customers, 'driver_performance': drivers}
+
+    analyzer = DataAnalyzer(use_cache=False)
+    analyzer._load_frame = lambda query, **params: frames[query.name].copy()
+    analyzer._iter_frames = lambda query, **params: frame_chunks(frames[query.name], 25)
+    return analyzer
+
+
+def test_streamed_driver_analysis_matches_in_memory(analyzer):
+    expected = analyzer.analyze_driver_performance(30)
+    analyzer.streaming = True
+    streamed = analyzer.analyze_driver_performance(30)
+
+    assert 'driver_metrics' not in streamed
+    assert [d['id'] for d in streamed['top_performers']] == [d['id'] for d in expected['top_performers']]
+    for key, value in expected['summary'].items():
+        assert streamed['summary'][key] == pytest.approx(value)
+    assert streamed['improvement_areas'][:2] == expected['improvement_areas'][:2]
+
+
+@requires_pyarrow
+def test_streamed_customer_analysis_matches_in_memory(analyzer):
+    analyzer.streaming = True
+    streamed = analyzer.analyze_customer_behavior(90)
+    analyzer.streaming = False
+    expected = analyzer.analyze_customer_behavior(90)
+
+    for section in ('vip_analysis', 'summary'):
+        for key, value in expected[section].items():
+            assert streamed[section][key] == pytest.approx(value)
+    assert streamed['clv_predictions']['average_current_value'] == pytest.approx(
+        expected['clv_predictions']['average_current_value'])
+    assert streamed['clv_predictions']['high_value_threshold'] == pytest.approx(
+        expected['clv_predictions']['high_value_threshold'], rel=0.05)
+    assert [c['id'] for c in streamed['at_risk_customers']] == [c['id'] for c in expected['at_risk_customers']]
+
+    # Both paths assign segments with the same saved model
+    assert streamed['segmentation']['retrained'] == 'no model'
+    assert expected['segmentation']['model_version'] == streamed['segmentation']['model_version']
+    for name, segment in expected['customer_segments'].items():
+        assert streamed['customer_segments'][name]['count'] == segment['count']